@@ -12,15 +12,18 @@ Features:
 - Dead-Letter-Queue für fehlgeschlagene Deliveries
 - Request/Response Pattern mit Timeout
 - Statistics & Monitoring
+- Shard-Queue je Agent mit Credit-basiertem Backpressure (v1.2)
+- Optionales persistentes Message-Log mit Replay (v1.2)
 
-Version: 1.0
+Version: 1.2
 Author: VERITAS Development Team
 Date: 6. Oktober 2025
 """
 
 import asyncio
-from typing import Callable, Dict, List, Optional, Set, Any, Tuple
-from collections import defaultdict
+import time
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Any, Tuple
+from collections import defaultdict, deque
 from datetime import datetime
 import logging
 import sys
@@ -54,19 +57,39 @@ logger = logging.getLogger(__name__)
 # Import Enhanced Components
 try:
     from backend.agents.agent_message_broker_enhanced import (
+        AgentShard,
         BrokerConfiguration,
         MessageWorker,
         WorkerPoolManager,
-        DEFAULT_CONFIG
+        DEFAULT_CONFIG,
+        latency_percentiles
     )
 except ModuleNotFoundError:
     from agent_message_broker_enhanced import (
+        AgentShard,
         BrokerConfiguration,
         MessageWorker,
         WorkerPoolManager,
-        DEFAULT_CONFIG
+        DEFAULT_CONFIG,
+        latency_percentiles
     )
 
+try:
+    from backend.agents.agent_message_log import (
+        DISCARDED,
+        MessageLog,
+        MessageLogConfig
+    )
+except ModuleNotFoundError:
+    from agent_message_log import (
+        DISCARDED,
+        MessageLog,
+        MessageLogConfig
+    )
+
+# Fenster für throughput_recent_msgs_per_sec (Sekunden)
+THROUGHPUT_WINDOW_S = 10
+
 
 class AgentMessageBroker:
     """
@@ -84,6 +107,16 @@ class AgentMessageBroker:
     - **NEW (v1.1):** Multi-Worker-Pattern für höheren Throughput (500+ msg/s)
     - **NEW (v1.1):** Message-Batching für Performance-Optimierung
     - **NEW (v1.1):** Worker-Health-Monitoring mit Auto-Restart
+    - **NEW (v1.2):** Shard-Queue je Agent (eigene Consumer), ein langsamer
+      Handler blockiert nur seinen eigenen Shard
+    - **NEW (v1.2):** Credit-basiertes Backpressure für send_message/publish_event
+      statt Verwerfen bei voller Queue
+    - **NEW (v1.2):** Gebündelter Fan-Out für Broadcasts/Events
+    - **NEW (v1.2):** Optionales persistentes Message-Log (``MessageLog``):
+      Replay unbestätigter Requests nach Neustart, Dead-Letter-Reprocessing
+    
+    Mit ``BrokerConfiguration(enable_sharding=False)`` läuft der Broker im
+    bisherigen Modus (eine globale Priority-Queue + Worker-Pool).
     
     Example:
         >>> # Default (Optimiert für Throughput)
@@ -94,8 +127,8 @@ class AgentMessageBroker:
         >>> config = BrokerConfiguration(num_workers=3, batch_size=10)
         >>> broker = AgentMessageBroker(config=config)
         >>> 
-        >>> # Agent registrieren
-        >>> broker.register_agent(agent.identity, agent.on_message)
+        >>> # Agent registrieren (optional: mehrere Consumer für den Shard)
+        >>> broker.register_agent(agent.identity, agent.on_message, consumers=2)
         >>> 
         >>> # Message senden
         >>> await broker.send_message(message)
@@ -107,6 +140,13 @@ class AgentMessageBroker:
         >>> broker.subscribe(agent_id, "rag_context_updates")
         >>> await broker.publish_event("rag_context_updates", sender, event_data)
         >>> 
+        >>> # Persistentes Log + Recovery nach Neustart
+        >>> config = BrokerConfiguration(message_log_dir="data/agent_message_log")
+        >>> broker = AgentMessageBroker(config=config)
+        >>> # ... Agenten registrieren, start() ...
+        >>> await broker.replay_unacknowledged()
+        >>> await broker.reprocess_dead_letters()
+        >>> 
         >>> # Performance Stats
         >>> stats = broker.get_stats()
         >>> print(f"Throughput: {stats['worker_pool']['total_messages_processed']} messages")
@@ -116,7 +156,8 @@ class AgentMessageBroker:
         self,
         config: Optional[BrokerConfiguration] = None,
         max_queue_size: Optional[int] = None,
-        max_retry: Optional[int] = None
+        max_retry: Optional[int] = None,
+        message_log: Optional[MessageLog] = None
     ):
         """
         Initialisiert den Message-Broker
@@ -125,6 +166,8 @@ class AgentMessageBroker:
             config: BrokerConfiguration für Performance-Tuning (empfohlen)
             max_queue_size: Maximale Queue-Größe (deprecated, use config)
             max_retry: Max Retry-Versuche (deprecated, use config)
+            message_log: Persistentes Message-Log (default: aus
+                         config.message_log_dir, sonst kein Log)
             
         Example:
             >>> # Empfohlen: Konfiguration verwenden
@@ -154,7 +197,10 @@ class AgentMessageBroker:
         # Topic-Subscriptions: topic -> Set[agent_id]
         self._subscriptions: Dict[str, Set[str]] = defaultdict(set)
         
-        # Message-Queue (Priority-Queue mit asyncio)
+        # Shard-Queues je Agent: agent_id -> AgentShard (enable_sharding)
+        self._shards: Dict[str, AgentShard] = {}
+        
+        # Globale Message-Queue (Legacy-Modus ohne Sharding)
         # Tuple: (priority: int, message_id: str, message: AgentMessage)
         self._message_queue: asyncio.PriorityQueue = asyncio.PriorityQueue(
             maxsize=self.config.max_queue_size
@@ -166,6 +212,15 @@ class AgentMessageBroker:
         # Dead-Letter-Queue für fehlgeschlagene Messages
         self._dead_letter_queue: List[Tuple[AgentMessage, str]] = []  # (message, error_reason)
         
+        # Persistentes Message-Log (optional)
+        self._owns_message_log = message_log is None and self.config.message_log_dir is not None
+        if self._owns_message_log:
+            message_log = MessageLog(MessageLogConfig(
+                directory=self.config.message_log_dir,
+                fsync_interval_ms=self.config.message_log_fsync_interval_ms
+            ))
+        self._message_log: Optional[MessageLog] = message_log
+        
         # NEW: Worker Pool für Multi-Worker-Pattern
         self._worker_pool = WorkerPoolManager(self)
         
@@ -183,14 +238,25 @@ class AgentMessageBroker:
             "broker_uptime_seconds": 0,
             # NEW: Batch-Processing Stats
             "batches_processed": 0,
-            "avg_batch_size": 0.0
+            "avg_batch_size": 0.0,
+            # NEW: Sharding & Backpressure Stats
+            "backpressure_rejections": 0,
+            "backpressure_waits": 0,
+            "fanout_batches": 0
         }
+        # Zustellungen je Sekunde (gleitendes Fenster für throughput_recent)
+        self._delivery_buckets: Deque[List[int]] = deque()  # [Sekunde, Anzahl]
         
         # Background-Worker (Legacy - wird durch Worker-Pool ersetzt)
         self._worker_task: Optional[asyncio.Task] = None
+        # Aufräumen des Message-Logs (abgeschlossene Segmente nach Rotation)
+        self._log_maintenance_task: Optional[asyncio.Task] = None
         self._running = False
         
-        logger.info(f"✅ AgentMessageBroker initialisiert (Workers: {self.config.num_workers}, Batching: {self.config.enable_batching})")
+        logger.info(
+            f"✅ AgentMessageBroker initialisiert (Workers: {self.config.num_workers}, "
+            f"Batching: {self.config.enable_batching}, Sharding: {self.config.enable_sharding})"
+        )
     
     async def start(self):
         """
@@ -206,13 +272,24 @@ class AgentMessageBroker:
         self._running = True
         self._stats["broker_start_time"] = datetime.now()
         
-        # Worker-Pool starten (ersetzt Single-Worker)
-        await self._worker_pool.start(self.config.num_workers)
-        
-        logger.info(
-            f"🚀 Message-Broker gestartet "
-            f"(Workers: {self.config.num_workers}, Batching: {self.config.enable_batching})"
-        )
+        if self.config.enable_sharding:
+            # Consumer je Agent-Shard starten
+            for shard in self._shards.values():
+                shard.start()
+            logger.info(
+                f"🚀 Message-Broker gestartet "
+                f"(Shards: {len(self._shards)}, Batching: {self.config.enable_batching})"
+            )
+        else:
+            # Worker-Pool starten (globale Queue)
+            await self._worker_pool.start(self.config.num_workers)
+            logger.info(
+                f"🚀 Message-Broker gestartet "
+                f"(Workers: {self.config.num_workers}, Batching: {self.config.enable_batching})"
+            )
+        
+        if self._message_log:
+            self._log_maintenance_task = asyncio.create_task(self._log_maintenance_loop())
     
     async def stop(self):
         """
@@ -226,14 +303,31 @@ class AgentMessageBroker:
         
         self._running = False
         
-        # Worker-Pool stoppen
+        if self._log_maintenance_task:
+            self._log_maintenance_task.cancel()
+            try:
+                await self._log_maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._log_maintenance_task = None
+        
+        # Worker-Pool und Shard-Consumer stoppen
         await self._worker_pool.stop()
+        for shard in self._shards.values():
+            await shard.stop()
         
         # Pending-Requests canceln
         for correlation_id, future in self._pending_requests.items():
             if not future.done():
                 future.cancel()
         
+        # Message-Log sichern
+        if self._message_log:
+            if self._owns_message_log:
+                self._message_log.close()
+            else:
+                self._message_log.sync()
+        
         # Uptime berechnen
         if self._stats["broker_start_time"]:
             uptime = (datetime.now() - self._stats["broker_start_time"]).total_seconds()
@@ -252,7 +346,8 @@ class AgentMessageBroker:
     def register_agent(
         self,
         identity: AgentIdentity,
-        handler: Callable[[AgentMessage], Any]
+        handler: Callable[[AgentMessage], Any],
+        consumers: Optional[int] = None
     ):
         """
         Registriert einen Agenten mit Message-Handler
@@ -261,6 +356,9 @@ class AgentMessageBroker:
             identity: Agent-Identität
             handler: Callback-Funktion für eingehende Messages
                      Kann sync oder async sein: def handler(msg: AgentMessage) -> Optional[Dict]
+            consumers: Consumer-Tasks für den Shard des Agenten
+                       (default: config.consumers_per_agent; >1 nur für
+                       Handler, die keine Reihenfolge benötigen)
         
         Example:
             >>> def on_message(message: AgentMessage) -> Dict[str, Any]:
@@ -275,6 +373,18 @@ class AgentMessageBroker:
         self._handlers[identity.agent_id] = handler
         self._stats["agents_registered"] = len(self._agents)
         
+        if self.config.enable_sharding and identity.agent_id not in self._shards:
+            shard = AgentShard(
+                identity.agent_id,
+                self,
+                consumers=consumers or self.config.consumers_per_agent,
+                capacity=self.config.shard_capacity,
+                latency_window=self.config.latency_window
+            )
+            self._shards[identity.agent_id] = shard
+            if self._running:
+                shard.start()
+        
         logger.info(f"📝 Agent registriert: {identity.agent_name} ({identity.agent_id})")
     
     def unregister_agent(self, agent_id: str):
@@ -294,6 +404,13 @@ class AgentMessageBroker:
         del self._agents[agent_id]
         del self._handlers[agent_id]
         
+        # Shard-Consumer abbrechen (wartende Messages verfallen)
+        shard = self._shards.pop(agent_id, None)
+        if shard:
+            if shard.depth:
+                logger.warning(f"⚠️ {shard.depth} wartende Messages für {agent_id} verworfen")
+            shard.cancel()
+        
         # Remove from all subscriptions
         for topic in self._subscriptions:
             self._subscriptions[topic].discard(agent_id)
@@ -407,17 +524,33 @@ class AgentMessageBroker:
         Args:
             message: AgentMessage-Objekt
             
+        Mit Sharding wird die Message in den Shard jedes Empfängers
+        eingereiht. Ist ein Shard voll, wartet der Aufruf bis zu
+        ``backpressure_timeout_ms`` auf einen Credit (Backpressure).
+        
         Returns:
-            True wenn Message in Queue eingereiht wurde, False bei Queue-Full
+            True wenn Message für alle Empfänger eingereiht wurde,
+            False bei voller Queue (Dead-Letter-Queue)
             
         Example:
             >>> message = AgentMessage(sender=..., recipients=..., ...)
             >>> success = await broker.send_message(message)
         """
+        # RESPONSE sofort dem wartenden send_request zustellen: wartet dieser in
+        # einem Handler, ist er selbst der (einzige) Consumer des Empfänger-Shards
+        self._resolve_pending_request(message)
+        
+        if self.config.enable_sharding:
+            return await self._send_sharded(message)
+        
         try:
             # Priority-basiertes Queuing (negative für Max-Heap)
             priority = -message.metadata.priority.value
             
+            # Vor dem Einreihen protokollieren (Zustellung kann sofort folgen)
+            if self._message_log:
+                self._message_log.append_enqueued(message, self._recipient_ids(message))
+            
             # In Queue einreihen (non-blocking)
             try:
                 # Tuple: (priority, message_id for uniqueness, message)
@@ -431,17 +564,116 @@ class AgentMessageBroker:
                 return True
                 
             except asyncio.TimeoutError:
-                logger.error(f"❌ Message-Queue voll (max {self._max_queue_size})")
-                self._dead_letter_queue.append((message, "queue_full"))
+                logger.error(f"❌ Message-Queue voll (max {self.config.max_queue_size})")
+                self._dead_letter(message, "queue_full")
                 self._stats["messages_failed"] += 1
                 return False
                 
         except Exception as e:
             logger.error(f"❌ Fehler beim Senden der Message: {e}", exc_info=True)
-            self._dead_letter_queue.append((message, str(e)))
+            self._dead_letter(message, str(e))
             self._stats["messages_failed"] += 1
             return False
     
+    def _resolve_pending_request(self, message: AgentMessage):
+        """Löst den Pending-Request einer RESPONSE auf (unabhängig von der Zustellung)"""
+        if not message.is_response():
+            return
+        future = self._pending_requests.pop(message.metadata.correlation_id, None)
+        if future is not None and not future.done():
+            future.set_result(message)
+    
+    def _recipient_ids(self, message: AgentMessage) -> List[str]:
+        """Empfänger-IDs (Broadcast: alle registrierten Agenten)"""
+        if message.is_broadcast():
+            return list(self._agents)
+        return [recipient.agent_id for recipient in message.recipients]
+    
+    def _dead_letter(self, message: AgentMessage, reason: str, agent_id: Optional[str] = None):
+        """Dead-Letter-Queue (+ Message-Log); agent_id None: alle Empfänger"""
+        self._dead_letter_queue.append((message, reason))
+        if self._message_log:
+            self._message_log.append_dead_letter(message, reason, agent_id)
+    
+    async def _send_sharded(self, message: AgentMessage) -> bool:
+        """
+        Reiht eine Message in die Shards ihrer Empfänger ein
+        
+        Gebündelter Fan-Out: Erst werden alle Shards mit freien Credits ohne
+        await bedient, nur volle Shards werden (parallel) abgewartet.
+        
+        Args:
+            message: AgentMessage-Objekt
+            
+        Returns:
+            True wenn alle Empfänger-Shards die Message angenommen haben
+        """
+        recipient_ids = self._recipient_ids(message)
+        
+        ready: List[AgentShard] = []
+        waiting: List[AgentShard] = []
+        # Shards mit belegtem Credit, deren Message noch nicht eingereiht ist -
+        # bei Abbruch/Fehler werden diese Credits im finally zurückgegeben
+        granted: Set[AgentShard] = set()
+        
+        def enqueue(shards: List[AgentShard]):
+            if shards and self._message_log:
+                self._message_log.append_enqueued(message, [shard.agent_id for shard in shards])
+            for shard in shards:
+                shard.put(message)
+                granted.discard(shard)
+        
+        async def reserve(shard: AgentShard) -> bool:
+            if await shard.reserve(self.config.backpressure_timeout_ms / 1000.0):
+                granted.add(shard)
+                return True
+            return False
+        
+        try:
+            for agent_id in recipient_ids:
+                shard = self._shards.get(agent_id)
+                if shard is None:
+                    logger.warning(f"⚠️ Handler für Agent {agent_id} nicht gefunden")
+                    continue
+                if shard.try_reserve():
+                    granted.add(shard)
+                    ready.append(shard)
+                else:
+                    waiting.append(shard)
+            
+            # Ein Log-Record je Fan-Out, vor dem Einreihen
+            enqueue(ready)
+            
+            if len(recipient_ids) > 1:
+                self._stats["fanout_batches"] += 1
+            
+            accepted = True
+            if waiting:
+                self._stats["backpressure_waits"] += len(waiting)
+                reserved = await asyncio.gather(*(reserve(shard) for shard in waiting))
+                enqueue([shard for shard, ok in zip(waiting, reserved) if ok])
+                for shard, ok in zip(waiting, reserved):
+                    if ok:
+                        continue
+                    accepted = False
+                    shard.rejected += 1
+                    self._stats["backpressure_rejections"] += 1
+                    logger.error(
+                        f"❌ Shard {shard.agent_id} voll "
+                        f"(Credits: {shard.capacity}, Timeout: {self.config.backpressure_timeout_ms}ms)"
+                    )
+                    self._dead_letter(message, f"backpressure:{shard.agent_id}", shard.agent_id)
+        finally:
+            for shard in granted:
+                shard.release()
+        
+        if accepted:
+            self._stats["messages_sent"] += 1
+            logger.debug(f"📤 Message gesendet: {message}")
+        else:
+            self._stats["messages_failed"] += 1
+        return accepted
+    
     async def send_request(
         self,
         message: AgentMessage,
@@ -548,89 +780,252 @@ class AgentMessageBroker:
     
     async def _deliver_message(self, message: AgentMessage):
         """
-        Liefert eine Message an Empfänger
+        Liefert eine Message an alle Empfänger (Legacy-Modus, globale Queue)
         
         Args:
             message: Auszuliefernde Message
         """
         try:
-            # TTL prüfen
-            if message.metadata.is_expired():
-                logger.warning(f"⏱️ Message expired (TTL {message.metadata.ttl_seconds}s): {message}")
-                self._dead_letter_queue.append((message, "expired"))
-                self._stats["messages_expired"] += 1
-                return
-            
             # Broadcast oder Point-to-Point?
             if message.is_broadcast():
                 # Broadcast an alle registrierten Agenten
-                recipients = list(self._agents.values())
+                recipient_ids = list(self._agents)
             else:
-                recipients = message.recipients
+                recipient_ids = [recipient.agent_id for recipient in message.recipients]
             
             # An jeden Empfänger ausliefern
             delivery_count = 0
-            for recipient in recipients:
-                if recipient.agent_id not in self._handlers:
-                    logger.warning(f"⚠️ Handler für Agent {recipient.agent_id} nicht gefunden")
-                    continue
-                
-                try:
-                    # Handler aufrufen (async oder sync)
-                    handler = self._handlers[recipient.agent_id]
-                    
-                    if asyncio.iscoroutinefunction(handler):
-                        response = await handler(message)
-                    else:
-                        response = handler(message)
-                    
-                    # Für REQUEST: Response verarbeiten
-                    if message.is_request() and response:
-                        # Response-Message erstellen
-                        if isinstance(response, dict):
-                            response_msg = message.create_response(
-                                sender=recipient,
-                                payload=response
-                            )
-                            await self.send_message(response_msg)
-                    
-                    # Für RESPONSE: Pending-Request auflösen
-                    if message.is_response():
-                        correlation_id = message.metadata.correlation_id
-                        if correlation_id in self._pending_requests:
-                            future = self._pending_requests[correlation_id]
-                            if not future.done():
-                                future.set_result(message)
-                            del self._pending_requests[correlation_id]
-                    
+            for agent_id in recipient_ids:
+                if await self._deliver_to(agent_id, message):
                     delivery_count += 1
-                    
-                except Exception as e:
-                    logger.error(
-                        f"❌ Fehler bei Message-Delivery an {recipient.agent_id}: {e}",
-                        exc_info=True
-                    )
-                    
-                    # Retry-Logic (nur für wichtige Messages)
-                    if (message.metadata.priority.value >= MessagePriority.HIGH.value and
-                        message.metadata.retry_count < self.config.retry_max_attempts):
-                        
-                        message.metadata.retry_count += 1
-                        await self.send_message(message)
-                        self._stats["messages_retried"] += 1
-                        logger.info(f"🔄 Message-Retry ({message.metadata.retry_count}/{self.config.retry_max_attempts}): {message}")
-                    else:
-                        self._dead_letter_queue.append((message, str(e)))
-                        self._stats["messages_failed"] += 1
-            
-            self._stats["messages_delivered"] += delivery_count
+            
             logger.debug(f"✅ Message zugestellt: {message} → {delivery_count} Empfänger")
             
         except Exception as e:
             logger.error(f"❌ Fehler bei Message-Delivery: {e}", exc_info=True)
-            self._dead_letter_queue.append((message, str(e)))
+            self._dead_letter(message, str(e))
             self._stats["messages_failed"] += 1
     
+    async def _deliver_to(self, agent_id: str, message: AgentMessage) -> bool:
+        """
+        Liefert eine Message an einen Empfänger (Shard-Consumer bzw. Worker)
+        
+        Args:
+            agent_id: Empfänger-Agent-ID
+            message: Auszuliefernde Message
+            
+        Returns:
+            True wenn der Handler die Message verarbeitet hat
+        """
+        # TTL prüfen
+        if message.metadata.is_expired():
+            logger.warning(f"⏱️ Message expired (TTL {message.metadata.ttl_seconds}s): {message}")
+            self._dead_letter(message, "expired", agent_id)
+            self._stats["messages_expired"] += 1
+            return False
+        
+        handler = self._handlers.get(agent_id)
+        if handler is None:
+            logger.warning(f"⚠️ Handler für Agent {agent_id} nicht gefunden")
+            return False
+        
+        try:
+            # Handler aufrufen (async oder sync)
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(message)
+            else:
+                response = handler(message)
+            
+            # Für REQUEST: Response verarbeiten
+            if message.is_request() and response:
+                # Response-Message erstellen
+                if isinstance(response, dict):
+                    response_msg = message.create_response(
+                        sender=self._agents[agent_id],
+                        payload=response
+                    )
+                    await self.send_message(response_msg)
+            
+            # Für RESPONSE: Pending-Request auflösen (falls nicht schon beim Senden)
+            self._resolve_pending_request(message)
+            
+            self._stats["messages_delivered"] += 1
+            self._count_delivery()
+            if self._message_log:
+                self._message_log.append_delivered(message.message_id, agent_id)
+            return True
+            
+        except Exception as e:
+            logger.error(
+                f"❌ Fehler bei Message-Delivery an {agent_id}: {e}",
+                exc_info=True
+            )
+            
+            # Retry-Logic (nur für wichtige Messages)
+            if (message.metadata.priority.value >= MessagePriority.HIGH.value and
+                message.metadata.retry_count < self.config.retry_max_attempts):
+                
+                message.metadata.retry_count += 1
+                if self._message_log:
+                    self._message_log.append_failed(message.message_id, agent_id, str(e))
+                shard = self._shards.get(agent_id)
+                if shard is not None:
+                    # Nur den fehlgeschlagenen Empfänger erneut beliefern - direkt
+                    # in den Shard, der Credit dieser Zustellung ist noch belegt
+                    if self._message_log:
+                        self._message_log.append_enqueued(message, [agent_id])
+                    shard.requeue(message)
+                else:
+                    await self.send_message(message)
+                self._stats["messages_retried"] += 1
+                logger.info(f"🔄 Message-Retry ({message.metadata.retry_count}/{self.config.retry_max_attempts}): {message}")
+            else:
+                self._dead_letter(message, str(e), agent_id)
+                self._stats["messages_failed"] += 1
+            return False
+    
+    async def _enqueue_for(self, agent_id: str, message: AgentMessage) -> bool:
+        """
+        Reiht eine Message für genau einen Empfänger-Shard ein
+        (Replay, Dead-Letter-Reprocessing)
+        
+        Returns:
+            True wenn eingereiht, False bei Backpressure-Timeout (Dead-Letter)
+        """
+        shard = self._shards.get(agent_id)
+        if shard is None:
+            logger.warning(f"⚠️ Handler für Agent {agent_id} nicht gefunden")
+            return False
+        if not await shard.reserve(self.config.backpressure_timeout_ms / 1000.0):
+            shard.rejected += 1
+            self._stats["backpressure_rejections"] += 1
+            self._dead_letter(message, f"backpressure:{agent_id}", agent_id)
+            return False
+        if self._message_log:
+            self._message_log.append_enqueued(message, [agent_id])
+        shard.put(message)
+        return True
+    
+    # ========================================================================
+    # RECOVERY & DEAD-LETTER-REPROCESSING (Message-Log)
+    # ========================================================================
+    
+    async def replay_unacknowledged(
+        self,
+        message_types: Optional[Sequence[MessageType]] = (MessageType.REQUEST,)
+    ) -> int:
+        """
+        Reiht Messages erneut ein, die laut Message-Log eingereiht, aber nie
+        bestätigt wurden (z.B. nach Absturz/Neustart eines Workers)
+        
+        Nach dem Registrieren der Agenten aufrufen. Empfänger, die nicht
+        mehr registriert sind, werden übersprungen.
+        
+        Args:
+            message_types: Nur diese Typen erneut einreihen (None: alle)
+            
+        Returns:
+            Anzahl erneut eingereihter Deliveries
+            
+        Raises:
+            RuntimeError: Wenn kein Message-Log konfiguriert ist
+        """
+        log = self._require_message_log()
+        replayed = 0
+        seen: Set[str] = set()
+        
+        for agent_id, message in await asyncio.to_thread(log.unacknowledged, message_types):
+            if agent_id not in self._handlers:
+                logger.warning(f"⚠️ Replay übersprungen: Agent {agent_id} nicht registriert")
+                continue
+            if self.config.enable_sharding:
+                replayed += await self._enqueue_for(agent_id, message)
+            elif message.message_id not in seen:
+                # Globale Queue: eine Message für alle Empfänger
+                seen.add(message.message_id)
+                replayed += await self.send_message(message)
+        
+        logger.info(f"🔁 Replay: {replayed} unbestätigte Messages erneut eingereiht")
+        return replayed
+    
+    async def reprocess_dead_letters(
+        self,
+        predicate: Optional[Callable[[AgentMessage, str], bool]] = None
+    ) -> int:
+        """
+        Reiht Dead-Letters gebündelt erneut ein
+        
+        Quelle ist das Message-Log (überlebt Neustarts), ohne Log die
+        In-Memory-Dead-Letter-Queue.
+        
+        Args:
+            predicate: Optionaler Filter (message, reason) -> bool
+            
+        Returns:
+            Anzahl erneut eingereihter Messages
+        """
+        if self._message_log:
+            candidates = await asyncio.to_thread(self._message_log.dead_letters)
+        else:
+            candidates = [(message, reason, None) for message, reason in self._dead_letter_queue]
+        
+        reprocessed = 0
+        redriven_ids: Set[str] = set()
+        for message, reason, agent_id in candidates:
+            if predicate and not predicate(message, reason):
+                continue
+            
+            # Frischer Versuch: Retry-Zähler zurücksetzen
+            message.metadata.retry_count = 0
+            if self._message_log:
+                self._message_log.append_resolved(message.message_id, agent_id)
+            
+            if agent_id and self.config.enable_sharding:
+                accepted = await self._enqueue_for(agent_id, message)
+            else:
+                accepted = await self.send_message(message)
+            if accepted:
+                reprocessed += 1
+                redriven_ids.add(message.message_id)
+        
+        # In-Memory-Queue um erneut eingereihte Messages bereinigen
+        self._dead_letter_queue = [
+            (message, reason) for message, reason in self._dead_letter_queue
+            if message.message_id not in redriven_ids
+        ]
+        logger.info(f"🔁 Dead-Letter-Reprocessing: {reprocessed}/{len(candidates)} Messages erneut eingereiht")
+        return reprocessed
+    
+    def _count_delivery(self):
+        """Zählt eine Zustellung im Sekunden-Bucket des Throughput-Fensters"""
+        second = int(time.perf_counter())
+        buckets = self._delivery_buckets
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+            return
+        buckets.append([second, 1])
+        while buckets[0][0] <= second - THROUGHPUT_WINDOW_S:
+            buckets.popleft()
+    
+    async def _log_maintenance_loop(self):
+        """Löscht nach jeder Segment-Rotation abgeschlossene Segmente (im Thread)"""
+        pruned_at_rotation = 0
+        while True:
+            await asyncio.sleep(self.config.message_log_prune_interval_sec)
+            rotated = self._message_log.get_stats()["segments_rotated"]
+            if rotated == pruned_at_rotation:
+                continue
+            try:
+                await asyncio.to_thread(self._message_log.prune)
+                pruned_at_rotation = rotated
+            except Exception as e:
+                logger.error(f"❌ MessageLog-Prune fehlgeschlagen: {e}")
+    
+    def _require_message_log(self) -> MessageLog:
+        if self._message_log is None:
+            raise RuntimeError("Kein Message-Log konfiguriert (BrokerConfiguration.message_log_dir)")
+        return self._message_log
+    
     # ========================================================================
     # STATISTICS & MONITORING
     # ========================================================================
@@ -654,16 +1049,35 @@ class AgentMessageBroker:
         else:
             uptime = self._stats["broker_uptime_seconds"]
         
+        if self.config.enable_sharding:
+            queue_size = sum(shard.depth for shard in self._shards.values())
+            capacity = max(1, self.config.shard_capacity * len(self._shards))
+        else:
+            queue_size = self._message_queue.qsize()
+            capacity = self.config.max_queue_size
+        
+        # Throughput: gesamt und im gleitenden Fenster (ohne Seiteneffekt)
+        delivered = self._stats["messages_delivered"]
+        oldest = int(time.perf_counter()) - THROUGHPUT_WINDOW_S
+        recent = sum(count for second, count in self._delivery_buckets if second > oldest) / THROUGHPUT_WINDOW_S
+        
         base_stats = {
             **self._stats,
             "broker_uptime_seconds": uptime,
-            "queue_size": self._message_queue.qsize(),
-            "queue_utilization": self._message_queue.qsize() / self.config.max_queue_size,
+            "queue_size": queue_size,
+            "queue_utilization": queue_size / capacity,
             "pending_requests": len(self._pending_requests),
             "dead_letter_queue_size": len(self._dead_letter_queue),
             "registered_agents": len(self._agents),
             "topics": len(self._subscriptions),
-            "running": self._running
+            "running": self._running,
+            "throughput_msgs_per_sec": round(delivered / uptime, 2) if uptime > 0 else 0.0,
+            "throughput_recent_msgs_per_sec": round(recent, 2),
+            "delivery_latency_ms": latency_percentiles(
+                [sample for shard in self._shards.values() for sample in shard.latency_samples()]
+            ),
+            "shards": {agent_id: shard.get_stats() for agent_id, shard in self._shards.items()},
+            "message_log": self._message_log.get_stats() if self._message_log else None
         }
         
         # Worker-Pool-Stats hinzufügen
@@ -678,7 +1092,11 @@ class AgentMessageBroker:
                 "batch_size": self.config.batch_size,
                 "batch_timeout_ms": self.config.batch_timeout_ms,
                 "max_queue_size": self.config.max_queue_size,
-                "delivery_parallelism": self.config.delivery_parallelism
+                "delivery_parallelism": self.config.delivery_parallelism,
+                "enable_sharding": self.config.enable_sharding,
+                "consumers_per_agent": self.config.consumers_per_agent,
+                "shard_capacity": self.config.shard_capacity,
+                "backpressure_timeout_ms": self.config.backpressure_timeout_ms
             }
         }
     
@@ -694,8 +1112,24 @@ class AgentMessageBroker:
     def clear_dead_letters(self):
         """Leert die Dead-Letter-Queue"""
         count = len(self._dead_letter_queue)
+        if self._message_log:
+            # Auch im Log als verworfen markieren (kein Reprocessing mehr);
+            # ohne Agent-ID gilt der Record für alle Dead-Letters der Message
+            for message_id in dict.fromkeys(message.message_id for message, _ in self._dead_letter_queue):
+                self._message_log.append_resolved(message_id, None, kind=DISCARDED)
         self._dead_letter_queue.clear()
         logger.info(f"🗑️ Dead-Letter-Queue geleert ({count} Messages)")
+    
+    async def aclear_dead_letters(self):
+        """
+        Leert die Dead-Letter-Queue inkl. Dead-Letters früherer Läufe
+        
+        Diese stehen nur im Message-Log; dessen Scan läuft im Thread.
+        """
+        if self._message_log:
+            for message, reason, agent_id in await asyncio.to_thread(self._message_log.dead_letters):
+                self._message_log.append_resolved(message.message_id, agent_id, kind=DISCARDED)
+        self.clear_dead_letters()
 
 
 # ============================================================================
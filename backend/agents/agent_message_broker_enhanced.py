@@ -9,14 +9,19 @@ Features:
 - Worker-Health-Monitoring mit Auto-Restart
 - Konfigurierbare Performance-Parameter
 - Backward-Kompatibel mit Single-Worker-Modus
+- **NEW (v1.2):** Shard-Queue je Agent mit eigenen Consumern und
+  Credit-basiertem Backpressure (AgentShard)
 
-Version: 1.1 (Throughput-Optimierung)
+Version: 1.2 (Sharding & Backpressure)
 Author: VERITAS Development Team
 Date: 6. Oktober 2025
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import itertools
+import time
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional, Sequence
 from dataclasses import dataclass, field
 import logging
 from datetime import datetime
@@ -41,6 +46,17 @@ class BrokerConfiguration:
         delivery_parallelism: Max parallele Deliveries pro Worker
         retry_max_attempts: Max Retry-Versuche bei Delivery-Failures
         retry_backoff_ms: Backoff zwischen Retries (ms)
+        enable_sharding: Eigene Queue je Agent statt einer globalen Queue
+        consumers_per_agent: Consumer-Tasks je Agent-Shard (Default, per
+            ``register_agent(..., consumers=n)`` überschreibbar)
+        shard_capacity: Credits je Shard (max. wartende + laufende Deliveries)
+        backpressure_timeout_ms: Max. Wartezeit von send_message auf Credits
+        latency_window: Anzahl Latenz-Messungen je Shard für Perzentile
+        message_log_dir: Verzeichnis für das persistente Message-Log
+            (None: kein Log, nur In-Memory-Dead-Letter-Queue)
+        message_log_fsync_interval_ms: Max. Zeit bis zum fsync eines Log-Records
+        message_log_prune_interval_sec: Prüfintervall des Brokers; nach einer
+            Segment-Rotation werden abgeschlossene Segmente gelöscht
     
     Example:
         >>> # High-Throughput Configuration
@@ -70,6 +86,18 @@ class BrokerConfiguration:
     retry_max_attempts: int = 3
     retry_backoff_ms: int = 100
     
+    # Sharding & Backpressure
+    enable_sharding: bool = True
+    consumers_per_agent: int = 1  # 1 = Reihenfolge je Agent bleibt erhalten
+    shard_capacity: int = 1000
+    backpressure_timeout_ms: int = 1000
+    latency_window: int = 1000
+    
+    # Persistentes Message-Log (optional)
+    message_log_dir: Optional[str] = None
+    message_log_fsync_interval_ms: int = 50
+    message_log_prune_interval_sec: float = 60.0
+    
     def __post_init__(self):
         """Validierung"""
         if not 1 <= self.num_workers <= 10:
@@ -78,6 +106,30 @@ class BrokerConfiguration:
             raise ValueError("batch_size must be 1-100")
         if not 10 <= self.batch_timeout_ms <= 1000:
             raise ValueError("batch_timeout_ms must be 10-1000")
+        if not 1 <= self.consumers_per_agent <= 32:
+            raise ValueError("consumers_per_agent must be 1-32")
+        if self.shard_capacity < 1:
+            raise ValueError("shard_capacity must be >= 1")
+        if self.backpressure_timeout_ms < 0:
+            raise ValueError("backpressure_timeout_ms must be >= 0")
+
+
+def latency_percentiles(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    p50/p95/p99 einer Latenz-Stichprobe (Sekunden → Millisekunden)
+    
+    Returns:
+        {"p50": ms, "p95": ms, "p99": ms} (None ohne Messungen)
+    """
+    values = sorted(samples)
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    
+    def pick(q: float) -> float:
+        index = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+        return round(values[index] * 1000, 3)
+    
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
 
 
 class MessageWorker:
@@ -389,5 +441,235 @@ class WorkerPoolManager:
         }
 
 
+class AgentShard:
+    """
+    Eigene Priority-Queue je Agent mit Consumer-Tasks und Credits
+    
+    Ein langsamer Handler blockiert nur seinen eigenen Shard - Messages an
+    andere Agenten werden von deren Consumern unabhängig zugestellt.
+    
+    Backpressure über Credits: Jede eingereihte Delivery belegt einen
+    Credit, der erst nach abgeschlossener Zustellung zurückgegeben wird.
+    Sind alle Credits vergeben, wartet ``send_message`` (begrenzt durch
+    ``backpressure_timeout_ms``) statt still zu verwerfen.
+    
+    Attributes:
+        agent_id: Agent, dessen Messages dieser Shard zustellt
+        broker: Referenz zum AgentMessageBroker
+        num_consumers: Anzahl Consumer-Tasks
+        capacity: Anzahl Credits
+    
+    Example:
+        >>> shard = AgentShard("env-agent-001", broker, consumers=2, capacity=500)
+        >>> shard.start()
+        >>> if shard.try_reserve():
+        ...     shard.put(message)
+    """
+    
+    def __init__(
+        self,
+        agent_id: str,
+        broker: 'AgentMessageBroker',
+        consumers: int = 1,
+        capacity: int = 1000,
+        latency_window: int = 1000
+    ):
+        self.agent_id = agent_id
+        self.broker = broker
+        self.num_consumers = max(1, consumers)
+        self.capacity = max(1, capacity)
+        
+        # (priority, seq, enqueued_at, message) - seq hält FIFO je Priorität
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._outstanding = 0
+        self._credit_waiters: Deque[asyncio.Future] = deque()
+        self._tasks: List[asyncio.Task] = []
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        
+        # Statistics
+        self._drained = 0  # aus der Queue geholt, Zustellung noch nicht begonnen
+        self.in_flight = 0
+        self.delivered = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+    
+    @property
+    def depth(self) -> int:
+        """Wartende Deliveries (inkl. bereits in einen Batch übernommener)"""
+        return self._queue.qsize() + self._drained
+    
+    @property
+    def available_credits(self) -> int:
+        """Freie Credits"""
+        return self.capacity - self._outstanding
+    
+    def start(self):
+        """Startet Consumer-Tasks (benötigt laufenden Event-Loop)"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._consume(), name=f"shard-{self.agent_id}-{i}")
+            for i in range(self.num_consumers)
+        ]
+    
+    def cancel(self):
+        """Bricht Consumer-Tasks ab (ohne zu warten)"""
+        for task in self._tasks:
+            task.cancel()
+    
+    async def stop(self):
+        """Stoppt Consumer-Tasks"""
+        self.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    # ------------------------------------------------------------------
+    # Credits
+    # ------------------------------------------------------------------
+    
+    def try_reserve(self) -> bool:
+        """Belegt einen Credit ohne zu warten"""
+        while self._credit_waiters and self._credit_waiters[0].done():
+            self._credit_waiters.popleft()  # abgelaufene Wartende
+        if self._outstanding < self.capacity and not self._credit_waiters:
+            self._outstanding += 1
+            return True
+        return False
+    
+    async def reserve(self, timeout: float) -> bool:
+        """
+        Wartet bis ein Credit frei wird
+        
+        Args:
+            timeout: Max. Wartezeit in Sekunden
+        
+        Returns:
+            True wenn Credit belegt, False bei Timeout
+        """
+        if self.try_reserve():
+            return True
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._credit_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Credit wurde im selben Moment übergeben
+                return True
+            self._drop_waiter(waiter)
+            return False
+        except BaseException:
+            # Abgebrochener Sender: übergebenen Credit zurückgeben bzw.
+            # Wartenden austragen - sonst geht der Credit dauerhaft verloren
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._drop_waiter(waiter)
+            raise
+    
+    def _drop_waiter(self, waiter: asyncio.Future):
+        waiter.cancel()
+        try:
+            self._credit_waiters.remove(waiter)
+        except ValueError:
+            pass
+    
+    def release(self):
+        """Gibt einen Credit zurück (direkt an den ältesten Wartenden)"""
+        while self._credit_waiters:
+            waiter = self._credit_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # Credit geht über, _outstanding bleibt
+                return
+        self._outstanding -= 1
+    
+    def put(self, message):
+        """Reiht Message ein (Credit muss vorher belegt sein)"""
+        priority = -message.metadata.priority.value
+        self._queue.put_nowait((priority, next(self._seq), time.perf_counter(), message))
+    
+    def requeue(self, message):
+        """
+        Reiht einen Retry aus dem eigenen Consumer ein, ohne auf Credits zu warten
+        
+        Der Consumer hält den Credit der fehlgeschlagenen Zustellung bis zum
+        Ende von ``_deliver_to`` - ein ``reserve`` könnte bei vollem Shard nur
+        in den Backpressure-Timeout laufen. Die Belegung überschreitet
+        ``capacity`` daher höchstens um die Anzahl der Consumer.
+        """
+        self._outstanding += 1
+        self.put(message)
+    
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+    
+    async def _consume(self):
+        """Consumer-Loop: holt Batches aus dem Shard und stellt sie zu"""
+        batch_size = self.broker.config.batch_size if self.broker.config.enable_batching else 1
+        
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Bereits wartende Messages ohne weiteres await mitnehmen
+            # (gleichmäßig auf die Consumer verteilt)
+            limit = min(batch_size, max(1, (self._queue.qsize() + 1) // self.num_consumers))
+            while len(batch) < limit:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            self.batches += 1
+            self._drained += len(batch)
+            
+            for index, (_, _, enqueued_at, message) in enumerate(batch):
+                self._drained -= 1
+                self.in_flight += 1
+                try:
+                    delivered = await self.broker._deliver_to(self.agent_id, message)
+                except asyncio.CancelledError:
+                    # Restliche Credits des Batches freigeben
+                    for _ in batch[index:]:
+                        self.release()
+                    self._drained -= len(batch) - index - 1
+                    self.in_flight -= 1
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Shard {self.agent_id} Delivery-Fehler: {e}", exc_info=True)
+                    delivered = False
+                
+                self.in_flight -= 1
+                self.release()
+                self._latencies.append(time.perf_counter() - enqueued_at)
+                if delivered:
+                    self.delivered += 1
+                else:
+                    self.failed += 1
+    
+    def latency_samples(self) -> List[float]:
+        """Letzte Delivery-Latenzen (Sekunden, Einreihen → Zustellung)"""
+        return list(self._latencies)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Shard-Statistiken"""
+        return {
+            "depth": self.depth,
+            "in_flight": self.in_flight,
+            "available_credits": self.available_credits,
+            "waiting_senders": sum(1 for w in self._credit_waiters if not w.done()),
+            "consumers": self.num_consumers,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "latency_ms": latency_percentiles(self._latencies)
+        }
+
+
 # Für Backward-Kompatibilität: Default Config
 DEFAULT_CONFIG = BrokerConfiguration()
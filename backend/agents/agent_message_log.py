@@ -0,0 +1,439 @@
+"""
+VERITAS Agent Communication Protocol - Durable Message Log
+
+Append-only, segment-basiertes Message-Log für den AgentMessageBroker.
+
+Problem:
+- Dead-Letters lebten nur in der In-Memory-Liste des Brokers
+- Eingereihte, noch nicht zugestellte Messages gingen bei einem Neustart verloren
+
+Lösung:
+- Jede Message wird beim Einreihen, bei Zustellung und bei Fehlern als
+  JSON-Zeile protokolliert (``enqueued`` / ``delivered`` / ``failed`` /
+  ``dead_letter`` / ``redriven`` / ``discarded``)
+- Lokale Segment-Dateien (``segment-<erste seq>.log``), Rotation nach Größe
+- Ein Writer-Thread, fsync gebündelt (höchstens alle ``fsync_interval_ms``
+  bzw. nach ``fsync_batch`` Records) - der Event-Loop wartet nie auf die Platte
+- Recovery: unbestätigte Messages (enqueued, aber weder delivered noch
+  dead_letter) und offene Dead-Letters lassen sich aus dem Log rekonstruieren
+- Unvollständige letzte Zeile (Absturz während write) wird ignoriert
+- Offline-Benchmarks: ``captured_traffic()`` liefert den aufgezeichneten
+  Verkehr mit Zeitstempeln zum erneuten Abspielen
+
+Version: 1.0
+Author: VERITAS Development Team
+Date: 6. Oktober 2025
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from shared.protocols.agent_message import AgentMessage, MessageType
+except ModuleNotFoundError:
+    from protocols.agent_message import AgentMessage, MessageType
+
+logger = logging.getLogger(__name__)
+
+# Record-Arten
+ENQUEUED = "enqueued"
+DELIVERED = "delivered"
+FAILED = "failed"
+DEAD_LETTER = "dead_letter"
+REDRIVEN = "redriven"
+DISCARDED = "discarded"
+
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+
+
+@dataclass
+class MessageLogConfig:
+    """
+    Konfiguration des Message-Logs
+
+    Attributes:
+        directory: Verzeichnis der Segment-Dateien
+        segment_max_bytes: Rotation ab dieser Segment-Größe
+        fsync_interval_ms: Max. Zeit zwischen Schreiben und fsync
+        fsync_batch: fsync spätestens nach so vielen Records
+        max_pending: Max. wartende Records (Backpressure für Produzenten)
+    """
+    directory: str = "data/agent_message_log"
+    segment_max_bytes: int = 64 * 1024 * 1024
+    fsync_interval_ms: int = 50
+    fsync_batch: int = 1000
+    max_pending: int = 100000
+
+
+class MessageLog:
+    """
+    Append-only Segment-Log mit gebündeltem fsync
+
+    Example:
+        >>> log = MessageLog(MessageLogConfig(directory="data/broker_log"))
+        >>> log.append_enqueued(message, ["env-agent-001"])
+        >>> log.append_delivered(message.message_id, "env-agent-001")
+        >>> log.sync()
+        >>> for agent_id, message in log.unacknowledged():
+        ...     ...
+    """
+
+    def __init__(self, config: Optional[MessageLogConfig] = None):
+        self.config = config or MessageLogConfig()
+        self.directory = Path(self.config.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=self.config.max_pending)
+        self._closed = False
+        self._stats = {
+            "records_written": 0,
+            "bytes_written": 0,
+            "fsyncs": 0,
+            "segments_rotated": 0,
+            "write_errors": 0
+        }
+
+        self._next_seq = self._recover_next_seq()
+        self._file = None
+        self._segment_path: Optional[Path] = None
+        self._open_segment()
+
+        self._writer = threading.Thread(target=self._run_writer, name="veritas-message-log", daemon=True)
+        self._writer.start()
+
+        logger.info(f"✅ MessageLog geöffnet: {self.directory} (next seq: {self._next_seq})")
+
+    # ========================================================================
+    # APPEND (beliebiger Thread / Event-Loop, nicht blockierend)
+    # ========================================================================
+
+    def append_enqueued(self, message: AgentMessage, agent_ids: Sequence[str]):
+        """Message für Empfänger eingereiht (inkl. vollständiger Message)"""
+        self._append({"kind": ENQUEUED, "id": message.message_id, "agents": list(agent_ids),
+                      "msg": message.to_dict()})
+
+    def append_delivered(self, message_id: str, agent_id: str):
+        """Message an Empfänger zugestellt (Bestätigung)"""
+        self._append({"kind": DELIVERED, "id": message_id, "agents": [agent_id]})
+
+    def append_failed(self, message_id: str, agent_id: str, reason: str):
+        """Zustellversuch fehlgeschlagen (Message bleibt unbestätigt, Retry folgt)"""
+        self._append({"kind": FAILED, "id": message_id, "agents": [agent_id], "reason": reason})
+
+    def append_dead_letter(self, message: AgentMessage, reason: str, agent_id: Optional[str] = None):
+        """Message endgültig fehlgeschlagen (agent_id None: alle Empfänger)"""
+        self._append({"kind": DEAD_LETTER, "id": message.message_id,
+                      "agents": [agent_id] if agent_id else [], "reason": reason,
+                      "msg": message.to_dict()})
+
+    def append_resolved(self, message_id: str, agent_id: Optional[str], kind: str = REDRIVEN):
+        """Dead-Letter erneut eingereiht (``redriven``) oder verworfen (``discarded``)"""
+        self._append({"kind": kind, "id": message_id, "agents": [agent_id] if agent_id else []})
+
+    def _append(self, record: Dict[str, Any]):
+        if self._closed:
+            raise RuntimeError(f"MessageLog {self.directory} ist geschlossen")
+        record["ts"] = time.time()
+        self._queue.put(("record", record))
+
+    def sync(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Blockiert bis alle bisher angehängten Records geschrieben und
+        per fsync gesichert sind
+
+        Returns:
+            True wenn rechtzeitig gesichert
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("sync", done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Schreibt ausstehende Records, fsync, beendet den Writer-Thread"""
+        if self._closed:
+            return
+        self.sync(timeout)
+        self._closed = True
+        self._queue.put(("stop", None))
+        self._writer.join(timeout)
+        logger.info(f"✅ MessageLog geschlossen: {self.directory}")
+
+    # ========================================================================
+    # WRITER-THREAD
+    # ========================================================================
+
+    def _segment_paths(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}"))
+
+    def _recover_next_seq(self) -> int:
+        """Nächste Sequenznummer aus dem letzten gültigen Record"""
+        last_seq = -1
+        segments = self._segment_paths()
+        if segments:
+            for record in self._read_segment(segments[-1]):
+                last_seq = record["seq"]
+            if last_seq < 0:
+                last_seq = int(segments[-1].name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]) - 1
+        return last_seq + 1
+
+    def _open_segment(self):
+        segments = self._segment_paths()
+        if segments and segments[-1].stat().st_size < self.config.segment_max_bytes:
+            path = segments[-1]
+            self._repair_tail(path)
+        else:
+            path = self.directory / f"{_SEGMENT_PREFIX}{self._next_seq:012d}{_SEGMENT_SUFFIX}"
+        self._segment_path = path
+        self._file = open(path, "ab")
+
+    @staticmethod
+    def _repair_tail(path: Path):
+        """Schneidet eine unvollständige letzte Zeile ab (Absturz während write)"""
+        with open(path, "rb+") as handle:
+            data = handle.read()
+            if data and not data.endswith(b"\n"):
+                handle.truncate(data.rfind(b"\n") + 1)
+
+    def _run_writer(self):
+        interval = self.config.fsync_interval_ms / 1000.0
+        unsynced = 0
+        last_sync = time.monotonic()
+
+        while True:
+            timeout = max(0.0, interval - (time.monotonic() - last_sync)) if unsynced else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            items = [item] if item is not None else []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            waiters = []
+            stop = False
+            for kind, payload in items:
+                if kind == "record":
+                    payload["seq"] = self._next_seq
+                    self._next_seq += 1
+                    line = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                    lines.append((payload["seq"], line))
+                elif kind == "sync":
+                    waiters.append(payload)
+                elif kind == "stop":
+                    stop = True
+
+            if lines:
+                self._write(lines)
+                unsynced += len(lines)
+
+            due = unsynced and (
+                waiters or stop
+                or unsynced >= self.config.fsync_batch
+                or time.monotonic() - last_sync >= interval
+            )
+            if due:
+                self._fsync()
+                unsynced = 0
+                last_sync = time.monotonic()
+
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._file.close()
+                return
+
+    def _write(self, lines: List[Tuple[int, bytes]]):
+        try:
+            for seq, line in lines:
+                if self._file.tell() >= self.config.segment_max_bytes:
+                    self._rotate(seq)
+                self._file.write(line)
+                self._stats["records_written"] += 1
+                self._stats["bytes_written"] += len(line)
+        except OSError as e:
+            self._stats["write_errors"] += 1
+            logger.error(f"❌ MessageLog Schreibfehler: {e}")
+
+    def _rotate(self, base_seq: int):
+        """Schließt das aktive Segment und beginnt ein neues ab ``base_seq``"""
+        self._fsync()
+        self._file.close()
+        self._segment_path = self.directory / f"{_SEGMENT_PREFIX}{base_seq:012d}{_SEGMENT_SUFFIX}"
+        self._file = open(self._segment_path, "ab")
+        self._stats["segments_rotated"] += 1
+
+    def _fsync(self):
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._stats["fsyncs"] += 1
+        except OSError as e:
+            self._stats["write_errors"] += 1
+            logger.error(f"❌ MessageLog fsync fehlgeschlagen: {e}")
+
+    # ========================================================================
+    # LESEN & RECOVERY
+    # ========================================================================
+
+    @staticmethod
+    def _read_segment(path: Path) -> Iterator[Dict[str, Any]]:
+        with open(path, "rb") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Unvollständige letzte Zeile
+                    continue
+
+    def records(self, from_seq: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Alle Records ab ``from_seq`` in Log-Reihenfolge
+
+        Args:
+            from_seq: Erste gewünschte Sequenznummer
+        """
+        self.sync()
+        segments = self._segment_paths()
+        for index, path in enumerate(segments):
+            # Segmente, die vollständig vor from_seq liegen, überspringen
+            if index + 1 < len(segments):
+                next_base = int(segments[index + 1].name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+                if next_base <= from_seq:
+                    continue
+            for record in self._read_segment(path):
+                if record["seq"] >= from_seq:
+                    yield record
+
+    def _scan(self) -> Tuple[Dict[Tuple[str, str], Tuple[int, Dict]], Dict[Tuple[str, Optional[str]], Tuple[int, Dict, str]]]:
+        """
+        Rekonstruiert offenen Zustand
+
+        Returns:
+            (pending, dead):
+            pending[(message_id, agent_id)] = (seq, message_dict)
+            dead[(message_id, agent_id | None)] = (seq, message_dict, reason)
+        """
+        pending: Dict[Tuple[str, str], Tuple[int, Dict]] = {}
+        dead: Dict[Tuple[str, Optional[str]], Tuple[int, Dict, str]] = {}
+
+        for record in self.records():
+            kind = record["kind"]
+            message_id = record["id"]
+            agents = record.get("agents") or []
+            if kind == ENQUEUED:
+                for agent_id in agents:
+                    pending[(message_id, agent_id)] = (record["seq"], record["msg"])
+            elif kind == DELIVERED:
+                for agent_id in agents:
+                    pending.pop((message_id, agent_id), None)
+            elif kind == DEAD_LETTER:
+                keys = [(message_id, agent_id) for agent_id in agents] or [
+                    key for key in pending if key[0] == message_id
+                ]
+                for key in keys:
+                    pending.pop(key, None)
+                dead[(message_id, agents[0] if agents else None)] = (record["seq"], record["msg"], record.get("reason", ""))
+            elif kind == DISCARDED and not agents:
+                # Verworfen ohne Agent-ID: alle Dead-Letters der Message
+                for key in [key for key in dead if key[0] == message_id]:
+                    del dead[key]
+            elif kind in (REDRIVEN, DISCARDED):
+                dead.pop((message_id, agents[0] if agents else None), None)
+
+        return pending, dead
+
+    def unacknowledged(
+        self,
+        message_types: Optional[Sequence[MessageType]] = (MessageType.REQUEST,)
+    ) -> List[Tuple[str, AgentMessage]]:
+        """
+        Eingereihte, aber nicht bestätigte Messages (Recovery nach Neustart)
+
+        Args:
+            message_types: Nur diese Typen (None: alle)
+
+        Returns:
+            Liste von (agent_id, AgentMessage) in Log-Reihenfolge
+        """
+        pending, _ = self._scan()
+        allowed = {t.value for t in message_types} if message_types is not None else None
+        result = []
+        for (message_id, agent_id), (seq, data) in sorted(pending.items(), key=lambda item: item[1][0]):
+            if allowed is None or data["message_type"] in allowed:
+                result.append((agent_id, AgentMessage.from_dict(data)))
+        return result
+
+    def dead_letters(self) -> List[Tuple[AgentMessage, str, Optional[str]]]:
+        """
+        Offene Dead-Letters (weder erneut eingereiht noch verworfen)
+
+        Returns:
+            Liste von (AgentMessage, reason, agent_id | None) in Log-Reihenfolge
+        """
+        _, dead = self._scan()
+        return [
+            (AgentMessage.from_dict(data), reason, agent_id)
+            for (message_id, agent_id), (seq, data, reason) in sorted(dead.items(), key=lambda item: item[1][0])
+        ]
+
+    def captured_traffic(self) -> Iterator[Tuple[float, List[str], AgentMessage]]:
+        """
+        Aufgezeichneter Verkehr für Offline-Benchmarks
+
+        Yields:
+            (Zeitstempel, Empfänger-IDs, AgentMessage) je ``enqueued``-Record
+        """
+        for record in self.records():
+            if record["kind"] == ENQUEUED:
+                yield record["ts"], record["agents"], AgentMessage.from_dict(record["msg"])
+
+    def prune(self) -> int:
+        """
+        Löscht Segmente, die nur noch abgeschlossene Records enthalten
+
+        Returns:
+            Anzahl gelöschter Segmente
+        """
+        # Vor dem Scan festhalten: danach geschriebene Records (auch in neu
+        # rotierten Segmenten) sieht der Scan nicht und dürfen nicht zählen
+        next_seq = self._next_seq
+        segments = self._segment_paths()
+
+        pending, dead = self._scan()
+        open_seqs = [seq for seq, _ in pending.values()] + [seq for seq, _, _ in dead.values()]
+        oldest_open = min(open_seqs) if open_seqs else next_seq
+
+        removed = 0
+        for index, path in enumerate(segments[:-1]):  # aktives Segment bleibt
+            next_base = int(segments[index + 1].name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            if next_base <= oldest_open and path != self._segment_path:
+                path.unlink()
+                removed += 1
+        if removed:
+            logger.info(f"🗑️ MessageLog: {removed} abgeschlossene Segmente gelöscht")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Log-Statistiken"""
+        return {
+            **self._stats,
+            "directory": str(self.directory),
+            "segments": len(self._segment_paths()),
+            "pending_records": self._queue.qsize(),
+            "next_seq": self._next_seq
+        }
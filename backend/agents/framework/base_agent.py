@@ -10,7 +10,7 @@ Integration: Multi-agent research plan execution with database persistence
 Key Features:
 - Schema-based plan execution
 - Step-by-step result tracking
-- Database persistence via SQLite
+- Database persistence via SQLite (batched write-behind, see plan_store)
 - Quality metrics and error handling
 - VERITAS-specific tool integration (UDS3, Phase5 Hybrid Search)
 
@@ -22,7 +22,7 @@ import json
 import sqlite3
 import logging
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
@@ -33,6 +33,8 @@ try:
     from .schema_validation import validate_research_plan, validate_step
     from .state_machine import StateMachine, PlanState, StateTransition, StateTransitionError
     from .dependency_resolver import DependencyResolver, DependencyError
+    from .dag_executor import ReadyQueueExecutor
+    from .plan_store import PlanStore, get_plan_store
     from .retry_handler import RetryHandler, RetryConfig, RetryStrategy
     from .quality_gate import QualityGate, QualityPolicy, GateDecision
     from .agent_monitoring import AgentMonitor
@@ -40,6 +42,8 @@ except ImportError:
     from schema_validation import validate_research_plan, validate_step
     from state_machine import StateMachine, PlanState, StateTransition, StateTransitionError
     from dependency_resolver import DependencyResolver, DependencyError
+    from dag_executor import ReadyQueueExecutor
+    from plan_store import PlanStore, get_plan_store
     from retry_handler import RetryHandler, RetryConfig, RetryStrategy
     from quality_gate import QualityGate, QualityPolicy, GateDecision
     from agent_monitoring import AgentMonitor
@@ -101,6 +105,7 @@ class BaseAgent(ABC):
         self.db_path = db_path or Path(__file__).parent.parent.parent.parent / "data" / "agent_framework.db"
         self.config = config or {}
         self._connection = None
+        self._plan_store: Optional[PlanStore] = None
         self._state_machines: Dict[str, StateMachine] = {}  # plan_id -> StateMachine
         
         # Initialize quality gate if policy provided
@@ -265,6 +270,7 @@ class BaseAgent(ABC):
                     "execution_time_ms": int,
                     "execution_mode": "parallel" | "sequential",
                     "max_parallelism": int,
+                    "schedule": Dict[str, Any] | None,  # Parallel only: critical path, idle-worker time
                     "errors": List[str]
                 }
         
@@ -372,6 +378,7 @@ class BaseAgent(ABC):
         total_quality = execution_result["total_quality"]
         errors_list = execution_result["errors"]
         max_parallelism = execution_result.get("max_parallelism", 1)
+        schedule = execution_result.get("schedule")
         
         # Calculate final status
         total_executed = succeeded + failed
@@ -424,6 +431,7 @@ class BaseAgent(ABC):
             "execution_time_ms": execution_time,
             "execution_mode": execution_mode,
             "max_parallelism": max_parallelism,
+            "schedule": schedule,
             "errors": errors_list
         }
     
@@ -537,8 +545,9 @@ class BaseAgent(ABC):
         """
         Execute steps in parallel based on dependencies.
         
-        Uses DependencyResolver to determine execution groups and
-        ThreadPoolExecutor for parallel execution.
+        Uses DependencyResolver to build the step DAG and ReadyQueueExecutor
+        to launch each step as soon as all of its dependencies have finished
+        (no barrier between dependency levels, one thread pool per plan).
         
         Args:
             plan_id: Plan identifier
@@ -547,18 +556,13 @@ class BaseAgent(ABC):
             max_workers: Maximum parallel workers
         
         Returns:
-            Execution results dictionary
+            Execution results dictionary (including "schedule" report with
+            critical path and idle-worker time)
         """
         try:
             # Build dependency graph
             resolver = DependencyResolver(steps)
-            execution_plan = resolver.get_execution_plan()
-            max_parallelism = max(len(group) for group in execution_plan) if execution_plan else 1
-            
-            logger.info(
-                f"Parallel execution: {len(execution_plan)} groups, "
-                f"max parallelism: {max_parallelism}"
-            )
+            dag_executor = ReadyQueueExecutor(resolver, max_workers=max_workers)
         
         except DependencyError as e:
             logger.error(f"Dependency resolution failed: {e}")
@@ -574,60 +578,52 @@ class BaseAgent(ABC):
         # Create step lookup map
         step_map = {step["step_id"]: step for step in steps}
         
-        # Execute each group in sequence, but steps within group in parallel
-        for group_index, step_ids in enumerate(execution_plan, 1):
-            logger.info(
-                f"Executing group {group_index}/{len(execution_plan)}: "
-                f"{len(step_ids)} steps in parallel"
-            )
+        def run_step(step_id: str) -> Dict[str, Any]:
+            # Snapshot of the context: all dependencies have finished, and
+            # later updates by the collecting thread do not race with readers
+            step_context = dict(context)
+            step_context["previous_results"] = dict(context["previous_results"])
+            return self._execute_single_step(plan_id, step_map[step_id], step_context)
+        
+        def collect(step_id: str, future: Future) -> None:
+            nonlocal succeeded, failed, total_quality
+            step = step_map[step_id]
+            step_number = step.get("step_index", 0) + 1
             
-            # Execute steps in this group in parallel
-            with ThreadPoolExecutor(max_workers=min(max_workers, len(step_ids))) as executor:
-                # Submit all steps in this group
-                future_to_step = {}
-                for step_id in step_ids:
-                    step = step_map[step_id]
-                    future = executor.submit(
-                        self._execute_single_step,
-                        plan_id,
-                        step,
-                        context
-                    )
-                    future_to_step[future] = step
+            try:
+                result = future.result()
+                results[step_id] = result
+                
+                # Update context (single collecting thread)
+                context["previous_results"][step_id] = result
                 
-                # Collect results as they complete
-                for future in as_completed(future_to_step):
-                    step = future_to_step[future]
-                    step_id = step["step_id"]
-                    
-                    try:
-                        result = future.result()
-                        results[step_id] = result
-                        
-                        # Update context (thread-safe since we wait for group completion)
-                        context["previous_results"][step_id] = result
-                        
-                        # Update metrics
-                        if result.get("status") == "success":
-                            succeeded += 1
-                            total_quality += result.get("quality_score", 0.0)
-                        else:
-                            failed += 1
-                            step_number = step.get("step_index", 0) + 1
-                            errors_list.append(
-                                f"Step {step_number} ({step_id}): {result.get('error', 'Unknown error')}"
-                            )
-                    
-                    except Exception as e:
-                        logger.error(f"Error in parallel execution of {step_id}: {e}", exc_info=True)
-                        failed += 1
-                        step_number = step.get("step_index", 0) + 1
-                        errors_list.append(f"Step {step_number} ({step_id}): {str(e)}")
-                        results[step_id] = {
-                            "status": "failed",
-                            "error": str(e),
-                            "quality_score": 0.0
-                        }
+                # Update metrics
+                if result.get("status") == "success":
+                    succeeded += 1
+                    total_quality += result.get("quality_score", 0.0)
+                else:
+                    failed += 1
+                    errors_list.append(
+                        f"Step {step_number} ({step_id}): {result.get('error', 'Unknown error')}"
+                    )
+            
+            except Exception as e:
+                logger.error(f"Error in parallel execution of {step_id}: {e}", exc_info=True)
+                failed += 1
+                errors_list.append(f"Step {step_number} ({step_id}): {str(e)}")
+                results[step_id] = {
+                    "status": "failed",
+                    "error": str(e),
+                    "quality_score": 0.0
+                }
+        
+        schedule = dag_executor.run(submit=run_step, on_complete=collect)
+        
+        logger.info(
+            f"Parallel execution of plan {plan_id}: makespan {schedule['makespan_ms']:.0f}ms, "
+            f"critical path {schedule['critical_path_ms']:.0f}ms ({' -> '.join(schedule['critical_path'])}), "
+            f"idle workers {schedule['idle_worker_ms']:.0f}ms"
+        )
         
         return {
             "results": results,
@@ -635,7 +631,8 @@ class BaseAgent(ABC):
             "failed": failed,
             "total_quality": total_quality,
             "errors": errors_list,
-            "max_parallelism": max_parallelism
+            "max_parallelism": schedule["peak_parallelism"] or 1,
+            "schedule": schedule
         }
     
     def _execute_single_step(
@@ -704,7 +701,7 @@ class BaseAgent(ABC):
                 retry_count=retry_handler.current_attempt - 1 if hasattr(retry_handler, 'current_attempt') else 0
             )
         
-        # Store result (thread-safe since we create new connection)
+        # Store result (enqueued to the plan store's writer thread)
         self._store_step_result(plan_id, step, result)
         
         return result
@@ -727,42 +724,30 @@ class BaseAgent(ABC):
         return self.execute_step(step, context)
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get or create database connection."""
+        """Get or create database connection (reads only; writes go through the plan store)."""
         if self._connection is None:
             self._connection = sqlite3.connect(str(self.db_path))
             self._connection.row_factory = sqlite3.Row
         return self._connection
     
+    @property
+    def plan_store(self) -> PlanStore:
+        """Shared write-behind store of this agent's database (one writer thread per file)."""
+        if self._plan_store is None:
+            self._plan_store = get_plan_store(self.db_path)
+        return self._plan_store
+    
     def _create_plan_record(self, plan: Dict[str, Any]) -> None:
-        """Create research plan record in database."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """
+        Create research plan record in database.
         
-        veritas_ext = plan.get("veritas_extensions", {})
+        Waits for the plan store to commit the record (one round trip per
+        plan), so a duplicate or invalid plan_id still fails execute().
         
-        cursor.execute("""
-            INSERT INTO research_plans (
-                plan_id, research_question, schema_name, status,
-                plan_document, total_steps, uds3_databases,
-                phase5_hybrid_search, security_level, source_domains,
-                query_complexity, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            plan["plan_id"],
-            plan["research_question"],
-            plan["schema_name"],
-            "pending",
-            json.dumps(plan),
-            len(plan.get("steps", [])),
-            json.dumps(veritas_ext.get("uds3_databases", [])),
-            1 if veritas_ext.get("phase5_hybrid_search", False) else 0,
-            veritas_ext.get("security_level", "internal"),
-            json.dumps(veritas_ext.get("source_domains", [])),
-            plan.get("query_complexity", "standard"),
-            datetime.utcnow().isoformat()
-        ))
-        
-        conn.commit()
+        Raises:
+            sqlite3.Error: If the record cannot be inserted
+        """
+        self.plan_store.create_plan(plan, wait=True)
         logger.debug(f"Created plan record: {plan['plan_id']}")
     
     def _store_step_result(
@@ -771,53 +756,12 @@ class BaseAgent(ABC):
         step: Dict[str, Any],
         result: Dict[str, Any]
     ) -> None:
-        """Store step execution result in database (thread-safe)."""
-        # Create new connection for thread safety
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        step_index = step.get("step_index", 0)
-        
-        # Map result status to database status
-        result_status = result.get("status", "unknown")
-        db_status = "completed" if result_status == "success" else "failed" if result_status == "failed" else "pending"
-        
-        # Get retry information from result
-        retry_count = result.get("retry_count", 0)
-        
-        try:
-            # Insert step record (if not exists)
-            cursor.execute("""
-                INSERT OR REPLACE INTO research_plan_steps (
-                    plan_id, step_id, step_index, step_name, step_type,
-                    agent_name, agent_type, depends_on, status,
-                    step_config, result, execution_time_ms, retry_count, completed_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                plan_id,
-                step["step_id"],
-                step_index,
-                step.get("step_name", ""),
-                step.get("step_type", "unknown"),
-                step.get("agent_name", ""),
-                step.get("agent_type", "unknown"),
-                json.dumps(step.get("depends_on", [])),
-                db_status,
-                json.dumps(step),
-                json.dumps(result),
-                result.get("execution_time_ms", 0),
-                retry_count,
-                datetime.utcnow().isoformat()
-            ))
-            
-            conn.commit()
-            logger.debug(
-                f"Stored result for step: {step['step_id']} "
-                f"(status: {db_status}, retries: {retry_count})"
-            )
-        finally:
-            conn.close()
+        """Store step execution result in database (thread-safe, batched write-behind)."""
+        self.plan_store.store_step_result(plan_id, step, result)
+        logger.debug(
+            f"Queued result for step: {step['step_id']} "
+            f"(status: {result.get('status', 'unknown')}, retries: {result.get('retry_count', 0)})"
+        )
     
     def _update_plan_status(
         self,
@@ -826,25 +770,12 @@ class BaseAgent(ABC):
         quality_score: float,
         execution_time_ms: int
     ) -> None:
-        """Update plan execution status in database."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """Update plan execution status in database and flush all pending plan writes."""
+        self.plan_store.update_plan_status(plan_id, status, execution_time_ms)
         
-        cursor.execute("""
-            UPDATE research_plans
-            SET status = ?,
-                execution_time_ms = ?,
-                updated_at = ?,
-                progress_percentage = 100.0
-            WHERE plan_id = ?
-        """, (
-            status if status != "partial" else "completed",  # Map partial to completed
-            execution_time_ms,
-            datetime.utcnow().isoformat(),
-            plan_id
-        ))
-        
-        conn.commit()
+        # Flush-on-complete: the plan is durable once execute() returns
+        if not self.plan_store.flush():
+            logger.warning(f"Plan store flush timed out for plan {plan_id}")
         logger.debug(f"Updated plan status: {plan_id} -> {status}")
     
     def _on_state_change(self, transition: StateTransition) -> None:
@@ -856,26 +787,16 @@ class BaseAgent(ABC):
         Args:
             transition: State transition details
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         # Extract plan_id from metadata or use a placeholder
         plan_id = transition.metadata.get("plan_id") if transition.metadata else None
         
         # Log state transition in agent_execution_log
-        cursor.execute("""
-            INSERT INTO agent_execution_log (
-                plan_id, log_level, message, agent_name, timestamp
-            ) VALUES (?, ?, ?, ?, ?)
-        """, (
+        self.plan_store.log_execution(
             plan_id,
-            "INFO",
             f"State transition: {transition.from_state.value} → {transition.to_state.value} ({transition.reason})",
             self.get_agent_type(),
             transition.timestamp
-        ))
-        
-        conn.commit()
+        )
         logger.debug(f"Logged state transition: {transition.from_state.value} → {transition.to_state.value}")
     
     def get_state_machine(self, plan_id: str) -> Optional[StateMachine]:
@@ -905,6 +826,10 @@ class BaseAgent(ABC):
         Returns:
             Dictionary with plan details and step results
         """
+        # Read-your-writes: commit queued results first
+        if self._plan_store is not None:
+            self._plan_store.flush()
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -959,8 +884,11 @@ class BaseAgent(ABC):
         return result
     
     def close(self) -> None:
-        """Close database connection."""
-        if self._connection:
+        """Flush pending plan writes and close database connection."""
+        if getattr(self, "_plan_store", None) is not None:
+            self._plan_store.flush()
+            self._plan_store = None
+        if getattr(self, "_connection", None):
             self._connection.close()
             self._connection = None
             logger.debug(f"Closed database connection for agent: {self.agent_id}")
@@ -0,0 +1,210 @@
+"""
+VERITAS Agent Framework - Ready-Queue DAG Executor
+==================================================
+
+Dependency-driven parallel execution of research plan steps.
+
+Instead of executing ``DependencyResolver.get_execution_plan()`` groups
+level by level (with a barrier after each group), a step is launched as
+soon as all of its ``depends_on`` steps have finished. One slow step no
+longer blocks independent steps of the next level.
+
+Features:
+- One thread pool per plan (no pool per level)
+- Ready queue ordered by critical-path height (longest downstream chain first)
+- Completion callbacks run on the calling thread (no shared-state locking
+  needed by the caller)
+- Schedule report: makespan, critical path (actual durations),
+  idle-worker time and utilization
+
+Author: VERITAS Development Team
+Created: 2025-10-08
+"""
+
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .dependency_resolver import DependencyResolver
+except ImportError:
+    from dependency_resolver import DependencyResolver
+
+logger = logging.getLogger(__name__)
+
+
+class ReadyQueueExecutor:
+    """
+    Executes a step DAG with a ready queue instead of level barriers.
+
+    Attributes:
+        resolver: Dependency resolver for the plan steps
+        max_workers: Maximum concurrently running steps
+
+    Example:
+        >>> executor = ReadyQueueExecutor(DependencyResolver(steps), max_workers=4)
+        >>> report = executor.run(
+        ...     submit=lambda step_id: run_step(step_id),
+        ...     on_complete=lambda step_id, future: collect(step_id, future)
+        ... )
+        >>> report["critical_path"]
+        ['A', 'C', 'D']
+    """
+
+    def __init__(self, resolver: DependencyResolver, max_workers: int = 4):
+        """
+        Initialize executor.
+
+        Args:
+            resolver: Dependency resolver (graph must be acyclic)
+            max_workers: Maximum concurrently running steps
+        """
+        self.resolver = resolver
+        self.max_workers = max(1, max_workers)
+        self._order = {step["step_id"]: index for index, step in enumerate(resolver.steps)}
+        self._heights = self._compute_heights()
+
+    def _compute_heights(self) -> Dict[str, int]:
+        """Longest chain of dependents below each step (scheduling priority)."""
+        heights: Dict[str, int] = {}
+        for step_id in reversed(self.resolver.topological_sort()):
+            dependents = self.resolver.get_step_dependents(step_id)
+            heights[step_id] = 1 + max((heights[d] for d in dependents), default=0)
+        return heights
+
+    def run(
+        self,
+        submit: Callable[[str], Any],
+        on_complete: Callable[[str, Future], None]
+    ) -> Dict[str, Any]:
+        """
+        Execute all steps.
+
+        A failed step still releases its dependents (same semantics as the
+        level-based execution); failure handling is up to ``on_complete``.
+
+        Args:
+            submit: Function executing one step (runs in a worker thread)
+            on_complete: Callback per finished step (runs on the calling thread)
+
+        Returns:
+            Schedule report (see ``_build_report``)
+        """
+        step_ids = list(self._order)
+        if not step_ids:
+            return self._build_report({}, 0.0, 0)
+
+        remaining_deps = {
+            step_id: len(self.resolver.get_step_dependencies(step_id))
+            for step_id in step_ids
+        }
+        ready: List[Tuple[int, int, str]] = []
+        for step_id in step_ids:
+            if remaining_deps[step_id] == 0:
+                self._push_ready(ready, step_id)
+
+        timings: Dict[str, Tuple[float, float]] = {}
+        running: Dict[Future, str] = {}
+        peak_parallelism = 0
+        workers = min(self.max_workers, len(step_ids))
+        plan_start = time.perf_counter()
+
+        def timed(step_id: str) -> Any:
+            started = time.perf_counter()
+            try:
+                return submit(step_id)
+            finally:
+                timings[step_id] = (started - plan_start, time.perf_counter() - plan_start)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="veritas-dag") as pool:
+            while ready or running:
+                # Launch ready steps while workers are free
+                while ready and len(running) < workers:
+                    _, _, step_id = heapq.heappop(ready)
+                    running[pool.submit(timed, step_id)] = step_id
+                peak_parallelism = max(peak_parallelism, len(running))
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    step_id = running.pop(future)
+                    on_complete(step_id, future)
+                    for dependent in self.resolver.get_step_dependents(step_id):
+                        remaining_deps[dependent] -= 1
+                        if remaining_deps[dependent] == 0:
+                            self._push_ready(ready, dependent)
+
+        makespan = time.perf_counter() - plan_start
+        return self._build_report(timings, makespan, workers, peak_parallelism)
+
+    def _push_ready(self, ready: List[Tuple[int, int, str]], step_id: str) -> None:
+        # Higher critical-path height first, then plan order
+        heapq.heappush(ready, (-self._heights[step_id], self._order[step_id], step_id))
+
+    def _build_report(
+        self,
+        timings: Dict[str, Tuple[float, float]],
+        makespan: float,
+        workers: int,
+        peak_parallelism: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Build schedule report.
+
+        Returns:
+            {
+                "makespan_ms": float,          # Wall time of the plan
+                "busy_ms": float,              # Sum of step durations
+                "idle_worker_ms": float,       # workers * makespan - busy
+                "worker_utilization": float,   # busy / (workers * makespan)
+                "critical_path": List[str],    # Longest dependency chain (actual durations)
+                "critical_path_ms": float,
+                "workers": int,
+                "peak_parallelism": int,
+                "step_timings": Dict[str, Dict[str, float]]  # start/end offsets in ms
+            }
+        """
+        durations = {step_id: end - start for step_id, (start, end) in timings.items()}
+        busy = sum(durations.values())
+        capacity = workers * makespan
+        critical_path, critical_length = self._critical_path(durations)
+
+        return {
+            "makespan_ms": round(makespan * 1000, 3),
+            "busy_ms": round(busy * 1000, 3),
+            "idle_worker_ms": round(max(0.0, capacity - busy) * 1000, 3),
+            "worker_utilization": round(busy / capacity, 4) if capacity > 0 else 0.0,
+            "critical_path": critical_path,
+            "critical_path_ms": round(critical_length * 1000, 3),
+            "workers": workers,
+            "peak_parallelism": peak_parallelism,
+            "step_timings": {
+                step_id: {"start_ms": round(start * 1000, 3), "end_ms": round(end * 1000, 3)}
+                for step_id, (start, end) in timings.items()
+            }
+        }
+
+    def _critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest path through the DAG weighted by actual step durations."""
+        finish: Dict[str, float] = {}
+        predecessor: Dict[str, Optional[str]] = {}
+        for step_id in self.resolver.topological_sort():
+            best_dep: Optional[str] = None
+            best_finish = 0.0
+            for dep in self.resolver.get_step_dependencies(step_id):
+                if finish.get(dep, 0.0) > best_finish or best_dep is None:
+                    best_dep, best_finish = dep, finish.get(dep, 0.0)
+            finish[step_id] = best_finish + durations.get(step_id, 0.0)
+            predecessor[step_id] = best_dep
+
+        if not finish:
+            return [], 0.0
+
+        last = max(finish, key=lambda step_id: finish[step_id])
+        path = []
+        node: Optional[str] = last
+        while node is not None:
+            path.append(node)
+            node = predecessor[node]
+        return list(reversed(path)), finish[last]
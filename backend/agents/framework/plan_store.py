@@ -0,0 +1,424 @@
+"""
+VERITAS Agent Framework - Write-Behind Plan Store
+=================================================
+
+Batched SQLite persistence for research plans and step results.
+
+BaseAgent used to open a new ``sqlite3.connect`` per step result, commit a
+single ``INSERT OR REPLACE`` and close it again, while plan records and
+state transitions went through one shared (non thread-safe) connection.
+Parallel plans serialized on SQLite locks and one fsync per step.
+
+PlanStore owns the database writes of an SQLite file:
+- One writer thread with one connection (no lock contention between writers)
+- WAL journal mode with ``synchronous=NORMAL`` (readers never block the writer)
+- Group commit: everything queued while the previous transaction ran is
+  written in the next transaction; consecutive rows of the same statement
+  go through one ``executemany`` (statement prepared once)
+- JSON serialization happens on the calling thread, the writer only does I/O
+- ``flush()`` blocks until everything enqueued before it is committed;
+  BaseAgent flushes when a plan completes
+- ``create_plan(..., wait=True)`` waits for that record and re-raises its
+  error, so a duplicate plan_id still fails ``BaseAgent.execute()``
+
+Author: VERITAS Development Team
+Created: 2025-10-08
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+INSERT_PLAN_SQL = """
+    INSERT INTO research_plans (
+        plan_id, research_question, schema_name, status,
+        plan_document, total_steps, uds3_databases,
+        phase5_hybrid_search, security_level, source_domains,
+        query_complexity, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPSERT_STEP_SQL = """
+    INSERT OR REPLACE INTO research_plan_steps (
+        plan_id, step_id, step_index, step_name, step_type,
+        agent_name, agent_type, depends_on, status,
+        step_config, result, execution_time_ms, retry_count, completed_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_PLAN_STATUS_SQL = """
+    UPDATE research_plans
+    SET status = ?,
+        execution_time_ms = ?,
+        updated_at = ?,
+        progress_percentage = 100.0
+    WHERE plan_id = ?
+"""
+
+INSERT_EXECUTION_LOG_SQL = """
+    INSERT INTO agent_execution_log (
+        plan_id, log_level, message, agent_name, timestamp
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
+# Queue item: ("write", sql, params, ack) | ("flush", event, None, None) | ("stop", event, None, None)
+_QueueItem = Tuple[str, Any, Any, Optional["_WriteAck"]]
+# Pending write: (sql, params, ack)
+_Write = Tuple[str, Any, Optional["_WriteAck"]]
+
+
+class _WriteAck:
+    """Outcome of a write whose producer waits for it."""
+
+    __slots__ = ("done", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[sqlite3.Error] = None
+
+    def resolve(self, error: Optional[sqlite3.Error] = None) -> None:
+        self.error = error
+        self.done.set()
+
+
+class PlanStore:
+    """
+    Write-behind persistence for ``research_plans``, ``research_plan_steps``
+    and ``agent_execution_log``.
+
+    Attributes:
+        db_path: Path to SQLite database
+        batch_size: Maximum writes per transaction
+        max_queue: Maximum pending writes (enqueueing blocks when full)
+
+    Example:
+        >>> store = get_plan_store(Path("data/agent_framework.db"))
+        >>> store.store_step_result("plan_001", step, result)
+        >>> store.update_plan_status("plan_001", "completed", 1200)
+        >>> store.flush()
+        True
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        batch_size: int = 512,
+        max_queue: int = 10000
+    ):
+        """
+        Initialize store and start the writer thread.
+
+        Args:
+            db_path: Path to SQLite database (tables must exist)
+            batch_size: Maximum writes per transaction
+            max_queue: Maximum pending writes (backpressure for producers)
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = max(1, batch_size)
+        self.max_queue = max_queue
+        self._queue: "queue.Queue[_QueueItem]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+        # Statistics (written by the writer thread only)
+        self._stats = {
+            "writes": 0,
+            "transactions": 0,
+            "failed_writes": 0,
+            "flushes": 0,
+            "max_batch": 0,
+            "write_time_ms": 0.0,
+        }
+        self.last_error: Optional[str] = None
+
+        self._ready = threading.Event()
+        self._writer = threading.Thread(
+            target=self._run_writer,
+            name=f"veritas-plan-store-{self.db_path.name}",
+            daemon=True
+        )
+        self._writer.start()
+        self._ready.wait()
+
+    # ------------------------------------------------------------------
+    # Producer API (any thread)
+    # ------------------------------------------------------------------
+
+    def create_plan(
+        self,
+        plan: Dict[str, Any],
+        wait: bool = False,
+        timeout: Optional[float] = 30.0
+    ) -> None:
+        """
+        Enqueue research plan record.
+
+        Args:
+            plan: Research plan
+            wait: Block until the record is committed and re-raise its error
+            timeout: Maximum wait in seconds when ``wait`` is set
+
+        Raises:
+            sqlite3.Error: Insert failed, e.g. duplicate plan_id (only with ``wait``)
+            TimeoutError: Writer did not reach the record in time (only with ``wait``)
+        """
+        veritas_ext = plan.get("veritas_extensions", {})
+        ack = _WriteAck() if wait else None
+        self._enqueue(INSERT_PLAN_SQL, (
+            plan["plan_id"],
+            plan["research_question"],
+            plan["schema_name"],
+            "pending",
+            json.dumps(plan),
+            len(plan.get("steps", [])),
+            json.dumps(veritas_ext.get("uds3_databases", [])),
+            1 if veritas_ext.get("phase5_hybrid_search", False) else 0,
+            veritas_ext.get("security_level", "internal"),
+            json.dumps(veritas_ext.get("source_domains", [])),
+            plan.get("query_complexity", "standard"),
+            datetime.utcnow().isoformat()
+        ), ack)
+
+        if ack is not None:
+            if not ack.done.wait(timeout):
+                raise TimeoutError(f"PlanStore did not commit plan {plan['plan_id']} within {timeout}s")
+            if ack.error is not None:
+                raise ack.error
+
+    def store_step_result(
+        self,
+        plan_id: str,
+        step: Dict[str, Any],
+        result: Dict[str, Any]
+    ) -> None:
+        """Enqueue step result (insert or replace)."""
+        # Map result status to database status
+        result_status = result.get("status", "unknown")
+        db_status = "completed" if result_status == "success" else "failed" if result_status == "failed" else "pending"
+
+        self._enqueue(UPSERT_STEP_SQL, (
+            plan_id,
+            step["step_id"],
+            step.get("step_index", 0),
+            step.get("step_name", ""),
+            step.get("step_type", "unknown"),
+            step.get("agent_name", ""),
+            step.get("agent_type", "unknown"),
+            json.dumps(step.get("depends_on", [])),
+            db_status,
+            json.dumps(step),
+            json.dumps(result),
+            result.get("execution_time_ms", 0),
+            result.get("retry_count", 0),
+            datetime.utcnow().isoformat()
+        ))
+
+    def update_plan_status(
+        self,
+        plan_id: str,
+        status: str,
+        execution_time_ms: int
+    ) -> None:
+        """Enqueue final plan status update."""
+        self._enqueue(UPDATE_PLAN_STATUS_SQL, (
+            status if status != "partial" else "completed",  # Map partial to completed
+            execution_time_ms,
+            datetime.utcnow().isoformat(),
+            plan_id
+        ))
+
+    def log_execution(
+        self,
+        plan_id: Optional[str],
+        message: str,
+        agent_name: str,
+        timestamp: Any,
+        log_level: str = "INFO"
+    ) -> None:
+        """Enqueue agent execution log entry."""
+        self._enqueue(INSERT_EXECUTION_LOG_SQL, (plan_id, log_level, message, agent_name, timestamp))
+
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Block until all writes enqueued so far are committed.
+
+        Args:
+            timeout: Maximum wait in seconds (None: wait forever)
+
+        Returns:
+            True if the writer reached the flush marker in time
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done, None, None))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Flush pending writes and stop the writer thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        done = threading.Event()
+        self._queue.put(("stop", done, None, None))
+        done.wait(timeout)
+        self._writer.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer statistics."""
+        stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        stats["avg_batch"] = round(stats["writes"] / stats["transactions"], 2) if stats["transactions"] else 0.0
+        stats["last_error"] = self.last_error
+        return stats
+
+    def _enqueue(self, sql: str, params: Tuple[Any, ...], ack: Optional[_WriteAck] = None) -> None:
+        if self._closed:
+            raise RuntimeError(f"PlanStore for {self.db_path} is closed")
+        self._queue.put(("write", sql, params, ack))
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are controlled explicitly (BEGIN/COMMIT)
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _run_writer(self) -> None:
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            self.last_error = str(e)
+            logger.error(f"PlanStore cannot open {self.db_path}: {e}")
+            conn = None
+        finally:
+            self._ready.set()
+
+        stop_event: Optional[threading.Event] = None
+        while stop_event is None:
+            batch = [self._queue.get()]
+            # Group commit: take everything that queued up meanwhile
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [(sql, params, ack) for kind, sql, params, ack in batch if kind == "write"]
+            if writes:
+                self._write_batch(conn, writes)
+
+            for kind, event, _, _ in batch:
+                if kind == "flush":
+                    self._stats["flushes"] += 1
+                    event.set()
+                elif kind == "stop":
+                    stop_event = event
+
+        # Drain writes enqueued concurrently with close()
+        remaining: List[_Write] = []
+        while True:
+            try:
+                kind, payload, params, ack = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "write":
+                remaining.append((payload, params, ack))
+            else:
+                payload.set()
+        if remaining:
+            self._write_batch(conn, remaining)
+
+        if conn is not None:
+            conn.close()
+        stop_event.set()
+
+    def _write_batch(self, conn: Optional[sqlite3.Connection], writes: List[_Write]) -> None:
+        if conn is None:
+            self._stats["failed_writes"] += len(writes)
+            error = sqlite3.OperationalError(f"PlanStore cannot open {self.db_path}: {self.last_error}")
+            for _, _, ack in writes:
+                if ack is not None:
+                    ack.resolve(error)
+            return
+
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN")
+            # Consecutive rows of the same statement: one prepared statement
+            for sql, group in groupby(writes, key=lambda write: write[0]):
+                conn.executemany(sql, [params for _, params, _ in group])
+            conn.execute("COMMIT")
+            self._stats["transactions"] += 1
+            self._stats["writes"] += len(writes)
+            for _, _, ack in writes:
+                if ack is not None:
+                    ack.resolve()
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning(f"PlanStore batch of {len(writes)} failed ({e}), retrying writes individually")
+            self._write_individually(conn, writes)
+
+        self._stats["max_batch"] = max(self._stats["max_batch"], len(writes))
+        self._stats["write_time_ms"] += (time.perf_counter() - started) * 1000
+
+    def _write_individually(self, conn: sqlite3.Connection, writes: List[_Write]) -> None:
+        """Fallback after a failed batch: one bad row must not drop the others."""
+        for sql, params, ack in writes:
+            error: Optional[sqlite3.Error] = None
+            try:
+                conn.execute(sql, params)
+                self._stats["transactions"] += 1
+                self._stats["writes"] += 1
+            except sqlite3.Error as e:
+                error = e
+                self._stats["failed_writes"] += 1
+                self.last_error = str(e)
+                logger.error(f"PlanStore write failed: {e}")
+            if ack is not None:
+                ack.resolve(error)
+
+
+# ============================================================================
+# Shared stores (one writer thread per database file)
+# ============================================================================
+
+_stores: Dict[str, PlanStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_plan_store(db_path: Union[str, Path]) -> PlanStore:
+    """Get the shared PlanStore of a database file."""
+    key = str(Path(db_path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._closed:
+            store = _stores[key] = PlanStore(db_path)
+        return store
+
+
+@atexit.register
+def close_plan_stores() -> None:
+    """Flush and close all shared stores (called at interpreter exit)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+VERITAS AGENT SCHEDULER
+=======================
+
+Prozessweiter Scheduler für die Agent-Ausführung der Intelligent Pipeline.
+
+Problem:
+--------
+``IntelligentMultiAgentPipeline`` erzeugte je Request einen eigenen
+``ThreadPoolExecutor(max_workers=5)`` und fuhr ihn in ``cleanup()`` wieder
+herunter. Unter Last entstanden und verschwanden hunderte Threads pro
+Sekunde; die Gesamt-Nebenläufigkeit (Requests × Agenten) war unbegrenzt.
+
+Lösung:
+-------
+1. Ein gemeinsamer, begrenzter Thread-Pool für blockierende Agenten
+   (UDS3-I/O); nicht-blockierende Agenten laufen nativ als Coroutine
+2. Globale Obergrenze laufender Agenten plus Limits je Agent-Typ und je
+   Request (``max_parallel_agents``)
+3. Faire Warteschlange: Round-Robin über Requests - ein Request mit vielen
+   Agenten verdrängt keine später eintreffenden Requests
+4. Admission Control: begrenzte Anzahl aktiver Pipeline-Läufe, dahinter
+   eine begrenzte Warteschlange; ist auch diese voll, wird
+   ``SchedulerSaturatedError`` (→ HTTP 429 mit Queue-Position und
+   Retry-After) ausgelöst
+
+Verwendung:
+-----------
+scheduler = get_agent_scheduler()
+async with scheduler.admit(query_id, max_parallel=5):
+    result = await scheduler.run(query_id, "legal_framework", blocking_fn, arg)
+    result = await scheduler.run(query_id, "environmental", async_fn, arg)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AgentSchedulerConfig:
+    """Konfiguration des Agent-Schedulers"""
+
+    max_workers: int = 16  # Threads für blockierende Agenten (prozessweit)
+    max_concurrent_tasks: int = 32  # Gleichzeitig laufende Agenten (Threads + Coroutinen)
+    max_tasks_per_request: int = 5  # Default, falls ein Request kein Limit angibt
+    default_agent_type_limit: int = 8  # Gleichzeitige Agenten je Typ
+    agent_type_limits: Dict[str, int] = field(default_factory=dict)
+    max_active_requests: int = 32  # Gleichzeitig zugelassene Pipeline-Läufe
+    max_queued_requests: int = 64  # Wartende Läufe; darüber → SchedulerSaturatedError
+    admission_timeout: Optional[float] = 30.0  # Max. Wartezeit in der Admission-Queue (s)
+    thread_name_prefix: str = "veritas-agent"
+
+    @classmethod
+    def from_env(cls) -> "AgentSchedulerConfig":
+        """Konfiguration aus ``VERITAS_AGENT_*``-Umgebungsvariablen."""
+        config = cls()
+        for attr, env in (
+            ("max_workers", "VERITAS_AGENT_MAX_WORKERS"),
+            ("max_concurrent_tasks", "VERITAS_AGENT_MAX_CONCURRENT"),
+            ("max_active_requests", "VERITAS_AGENT_MAX_ACTIVE_REQUESTS"),
+            ("max_queued_requests", "VERITAS_AGENT_MAX_QUEUED_REQUESTS"),
+        ):
+            value = os.getenv(env)
+            if value:
+                try:
+                    setattr(config, attr, max(1, int(value)))
+                except ValueError:
+                    logger.warning(f"⚠️ Ungültiger Wert für {env}: {value!r}")
+        return config
+
+    def limit_for(self, agent_type: str) -> int:
+        return max(1, self.agent_type_limits.get(agent_type, self.default_agent_type_limit))
+
+
+class SchedulerSaturatedError(RuntimeError):
+    """Scheduler ausgelastet - der Aufrufer soll später erneut anfragen (HTTP 429)."""
+
+    def __init__(self, queue_position: int, retry_after: float, reason: str = "queue_full"):
+        self.queue_position = queue_position
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(
+            f"Agent-Scheduler ausgelastet ({reason}, Queue-Position {queue_position}, "
+            f"erneut versuchen in {retry_after:.0f}s)"
+        )
+
+    @property
+    def retry_after_header(self) -> str:
+        """Wert für den ``Retry-After``-Header (ganze Sekunden)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error": "scheduler_saturated",
+            "reason": self.reason,
+            "queue_position": self.queue_position,
+            "retry_after": self.retry_after,
+            "message": str(self),
+        }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Gibt einen Wartenden frei (im Loop des Wartenden; abgebrochene ignorieren)."""
+    if not future.done():
+        future.set_result(None)
+
+
+class _Waiter:
+    """Wartender Request (Admission) bzw. wartender Agent (Task-Queue)."""
+
+    __slots__ = ("request_id", "agent_type", "future", "loop", "enqueued_at", "granted")
+
+    def __init__(self, request_id: str, agent_type: Optional[str], loop: asyncio.AbstractEventLoop):
+        self.request_id = request_id
+        self.agent_type = agent_type
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+        self.enqueued_at = time.perf_counter()
+        self.granted = False
+
+    def grant(self) -> None:
+        """Freigabe (unter dem Scheduler-Lock aufrufen)."""
+        self.granted = True
+        try:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        except RuntimeError:
+            # Loop des Wartenden bereits geschlossen
+            pass
+
+
+class AgentScheduler:
+    """
+    Begrenzte, faire Ausführung von Agenten über alle Pipeline-Läufe.
+
+    Thread-sicher und unabhängig vom Event-Loop (Freigaben werden per
+    ``call_soon_threadsafe`` in den Loop des Wartenden zugestellt).
+    """
+
+    def __init__(self, config: Optional[AgentSchedulerConfig] = None):
+        self.config = config or AgentSchedulerConfig()
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Admission
+        self._active_requests: Dict[str, float] = {}  # request_id → Startzeit
+        self._request_limits: Dict[str, int] = {}
+        self._admission_queue: Deque[_Waiter] = deque()
+
+        # Agent-Tasks je Request (faire Vergabe, siehe _dispatch_locked)
+        self._task_queues: Dict[str, Deque[_Waiter]] = {}
+        self._queued_tasks = 0
+        self._running_tasks = 0
+        self._running_by_type: Counter = Counter()
+        self._running_by_request: Counter = Counter()
+        self._last_served: Dict[str, int] = {}  # request_id → Vergabe-Sequenz
+        self._grant_seq = 0
+
+        # Statistiken
+        self._admitted = 0
+        self._admission_waits = 0
+        self._rejected = 0
+        self._admission_timeouts = 0
+        self._tasks_completed = 0
+        self._tasks_async = 0
+        self._tasks_threaded = 0
+        self._total_task_wait = 0.0
+        self._max_task_wait = 0.0
+        self._max_queued_tasks = 0
+        self._avg_request_seconds = 5.0  # EMA, Startwert für Retry-After-Schätzung
+
+    # ------------------------------------------------------------------
+    # Admission Control
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def admit(self, request_id: str, max_parallel: Optional[int] = None) -> AsyncIterator[None]:
+        """Context-Manager um einen Pipeline-Lauf (``acquire_request``/``release_request``)."""
+        await self.acquire_request(request_id, max_parallel)
+        try:
+            yield
+        finally:
+            self.release_request(request_id)
+
+    async def acquire_request(self, request_id: str, max_parallel: Optional[int] = None) -> None:
+        """
+        Lässt einen Pipeline-Lauf zu oder reiht ihn in die Admission-Queue ein.
+
+        Args:
+            request_id: Eindeutige Request-ID (query_id)
+            max_parallel: Max. gleichzeitige Agenten dieses Requests
+
+        Raises:
+            SchedulerSaturatedError: Admission-Queue voll bzw. Wartezeit überschritten
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if len(self._active_requests) < self.config.max_active_requests and not self._admission_queue:
+                self._activate_locked(request_id, max_parallel)
+                return
+
+            position = len(self._admission_queue) + 1
+            if position > self.config.max_queued_requests:
+                self._rejected += 1
+                retry_after = self._estimate_retry_after_locked(position)
+                logger.warning(f"🚦 Agent-Scheduler ausgelastet - Request {request_id} abgewiesen")
+                raise SchedulerSaturatedError(position, retry_after)
+
+            waiter = _Waiter(request_id, None, loop)
+            self._request_limits[request_id] = self._request_limit(max_parallel)
+            self._admission_queue.append(waiter)
+            self._admission_waits += 1
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.config.admission_timeout)
+        except BaseException as e:
+            with self._lock:
+                if not waiter.granted:
+                    position = self._admission_position_locked(waiter)
+                    if position:
+                        self._admission_queue.remove(waiter)
+                    self._request_limits.pop(request_id, None)
+                    if isinstance(e, asyncio.TimeoutError):
+                        self._admission_timeouts += 1
+                        raise SchedulerSaturatedError(
+                            position, self._estimate_retry_after_locked(position), reason="admission_timeout"
+                        ) from None
+                    raise
+            # Bereits freigegeben, aber abgebrochen: Slot zurückgeben
+            self.release_request(request_id)
+            raise
+
+    def release_request(self, request_id: str) -> None:
+        """Beendet einen Pipeline-Lauf und lässt den nächsten wartenden zu."""
+        with self._lock:
+            started = self._active_requests.pop(request_id, None)
+            self._request_limits.pop(request_id, None)
+            if not self._running_by_request[request_id]:
+                self._last_served.pop(request_id, None)
+            if started is not None:
+                duration = time.perf_counter() - started
+                self._avg_request_seconds = 0.8 * self._avg_request_seconds + 0.2 * duration
+
+            while self._admission_queue and len(self._active_requests) < self.config.max_active_requests:
+                waiter = self._admission_queue.popleft()
+                if waiter.future.cancelled():
+                    self._request_limits.pop(waiter.request_id, None)
+                    continue
+                self._activate_locked(waiter.request_id, self._request_limits.get(waiter.request_id))
+                waiter.grant()
+
+    def _activate_locked(self, request_id: str, max_parallel: Optional[int]) -> None:
+        self._active_requests[request_id] = time.perf_counter()
+        self._request_limits[request_id] = self._request_limit(max_parallel)
+        self._admitted += 1
+
+    def _request_limit(self, max_parallel: Optional[int]) -> int:
+        return max(1, max_parallel or self.config.max_tasks_per_request)
+
+    def _admission_position_locked(self, waiter: _Waiter) -> int:
+        for position, queued in enumerate(self._admission_queue, start=1):
+            if queued is waiter:
+                return position
+        return 0
+
+    def _estimate_retry_after_locked(self, position: int) -> float:
+        """Geschätzte Wartezeit bis ein Slot für ``position`` frei wird."""
+        waves = math.ceil(position / max(1, self.config.max_active_requests))
+        return round(max(1.0, waves * self._avg_request_seconds), 1)
+
+    # ------------------------------------------------------------------
+    # Agent-Ausführung
+    # ------------------------------------------------------------------
+
+    async def run(self, request_id: str, agent_type: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Führt einen Agenten aus, sobald globales, Typ- und Request-Limit es zulassen.
+
+        Coroutine-Funktionen laufen nativ im Event-Loop des Aufrufers,
+        synchrone (blockierende) Funktionen im gemeinsamen Thread-Pool.
+
+        Returns:
+            Rückgabewert von ``fn``
+        """
+        return await self.run_with_budget(request_id, agent_type, None, fn, *args, **kwargs)
+
+    async def run_with_budget(
+        self,
+        request_id: str,
+        agent_type: str,
+        budget: Optional[Callable[[], Optional[float]]],
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Wie ``run``, das Zeitbudget beginnt aber erst mit der Slot-Vergabe.
+
+        Die Wartezeit auf einen Slot zählt so nicht gegen das Budget des
+        Agenten; der Aufrufer begrenzt sie (z.B. durch die Request-Deadline).
+
+        Args:
+            budget: Liefert bei Slot-Vergabe das Ausführungsbudget in
+                Sekunden (None: unbegrenzt); <= 0 startet den Agenten nicht
+
+        Raises:
+            asyncio.TimeoutError: Budget überschritten bzw. bei Slot-Vergabe erschöpft
+        """
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(request_id, agent_type, loop)
+        with self._lock:
+            self._task_queues.setdefault(request_id, deque()).append(waiter)
+            self._queued_tasks += 1
+            self._max_queued_tasks = max(self._max_queued_tasks, self._queued_tasks)
+            self._dispatch_locked()
+
+        try:
+            await waiter.future
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self._finish_locked(waiter)
+                else:
+                    self._remove_queued_locked(waiter)
+            raise
+
+        timeout = budget() if budget is not None else None
+        if timeout is not None and timeout <= 0:
+            self._finish(waiter)
+            raise asyncio.TimeoutError()
+
+        if inspect.iscoroutinefunction(fn):
+            with self._lock:
+                self._tasks_async += 1
+            try:
+                return await asyncio.wait_for(fn(*args, **kwargs), timeout=timeout)
+            finally:
+                self._finish(waiter)
+
+        with self._lock:
+            self._tasks_threaded += 1
+        try:
+            cf_future = self._get_executor().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._finish(waiter)
+            raise
+        # Slot erst freigeben, wenn der Thread wirklich fertig ist (auch bei Timeout des Aufrufers)
+        cf_future.add_done_callback(lambda _: self._finish(waiter))
+        return await asyncio.wait_for(asyncio.wrap_future(cf_future, loop=loop), timeout=timeout)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    thread_name_prefix=self.config.thread_name_prefix
+                )
+            return self._executor
+
+    def _dispatch_locked(self) -> None:
+        """
+        Vergibt freie Slots fair über die Requests mit wartenden Agenten.
+
+        Bevorzugt wird der Request mit den wenigsten laufenden Agenten, bei
+        Gleichstand der am längsten nicht bediente (Round-Robin) - neu
+        eintreffende Requests kommen so vor bereits bedienten an die Reihe.
+        """
+        while self._running_tasks < self.config.max_concurrent_tasks and self._task_queues:
+            granted = None
+            best_key = None
+            for request_id, queue in self._task_queues.items():
+                running = self._running_by_request[request_id]
+                if running >= self._request_limits.get(request_id, self.config.max_tasks_per_request):
+                    continue
+                key = (running, self._last_served.get(request_id, 0))
+                if best_key is not None and key >= best_key:
+                    continue
+                candidate = next(
+                    (w for w in queue if self._running_by_type[w.agent_type] < self.config.limit_for(w.agent_type)),
+                    None
+                )
+                if candidate is not None:
+                    granted, best_key = candidate, key
+            if granted is None:
+                return
+
+            queue = self._task_queues[granted.request_id]
+            queue.remove(granted)
+            if not queue:
+                del self._task_queues[granted.request_id]
+            self._queued_tasks -= 1
+
+            if granted.future.cancelled():
+                continue
+
+            wait = time.perf_counter() - granted.enqueued_at
+            self._total_task_wait += wait
+            self._max_task_wait = max(self._max_task_wait, wait)
+            self._running_tasks += 1
+            self._running_by_type[granted.agent_type] += 1
+            self._running_by_request[granted.request_id] += 1
+            self._grant_seq += 1
+            self._last_served[granted.request_id] = self._grant_seq
+            granted.grant()
+
+    def _remove_queued_locked(self, waiter: _Waiter) -> None:
+        queue = self._task_queues.get(waiter.request_id)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._queued_tasks -= 1
+        if not queue:
+            del self._task_queues[waiter.request_id]
+
+    def _finish(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self._finish_locked(waiter)
+
+    def _finish_locked(self, waiter: _Waiter) -> None:
+        if not waiter.granted:
+            return
+        waiter.granted = False  # Doppelte Freigabe verhindern
+        self._running_tasks -= 1
+        self._running_by_type[waiter.agent_type] -= 1
+        if self._running_by_type[waiter.agent_type] <= 0:
+            del self._running_by_type[waiter.agent_type]
+        self._running_by_request[waiter.request_id] -= 1
+        if self._running_by_request[waiter.request_id] <= 0:
+            del self._running_by_request[waiter.request_id]
+            if waiter.request_id not in self._task_queues and waiter.request_id not in self._active_requests:
+                self._last_served.pop(waiter.request_id, None)
+        self._tasks_completed += 1
+        self._dispatch_locked()
+
+    # ------------------------------------------------------------------
+    # Verwaltung
+    # ------------------------------------------------------------------
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Beendet den Thread-Pool (wird bei Bedarf neu erstellt)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Scheduler-Statistiken zurück."""
+        with self._lock:
+            started = self._tasks_completed + self._running_tasks
+            return {
+                "max_workers": self.config.max_workers,
+                "max_concurrent_tasks": self.config.max_concurrent_tasks,
+                "max_active_requests": self.config.max_active_requests,
+                "max_queued_requests": self.config.max_queued_requests,
+                "active_requests": len(self._active_requests),
+                "queued_requests": len(self._admission_queue),
+                "running_tasks": self._running_tasks,
+                "running_by_type": dict(self._running_by_type),
+                "queued_tasks": self._queued_tasks,
+                "max_queued_tasks": self._max_queued_tasks,
+                "admitted": self._admitted,
+                "admission_waits": self._admission_waits,
+                "rejected": self._rejected,
+                "admission_timeouts": self._admission_timeouts,
+                "tasks_completed": self._tasks_completed,
+                "tasks_async": self._tasks_async,
+                "tasks_threaded": self._tasks_threaded,
+                "avg_task_wait_ms": self._total_task_wait / started * 1000 if started else 0.0,
+                "max_task_wait_ms": self._max_task_wait * 1000,
+                "avg_request_seconds": round(self._avg_request_seconds, 3),
+            }
+
+
+# Singleton-Instanz (prozessweit)
+_scheduler_instance: Optional[AgentScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_agent_scheduler(config: Optional[AgentSchedulerConfig] = None) -> AgentScheduler:
+    """
+    Gibt den prozessweiten Agent-Scheduler zurück (Singleton).
+
+    Args:
+        config: Konfiguration (nur bei erster Erstellung relevant;
+                default: ``AgentSchedulerConfig.from_env()``)
+    """
+    global _scheduler_instance
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            _scheduler_instance = AgentScheduler(config or AgentSchedulerConfig.from_env())
+            logger.info("✅ Agent-Scheduler initialisiert")
+        return _scheduler_instance
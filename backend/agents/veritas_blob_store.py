@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+VERITAS KEYED BLOB STORE
+========================
+
+Gemeinsamer SQLite-Store für content-adressierte Caches:
+(Namespace, Schlüssel) → BLOB.
+
+Nutzer:
+-------
+- ``EmbeddingCache``: (Modell, Content-Hash) → float32-Vektor
+- ``RerankScoreStore``: (Modell-Namespace, Query-/Chunk-Hash) → Score
+
+Eigenschaften:
+--------------
+- WAL-Modus, überlebt Neustarts; ohne Pfad In-Memory-Datenbank
+- Thread-sicher; async Aufrufer nutzen ``asyncio.to_thread``
+- ``ttl``: ältere Einträge werden beim Lesen ignoriert und beim Aufräumen gelöscht
+- ``max_rows``: beim Aufräumen werden die ältesten Einträge verdrängt
+- Aufräumen alle ``prune_every`` Aufrufe von ``put_many`` (oder per ``prune()``)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# SQLite begrenzt die Anzahl gebundener Parameter je Statement (konservativ)
+_SQLITE_MAX_PARAMS = 400
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class KeyedBlobStore:
+    """
+    SQLite-Tabelle ``(namespace, key) → value BLOB`` mit TTL und Größenlimit.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        table: str = "blobs",
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        prune_every: int = 64,
+    ):
+        """
+        Args:
+            path: SQLite-Datei (None: In-Memory-Datenbank)
+            table: Tabellenname (mehrere Stores können eine Datei teilen)
+            ttl: Max. Alter eines Eintrags in Sekunden (None: unbegrenzt)
+            max_rows: Max. Anzahl Einträge (None: unbegrenzt), älteste zuerst verdrängt
+            prune_every: Aufräumen nach jedem n-ten ``put_many``
+        """
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Ungültiger Tabellenname: {table!r}")
+
+        self.path = path or ":memory:"
+        self.table = table
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = max(1, prune_every)
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table} (created_at)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self._puts = 0
+
+    def get_many(self, namespace: str, keys: Sequence[str]) -> Dict[str, bytes]:
+        """Liefert gespeicherte Werte für ``keys`` (fehlende fehlen im Dict)."""
+        found: Dict[str, bytes] = {}
+        min_created = time.time() - self.ttl if self.ttl else 0.0
+        with self._lock:
+            for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                chunk = keys[start:start + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} "
+                    f"WHERE namespace = ? AND created_at >= ? AND key IN ({placeholders})",
+                    (namespace, min_created, *chunk),
+                )
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, namespace: str, values: Dict[str, bytes]) -> None:
+        """Speichert Werte (überschreibt vorhandene Einträge)."""
+        if not values:
+            return
+        now = time.time()
+        rows = [(namespace, key, value, now) for key, value in values.items()]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, created_at) "
+                f"VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self.writes += len(rows)
+            self._puts += 1
+            if self._puts % self.prune_every == 0:
+                self._prune_locked()
+
+    def prune(self) -> int:
+        """Löscht abgelaufene und überzählige Einträge. Returns: Anzahl."""
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        removed = 0
+        if self.ttl:
+            removed += self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+        if self.max_rows is not None:
+            excess = self._count_locked() - self.max_rows
+            if excess > 0:
+                removed += self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE (namespace, key) IN ("
+                    f"SELECT namespace, key FROM {self.table} ORDER BY created_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        if removed:
+            self._conn.commit()
+            self.evicted += removed
+        return removed
+
+    def _count_locked(self) -> int:
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count_locked()
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Löscht Einträge (alle oder eines Namespaces). Returns: Anzahl."""
+        with self._lock:
+            if namespace is None:
+                cursor = self._conn.execute(f"DELETE FROM {self.table}")
+            else:
+                cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evicted": self.evicted,
+            "max_rows": self.max_rows,
+        }
@@ -0,0 +1,1286 @@
+#!/usr/bin/env python3
+"""
+VERITAS BM25 INVERTED INDEX
+===========================
+
+Nativer Inverted Index für BM25 (Okapi) auf Basis von NumPy-Arrays.
+Ersetzt den linearen Scan von ``rank_bm25.BM25Okapi.get_scores``.
+
+Architektur (Lucene-Stil):
+--------------------------
+Der Index besteht aus unveränderlichen Segmenten. Jedes Segment hält
+CSR-Postings für die Terme seiner Dokumente:
+
+- terms:         (T,)   globale Term-IDs (aufsteigend)
+- indptr:        (T+1,) Offsets der Postings je Term
+- postings_doc:  (P,)   Dokument-Slots (je Term aufsteigend sortiert)
+- postings_tf:   (P,)   Term-Frequenzen
+- slots/doc_*:   Forward-Index (Slot -> Term-IDs) für Löschungen
+
+Globaler Zustand (über alle Segmente):
+
+- vocabulary:    term -> term_id
+- doc_len:       (N,) Dokumentlängen je Slot
+- live:          (N,) Tombstone-Maske (False = gelöscht)
+- df:            (V,) Document Frequency (nur lebende Dokumente)
+
+Inkrementelle Updates:
+----------------------
+- add_documents: neues Mini-Segment, df/avgdl werden inkrementell
+  fortgeschrieben → sofort durchsuchbar
+- remove_document: Tombstone setzen, df über Forward-Index dekrementieren
+- Segment Merging: Hintergrund-Thread fasst kleine benachbarte Segmente
+  zusammen und entfernt dabei Postings gelöschter Dokumente
+
+Query-Verarbeitung:
+-------------------
+1. Nur die Postings der Query-Terme werden angefasst (kein O(N)-Scan)
+2. MaxScore Early Termination: Terme werden nach Upper Bound absteigend
+   verarbeitet. Sobald die Summe der Upper Bounds aller restlichen Terme
+   den aktuellen Top-K-Schwellwert nicht mehr erreicht, werden für diese
+   Terme nur noch bekannte Kandidaten per ``searchsorted`` nachgeschlagen
+   ("non-essential lists").
+3. Top-K via ``np.argpartition`` statt vollständigem ``argsort``.
+4. Multi-Query (``top_k_multi``): alle Query-Varianten als eine dünne
+   Query-Term-Matrix Q (n_queries x U), multipliziert mit der dünnen
+   BM25-Gewichtsmatrix W (U x N) der U Query-Terme (``scipy.sparse``
+   CSR). Es entsteht kein dichtes (n_queries x N)-Array.
+
+Scores sind numerisch identisch zu ``BM25Okapi.get_scores`` auf dem
+Corpus der lebenden Dokumente. Dokumente ohne Treffer (Score 0) tauchen
+nicht in den Kandidaten auf.
+
+Persistenz:
+-----------
+``save()`` schreibt den Index als Version ``<path>/v-<id>/`` mit
+``manifest.json`` und ``.npy``-Dateien (Segmente, globale Arrays, Vokabular,
+Stored Fields), synchronisiert sie per fsync und veröffentlicht sie danach
+mit einem einzigen
+``os.replace`` der Pointer-Datei ``<path>/CURRENT``. Leser sehen immer
+entweder den vollständigen alten oder den vollständigen neuen Index; die
+vorherige Version bleibt für Leser erhalten, die den alten Pointer gerade
+gelesen haben. Indizes im alten Layout (Manifest direkt in ``path``) werden
+weiterhin geladen.
+``load()`` öffnet alle Arrays mit ``np.load(mmap_mode='r')``: Es wird
+nichts tokenisiert oder aufgebaut, mehrere Worker-Prozesse teilen sich
+dieselben Pages im Page Cache. Schreibzugriffe nach dem Laden kopieren
+nur die (kleinen) globalen Arrays (Copy-on-Write), Segmente bleiben
+gemappt bis sie gemerged werden.
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.3
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# scipy.sparse für Multi-Query-Scoring (optional - NumPy-Fallback)
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    sparse = None
+    SCIPY_AVAILABLE = False
+
+INDEX_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"  # Pointer auf das aktive Versions-Verzeichnis
+_VERSION_PREFIX = "v-"
+
+_SEGMENT_ARRAYS = (
+    "terms", "indptr", "postings_doc", "postings_tf", "term_max_tf",
+    "term_min_dl", "slots", "doc_indptr", "doc_terms"
+)
+
+# Gemeinsamer Merge-Thread für alle Indizes (Merges sind CPU-gebunden,
+# ein Worker reicht und verhindert Thread-Explosion bei Re-Indexierung)
+_merge_executor: Optional[ThreadPoolExecutor] = None
+_merge_executor_lock = threading.Lock()
+
+
+def _get_merge_executor() -> ThreadPoolExecutor:
+    global _merge_executor
+    with _merge_executor_lock:
+        if _merge_executor is None:
+            _merge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bm25-merge")
+        return _merge_executor
+
+
+class StringStore:
+    """
+    Kompakte String-Liste als UTF-8-Blob + Offsets (CSR-Stil).
+
+    Basis-Daten können per mmap von Disk kommen (read-only); Änderungen
+    landen in einem Overlay (angehängte Einträge, überschriebene Slots),
+    sodass nach einem Cold Start nichts dekodiert werden muss.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+        self._base_len = int(offsets.shape[0]) - 1
+        self._appended: List[Optional[str]] = []
+        self._overrides: Dict[int, Optional[str]] = {}
+
+    @classmethod
+    def encode(cls, strings: Iterable[Optional[str]]) -> "StringStore":
+        """Kodiert Strings (None → leerer String) in Blob + Offsets."""
+        encoded = [(value or "").encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def save(self, directory: str, name: str) -> None:
+        store = self if not (self._appended or self._overrides) else StringStore.encode(self)
+        np.save(os.path.join(directory, f"{name}_blob.npy"), store._blob)
+        np.save(os.path.join(directory, f"{name}_offsets.npy"), store._offsets)
+
+    @classmethod
+    def load(cls, directory: str, name: str, mmap_mode: Optional[str] = "r") -> "StringStore":
+        return cls(
+            np.load(os.path.join(directory, f"{name}_blob.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(directory, f"{name}_offsets.npy"), mmap_mode=mmap_mode)
+        )
+
+    def raw(self, index: int) -> bytes:
+        """UTF-8-Bytes eines Basis-Eintrags (ohne Overlay)."""
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+    def bisect_left(self, value: str) -> int:
+        """Binäre Suche in einer sortierten Basis (Byte-Ordnung == Codepoint-Ordnung)."""
+        key = value.encode("utf-8")
+        lo, hi = 0, self._base_len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.raw(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __len__(self) -> int:
+        return self._base_len + len(self._appended)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index < 0:
+            index += len(self)
+        if index in self._overrides:
+            return self._overrides[index]
+        if index < self._base_len:
+            return self.raw(index).decode("utf-8")
+        return self._appended[index - self._base_len]
+
+    def __setitem__(self, index: int, value: Optional[str]) -> None:
+        if index < 0:
+            index += len(self)
+        if index >= self._base_len:
+            self._appended[index - self._base_len] = value
+        else:
+            self._overrides[index] = value
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, value: Optional[str]) -> None:
+        self._appended.append(value)
+
+    def extend(self, values: Iterable[Optional[str]]) -> None:
+        self._appended.extend(values)
+
+
+def _fsync_path(path: str) -> None:
+    """fsync einer Datei oder eines Verzeichnisses (Verzeichnisse nicht unter Windows)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_tree(directory: str) -> None:
+    """fsync aller Dateien und Verzeichnisse unterhalb von ``directory``."""
+    for root, _, files in os.walk(directory, topdown=False):
+        for name in files:
+            _fsync_path(os.path.join(root, name))
+        _fsync_path(root)
+
+
+def _tf_part(
+    tf: np.ndarray,
+    doc_len: np.ndarray,
+    k1: float,
+    b: float,
+    avgdl: float
+) -> np.ndarray:
+    """TF-Sättigungsanteil der BM25-Formel (float64 für Parität mit BM25Okapi)."""
+    tf = tf.astype(np.float64)
+    norm = 1.0 - b + b * doc_len.astype(np.float64) / avgdl
+    return tf * (k1 + 1.0) / (tf + k1 * norm)
+
+
+class BM25Segment:
+    """
+    Unveränderliches Index-Segment mit CSR-Postings und Forward-Index.
+
+    Slots eines Segments sind aufsteigend und liegen vollständig hinter
+    den Slots aller älteren Segmente. Damit sind die über alle Segmente
+    konkatenierten Postings eines Terms ebenfalls nach Slot sortiert.
+    """
+
+    def __init__(
+        self,
+        terms: np.ndarray,
+        indptr: np.ndarray,
+        postings_doc: np.ndarray,
+        postings_tf: np.ndarray,
+        term_max_tf: np.ndarray,
+        term_min_dl: np.ndarray,
+        slots: np.ndarray,
+        doc_indptr: np.ndarray,
+        doc_terms: np.ndarray
+    ):
+        self.terms = terms
+        self.indptr = indptr
+        self.postings_doc = postings_doc
+        self.postings_tf = postings_tf
+        self.term_max_tf = term_max_tf
+        self.term_min_dl = term_min_dl
+        self.slots = slots
+        self.doc_indptr = doc_indptr
+        self.doc_terms = doc_terms
+        self.num_deleted = 0
+
+    @classmethod
+    def from_postings(
+        cls,
+        term_ids: np.ndarray,
+        slots: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray
+    ) -> Optional["BM25Segment"]:
+        """
+        Baut ein Segment aus (Term, Slot, TF)-Tripeln.
+
+        Args:
+            term_ids: Globale Term-IDs je Posting
+            slots: Dokument-Slots je Posting
+            tfs: Term-Frequenzen je Posting
+            doc_len: Globales Dokumentlängen-Array (nach Slot)
+
+        Returns:
+            Segment oder None wenn keine Postings vorhanden
+        """
+        if term_ids.size == 0:
+            return None
+
+        # Inverted: nach Term, innerhalb eines Terms nach Slot
+        order = np.lexsort((slots, term_ids))
+        sorted_terms = term_ids[order]
+        postings_doc = slots[order].astype(np.int32)
+        postings_tf = tfs[order].astype(np.float32)
+        terms, counts = np.unique(sorted_terms, return_counts=True)
+        indptr = np.zeros(terms.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        term_max_tf = np.maximum.reduceat(postings_tf, indptr[:-1])
+        term_min_dl = np.minimum.reduceat(doc_len[postings_doc], indptr[:-1]).astype(np.float32)
+
+        # Forward: nach Slot (für df-Dekrement beim Löschen)
+        forward = np.lexsort((term_ids, slots))
+        seg_slots, doc_counts = np.unique(slots[forward], return_counts=True)
+        doc_indptr = np.zeros(seg_slots.size + 1, dtype=np.int64)
+        np.cumsum(doc_counts, out=doc_indptr[1:])
+
+        return cls(
+            terms=terms.astype(np.int64),
+            indptr=indptr,
+            postings_doc=postings_doc,
+            postings_tf=postings_tf,
+            term_max_tf=term_max_tf,
+            term_min_dl=term_min_dl,
+            slots=seg_slots.astype(np.int32),
+            doc_indptr=doc_indptr,
+            doc_terms=term_ids[forward].astype(np.int32)
+        )
+
+    @classmethod
+    def merge(
+        cls,
+        segments: Sequence["BM25Segment"],
+        live: np.ndarray,
+        doc_len: np.ndarray
+    ) -> Optional["BM25Segment"]:
+        """
+        Fasst Segmente zusammen und verwirft Postings gelöschter Slots.
+
+        Args:
+            segments: Benachbarte Segmente (in Slot-Reihenfolge)
+            live: Tombstone-Maske (Snapshot)
+            doc_len: Globales Dokumentlängen-Array
+
+        Returns:
+            Neues Segment oder None wenn alle Dokumente gelöscht sind
+        """
+        term_ids = np.concatenate([np.repeat(s.terms, np.diff(s.indptr)) for s in segments])
+        slots = np.concatenate([s.postings_doc for s in segments])
+        tfs = np.concatenate([s.postings_tf for s in segments])
+        keep = live[slots]
+        return cls.from_postings(term_ids[keep], slots[keep], tfs[keep], doc_len)
+
+    @property
+    def num_docs(self) -> int:
+        return int(self.slots.shape[0])
+
+    @property
+    def num_postings(self) -> int:
+        return int(self.postings_doc.shape[0])
+
+    @property
+    def first_slot(self) -> int:
+        return int(self.slots[0])
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _SEGMENT_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "BM25Segment":
+        return cls(**{
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in _SEGMENT_ARRAYS
+        })
+
+    def find_term(self, term_id: int) -> int:
+        """Lokaler Index eines Terms oder -1."""
+        pos = int(np.searchsorted(self.terms, term_id))
+        if pos < self.terms.size and self.terms[pos] == term_id:
+            return pos
+        return -1
+
+    def postings(self, local_term: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Postings (Slots, TFs) eines lokalen Terms."""
+        start, end = self.indptr[local_term], self.indptr[local_term + 1]
+        return self.postings_doc[start:end], self.postings_tf[start:end]
+
+    def doc_term_ids(self, slot: int) -> np.ndarray:
+        """Term-IDs eines Dokuments (leer wenn Slot nicht im Segment)."""
+        pos = int(np.searchsorted(self.slots, slot))
+        if pos >= self.slots.size or self.slots[pos] != slot:
+            return np.zeros(0, dtype=np.int32)
+        return self.doc_terms[self.doc_indptr[pos]:self.doc_indptr[pos + 1]]
+
+    def memory_bytes(self) -> int:
+        return int(
+            self.terms.nbytes + self.indptr.nbytes + self.postings_doc.nbytes
+            + self.postings_tf.nbytes + self.term_max_tf.nbytes + self.term_min_dl.nbytes
+            + self.slots.nbytes + self.doc_indptr.nbytes + self.doc_terms.nbytes
+        )
+
+
+class BM25InvertedIndex:
+    """
+    BM25 Okapi Inverted Index mit Segmenten, Tombstones und MaxScore Top-K.
+
+    Dokumente werden über Slots adressiert (fortlaufend vergeben, nie
+    wiederverwendet). Gelöschte Slots bleiben als Tombstone bis zum
+    nächsten vollständigen Rebuild reserviert.
+
+    Performance:
+    -----------
+    - Indexing: O(P log P) wobei P = Anzahl (Term, Dokument)-Paare
+    - add_documents: O(P_neu log P_neu) + O(V) beim nächsten Query (IDF)
+    - remove_document: O(Terme des Dokuments)
+    - Retrieval: O(Σ |postings(q_i)|) statt O(N)
+    - Memory: ~12 bytes pro Posting + 5 bytes pro Dokument
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        max_segments: int = 8,
+        merge_width: int = 4,
+        deletes_merge_ratio: float = 0.3,
+        background_merge: bool = True
+    ):
+        """
+        Initialisiert einen leeren Index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+            epsilon: Floor-Faktor für negative IDFs (wie BM25Okapi)
+            max_segments: Ab dieser Segmentanzahl wird gemerged
+            merge_width: Anzahl benachbarter Segmente pro Merge
+            deletes_merge_ratio: Segmente mit höherem Lösch-Anteil werden neu geschrieben
+            background_merge: Merges im Hintergrund-Thread (False: synchron)
+        """
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.max_segments = max_segments
+        self.merge_width = max(2, merge_width)
+        self.deletes_merge_ratio = deletes_merge_ratio
+        self.background_merge = background_merge
+
+        self.vocabulary: Optional[Dict[str, int]] = {}
+        self._mapped_vocab: Optional[Tuple[StringStore, np.ndarray]] = None  # nach load()
+        self.stored_fields: Dict[str, StringStore] = {}
+        self.segments: List[BM25Segment] = []
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.live = np.zeros(0, dtype=bool)
+        self.df = np.zeros(0, dtype=np.int64)
+        self.total_len = 0.0
+        self.avgdl = 0.0
+        self.idf = np.zeros(0, dtype=np.float64)
+
+        self._num_slots = 0
+        self._num_live = 0
+        self._stats_dirty = False
+        self._lock = threading.RLock()
+        self._merge_running = False
+        self._merge_future: Optional[Future] = None
+        self._merges_completed = 0
+
+    # ------------------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------------------
+
+    @property
+    def num_docs(self) -> int:
+        """Anzahl lebender Dokumente."""
+        return self._num_live
+
+    @property
+    def num_slots(self) -> int:
+        """Anzahl vergebener Slots (inkl. Tombstones)."""
+        return self._num_slots
+
+    @property
+    def num_deleted(self) -> int:
+        """Anzahl Tombstones."""
+        return self._num_slots - self._num_live
+
+    @property
+    def num_terms(self) -> int:
+        """Anzahl Terme mit mindestens einem lebenden Dokument."""
+        return int(np.count_nonzero(self.df[:self._vocab_size()]))
+
+    @property
+    def num_postings(self) -> int:
+        """Anzahl (Term, Dokument)-Paare über alle Segmente."""
+        return sum(segment.num_postings for segment in self.segments)
+
+    @property
+    def num_segments(self) -> int:
+        return len(self.segments)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def build(self, tokenized_corpus: Sequence[Sequence[str]]) -> "BM25InvertedIndex":
+        """
+        Baut den Index neu aus einem tokenisierten Corpus (ein Segment).
+
+        Args:
+            tokenized_corpus: Liste von Token-Listen (eine pro Dokument)
+
+        Returns:
+            self (für Chaining)
+        """
+        with self._lock:
+            self.vocabulary = {}
+            self._mapped_vocab = None
+            self.segments = []
+            self.doc_len = np.zeros(0, dtype=np.float32)
+            self.live = np.zeros(0, dtype=bool)
+            self.df = np.zeros(0, dtype=np.int64)
+            self.total_len = 0.0
+            self._num_slots = 0
+            self._num_live = 0
+            self._append(tokenized_corpus)
+            self._refresh_statistics()
+        return self
+
+    def add_documents(self, tokenized_docs: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Fügt Dokumente als neues Segment hinzu (sofort durchsuchbar).
+
+        Args:
+            tokenized_docs: Liste von Token-Listen
+
+        Returns:
+            Vergebene Slots (in Eingabe-Reihenfolge)
+        """
+        with self._lock:
+            slots = self._append(tokenized_docs)
+        self._maybe_merge()
+        return slots
+
+    def remove_document(self, slot: int) -> bool:
+        """
+        Löscht ein Dokument (Tombstone) und aktualisiert df/avgdl.
+
+        Args:
+            slot: Slot des Dokuments
+
+        Returns:
+            True wenn gelöscht, False wenn unbekannt oder bereits gelöscht
+        """
+        with self._lock:
+            if slot < 0 or slot >= self._num_slots or not self.live[slot]:
+                return False
+
+            self._ensure_writable()
+            self.live[slot] = False
+            self._num_live -= 1
+            self.total_len -= float(self.doc_len[slot])
+
+            segment = self._segment_for_slot(slot)
+            if segment is not None:
+                self.df[segment.doc_term_ids(slot)] -= 1
+                segment.num_deleted += 1
+
+            self._stats_dirty = True
+
+        self._maybe_merge()
+        return True
+
+    def _append(self, tokenized_docs: Sequence[Sequence[str]]) -> np.ndarray:
+        """Vergibt Slots und schreibt ein neues Segment (Lock gehalten)."""
+        start = self._num_slots
+        num_new = len(tokenized_docs)
+        self._ensure_writable()
+        self._ensure_slot_capacity(start + num_new)
+
+        vocabulary = self._materialize_vocabulary()
+        term_ids: List[int] = []
+        slots: List[int] = []
+        tfs: List[int] = []
+
+        for offset, tokens in enumerate(tokenized_docs):
+            slot = start + offset
+            self.doc_len[slot] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    term_id = len(vocabulary)
+                    vocabulary[term] = term_id
+                term_ids.append(term_id)
+                slots.append(slot)
+                tfs.append(tf)
+
+        self.live[start:start + num_new] = True
+        self._num_slots += num_new
+        self._num_live += num_new
+        self.total_len += float(self.doc_len[start:start + num_new].sum())
+
+        term_arr = np.asarray(term_ids, dtype=np.int64)
+        self._ensure_vocab_capacity(len(vocabulary))
+        if term_arr.size:
+            self.df[:len(vocabulary)] += np.bincount(term_arr, minlength=len(vocabulary))
+
+        segment = BM25Segment.from_postings(
+            term_arr,
+            np.asarray(slots, dtype=np.int64),
+            np.asarray(tfs, dtype=np.float32),
+            self.doc_len
+        )
+        if segment is not None:
+            self.segments = self.segments + [segment]
+
+        self._stats_dirty = True
+        return np.arange(start, start + num_new, dtype=np.int64)
+
+    def _vocab_size(self) -> int:
+        if self.vocabulary is not None:
+            return len(self.vocabulary)
+        return int(self._mapped_vocab[1].shape[0])
+
+    def _term_id(self, token: str) -> Optional[int]:
+        """Term-ID eines Tokens (Dict oder binäre Suche im gemappten Vokabular)."""
+        if self.vocabulary is not None:
+            return self.vocabulary.get(token)
+        terms, term_ids = self._mapped_vocab
+        pos = terms.bisect_left(token)
+        if pos < term_ids.shape[0] and terms.raw(pos) == token.encode("utf-8"):
+            return int(term_ids[pos])
+        return None
+
+    def _materialize_vocabulary(self) -> Dict[str, int]:
+        """Baut das Vokabular-Dict aus dem gemappten Vokabular (erst beim ersten Schreiben)."""
+        if self.vocabulary is None:
+            terms, term_ids = self._mapped_vocab
+            self.vocabulary = dict(zip(terms, term_ids.tolist()))
+            self._mapped_vocab = None
+        return self.vocabulary
+
+    def _ensure_writable(self) -> None:
+        """Copy-on-Write für gemappte globale Arrays (Lock gehalten)."""
+        if not self.live.flags.writeable:
+            self.live = np.array(self.live)
+            self.doc_len = np.array(self.doc_len)
+            self.df = np.array(self.df)
+
+    def _ensure_slot_capacity(self, capacity: int) -> None:
+        if capacity <= self.doc_len.shape[0]:
+            return
+        new_capacity = max(capacity, 2 * self.doc_len.shape[0], 1024)
+        doc_len = np.zeros(new_capacity, dtype=np.float32)
+        doc_len[:self._num_slots] = self.doc_len[:self._num_slots]
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:self._num_slots] = self.live[:self._num_slots]
+        self.doc_len, self.live = doc_len, live
+
+    def _ensure_vocab_capacity(self, capacity: int) -> None:
+        if capacity <= self.df.shape[0]:
+            return
+        df = np.zeros(max(capacity, 2 * self.df.shape[0], 1024), dtype=np.int64)
+        df[:self.df.shape[0]] = self.df
+        self.df = df
+
+    def _segment_for_slot(self, slot: int) -> Optional[BM25Segment]:
+        segments = self.segments
+        pos = bisect.bisect_right([s.first_slot for s in segments], slot) - 1
+        return segments[pos] if pos >= 0 else None
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def _refresh_statistics(self) -> None:
+        """Berechnet avgdl und IDF neu (Lock gehalten)."""
+        num_docs = self._num_live
+        self.avgdl = self.total_len / num_docs if num_docs else 0.0
+
+        # IDF exakt wie rank_bm25.BM25Okapi._calc_idf auf dem lebenden Corpus
+        df = self.df[:self._vocab_size()].astype(np.float64)
+        present = df > 0
+        idf = np.zeros(df.shape[0], dtype=np.float64)
+        if present.any():
+            idf[present] = np.log(num_docs - df[present] + 0.5) - np.log(df[present] + 0.5)
+            average_idf = float(idf[present].sum() / np.count_nonzero(present))
+            idf[present & (idf < 0)] = self.epsilon * average_idf
+        self.idf = idf
+        self._stats_dirty = False
+
+    def _snapshot(self) -> Tuple[List[BM25Segment], np.ndarray, np.ndarray, np.ndarray, float, int, bool]:
+        """Konsistenter Lese-Snapshot für eine Query."""
+        with self._lock:
+            if self._stats_dirty:
+                self._refresh_statistics()
+            return (
+                self.segments,
+                self.live,
+                self.doc_len,
+                self.idf,
+                self.avgdl,
+                self._num_slots,
+                self._num_live < self._num_slots
+            )
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _query_terms(self, query_tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mappt Query-Tokens auf Term-IDs.
+
+        Doppelte Tokens werden (wie bei BM25Okapi) mehrfach gezählt
+        und daher als Gewicht zusammengefasst.
+        """
+        counts = Counter(
+            term_id for term_id in map(self._term_id, query_tokens) if term_id is not None
+        )
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return term_ids, weights
+
+    @staticmethod
+    def _term_postings(
+        segments: Sequence[BM25Segment],
+        term_id: int
+    ) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """
+        Konkatenierte Postings eines Terms über alle Segmente.
+
+        Returns:
+            (slots, tfs, max_tf, min_dl) - Slots aufsteigend sortiert
+        """
+        docs, tfs = [], []
+        max_tf, min_dl = 0.0, np.inf
+        for segment in segments:
+            local = segment.find_term(term_id)
+            if local < 0:
+                continue
+            seg_docs, seg_tfs = segment.postings(local)
+            docs.append(seg_docs)
+            tfs.append(seg_tfs)
+            max_tf = max(max_tf, float(segment.term_max_tf[local]))
+            min_dl = min(min_dl, float(segment.term_min_dl[local]))
+        if not docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32), 0.0, 0.0
+        if len(docs) == 1:
+            return docs[0], tfs[0], max_tf, min_dl
+        return np.concatenate(docs), np.concatenate(tfs), max_tf, min_dl
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """
+        Dichter Score-Vektor über alle Slots (kompatibel zu BM25Okapi).
+
+        Gelöschte Slots erhalten Score 0.
+
+        Args:
+            query_tokens: Tokenisierte Query
+
+        Returns:
+            Array (num_slots,) mit BM25-Scores
+        """
+        segments, live, doc_len, idf, avgdl, num_slots, has_deletes = self._snapshot()
+        scores = np.zeros(num_slots, dtype=np.float64)
+        term_ids, weights = self._query_terms(query_tokens)
+        for term_id, weight in zip(term_ids, weights):
+            docs, tfs, _, _ = self._term_postings(segments, term_id)
+            if has_deletes:
+                alive = live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+            scores[docs] += weight * idf[term_id] * _tf_part(tfs, doc_len[docs], self.k1, self.b, avgdl)
+        return scores
+
+    def top_k(
+        self,
+        query_tokens: Sequence[str],
+        k: int,
+        min_score: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K Dokumente für eine Query via Term-at-a-time MaxScore.
+
+        Args:
+            query_tokens: Tokenisierte Query
+            k: Anzahl Top-Dokumente
+            min_score: Optionaler minimaler Score (inklusive)
+
+        Returns:
+            (slots, scores), absteigend nach Score sortiert
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+        if k <= 0 or not self._num_live:
+            return empty
+
+        segments, live, doc_len, idf, avgdl, _, has_deletes = self._snapshot()
+        term_ids, weights = self._query_terms(query_tokens)
+        if not term_ids.size:
+            return empty
+
+        # Postings + Upper Bound je Term (max_tf / min_dl ist avgdl-unabhängig)
+        postings = [self._term_postings(segments, term_id) for term_id in term_ids]
+        upper_bounds = np.array([
+            weight * idf[term_id] * float(_tf_part(
+                np.array([max_tf]), np.array([min_dl]), self.k1, self.b, avgdl
+            )[0]) if docs.size else 0.0
+            for term_id, weight, (docs, _, max_tf, min_dl) in zip(term_ids, weights, postings)
+        ])
+        order = np.argsort(-upper_bounds, kind="stable")
+        # Restliche Upper Bound ab Term i (inklusive)
+        remaining = np.cumsum(upper_bounds[order][::-1])[::-1]
+        # Pruning nur sicher, wenn alle Beiträge nicht-negativ sind
+        can_prune = bool(np.all(idf[term_ids] > 0))
+
+        cand_docs = np.zeros(0, dtype=np.int64)
+        cand_scores = np.zeros(0, dtype=np.float64)
+        threshold = -np.inf
+
+        for i, term_pos in enumerate(order):
+            term_id, weight = term_ids[term_pos], weights[term_pos]
+            docs, tfs, _, _ = postings[term_pos]
+            if not docs.size:
+                continue
+
+            if can_prune and cand_docs.size >= k and remaining[i] < threshold:
+                # Non-essential: unbekannte Dokumente können Top-K nicht mehr
+                # erreichen → nur bekannte Kandidaten nachschlagen
+                survivors = cand_scores + remaining[i] >= threshold
+                cand_docs, cand_scores = cand_docs[survivors], cand_scores[survivors]
+
+                pos = np.minimum(np.searchsorted(docs, cand_docs), docs.size - 1)
+                hit = docs[pos] == cand_docs
+                if hit.any():
+                    cand_scores[hit] += weight * idf[term_id] * _tf_part(
+                        tfs[pos[hit]], doc_len[cand_docs[hit]], self.k1, self.b, avgdl
+                    )
+                continue
+
+            # Essential: Postings vollständig mergen
+            if has_deletes:
+                alive = live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+            contrib = weight * idf[term_id] * _tf_part(tfs, doc_len[docs], self.k1, self.b, avgdl)
+            merged_docs, inverse = np.unique(
+                np.concatenate([cand_docs, docs.astype(np.int64)]),
+                return_inverse=True
+            )
+            cand_scores = np.bincount(
+                inverse,
+                weights=np.concatenate([cand_scores, contrib]),
+                minlength=merged_docs.size
+            )
+            cand_docs = merged_docs
+
+            if can_prune and cand_docs.size >= k:
+                threshold = float(np.partition(cand_scores, cand_docs.size - k)[cand_docs.size - k])
+
+        if min_score is not None:
+            keep = cand_scores >= min_score
+            cand_docs, cand_scores = cand_docs[keep], cand_scores[keep]
+
+        if cand_docs.size > k:
+            top = np.argpartition(-cand_scores, k - 1)[:k]
+            cand_docs, cand_scores = cand_docs[top], cand_scores[top]
+
+        # Absteigend nach Score, bei Gleichstand nach Slot
+        ranking = np.lexsort((cand_docs, -cand_scores))
+        return cand_docs[ranking], cand_scores[ranking]
+
+    def top_k_multi(
+        self,
+        queries_tokens: Sequence[Sequence[str]],
+        k: int,
+        aggregation: str = "max"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-K für mehrere Queries mit Score-Aggregation in einem Durchlauf.
+
+        Scores S = Q @ W mit
+        - Q: (n_queries x U) Query-Term-Gewichte (Token-Häufigkeit)
+        - W: (U x N) BM25-Termgewichte idf * tf_part; jede Zeile ist
+          direkt die (nach Slot sortierte) Posting-Liste eines der
+          U Query-Terme → CSR ohne Sortierung
+
+        sum/avg sind linear und werden vor dem Produkt im Query-Raum
+        aggregiert (ein einziges (1 x U) @ W). max faltet die Zeilen von S
+        nacheinander in einen Akkumulator. In beiden Fällen entsteht kein
+        dichtes (n_queries x N)-Array und kein vollständiger argsort.
+
+        Ergebnis ist identisch zur Aggregation der dichten
+        ``get_scores``-Vektoren je Query; Dokumente ohne Treffer (Score 0)
+        tauchen nicht auf.
+
+        Args:
+            queries_tokens: Tokenisierte Queries
+            k: Anzahl Top-Dokumente
+            aggregation: "max", "sum" oder "avg" (über alle Queries)
+
+        Returns:
+            (slots, scores), absteigend nach Score sortiert
+
+        Raises:
+            ValueError: Unbekannte Aggregation
+        """
+        if aggregation not in ("max", "sum", "avg"):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+        num_queries = len(queries_tokens)
+        if k <= 0 or not num_queries or not self._num_live:
+            return empty
+
+        segments, live, doc_len, idf, avgdl, num_slots, has_deletes = self._snapshot()
+
+        # Q: Spalten = Position in der Term-Union
+        query_terms = [self._query_terms(tokens) for tokens in queries_tokens]
+        union_terms, term_cols = np.unique(
+            np.concatenate([term_ids for term_ids, _ in query_terms]),
+            return_inverse=True
+        )
+        if not union_terms.size:
+            return empty
+        q_indptr = np.concatenate([[0], np.cumsum([term_ids.size for term_ids, _ in query_terms])])
+        q_data = np.concatenate([weights for _, weights in query_terms])
+
+        # W: eine Zeile je Union-Term (Postings der lebenden Dokumente)
+        w_indices, w_data = [], []
+        for term_id in union_terms:
+            docs, tfs, _, _ = self._term_postings(segments, term_id)
+            if has_deletes:
+                alive = live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+            w_indices.append(docs)
+            w_data.append(idf[term_id] * _tf_part(tfs, doc_len[docs], self.k1, self.b, avgdl))
+        w_indptr = np.concatenate([[0], np.cumsum([docs.size for docs in w_indices])])
+        if not w_indptr[-1]:
+            return empty
+        w_indices = np.concatenate(w_indices)
+        w_data = np.concatenate(w_data)
+
+        if aggregation != "max":
+            # sum/avg sind linear: erst im Query-Raum aggregieren
+            # (1 x U), dann ein einziges Produkt mit W
+            term_weights = np.bincount(term_cols, weights=q_data, minlength=union_terms.size)
+            if aggregation == "avg":
+                term_weights /= num_queries
+            if SCIPY_AVAILABLE:
+                W = sparse.csr_matrix((w_data, w_indices, w_indptr), shape=(union_terms.size, num_slots))
+                S = sparse.csr_matrix(term_weights[np.newaxis, :]) @ W  # (1 x N), dünn
+                cand_docs, cand_scores = S.indices.astype(np.int64), S.data
+            else:
+                aggregated = np.bincount(
+                    w_indices, weights=np.repeat(term_weights, np.diff(w_indptr)) * w_data, minlength=num_slots
+                )
+                cand_docs = np.flatnonzero(aggregated)
+                cand_scores = aggregated[cand_docs]
+        else:
+            # max ist nicht linear: Zeilen von S = Q @ W nacheinander mit
+            # einem dichten Akkumulator berechnen (Gustavson-SpGEMM) und
+            # sofort per Maximum falten - S wird nie materialisiert
+            accumulator = np.empty(num_slots, dtype=np.float64)
+            aggregated = np.full(num_slots, -np.inf)
+            for q in range(num_queries):
+                accumulator.fill(0.0)
+                for i in range(q_indptr[q], q_indptr[q + 1]):
+                    row = slice(w_indptr[term_cols[i]], w_indptr[term_cols[i] + 1])
+                    accumulator[w_indices[row]] += q_data[i] * w_data[row]
+                # Nicht getroffene Dokumente haben für diese Query Score 0
+                np.maximum(aggregated, accumulator, out=aggregated)
+            cand_docs = np.flatnonzero(aggregated)
+            cand_scores = aggregated[cand_docs]
+
+        if cand_docs.size > k:
+            top = np.argpartition(-cand_scores, k - 1)[:k]
+            cand_docs, cand_scores = cand_docs[top], cand_scores[top]
+
+        ranking = np.lexsort((cand_docs, -cand_scores))
+        return cand_docs[ranking], cand_scores[ranking]
+
+    # ------------------------------------------------------------------
+    # Segment Merging
+    # ------------------------------------------------------------------
+
+    def _select_merge(self) -> List[BM25Segment]:
+        """Merge Policy: zu viele Segmente oder zu hoher Lösch-Anteil (Lock gehalten)."""
+        segments = self.segments
+        if len(segments) > self.max_segments:
+            width = min(self.merge_width, len(segments))
+            sizes = np.array([s.num_postings for s in segments], dtype=np.int64)
+            window = np.convolve(sizes, np.ones(width, dtype=np.int64), mode="valid")
+            start = int(np.argmin(window))
+            return segments[start:start + width]
+
+        for segment in segments:
+            if segment.num_deleted > self.deletes_merge_ratio * segment.num_docs:
+                return [segment]
+        return []
+
+    def _maybe_merge(self) -> None:
+        """Startet Merges, wenn die Merge Policy Arbeit findet."""
+        if not self.background_merge:
+            self._run_merges()
+            return
+
+        with self._lock:
+            if self._merge_running or not self._select_merge():
+                return
+            self._merge_running = True
+            self._merge_future = _get_merge_executor().submit(self._run_merges)
+
+    def _run_merges(self) -> None:
+        """Führt Merges aus, bis die Merge Policy nichts mehr findet."""
+        while True:
+            with self._lock:
+                candidates = self._select_merge()
+                if not candidates:
+                    self._merge_running = False
+                    return
+                live = self.live[:self._num_slots].copy()
+                doc_len = self.doc_len
+
+            try:
+                merged = BM25Segment.merge(candidates, live, doc_len)
+            except Exception as e:
+                logger.error(f"❌ BM25 Segment-Merge fehlgeschlagen: {e}")
+                with self._lock:
+                    self._merge_running = False
+                return
+
+            with self._lock:
+                self._swap_segments(candidates, merged)
+
+    def _swap_segments(self, candidates: List[BM25Segment], merged: Optional[BM25Segment]) -> None:
+        """Ersetzt gemergte Segmente, sofern sie noch aktuell sind (Lock gehalten)."""
+        segments = self.segments
+        start = next((i for i, s in enumerate(segments) if s is candidates[0]), None)
+        if start is None or segments[start:start + len(candidates)] != candidates:
+            # Index wurde zwischenzeitlich neu gebaut
+            return
+
+        replacement = []
+        if merged is not None:
+            merged.num_deleted = int(np.count_nonzero(~self.live[merged.slots]))
+            replacement = [merged]
+        self.segments = segments[:start] + replacement + segments[start + len(candidates):]
+        self._merges_completed += 1
+
+        logger.debug(
+            f"🔀 BM25 Segment-Merge: {len(candidates)} → {len(replacement)} "
+            f"({len(self.segments)} Segmente)"
+        )
+
+    def wait_for_merges(self) -> None:
+        """Blockiert bis laufende Hintergrund-Merges abgeschlossen sind."""
+        future = self._merge_future
+        if future is not None:
+            future.result()
+
+    def force_merge(self) -> None:
+        """Fasst alle Segmente zu einem zusammen (entfernt alle Tombstone-Postings)."""
+        self.wait_for_merges()
+        with self._lock:
+            if len(self.segments) <= 1 and not any(s.num_deleted for s in self.segments):
+                return
+            candidates = list(self.segments)
+            merged = BM25Segment.merge(candidates, self.live[:self._num_slots], self.doc_len)
+            self._swap_segments(candidates, merged)
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def resolve_path(path: str) -> Optional[str]:
+        """
+        Verzeichnis der aktiven Index-Version (None: kein Index unter ``path``).
+
+        Folgt ``CURRENT``; ohne Pointer wird das alte Layout (Manifest direkt
+        in ``path``) akzeptiert.
+        """
+        try:
+            with open(os.path.join(path, CURRENT_FILE), "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return path if os.path.exists(os.path.join(path, MANIFEST_FILE)) else None
+        return os.path.join(path, version)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Prüft, ob unter ``path`` ein gespeicherter Index liegt."""
+        directory = cls.resolve_path(path)
+        return directory is not None and os.path.exists(os.path.join(directory, MANIFEST_FILE))
+
+    def save(
+        self,
+        path: str,
+        stored_fields: Optional[Dict[str, Sequence[Optional[str]]]] = None
+    ) -> None:
+        """
+        Schreibt eine neue Index-Version und veröffentlicht sie atomar.
+
+        Args:
+            path: Index-Verzeichnis (enthält Versionen + ``CURRENT``)
+            stored_fields: Optionale String-Spalten je Slot (z.B. doc_id, content)
+        """
+        self.wait_for_merges()
+        start_time = time.time()
+        version = f"{_VERSION_PREFIX}{time.time_ns():020d}-{os.getpid()}"
+        tmp_path = os.path.join(path, version)
+        os.makedirs(tmp_path)
+
+        with self._lock:
+            if self._stats_dirty:
+                self._refresh_statistics()
+            num_slots, vocab_size = self._num_slots, self._vocab_size()
+
+            np.save(os.path.join(tmp_path, "doc_len.npy"), self.doc_len[:num_slots])
+            np.save(os.path.join(tmp_path, "live.npy"), self.live[:num_slots])
+            np.save(os.path.join(tmp_path, "df.npy"), self.df[:vocab_size])
+            np.save(os.path.join(tmp_path, "idf.npy"), self.idf[:vocab_size])
+
+            # Vokabular sortiert (für binäre Suche ohne Dict-Aufbau beim Laden)
+            if self.vocabulary is not None:
+                items = sorted(self.vocabulary.items())
+                terms = StringStore.encode(term for term, _ in items)
+                term_ids = np.fromiter((term_id for _, term_id in items), dtype=np.int64, count=len(items))
+            else:
+                terms, term_ids = self._mapped_vocab
+            terms.save(tmp_path, "vocab")
+            np.save(os.path.join(tmp_path, "vocab_ids.npy"), term_ids)
+
+            segments = list(self.segments)
+            for i, segment in enumerate(segments):
+                segment.save(os.path.join(tmp_path, f"segment_{i:04d}"))
+
+            for name, values in (stored_fields or {}).items():
+                store = values if isinstance(values, StringStore) else StringStore.encode(values)
+                store.save(tmp_path, f"field_{name}")
+
+            manifest = {
+                "format_version": INDEX_FORMAT_VERSION,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "k1": self.k1,
+                "b": self.b,
+                "epsilon": self.epsilon,
+                "num_slots": num_slots,
+                "num_live": self._num_live,
+                "total_len": self.total_len,
+                "avgdl": self.avgdl,
+                "vocab_size": vocab_size,
+                "segments": [
+                    {"dir": f"segment_{i:04d}", "num_docs": s.num_docs, "num_deleted": s.num_deleted}
+                    for i, s in enumerate(segments)
+                ],
+                "stored_fields": sorted((stored_fields or {}).keys()),
+            }
+
+        with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Version dauerhaft auf Disk, bevor CURRENT auf sie zeigt (sonst kann
+        # ein Crash einen Pointer auf unvollständige Dateien hinterlassen)
+        _fsync_tree(tmp_path)
+        _fsync_path(path)
+
+        # Veröffentlichen: ein os.replace des Pointers (Version ist vollständig geschrieben)
+        previous = self.resolve_path(path)
+        pointer_tmp = os.path.join(path, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(path, CURRENT_FILE))
+        _fsync_path(path)
+        self._remove_stale_versions(path, keep={version, os.path.basename(previous or "")})
+
+        logger.info(
+            f"💾 BM25-Index gespeichert: {path} ({self._num_live} Docs, "
+            f"{len(segments)} Segmente, {(time.time() - start_time) * 1000:.0f}ms)"
+        )
+
+    @staticmethod
+    def _remove_stale_versions(path: str, keep: set) -> None:
+        """
+        Löscht alle Versionen außer ``keep`` (aktive + vorherige), Reste
+        abgebrochener Saves und Dateien des alten Layouts. Unter POSIX
+        bleiben gemappte Dateien für laufende Leser gültig; unter Windows
+        gesperrte Dateien werden beim nächsten Save erneut versucht.
+        """
+        for name in os.listdir(path):
+            stale_version = name.startswith(_VERSION_PREFIX) and name not in keep
+            legacy = name == MANIFEST_FILE or name.endswith(".npy") or name.startswith("segment_")
+            if not (stale_version or legacy):
+                continue
+            target = os.path.join(path, name)
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                try:
+                    os.remove(target)
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        mmap: bool = True,
+        **kwargs: Any
+    ) -> "BM25InvertedIndex":
+        """
+        Lädt einen gespeicherten Index (per Default memory-mapped).
+
+        Args:
+            path: Index-Verzeichnis (folgt ``CURRENT``)
+            mmap: Arrays per mmap öffnen (False: vollständig in den RAM laden)
+            **kwargs: Weitere Konstruktor-Argumente (Merge Policy etc.)
+
+        Returns:
+            Geladener Index; Stored Fields unter ``index.stored_fields``
+
+        Raises:
+            FileNotFoundError: Wenn kein Manifest existiert
+            ValueError: Bei inkompatibler Format-Version
+        """
+        start_time = time.time()
+        path = cls.resolve_path(path) or path
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Inkompatibles BM25-Indexformat: {manifest.get('format_version')} "
+                f"(erwartet {INDEX_FORMAT_VERSION})"
+            )
+
+        mmap_mode = "r" if mmap else None
+        index = cls(k1=manifest["k1"], b=manifest["b"], epsilon=manifest["epsilon"], **kwargs)
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        index.doc_len = load_array("doc_len")
+        index.live = load_array("live")
+        index.df = load_array("df")
+        index.idf = load_array("idf")
+        index.vocabulary = None
+        index._mapped_vocab = (StringStore.load(path, "vocab", mmap_mode), load_array("vocab_ids"))
+
+        for info in manifest["segments"]:
+            segment = BM25Segment.load(os.path.join(path, info["dir"]), mmap_mode)
+            segment.num_deleted = info["num_deleted"]
+            index.segments.append(segment)
+
+        index.stored_fields = {
+            name: StringStore.load(path, f"field_{name}", mmap_mode)
+            for name in manifest.get("stored_fields", [])
+        }
+
+        index._num_slots = manifest["num_slots"]
+        index._num_live = manifest["num_live"]
+        index.total_len = manifest["total_len"]
+        index.avgdl = manifest["avgdl"]
+        index._stats_dirty = False
+
+        logger.info(
+            f"📂 BM25-Index geladen: {path} ({index._num_live} Docs, "
+            f"{len(index.segments)} Segmente, {(time.time() - start_time) * 1000:.0f}ms, "
+            f"mmap={'ja' if mmap else 'nein'})"
+        )
+        return index
+
+    def get_stats(self) -> Dict[str, int]:
+        """Index-Statistiken (Segmente, Tombstones, Merges)."""
+        return {
+            "num_segments": self.num_segments,
+            "num_deleted": self.num_deleted,
+            "merges_completed": self._merges_completed,
+        }
+
+    def memory_bytes(self) -> int:
+        """Speicherbedarf der NumPy-Arrays in Bytes (ohne Vokabular)."""
+        return int(
+            sum(segment.memory_bytes() for segment in self.segments)
+            + self.doc_len.nbytes + self.live.nbytes + self.df.nbytes + self.idf.nbytes
+        )
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+VERITAS DEADLINE SCHEDULER
+==========================
+
+Deadline-basierte Zeitbudgets für die Agent-Ausführung der Intelligent
+Pipeline.
+
+Problem:
+--------
+``_calculate_agent_timeout`` teilte ``request.timeout`` gleichmäßig durch
+die Anzahl der Agenten - obwohl diese parallel laufen. Schnelle Agenten
+bekamen Zeit, die sie nicht brauchen; langsame, aber wichtige Agenten
+(z.B. ``legal_framework``) wurden abgeschnitten, und lief die Zeit ab,
+endete alles als Timeout.
+
+Lösung:
+-------
+1. Eine absolute Deadline je Request (``time.monotonic()``), abzüglich
+   einer Reserve für Aggregation/LLM-Synthese, wird über
+   ``AgentExecutionTask.deadline`` weitergereicht
+2. Agenten werden nach ``priority_score`` gestartet
+3. Budget je Agent aus den historischen Latenz-Perzentilen (p90 × Faktor,
+   mit Priorität skaliert), gedeckelt durch die Restzeit bis zur Deadline;
+   ohne Historie gilt die Restzeit. Das Budget beginnt erst mit der
+   Slot-Vergabe des Agent-Schedulers - die Wartezeit in dessen Queue
+   begrenzt nur die Deadline. Timeouts gehen als zensierte Messung
+   (Laufzeit × ``timeout_growth``) in die Historie ein - sonst bliebe das
+   Perzentil beim alten Budget abgeschnitten und könnte nie wachsen
+4. Naht die Deadline, werden fertige Ergebnisse zurückgegeben; Agenten,
+   die nicht mehr sinnvoll starten können, werden übersprungen statt alle
+   Agenten in den Timeout laufen zu lassen
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Ergebnis je Aufgabe: (Aufgabe, Status, Ergebnis, Laufzeit in s)
+# Status: "completed" | "timeout" | "not_started"
+DeadlineOutcome = Tuple[T, str, Any, float]
+
+
+@dataclass
+class DeadlineConfig:
+    """Konfiguration der Deadline-Budgets"""
+
+    budget_percentile: float = 0.9  # Latenz-Perzentil als Basis des Budgets
+    safety_factor: float = 1.25  # Aufschlag auf das Perzentil
+    priority_boost: float = 0.5  # Zusätzlicher Aufschlag × priority_score (0..1)
+    min_budget: float = 0.5  # Darunter wird ein Agent nicht mehr gestartet (s)
+    min_samples: int = 5  # Ab so vielen Messungen gelten Perzentile
+    timeout_growth: float = 1.5  # Timeout zählt als Messung von Laufzeit × Faktor (zensiert)
+    history_size: int = 200  # Messungen je Agent-Typ (gleitendes Fenster)
+    synthesis_reserve: float = 0.2  # Anteil des Request-Timeouts für Aggregation/LLM
+    min_synthesis_reserve: float = 2.0  # Mindest-Reserve (s)
+
+
+class AgentLatencyTracker:
+    """Gleitendes Fenster erfolgreicher Agent-Laufzeiten je Agent-Typ."""
+
+    def __init__(self, history_size: int = 200):
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, agent_type: str, duration: float) -> None:
+        with self._lock:
+            samples = self._samples.get(agent_type)
+            if samples is None:
+                samples = self._samples[agent_type] = deque(maxlen=self.history_size)
+            samples.append(float(duration))
+
+    def sample_count(self, agent_type: str) -> int:
+        with self._lock:
+            return len(self._samples.get(agent_type, ()))
+
+    def percentile(self, agent_type: str, q: float) -> Optional[float]:
+        """Perzentil ``q`` (0..1, lineare Interpolation); None ohne Messungen."""
+        with self._lock:
+            values = sorted(self._samples.get(agent_type, ()))
+        if not values:
+            return None
+        position = min(max(q, 0.0), 1.0) * (len(values) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    def percentiles(self, agent_type: str) -> Dict[str, Optional[float]]:
+        """p50/p90/p95 (gerundet) für Monitoring."""
+        return {
+            f"p{int(q * 100)}": (round(value, 4) if value is not None else None)
+            for q in (0.5, 0.9, 0.95)
+            for value in (self.percentile(agent_type, q),)
+        }
+
+
+class DeadlinePlanner:
+    """Berechnet Stage-Deadline und Budgets je Agent."""
+
+    def __init__(
+        self,
+        config: Optional[DeadlineConfig] = None,
+        tracker: Optional[AgentLatencyTracker] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.config = config or DeadlineConfig()
+        self.tracker = tracker or AgentLatencyTracker(self.config.history_size)
+        self.clock = clock
+
+    def request_deadline(self, timeout: float, start: Optional[float] = None) -> float:
+        """Absolute Request-Deadline (``time.monotonic``-Basis)."""
+        return (start if start is not None else self.clock()) + float(timeout)
+
+    def agent_deadline(self, request_deadline: float, timeout: float) -> float:
+        """
+        Deadline der Agent-Ausführung: Request-Deadline abzüglich Reserve
+        für Aggregation/LLM (höchstens die Hälfte der Restzeit).
+        """
+        remaining = request_deadline - self.clock()
+        reserve = max(self.config.min_synthesis_reserve, float(timeout) * self.config.synthesis_reserve)
+        return request_deadline - min(reserve, max(remaining, 0.0) / 2)
+
+    def observe_timeout(self, agent_type: str, elapsed: float) -> None:
+        """
+        Erfasst einen Timeout als zensierte Messung: die echte Laufzeit liegt
+        über ``elapsed``, daher geht ``elapsed × timeout_growth`` in die
+        Historie ein. Wiederholte Timeouts heben das Budget schrittweise an.
+        """
+        self.tracker.observe(agent_type, float(elapsed) * self.config.timeout_growth)
+
+    def budget(self, agent_type: str, deadline: float, priority_score: float = 0.0) -> float:
+        """
+        Zeitbudget eines Agenten in Sekunden (0.0: nicht mehr starten).
+
+        Mit ausreichender Historie: Perzentil × Sicherheitsfaktor × (1 +
+        Boost × Priorität), mindestens ``min_budget``; stets gedeckelt durch
+        die Restzeit bis ``deadline``.
+        """
+        remaining = deadline - self.clock()
+        if remaining < self.config.min_budget:
+            return 0.0
+        if self.tracker.sample_count(agent_type) < self.config.min_samples:
+            return remaining
+
+        latency = self.tracker.percentile(agent_type, self.config.budget_percentile) or 0.0
+        priority = min(max(priority_score, 0.0), 1.0)
+        budget = latency * self.config.safety_factor * (1.0 + self.config.priority_boost * priority)
+        return min(remaining, max(self.config.min_budget, budget))
+
+
+def order_by_priority(tasks: Iterable[T]) -> List[T]:
+    """Sortiert Aufgaben nach ``priority_score`` (absteigend), dann ``planned_order``."""
+    return sorted(
+        tasks,
+        key=lambda task: (-getattr(task, "priority_score", 0.0), getattr(task, "planned_order", 0))
+    )
+
+
+async def run_until_deadline(
+    tasks: Sequence[T],
+    run: Callable[..., Awaitable[Any]],
+    budget_for: Callable[[T], float],
+    deadline: float,
+    concurrent: bool = True,
+    clock: Callable[[], float] = time.monotonic,
+    budget_on_grant: bool = False
+) -> List[DeadlineOutcome]:
+    """
+    Führt Aufgaben mit individuellem Budget bis zur Deadline aus.
+
+    Args:
+        tasks: Aufgaben in Start-Reihenfolge (Priorität)
+        run: Coroutine-Funktion je Aufgabe
+        budget_for: Budget in Sekunden je Aufgabe (<= 0: nicht starten)
+        deadline: Absolute Deadline (``clock``-Basis)
+        concurrent: Parallel (True) oder nacheinander (False)
+        budget_on_grant: ``run(task, budget)`` wartet selbst auf einen
+            Ausführungs-Slot und ruft ``budget()`` bei dessen Vergabe auf;
+            das Budget (Timeout über ``asyncio.TimeoutError``) gilt erst ab
+            dann, die Wartezeit begrenzt nur die Deadline
+
+    Returns:
+        Ein Ergebnis-Tupel je Aufgabe (Reihenfolge wie ``tasks``)
+    """
+
+    async def guarded(task: T) -> DeadlineOutcome:
+        budget = min(budget_for(task), deadline - clock())
+        if budget <= 0:
+            return task, "not_started", None, 0.0
+        if budget_on_grant:
+            return await guarded_on_grant(task)
+        started = clock()
+        try:
+            result = await asyncio.wait_for(run(task), timeout=budget)
+            return task, "completed", result, clock() - started
+        except asyncio.TimeoutError:
+            return task, "timeout", None, clock() - started
+
+    async def guarded_on_grant(task: T) -> DeadlineOutcome:
+        started: List[float] = []
+
+        def granted_budget() -> float:
+            # Budget neu bestimmen: die Wartezeit auf den Slot kann die Restzeit verkürzt haben
+            budget = min(budget_for(task), deadline - clock())
+            if budget > 0:
+                started.append(clock())
+            return budget
+
+        try:
+            result = await asyncio.wait_for(run(task, granted_budget), timeout=max(0.0, deadline - clock()))
+            return task, "completed", result, clock() - started[0]
+        except asyncio.TimeoutError:
+            if not started:
+                return task, "not_started", None, 0.0
+            return task, "timeout", None, clock() - started[0]
+
+    if not concurrent:
+        return [await guarded(task) for task in tasks]
+
+    running = [asyncio.ensure_future(guarded(task)) for task in tasks]
+    if not running:
+        return []
+    # Sicherheitsnetz: jede Aufgabe endet spätestens mit ihrem Budget
+    await asyncio.wait(running, timeout=max(0.0, deadline - clock()) + 0.5)
+
+    # Nicht beendete Aufgaben abbrechen - auch bevor ein Fehler weitergereicht wird
+    pending = [future for future in running if not future.done()]
+    for future in pending:
+        future.cancel()
+
+    outcomes: List[DeadlineOutcome] = []
+    for task, future in zip(tasks, running):
+        if future in pending or future.cancelled():
+            outcomes.append((task, "timeout", None, 0.0))
+        elif future.exception() is not None:
+            raise future.exception()
+        else:
+            outcomes.append(future.result())
+    return outcomes
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+VERITAS EMBEDDING SERVICE
+=========================
+
+Asynchroner, gebatchter Embedding-Client für Ollama mit persistentem Cache.
+
+Problem:
+--------
+``DirectOllamaEmbeddings.embed_documents`` sendet je Text einen blockierenden
+Request an ``/api/embeddings`` - ein Dokument mit 2.000 Chunks kostet
+2.000 sequentielle Round-Trips.
+
+Lösung:
+-------
+1. Batch-Endpoint ``/api/embed`` (``input: [...]``), ``batch_size`` Texte je Request
+2. Gepoolte Keep-Alive-Verbindungen des gemeinsamen ``OllamaTransport`` und
+   begrenzte Parallelität (``max_concurrency`` Batches gleichzeitig)
+3. Content-Hash-Cache auf Disk (``KeyedBlobStore``, float32-BLOB je Vektor):
+   unveränderte Chunks kosten beim Re-Ingest keinen Request
+4. Rückgabe als float32 NumPy-Array (``n × dim``) statt ``List[List[float]]``
+
+Fallbacks:
+----------
+- Ältere Ollama-Versionen ohne ``/api/embed`` (404): ``/api/embeddings`` je Text
+- Batch schlägt fehl (z.B. ein zu langer Text): Texte einzeln nachgefordert,
+  nur die tatsächlich fehlgeschlagenen erhalten Platzhalter
+- Ollama nicht erreichbar: deterministische Platzhalter-Vektoren wie
+  ``DirectOllamaEmbeddings`` (werden NICHT gecacht), oder Exception mit
+  ``raise_on_failure=True``
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from backend.agents.veritas_blob_store import KeyedBlobStore
+from backend.agents.veritas_ollama_transport import OllamaTransport, get_ollama_transport
+from native_ollama_integration import (
+    DEFAULT_EMBEDDING_DIMENSION,
+    DEFAULT_OLLAMA_HOST,
+    OllamaConnectionError,
+    _fallback_embedding,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmbeddingServiceConfig:
+    """Konfiguration für den Embedding-Service"""
+
+    # Ollama
+    base_url: str = DEFAULT_OLLAMA_HOST
+    model: str = "nomic-embed-text"
+    timeout: float = 60.0
+    max_retries: int = 2
+
+    # Batching & Parallelität
+    batch_size: int = 64  # Texte je /api/embed-Request
+    max_concurrency: int = 4  # Gleichzeitige Batch-Requests
+
+    # Persistenter Cache
+    enable_cache: bool = True
+    cache_path: Optional[str] = field(
+        default_factory=lambda: os.getenv("VERITAS_EMBEDDING_CACHE_PATH")
+    )  # SQLite-Datei (None: nur In-Memory)
+    cache_max_rows: Optional[int] = None  # Max. Anzahl Vektoren (None: unbegrenzt)
+
+    # Fallback
+    dimension: int = DEFAULT_EMBEDDING_DIMENSION  # Dimension der Platzhalter-Vektoren
+    raise_on_failure: bool = False
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 des Textes (Cache-Schlüssel, unabhängig von Chunk-IDs)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistenter Embedding-Cache: (Modell, Content-Hash) → float32-Vektor.
+
+    Dünne Schicht über ``KeyedBlobStore``: Vektoren liegen als Roh-BLOB
+    (``ndarray.tobytes()``) in SQLite und werden per ``np.frombuffer`` ohne
+    Umweg über Python-Floats gelesen.
+    Thread-sicher; der Service ruft ihn über ``asyncio.to_thread`` auf.
+    """
+
+    TABLE = "embedding_blobs"
+
+    def __init__(self, path: Optional[str] = None, max_rows: Optional[int] = None):
+        """
+        Args:
+            path: SQLite-Datei (None: In-Memory-Datenbank)
+            max_rows: Max. Anzahl Vektoren (None: unbegrenzt), älteste zuerst verdrängt
+        """
+        self._store = KeyedBlobStore(path, table=self.TABLE, max_rows=max_rows)
+        self.path = self._store.path
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Liefert alle gecachten Vektoren für ``hashes`` (fehlende fehlen im Dict)."""
+        return {
+            digest: np.frombuffer(blob, dtype=np.float32)
+            for digest, blob in self._store.get_many(model, list(hashes)).items()
+            if blob and len(blob) % 4 == 0
+        }
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        """Speichert Vektoren (überschreibt vorhandene Einträge)."""
+        self._store.put_many(model, {
+            digest: np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+            for digest, vector in vectors.items()
+        })
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def clear(self, model: Optional[str] = None) -> int:
+        """Löscht Einträge (alle oder eines Modells). Returns: Anzahl."""
+        return self._store.clear(model)
+
+    def close(self) -> None:
+        self._store.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._store.get_stats()
+
+
+class AsyncEmbeddingService:
+    """
+    Gebatchter, paralleler Embedding-Client mit Content-Hash-Cache.
+
+    Beispiel:
+    --------
+    service = AsyncEmbeddingService(EmbeddingServiceConfig(cache_path="data/embeddings.sqlite"))
+    matrix = await service.embed_documents(chunks)   # np.ndarray (n, dim), float32
+    query_vec = await service.embed_query("Bauantrag Frist")
+    """
+
+    def __init__(
+        self,
+        config: Optional[EmbeddingServiceConfig] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        transport: Optional[OllamaTransport] = None
+    ):
+        """
+        Args:
+            config: Service-Konfiguration
+            client: Optionaler eigener HTTP-Client (statt des gemeinsamen Pools)
+            transport: Gemeinsamer Ollama-Transport (Default: prozessweiter Pool)
+        """
+        self.config = config or EmbeddingServiceConfig()
+        self.base_url = self.config.base_url.rstrip("/")
+
+        self.transport = transport or get_ollama_transport(self.base_url)
+        self._client_override = client
+        self._semaphore = asyncio.Semaphore(max(1, self.config.max_concurrency))
+        self._batch_endpoint_supported = True
+        self._dimension: Optional[int] = None  # Tatsächliche Dimension des Modells
+
+        self.cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(self.config.cache_path, max_rows=self.config.cache_max_rows)
+            if self.config.enable_cache else None
+        )
+
+        self.stats = {
+            "texts_requested": 0,
+            "texts_embedded": 0,
+            "cache_hits": 0,
+            "batch_requests": 0,
+            "legacy_requests": 0,
+            "fallback_vectors": 0,
+            "total_time": 0.0,
+        }
+
+        logger.info(
+            f"🧮 EmbeddingService initialisiert: model={self.config.model}, "
+            f"batch_size={self.config.batch_size}, concurrency={self.config.max_concurrency}, "
+            f"cache={self.cache.path if self.cache else 'aus'}"
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client_override or self.transport.client
+
+    async def close(self) -> None:
+        """Schließt einen eigenen HTTP-Client und den Cache (der gemeinsame Pool bleibt offen)."""
+        if self._client_override is not None:
+            await self._client_override.aclose()
+        if self.cache is not None:
+            self.cache.close()
+
+    # ------------------------------------------------------------------
+    # Öffentliche API
+    # ------------------------------------------------------------------
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """Embedding eines einzelnen Textes (Shape ``(dim,)``)."""
+        return (await self.embed_documents([text]))[0]
+
+    async def embed_documents(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embeddings für mehrere Texte.
+
+        Identische Texte werden nur einmal angefragt, gecachte Texte gar nicht.
+
+        Returns:
+            float32-Array der Shape ``(len(texts), dim)``
+        """
+        start = time.time()
+        texts = list(texts)
+        self.stats["texts_requested"] += len(texts)
+        if not texts:
+            return np.zeros((0, self._dimension or self.config.dimension), dtype=np.float32)
+
+        # Deduplizieren (Reihenfolge der ersten Vorkommen)
+        hashes = [content_hash(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            unique.setdefault(digest, text)
+
+        vectors: Dict[str, np.ndarray] = {}
+        if self.cache is not None:
+            vectors = await asyncio.to_thread(self.cache.get_many, self.config.model, list(unique))
+            self.stats["cache_hits"] += len(vectors)
+
+        missing = [digest for digest in unique if digest not in vectors]
+        if missing:
+            computed = await self._embed_missing([unique[digest] for digest in missing])
+            fresh = {digest: vector for digest, vector in zip(missing, computed) if vector is not None}
+            if self.cache is not None and fresh:
+                await asyncio.to_thread(self.cache.put_many, self.config.model, fresh)
+            vectors.update(fresh)
+
+        if vectors:
+            self._dimension = next(iter(vectors.values())).shape[-1]
+
+        if missing:
+            # Platzhalter für fehlgeschlagene Texte (nicht gecacht) in der Dimension
+            # der echten Vektoren - config.dimension nur, solange keine bekannt ist
+            dimension = self._dimension or self.config.dimension
+            for digest, vector in zip(missing, computed):
+                if vector is None:
+                    vectors[digest] = np.asarray(
+                        _fallback_embedding(unique[digest], dimension), dtype=np.float32
+                    )
+                    self.stats["fallback_vectors"] += 1
+
+        result = np.stack([vectors[digest] for digest in hashes]).astype(np.float32, copy=False)
+        self.stats["total_time"] += time.time() - start
+        return result
+
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+
+    async def _embed_missing(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Verteilt Texte auf Batches und führt sie parallel (begrenzt) aus."""
+        size = max(1, self.config.batch_size)
+        batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+        results = await asyncio.gather(*(self._embed_batch_guarded(batch) for batch in batches))
+        return [vector for batch in results for vector in batch]
+
+    async def _embed_batch_guarded(self, batch: List[str]) -> List[Optional[np.ndarray]]:
+        async with self._semaphore:
+            last_error: Optional[Exception] = None
+            for attempt in range(max(1, self.config.max_retries)):
+                try:
+                    if self._batch_endpoint_supported:
+                        vectors = await self._request_batch(batch)
+                    else:
+                        vectors = await self._request_legacy(batch)
+                    self.stats["texts_embedded"] += len(vectors)
+                    return vectors
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"⚠️ Embedding-Batch fehlgeschlagen (Versuch {attempt + 1}): {e}")
+                    if attempt + 1 < self.config.max_retries:
+                        await asyncio.sleep(0.5 * 2 ** attempt)
+
+            if len(batch) > 1:
+                # Ein fehlerhafter Text soll nicht den ganzen Batch kosten
+                return await self._embed_each(batch)
+
+        if self.config.raise_on_failure:
+            raise OllamaConnectionError(str(last_error)) from last_error
+        return [None] * len(batch)
+
+    async def _embed_each(self, batch: List[str]) -> List[Optional[np.ndarray]]:
+        """Einzel-Requests nach fehlgeschlagenem Batch (Slot der Semaphore gehalten)."""
+        vectors: List[Optional[np.ndarray]] = []
+        for text in batch:
+            try:
+                if self._batch_endpoint_supported:
+                    vector = (await self._request_batch([text]))[0]
+                else:
+                    vector = (await self._request_legacy([text]))[0]
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding für Einzeltext fehlgeschlagen: {e}")
+                if self.config.raise_on_failure:
+                    raise OllamaConnectionError(str(e)) from e
+                vector = None
+            else:
+                self.stats["texts_embedded"] += 1
+            vectors.append(vector)
+        return vectors
+
+    async def _request_batch(self, batch: List[str]) -> List[np.ndarray]:
+        """Ein Request an ``/api/embed`` für den ganzen Batch."""
+        async with self.transport.slot(self.config.model, "/api/embed"):
+            response = await self.client.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.config.model, "input": batch},
+                timeout=self.config.timeout,
+            )
+        if response.status_code == 404 and "model" not in response.text.lower():
+            # Ollama < 0.3: kein Batch-Endpoint
+            logger.info("ℹ️ /api/embed nicht verfügbar - nutze /api/embeddings je Text")
+            self._batch_endpoint_supported = False
+            return await self._request_legacy(batch)
+        response.raise_for_status()
+        self.stats["batch_requests"] += 1
+
+        embeddings = response.json().get("embeddings")
+        if not isinstance(embeddings, list) or len(embeddings) != len(batch):
+            raise ValueError("embeddings fehlen oder passen nicht zum Batch")
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        return list(matrix)
+
+    async def _request_legacy(self, batch: List[str]) -> List[np.ndarray]:
+        """Fallback: ``/api/embeddings`` je Text (über denselben Verbindungs-Pool)."""
+        vectors = []
+        for text in batch:
+            async with self.transport.slot(self.config.model, "/api/embeddings"):
+                response = await self.client.post(
+                    f"{self.base_url}/api/embeddings",
+                    json={"model": self.config.model, "prompt": text},
+                    timeout=self.config.timeout,
+                )
+            response.raise_for_status()
+            self.stats["legacy_requests"] += 1
+            vector = response.json().get("embedding")
+            if not isinstance(vector, list):
+                raise ValueError("embedding fehlt")
+            vectors.append(np.asarray(vector, dtype=np.float32))
+        return vectors
+
+    # ------------------------------------------------------------------
+    # Statistiken
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Service-Statistiken zurück."""
+        stats = {
+            **self.stats,
+            "model": self.config.model,
+            "batch_endpoint": self._batch_endpoint_supported,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+
+# ============================================================================
+# Singleton
+# ============================================================================
+
+_global_embedding_service: Optional[AsyncEmbeddingService] = None
+
+
+def get_embedding_service(config: Optional[EmbeddingServiceConfig] = None) -> AsyncEmbeddingService:
+    """Liefert die globale AsyncEmbeddingService-Instanz."""
+    global _global_embedding_service
+    if _global_embedding_service is None:
+        _global_embedding_service = AsyncEmbeddingService(config)
+    return _global_embedding_service
@@ -36,7 +36,7 @@ import asyncio
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +100,11 @@ class HybridRetrievalConfig:
     expansion_strategies: List[str] = field(
         default_factory=lambda: ["synonym", "context"]
     )
+    expansion_latency_budget_ms: Optional[float] = 1500.0  # Deadline für Varianten (None: keine)
+    
+    # Pipelined Re-Ranking (benötigt reranker)
+    enable_pipelined_rerank: bool = False  # Cross-Encoder startet nach dem ersten Retriever
+    rerank_candidates: Optional[int] = None  # Kandidaten je Pipeline-Schritt (None: top_k)
     
     # Fallback-Verhalten
     fallback_to_dense: bool = True  # Fallback auf Dense wenn Sparse fehlt
@@ -164,7 +169,8 @@ class HybridRetriever:
         self,
         dense_retriever: Any,  # UDS3 Strategy oder andere Dense-Retriever
         sparse_retriever: Optional[SparseRetriever] = None,
-        config: Optional[HybridRetrievalConfig] = None
+        config: Optional[HybridRetrievalConfig] = None,
+        reranker: Optional[Any] = None  # ReRankingService für pipelined Modus
     ):
         """
         Initialisiert Hybrid Retriever.
@@ -173,10 +179,13 @@ class HybridRetriever:
             dense_retriever: Dense Retrieval Backend (z.B. UDS3)
             sparse_retriever: BM25 Sparse Retriever (optional)
             config: Hybrid-Konfiguration (optional)
+            reranker: Cross-Encoder (``ReRankingService``) für den pipelined
+                      Modus (``config.enable_pipelined_rerank``)
         """
         self.dense_retriever = dense_retriever
         self.sparse_retriever = sparse_retriever or get_sparse_retriever()
         self.config = config or HybridRetrievalConfig()
+        self.reranker = reranker
         
         # RRF mit Weights
         rrf_config = RRFConfig(
@@ -240,7 +249,8 @@ class HybridRetriever:
                 
                 expansion_config = QueryExpansionConfig(
                     num_expansions=self.config.num_query_expansions,
-                    strategies=strategies
+                    strategies=strategies,
+                    latency_budget_ms=self.config.expansion_latency_budget_ms
                 )
                 
                 self.query_expander = get_query_expander(expansion_config)
@@ -256,7 +266,8 @@ class HybridRetriever:
         enable_sparse: Optional[bool] = None,
         enable_query_expansion: Optional[bool] = None,
         dense_params: Optional[Dict[str, Any]] = None,
-        sparse_params: Optional[Dict[str, Any]] = None
+        sparse_params: Optional[Dict[str, Any]] = None,
+        pipelined: Optional[bool] = None
     ) -> List[HybridResult]:
         """
         Hybrid Retrieval: Dense + Sparse + RRF-Fusion + Query Expansion.
@@ -268,31 +279,51 @@ class HybridRetriever:
             enable_query_expansion: Query Expansion aktivieren (override config)
             dense_params: Parameter für Dense Retrieval (optional)
             sparse_params: Parameter für Sparse Retrieval (optional)
+            pipelined: Pipelined Re-Ranking (override config.enable_pipelined_rerank)
             
         Returns:
             Liste der Top-K Hybrid-Results, sortiert nach RRF-Score
+            (pipelined: nach Cross-Encoder-Score, siehe ``_retrieve_pipelined``)
         """
         top_k = top_k or self.config.final_top_k
         enable_sparse = enable_sparse if enable_sparse is not None else self.config.enable_sparse
         enable_query_expansion = enable_query_expansion if enable_query_expansion is not None else self.config.enable_query_expansion
+        pipelined = pipelined if pipelined is not None else self.config.enable_pipelined_rerank
+        
+        if pipelined:
+            if self.reranker is not None and self.reranker.is_available():
+                return await self._retrieve_pipelined(
+                    query, top_k, enable_sparse, enable_query_expansion,
+                    dense_params, sparse_params
+                )
+            logger.debug("⚠️ Pipelined Re-Ranking ohne verfügbaren Reranker - Standard-Modus")
         
         start_time = time.time()
         
-        # === QUERY EXPANSION (Optional) ===
+        # === MULTI-QUERY RETRIEVAL ===
+        # Retrieval der Original-Query startet sofort; Varianten der Query
+        # Expansion werden nachgezogen, sobald sie eintreffen (Varianten nach
+        # Ablauf des Latenz-Budgets verwirft der QueryExpander)
         queries_to_search = [query]  # Original Query
+        retrieval_tasks = [
+            asyncio.create_task(
+                self._retrieve_for_query(query, enable_sparse, dense_params, sparse_params)
+            )
+        ]
         query_expansion_applied = False
         
         if enable_query_expansion and self._query_expansion_available:
             try:
-                expanded = await self.query_expander.expand(
+                async for eq in self.query_expander.expand_iter(
                     query,
                     num_expansions=self.config.num_query_expansions
-                )
-                
-                # Füge expandierte Queries hinzu (ohne Original-Duplikat)
-                for eq in expanded:
+                ):
+                    # Füge expandierte Queries hinzu (ohne Original-Duplikat)
                     if eq.text != query and eq.text not in queries_to_search:
                         queries_to_search.append(eq.text)
+                        retrieval_tasks.append(asyncio.create_task(
+                            self._retrieve_for_query(eq.text, enable_sparse, dense_params, sparse_params)
+                        ))
                 
                 query_expansion_applied = len(queries_to_search) > 1
                 
@@ -301,45 +332,18 @@ class HybridRetriever:
                         f"🔍 Query Expansion: '{query[:50]}...' → {len(queries_to_search)} Varianten"
                     )
                 
+            except asyncio.CancelledError:
+                for task in retrieval_tasks:
+                    task.cancel()
+                raise
             except Exception as e:
                 logger.warning(f"⚠️ Query Expansion fehlgeschlagen: {e}")
         
-        # === MULTI-QUERY RETRIEVAL ===
-        # Für jede Query: Dense + Sparse Retrieval
         all_dense_results = []
         all_sparse_results = []
-        
-        for q in queries_to_search:
-            # Parallel Retrieval: Dense + Sparse
-            tasks = []
-            
-            # Dense Retrieval (immer)
-            dense_task = self._retrieve_dense(q, dense_params or {})
-            tasks.append(dense_task)
-            
-            # Sparse Retrieval (optional)
-            if enable_sparse and self._sparse_available:
-                sparse_task = self._retrieve_sparse(q, sparse_params or {})
-                tasks.append(sparse_task)
-            
-            # Parallel ausführen
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Extract Dense Results
-            dense_results = results[0] if not isinstance(results[0], Exception) else []
-            if isinstance(results[0], Exception):
-                logger.error(f"❌ Dense Retrieval fehler für '{q[:30]}...': {results[0]}")
-                dense_results = []
-            
+        for dense_results, sparse_results in await asyncio.gather(*retrieval_tasks):
             all_dense_results.extend(dense_results)
-            
-            # Extract Sparse Results (wenn vorhanden)
-            if len(results) > 1:
-                sparse_results = results[1] if not isinstance(results[1], Exception) else []
-                if isinstance(results[1], Exception):
-                    logger.warning(f"⚠️ Sparse Retrieval fehler für '{q[:30]}...': {results[1]}")
-                else:
-                    all_sparse_results.extend(sparse_results)
+            all_sparse_results.extend(sparse_results)
         
         # RRF-Fusion oder Fallback
         if all_sparse_results and self.config.enable_fusion:
@@ -373,6 +377,220 @@ class HybridRetriever:
         
         return hybrid_results
     
+    async def _retrieve_pipelined(
+        self,
+        query: str,
+        top_k: int,
+        enable_sparse: bool,
+        enable_query_expansion: bool,
+        dense_params: Optional[Dict[str, Any]],
+        sparse_params: Optional[Dict[str, Any]]
+    ) -> List[HybridResult]:
+        """
+        Spekulative Pipeline: Retrieval, RRF-Fusion und Re-Ranking überlappen.
+        
+        Jede Result-Liste (Dense/Sparse je Query-Variante) wird beim Eintreffen
+        in eine inkrementelle RRF-Fusion übernommen. Der Cross-Encoder bewertet
+        sofort die aktuellen Top-Kandidaten, die noch keinen Score haben -
+        bereits bewertete Dokumente werden nicht erneut gescored. Kandidaten,
+        die durch spätere Listen aus den Top-K fallen, sind verworfene Arbeit.
+        
+        Ergebnis: finales RRF-Top-K, sortiert nach Cross-Encoder-Score
+        (``metadata["rerank_score"]``); Stufen-Timings in ``metadata["timings"]``.
+        """
+        start = time.perf_counter()
+        
+        def elapsed_ms() -> float:
+            return (time.perf_counter() - start) * 1000
+        
+        timings: Dict[str, Any] = {"mode": "pipelined"}
+        fusion = self.rrf.incremental()
+        fusion_ms = 0.0
+        candidates_k = self.config.rerank_candidates or top_k
+        use_sparse = enable_sparse and self._sparse_available
+        
+        events: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+        queries = [query]
+        outstanding = 0  # Noch ausstehende Result-Listen (+ Expansion)
+        
+        async def run_retriever(source: str, q: str, coro) -> None:
+            try:
+                results = await coro
+            except Exception as e:
+                logger.warning(f"⚠️ {source.capitalize()} Retrieval fehler für '{q[:30]}...': {e}")
+                results = []
+            events.put_nowait((source, results))
+        
+        def launch(q: str) -> None:
+            nonlocal outstanding
+            tasks.append(asyncio.create_task(
+                run_retriever("dense", q, self._retrieve_dense(q, dense_params or {}))
+            ))
+            outstanding += 1
+            if use_sparse:
+                tasks.append(asyncio.create_task(
+                    run_retriever("sparse", q, self._retrieve_sparse(q, sparse_params or {}))
+                ))
+                outstanding += 1
+        
+        async def run_expansion() -> None:
+            try:
+                async for eq in self.query_expander.expand_iter(
+                    query,
+                    num_expansions=self.config.num_query_expansions
+                ):
+                    if eq.text not in queries:
+                        queries.append(eq.text)
+                        launch(eq.text)
+            except Exception as e:
+                logger.warning(f"⚠️ Query Expansion fehlgeschlagen: {e}")
+            finally:
+                events.put_nowait(("expansion", None))
+        
+        # Cross-Encoder-Scores je doc_id; scheduled = bewertet oder in Arbeit
+        rerank_scores: Dict[str, float] = {}
+        scheduled: set = set()
+        rerank_tasks: List[asyncio.Task] = []
+        rerank_ms = 0.0
+        rerank_skipped = 0
+        
+        async def score(docs: List[FusedDocument]) -> None:
+            nonlocal rerank_ms
+            scoring_start = time.perf_counter()
+            try:
+                scores = await self.reranker.score_documents(
+                    query,
+                    [
+                        {"id": doc.doc_id, "content": doc.content, "title": (doc.metadata or {}).get("title")}
+                        for doc in docs
+                    ]
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Pipelined Re-Ranking fehlgeschlagen: {e}")
+                return
+            finally:
+                rerank_ms += (time.perf_counter() - scoring_start) * 1000
+            for doc, value in zip(docs, scores):
+                rerank_scores[doc.doc_id] = float(value)
+        
+        def schedule(candidates: List[FusedDocument]) -> None:
+            nonlocal rerank_skipped
+            unscored = [doc for doc in candidates if doc.doc_id not in scheduled]
+            rerank_skipped += len(candidates) - len(unscored)
+            if not unscored:
+                return
+            scheduled.update(doc.doc_id for doc in unscored)
+            if "first_rerank_ms" not in timings:
+                timings["first_rerank_ms"] = elapsed_ms()
+            rerank_tasks.append(asyncio.create_task(score(unscored)))
+        
+        launch(query)
+        if enable_query_expansion and self._query_expansion_available:
+            tasks.append(asyncio.create_task(run_expansion()))
+            outstanding += 1
+        
+        counts = {"dense": 0, "sparse": 0}
+        try:
+            while outstanding:
+                source, results = await events.get()
+                outstanding -= 1
+                if source == "expansion":
+                    timings["expansion_ms"] = elapsed_ms()
+                    continue
+                
+                timings[f"{source}_ms"] = elapsed_ms()  # Letzte Liste der Quelle
+                counts[source] += len(results)
+                if not results:
+                    continue
+                
+                fusion_start = time.perf_counter()
+                fusion.add(source, results)
+                candidates = fusion.ranking(candidates_k)
+                fusion_ms += (time.perf_counter() - fusion_start) * 1000
+                
+                timings.setdefault("first_candidates_ms", elapsed_ms())
+                schedule(candidates)
+            
+            retrieval_done = elapsed_ms()
+            
+            # Finales Ranking: nur Dokumente ohne Score nachbewerten
+            fusion_start = time.perf_counter()
+            fused_docs = fusion.ranking(top_k)
+            fusion_ms += (time.perf_counter() - fusion_start) * 1000
+            schedule(fused_docs)
+            
+            await asyncio.gather(*rerank_tasks)
+        except asyncio.CancelledError:
+            for task in tasks + rerank_tasks:
+                task.cancel()
+            raise
+        
+        hybrid_results = self._convert_fused_to_hybrid(fused_docs)
+        if not counts["sparse"]:
+            for result in hybrid_results:
+                result.retrieval_method = "dense_only"
+        
+        # Nach Cross-Encoder-Score sortieren (ohne Score: RRF-Reihenfolge dahinter)
+        hybrid_results.sort(
+            key=lambda r: (r.doc_id in rerank_scores, rerank_scores.get(r.doc_id, 0.0)),
+            reverse=True
+        )
+        
+        timings.update({
+            "fusion_ms": fusion_ms,
+            "rerank_ms": rerank_ms,  # Summe der Cross-Encoder-Laufzeiten
+            "rerank_tail_ms": elapsed_ms() - retrieval_done,  # Re-Ranking nach letztem Retriever
+            "total_ms": elapsed_ms(),
+            "queries": len(queries),
+            "dense_results": counts["dense"],
+            "sparse_results": counts["sparse"],
+            "rerank_scored": len(rerank_scores),
+            "rerank_skipped": rerank_skipped,
+            "rerank_wasted": len(set(rerank_scores) - {doc.doc_id for doc in fused_docs}),
+        })
+        
+        for result in hybrid_results:
+            result.metadata = {**(result.metadata or {}), "timings": timings}
+            if result.doc_id in rerank_scores:
+                result.metadata["rerank_score"] = rerank_scores[result.doc_id]
+        
+        logger.debug(
+            f"🔍 Pipelined Hybrid Retrieval: {len(hybrid_results)} Docs in {timings['total_ms']:.1f}ms "
+            f"(Re-Ranking nach Retrieval: {timings['rerank_tail_ms']:.1f}ms, "
+            f"{len(rerank_scores)} gescored, {rerank_skipped} übersprungen)"
+        )
+        
+        return hybrid_results
+    
+    async def _retrieve_for_query(
+        self,
+        query: str,
+        enable_sparse: bool,
+        dense_params: Optional[Dict[str, Any]],
+        sparse_params: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Dense + Sparse Retrieval (parallel) für eine Query-Variante."""
+        tasks = [self._retrieve_dense(query, dense_params or {})]
+        if enable_sparse and self._sparse_available:
+            tasks.append(self._retrieve_sparse(query, sparse_params or {}))
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        dense_results = results[0]
+        if isinstance(dense_results, Exception):
+            logger.error(f"❌ Dense Retrieval fehler für '{query[:30]}...': {dense_results}")
+            dense_results = []
+        
+        sparse_results = []
+        if len(results) > 1:
+            if isinstance(results[1], Exception):
+                logger.warning(f"⚠️ Sparse Retrieval fehler für '{query[:30]}...': {results[1]}")
+            else:
+                sparse_results = results[1]
+        
+        return dense_results, sparse_results
+    
     async def _retrieve_dense(
         self,
         query: str,
@@ -543,7 +761,8 @@ class HybridRetriever:
 def create_hybrid_retriever(
     dense_retriever: Any,
     corpus: Optional[List[Dict[str, Any]]] = None,
-    config: Optional[HybridRetrievalConfig] = None
+    config: Optional[HybridRetrievalConfig] = None,
+    reranker: Optional[Any] = None
 ) -> HybridRetriever:
     """
     Erstellt HybridRetriever mit optionaler Corpus-Indexierung.
@@ -552,6 +771,9 @@ def create_hybrid_retriever(
         dense_retriever: Dense Retrieval Backend
         corpus: Dokumente für BM25-Indexierung (optional)
         config: Hybrid-Konfiguration (optional)
+        reranker: Cross-Encoder für den pipelined Modus; bei
+                  ``config.enable_pipelined_rerank`` ohne reranker wird der
+                  globale ``ReRankingService`` verwendet
         
     Returns:
         HybridRetriever-Instanz
@@ -562,8 +784,16 @@ def create_hybrid_retriever(
     if corpus and sparse_retriever.is_available():
         sparse_retriever.index_documents(corpus)
     
+    if reranker is None and config is not None and config.enable_pipelined_rerank:
+        try:
+            from backend.agents.veritas_reranking_service import get_reranking_service
+            reranker = get_reranking_service()
+        except ImportError as e:
+            logger.warning(f"⚠️ Pipelined Re-Ranking ohne Re-Ranking-Service: {e}")
+    
     return HybridRetriever(
         dense_retriever=dense_retriever,
         sparse_retriever=sparse_retriever,
-        config=config
+        config=config,
+        reranker=reranker
     )
@@ -29,10 +29,9 @@ import queue
 import threading
 import copy
 from collections import Counter, deque
-from typing import Dict, List, Any, Optional, AsyncGenerator, Tuple
+from typing import Dict, List, Any, Optional, AsyncGenerator, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 # Sicherstellen, dass das Projekt-Root im Python-Pfad liegt
@@ -43,6 +42,9 @@ if REPO_ROOT not in sys.path:
 # VERITAS Shared Enums
 from backend.agents.veritas_shared_enums import QueryComplexity, QueryDomain, QueryStatus, PipelineStage
 from backend.agents.rag_context_service import RAGContextService, RAGQueryOptions
+from backend.agents.veritas_uds3_coalescer import UDS3SearchCoalescer
+from backend.agents.veritas_agent_scheduler import AgentScheduler, SchedulerSaturatedError, get_agent_scheduler
+from backend.agents.veritas_deadline_scheduler import DeadlinePlanner, order_by_priority, run_until_deadline
 
 # VERITAS Imports
 try:
@@ -132,6 +134,7 @@ class IntelligentPipelineRequest:
     max_parallel_agents: int = 5
     timeout: int = 60
     metadata: Dict[str, Any] = field(default_factory=dict)
+    deadline: Optional[float] = None  # Absolute Deadline (time.monotonic), default: Start + timeout
 
 @dataclass
 class IntelligentPipelineResponse:
@@ -179,6 +182,8 @@ class AgentExecutionTask:
     planned_order: int
     metadata: Dict[str, Any] = field(default_factory=dict)
     disabled: bool = False
+    deadline: Optional[float] = None  # Absolute Deadline der Agent-Ausführung (time.monotonic)
+    budget: Optional[float] = None  # Zugeteiltes Zeitbudget in Sekunden
 
 # ============================================================================
 # INTELLIGENT MULTI-AGENT PIPELINE
@@ -209,7 +214,8 @@ class IntelligentMultiAgentPipeline:
         Initialisiert die Intelligent Multi-Agent Pipeline
         
         Args:
-            max_workers: Maximale Anzahl paralleler Agent-Threads
+            max_workers: Maximale Anzahl paralleler Agenten je Request (falls
+                         der Request kein ``max_parallel_agents`` angibt)
         """
         self.max_workers = max_workers
         
@@ -232,14 +238,19 @@ class IntelligentMultiAgentPipeline:
         self.intent_classifier = None  # Wird in initialize() geladen
         self.context_window_manager = None  # Wird in initialize() geladen
         
-        # Threading
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Agent-Ausführung: prozessweiter Scheduler (gemeinsamer Thread-Pool,
+        # Limits je Agent-Typ, faire Queue, Admission Control)
+        self.agent_scheduler: AgentScheduler = get_agent_scheduler()
+        # Deadline-Budgets aus historischen Agent-Latenzen
+        self.deadline_planner = DeadlinePlanner()
         self.agent_task_queue: "queue.Queue[AgentExecutionTask]" = queue.Queue()
         self._agent_results_lock = threading.RLock()
         
         # Active Pipelines
         self.active_pipelines: Dict[str, IntelligentPipelineRequest] = {}
         self.pipeline_steps: Dict[str, List[PipelineStep]] = {}
+        # Request-scoped UDS3-Suchen (Single-Flight + Memoization je Lauf)
+        self.uds3_searches: Dict[str, UDS3SearchCoalescer] = {}
         
         # Statistics
         self.stats = {
@@ -256,6 +267,7 @@ class IntelligentMultiAgentPipeline:
             'orchestrator_usage': 0,
             'supervisor_usage': 0,  # 🆕 Supervisor-Statistik
             'agent_registry_usage': 0,  # 🆕 Agent Registry-Statistik
+            'uds3_search': {'calls': 0, 'executed': 0, 'dedup_ratio': 0.0},
             'stage_duration_stats': {},
             'agent_metrics': {},
             'query_metrics': {
@@ -406,10 +418,7 @@ class IntelligentMultiAgentPipeline:
             bool: True wenn erfolgreich
         """
         try:
-            # ThreadPool für diesen Request erstellen
-            if not self.executor:
-                self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
-                logger.info(f"✅ ThreadPool erstellt ({self.max_workers} workers)")
+            # Agent-Threads kommen aus dem prozessweiten Scheduler (kein Pool je Request)
             
             # RAG Context Service (falls RAG enabled)
             if enable_rag and self.uds3_strategy:
@@ -446,17 +455,13 @@ class IntelligentMultiAgentPipeline:
         um Ressourcen freizugeben und Memory-Leaks zu vermeiden.
         
         Cleanup umfasst:
-        - ThreadPool shutdown
         - State clearing
         - Temporary data cleanup
+        
+        Der Thread-Pool gehört dem prozessweiten Agent-Scheduler und wird
+        hier nicht beendet.
         """
         try:
-            # ThreadPool beenden
-            if self.executor:
-                self.executor.shutdown(wait=False)
-                self.executor = None
-                logger.info("✅ ThreadPool beendet")
-            
             # State clearen
             self.active_pipelines.clear()
             self.pipeline_steps.clear()
@@ -479,13 +484,25 @@ class IntelligentMultiAgentPipeline:
             
         Returns:
             IntelligentPipelineResponse: Umfassende Pipeline-Response
+            
+        Raises:
+            SchedulerSaturatedError: Agent-Scheduler ausgelastet (→ HTTP 429)
         """
         start_time = time.time()
         request.session_id = request.session_id or str(uuid.uuid4())
+        if request.deadline is None:
+            request.deadline = self.deadline_planner.request_deadline(request.timeout or 60)
+        
+        # Admission Control: wartet auf einen freien Slot oder löst 429 aus
+        await self.agent_scheduler.acquire_request(
+            request.query_id,
+            max_parallel=request.max_parallel_agents or self.max_workers
+        )
         
         # Pipeline in aktive Liste aufnehmen
         self.active_pipelines[request.query_id] = request
         self.pipeline_steps[request.query_id] = []
+        self.uds3_searches[request.query_id] = UDS3SearchCoalescer(self.uds3_strategy)
         self._start_progress_session(request)
         
         try:
@@ -567,7 +584,9 @@ class IntelligentMultiAgentPipeline:
                         agent_count=0,  # Wird nach Agent-Selection aktualisiert
                         intent=intent_prediction.intent,
                         confidence=None,
-                        user_preference=getattr(request, 'user_preference', 1.0)
+                        user_preference=getattr(request, 'user_preference', 1.0),
+                        rag_chunks=rag_result.get("documents", []),
+                        tokenizer=self._request_tokenizer(request)
                     )
                     
                     logger.info(f"💰 Token budget updated after RAG: {updated_budget} tokens "
@@ -605,7 +624,9 @@ class IntelligentMultiAgentPipeline:
                         agent_count=agent_count,
                         intent=intent_prediction.intent,
                         confidence=None,
-                        user_preference=getattr(request, 'user_preference', 1.0)
+                        user_preference=getattr(request, 'user_preference', 1.0),
+                        rag_chunks=rag_result.get("documents", []) if rag_result else None,
+                        tokenizer=self._request_tokenizer(request)
                     )
                     
                     logger.info(f"💰 Final token budget: {final_budget} tokens "
@@ -635,6 +656,7 @@ class IntelligentMultiAgentPipeline:
                 for step in self.pipeline_steps.get(request.query_id, [])
                 if step.start_time and step.end_time
             }
+            uds3_search_stats = self.uds3_searches[request.query_id].get_stats()
             
             # Pipeline erfolgreich abgeschlossen
             processing_time = time.time() - start_time
@@ -678,6 +700,7 @@ class IntelligentMultiAgentPipeline:
                     'agent_confidence_summary': final_result.get('agent_consensus', {}).get('confidence', {}),
                     'combined_confidence': final_result.get('agent_consensus', {}).get('blended_confidence'),
                     'stage_durations': stage_durations,
+                    'uds3_search': uds3_search_stats,
                     'progress_session_id': request.session_id,
                     # 🆕 Token Budget Metadata
                     'token_budget': {
@@ -705,6 +728,8 @@ class IntelligentMultiAgentPipeline:
             
             return response
             
+        except SchedulerSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"❌ Pipeline-Verarbeitung fehlgeschlagen: {e}")
             self._record_pipeline_error(request, e)
@@ -724,11 +749,20 @@ class IntelligentMultiAgentPipeline:
             # ✅ CLEANUP: Request-scoped Ressourcen freigeben
             if request.query_id in self.active_pipelines:
                 del self.active_pipelines[request.query_id]
+            self.uds3_searches.pop(request.query_id, None)
+            self.agent_scheduler.release_request(request.query_id)
             
             # Optional: Vollständiger Cleanup (wenn Factory-Pattern genutzt wird)
             # Wird auskommentiert, bis Factory-Pattern aktiviert ist
             # await self.cleanup()
     
+    def _request_tokenizer(self, request: IntelligentPipelineRequest) -> Optional[str]:
+        """Tokenizer-Spezifikation des Synthese-Modells (für exakte Token-Counts)"""
+        if not self.context_window_manager:
+            return None
+        model_name = getattr(request, 'model_name', 'llama3.1:8b')
+        return self.context_window_manager.get_model_spec(model_name).tokenizer
+    
     async def _execute_pipeline_step(self,
                                    request: IntelligentPipelineRequest,
                                    step_id: str,
@@ -1291,6 +1325,10 @@ class IntelligentMultiAgentPipeline:
         if not sequential_plan:
             sequential_plan = [agent for agent in ordered_agents if agent not in parallel_plan]
 
+        # Eine Deadline für alle Agenten (Reserve für Aggregation/LLM bleibt frei)
+        request_deadline = request.deadline or self.deadline_planner.request_deadline(request.timeout or 60)
+        agent_deadline = self.deadline_planner.agent_deadline(request_deadline, request.timeout or 60)
+
         # Tasks vorbereiten und in Queue legen
         agent_tasks: List[AgentExecutionTask] = []
         for order_index, agent_type in enumerate(ordered_agents):
@@ -1305,7 +1343,8 @@ class IntelligentMultiAgentPipeline:
                         "requested_by": "orchestrator" if agent_type in (parallel_plan + sequential_plan) else "pipeline",
                         "disabled": agent_type in disabled_tasks
                     },
-                    disabled=agent_type in disabled_tasks
+                    disabled=agent_type in disabled_tasks,
+                    deadline=agent_deadline
                 )
             )
 
@@ -1325,12 +1364,15 @@ class IntelligentMultiAgentPipeline:
         skipped_count = 0
         failed_count = 0
         timeout_count = 0
+        deadline_skipped = 0
 
         for task_output in parallel_outputs + sequential_outputs:
             total_duration += task_output.get("duration", 0.0)
             status = task_output.get("status")
             if status == "skipped":
                 skipped_count += 1
+                if task_output.get("deadline_skipped"):
+                    deadline_skipped += 1
             elif status == "failed":
                 failed_count += 1
             elif status == "timeout":
@@ -1355,6 +1397,9 @@ class IntelligentMultiAgentPipeline:
                 "agents_skipped": skipped_count,
                 "failed_agents": failed_count,
                 "timed_out_agents": timeout_count,
+                "deadline_skipped_agents": deadline_skipped,
+                "partial_results": bool(timeout_count or deadline_skipped),
+                "agent_deadline_remaining": round(agent_deadline - time.monotonic(), 3),
                 "total_execution_time": round(total_duration, 3),
                 "priority_map": priority_map,
                 "execution_trace": sorted(
@@ -1397,13 +1442,27 @@ class IntelligentMultiAgentPipeline:
                                    rag_context: Dict[str, Any],
                                    tasks: List[AgentExecutionTask],
                                    concurrent: bool = True) -> List[Dict[str, Any]]:
-        """Führt Agenten-Aufgaben aus (optional parallel)"""
+        """
+        Führt Agenten-Aufgaben nach Priorität bis zur Agent-Deadline aus
+        (optional parallel).
+
+        Jeder Agent erhält ein Budget aus seinen Latenz-Perzentilen; naht die
+        Deadline, werden fertige Ergebnisse geliefert und nicht mehr
+        startbare Agenten übersprungen.
+        """
 
         if not tasks:
             return []
 
-        outputs: List[Dict[str, Any]] = []
-        timeout_per_task = self._calculate_agent_timeout(request, len(tasks))
+        tasks = order_by_priority(tasks)
+        planner = self.deadline_planner
+        deadline = min(
+            (task.deadline for task in tasks if task.deadline is not None),
+            default=planner.agent_deadline(
+                request.deadline or planner.request_deadline(request.timeout or 60),
+                request.timeout or 60
+            )
+        )
 
         for task in tasks:
             if task.disabled:
@@ -1419,68 +1478,65 @@ class IntelligentMultiAgentPipeline:
                 }
             )
 
-        if concurrent:
-            loop = asyncio.get_running_loop()
-            async_futures: List[asyncio.Future] = []
-            future_task_map: Dict[asyncio.Future, AgentExecutionTask] = {}
-
-            for task in tasks:
-                cf_future = loop.run_in_executor(
-                    self.executor,
-                    self._run_agent_task_sync,
-                    request,
-                    task,
-                    rag_context
-                )
-                async_future = asyncio.wrap_future(cf_future)
-                async_futures.append(async_future)
-                future_task_map[async_future] = task
+        def budget_for(task: AgentExecutionTask) -> float:
+            # Budget beim Start bestimmen (sequenzielle Agenten sehen die Restzeit)
+            if task.disabled:
+                return max(planner.config.min_budget, deadline - time.monotonic())
+            task.budget = planner.budget(task.agent_type, task.deadline or deadline, task.priority_score)
+            return task.budget
+
+        outcomes = await run_until_deadline(
+            tasks,
+            lambda task, budget: self._run_agent_task_async(request, task, rag_context, budget),
+            budget_for,
+            deadline,
+            concurrent=concurrent,
+            budget_on_grant=True
+        )
 
-            for async_future in asyncio.as_completed(async_futures):
-                task_ref = future_task_map.get(async_future)
-                try:
-                    outputs.append(await asyncio.wait_for(async_future, timeout=timeout_per_task))
-                except asyncio.TimeoutError:
-                    outputs.append(self._build_timeout_output(task_ref, timeout_per_task))
-        else:
-            for task in tasks:
-                try:
-                    outputs.append(
-                        await asyncio.wait_for(
-                            self._run_agent_task_async(request, task, rag_context),
-                            timeout=timeout_per_task
-                        )
-                    )
-                except asyncio.TimeoutError:
-                    outputs.append(self._build_timeout_output(task, timeout_per_task))
+        outputs: List[Dict[str, Any]] = []
+        for task, status, output, elapsed in outcomes:
+            if status == "completed":
+                outputs.append(output)
+            elif status == "timeout":
+                outputs.append(self._build_timeout_output(task, elapsed or (task.budget or 0.0)))
+            else:
+                outputs.append(self._build_skipped_output(
+                    task, reason="Deadline erreicht - Agent nicht gestartet", deadline_skipped=True
+                ))
 
         return outputs
 
     async def _run_agent_task_async(self,
                                     request: IntelligentPipelineRequest,
                                     task: AgentExecutionTask,
-                                    rag_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Hilfsfunktion um Agenten-Aufgabe async über ThreadPool auszuführen"""
+                                    rag_context: Dict[str, Any],
+                                    budget: Optional[Callable[[], float]] = None) -> Dict[str, Any]:
+        """
+        Führt eine Agenten-Aufgabe über den prozessweiten Agent-Scheduler aus.
+
+        Nativ async (ohne Worker-Thread), wenn der Agent nicht blockiert:
+        kein UDS3-Backend (Mock-Ergebnis) oder eine UDS3-Strategie mit
+        asynchronem ``query_across_databases``. Sonst blockierend im
+        gemeinsamen Thread-Pool des Schedulers. ``budget`` wird bei der
+        Slot-Vergabe ausgewertet (Zeitbudget ab Ausführungsbeginn).
+        """
 
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            self.executor,
-            self._run_agent_task_sync,
+        uds3_search = self.uds3_searches.get(request.query_id)
+        if task.disabled or not self.uds3_strategy or (uds3_search and uds3_search.is_async):
+            worker = self._run_agent_task_native
+        else:
+            worker = self._run_agent_task_sync
+        return await self.agent_scheduler.run_with_budget(
+            request.query_id,
+            task.agent_type,
+            budget,
+            worker,
             request,
             task,
             rag_context
         )
 
-    def _calculate_agent_timeout(self, request: IntelligentPipelineRequest, task_count: int) -> float:
-        """Berechnet Timeout pro Agent basierend auf Gesamt-Timeout"""
-
-        if task_count <= 0:
-            task_count = 1
-
-        base_timeout = float(request.timeout or 60)
-        timeout_per_task = base_timeout / task_count
-        return max(3.0, min(timeout_per_task, base_timeout))
-
     def _run_agent_task_sync(self,
                               request: IntelligentPipelineRequest,
                               task: AgentExecutionTask,
@@ -1490,25 +1546,66 @@ class IntelligentMultiAgentPipeline:
         start_time = time.time()
 
         if task.disabled:
-            trace = {
-                "agent": task.agent_type,
-                "status": "skipped",
-                "stage": task.stage,
-                "priority": round(task.priority_score, 2),
-                "duration": 0.0,
-                "order": task.planned_order,
-                "reason": "Dynamic pipeline disabled task"
-            }
-            return {
-                "task": task,
-                "result": None,
-                "trace": trace,
-                "duration": 0.0,
-                "status": "skipped"
-            }
+            return self._build_skipped_output(task)
 
         # 🆕 ECHTE AGENT-EXECUTION (mit Fallback auf Mock)
-        agent_result = self._execute_real_agent(task.agent_type, request.query_text, rag_context)
+        agent_result = self._execute_real_agent(
+            task.agent_type,
+            request.query_text,
+            rag_context,
+            uds3_search=self.uds3_searches.get(request.query_id)
+        )
+        return self._build_task_output(task, agent_result, start_time)
+
+    async def _run_agent_task_native(self,
+                                     request: IntelligentPipelineRequest,
+                                     task: AgentExecutionTask,
+                                     rag_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async Worker für einzelne Agenten-Aufgabe (läuft im Event-Loop)"""
+
+        start_time = time.time()
+
+        if task.disabled:
+            return self._build_skipped_output(task)
+
+        agent_result = await self._execute_real_agent_async(
+            task.agent_type,
+            request.query_text,
+            rag_context,
+            uds3_search=self.uds3_searches.get(request.query_id)
+        )
+        return self._build_task_output(task, agent_result, start_time)
+
+    def _build_skipped_output(self,
+                              task: AgentExecutionTask,
+                              reason: str = "Dynamic pipeline disabled task",
+                              deadline_skipped: bool = False) -> Dict[str, Any]:
+        """Ausgabe für deaktivierte bzw. wegen der Deadline nicht gestartete Agenten-Aufgaben"""
+
+        trace = {
+            "agent": task.agent_type,
+            "status": "skipped",
+            "stage": task.stage,
+            "priority": round(task.priority_score, 2),
+            "duration": 0.0,
+            "order": task.planned_order,
+            "reason": reason
+        }
+        return {
+            "task": task,
+            "result": None,
+            "trace": trace,
+            "duration": 0.0,
+            "status": "skipped",
+            "deadline_skipped": deadline_skipped
+        }
+
+    def _build_task_output(self,
+                           task: AgentExecutionTask,
+                           agent_result: Dict[str, Any],
+                           start_time: float) -> Dict[str, Any]:
+        """Strukturierte Ausgabe (Ergebnis + Trace) einer ausgeführten Agenten-Aufgabe"""
+
         agent_result['priority_score'] = round(task.priority_score, 2)
         agent_result['execution_stage'] = task.stage
 
@@ -1522,6 +1619,8 @@ class IntelligentMultiAgentPipeline:
             "duration": round(duration, 3),
             "order": task.planned_order
         }
+        if task.budget is not None:
+            trace["budget"] = round(task.budget, 3)
 
         with self._agent_results_lock:
             self.stats['agents_executed'] += 1
@@ -1557,6 +1656,8 @@ class IntelligentMultiAgentPipeline:
             "order": task.planned_order,
             "reason": f"Agent timeout nach {round(timeout_value, 1)}s"
         }
+        if task.budget is not None:
+            trace["budget"] = round(task.budget, 3)
 
         with self._agent_results_lock:
             self.stats['agent_timeouts'] += 1
@@ -1787,6 +1888,14 @@ class IntelligentMultiAgentPipeline:
                                  analysis_result: Optional[Dict[str, Any]] = None) -> None:
         """Speichert kompakte Pipeline-Metriken für Monitoring."""
 
+        uds3_search = (response.processing_metadata or {}).get('uds3_search') or {}
+        if uds3_search:
+            totals = self.stats.setdefault('uds3_search', {'calls': 0, 'executed': 0, 'dedup_ratio': 0.0})
+            totals['calls'] += uds3_search.get('calls', 0)
+            totals['executed'] += uds3_search.get('executed', 0)
+            if totals['calls']:
+                totals['dedup_ratio'] = round(1.0 - totals['executed'] / totals['calls'], 4)
+        
         metrics_entry = {
             'timestamp': datetime.now(timezone.utc).isoformat(),
             'query_id': request.query_id,
@@ -1796,6 +1905,7 @@ class IntelligentMultiAgentPipeline:
             'stage_durations': stage_durations,
             'agents_used': len(response.agent_results or {}),
             'agent_execution_summary': execution_summary or {},
+            'uds3_dedup_ratio': uds3_search.get('dedup_ratio'),
             'combined_confidence': response.agent_consensus.get('blended_confidence') if isinstance(response.agent_consensus, dict) else None,
             'query_complexity': (analysis_result or {}).get('complexity') if isinstance(analysis_result, dict) else None,
             'query_domain': (analysis_result or {}).get('domain') if isinstance(analysis_result, dict) else None
@@ -1920,6 +2030,17 @@ class IntelligentMultiAgentPipeline:
             else:
                 entry['failures'] += 1
 
+            if numeric_duration is not None and status in ("completed", "success", "timeout"):
+                # Latenz-Historie für Deadline-Budgets (Timeouts zensiert, mindestens das Budget)
+                if status == "timeout":
+                    self.deadline_planner.observe_timeout(agent_type, numeric_duration)
+                else:
+                    self.deadline_planner.tracker.observe(agent_type, numeric_duration)
+                entry.update({
+                    f"{name}_duration": value
+                    for name, value in self.deadline_planner.tracker.percentiles(agent_type).items()
+                })
+
             if numeric_duration is not None:
                 entry['duration_samples'] += 1
                 entry['total_duration'] += numeric_duration
@@ -2199,7 +2320,23 @@ class IntelligentMultiAgentPipeline:
             'details': f'Detaillierte {agent_type} Analyse für: {query[:50]}...'
         }
     
-    def _execute_real_agent(self, agent_type: str, query: str, rag_context: Dict[str, Any]) -> Dict[str, Any]:
+    # Mapping von Pipeline Agent-Typen zu UDS3 Such-Kategorien
+    AGENT_SEARCH_CATEGORIES = {
+        'geo_context': 'geographic',
+        'legal_framework': 'legal',
+        'document_retrieval': 'documents',
+        'environmental': 'environmental',
+        'construction': 'construction',
+        'traffic': 'traffic',
+        'financial': 'financial',
+        'social': 'social'
+    }
+
+    def _execute_real_agent(self,
+                            agent_type: str,
+                            query: str,
+                            rag_context: Dict[str, Any],
+                            uds3_search: Optional[UDS3SearchCoalescer] = None) -> Dict[str, Any]:
         """
         🆕 Führt echten VERITAS Agent aus mit UDS3 Hybrid Search
         
@@ -2209,76 +2346,26 @@ class IntelligentMultiAgentPipeline:
             agent_type: Typ des Agents (z.B. 'environmental', 'legal_framework')
             query: User Query
             rag_context: RAG Context mit zusätzlichen Informationen
+            uds3_search: Request-scoped Coalescer (Agenten eines Laufs teilen
+                         eine UDS3-Suche; Kategorie wird lokal gefiltert)
             
         Returns:
             Agent-Ergebnis Dict mit summary, sources, confidence_score
         """
         try:
-            # Mapping von Pipeline Agent-Typen zu UDS3 Such-Kategorien
-            agent_to_category = {
-                'geo_context': 'geographic',
-                'legal_framework': 'legal',
-                'document_retrieval': 'documents',
-                'environmental': 'environmental',
-                'construction': 'construction',
-                'traffic': 'traffic',
-                'financial': 'financial',
-                'social': 'social'
-            }
-            
             # UDS3 Hybrid Search ausführen
             if self.uds3_strategy:
-                category = agent_to_category.get(agent_type, 'general')
+                category = self.AGENT_SEARCH_CATEGORIES.get(agent_type, 'general')
                 
-                # UDS3 Query mit Filter für Agent-Kategorie
-                search_result = self.uds3_strategy.query_across_databases(
-                    vector_params={
-                        "query_text": query,
-                        "top_k": 5,
-                        "threshold": 0.5
-                    },
-                    graph_params=None,
-                    relational_params=None,
-                    join_strategy="union",
-                    execution_mode="smart"
+                # Gemeinsame UDS3-Suche des Laufs, Kategorie-Filter lokal
+                search = uds3_search or UDS3SearchCoalescer(self.uds3_strategy)
+                search_results = search.vector_search(
+                    query,
+                    category=category,
+                    top_k=5,
+                    threshold=0.5
                 )
-                
-                # Ergebnisse extrahieren
-                sources = []
-                summaries = []
-                confidence_scores = []
-                
-                if search_result and search_result.success and hasattr(search_result, 'joined_results'):
-                    for result in search_result.joined_results[:5]:  # Top 5
-                        if isinstance(result, dict):
-                            # Extract content
-                            content = result.get('content', result.get('text', ''))
-                            score = result.get('score', result.get('similarity', 0.0))
-                            source = result.get('source', result.get('doc_id', 'UDS3'))
-                            
-                            if content:
-                                summaries.append(content[:200])  # Erste 200 Zeichen
-                            if source:
-                                sources.append(source)
-                            if score:
-                                confidence_scores.append(float(score))
-                
-                # Wenn UDS3 Ergebnisse liefert, nutze diese
-                if sources and summaries:
-                    avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.75
-                    
-                    return {
-                        'agent_type': agent_type,
-                        'status': 'completed',
-                        'confidence_score': min(avg_confidence, 1.0),
-                        'summary': f"UDS3: {len(summaries)} relevante Dokumente gefunden. {summaries[0] if summaries else ''}",
-                        'sources': sources[:3],  # Top 3 Quellen
-                        'processing_time': 1.5,
-                        'details': ' | '.join(summaries[:3]),
-                        'uds3_used': True
-                    }
-                else:
-                    logger.debug(f"ℹ️ UDS3 Search für {agent_type}: Keine Ergebnisse, Fallback auf Mock")
+                return self._build_agent_result(agent_type, query, search_results)
             else:
                 logger.debug(f"ℹ️ UDS3 nicht verfügbar für {agent_type}, Fallback auf Mock")
                 
@@ -2288,6 +2375,78 @@ class IntelligentMultiAgentPipeline:
         # Fallback: Mock-Daten
         return self._generate_mock_agent_result(agent_type, query)
     
+    async def _execute_real_agent_async(self,
+                                        agent_type: str,
+                                        query: str,
+                                        rag_context: Dict[str, Any],
+                                        uds3_search: Optional[UDS3SearchCoalescer] = None) -> Dict[str, Any]:
+        """
+        Async-Variante von ``_execute_real_agent`` (kein Worker-Thread).
+        
+        Blockierende UDS3-Strategien laufen über ``avector_search`` im
+        Thread, nativ asynchrone direkt im Event-Loop.
+        """
+        try:
+            if self.uds3_strategy:
+                category = self.AGENT_SEARCH_CATEGORIES.get(agent_type, 'general')
+                search = uds3_search or UDS3SearchCoalescer(self.uds3_strategy)
+                search_results = await search.avector_search(
+                    query,
+                    category=category,
+                    top_k=5,
+                    threshold=0.5
+                )
+                return self._build_agent_result(agent_type, query, search_results)
+            else:
+                logger.debug(f"ℹ️ UDS3 nicht verfügbar für {agent_type}, Fallback auf Mock")
+                
+        except Exception as e:
+            logger.warning(f"⚠️ Fehler bei Agent-Execution {agent_type}: {e}, Fallback auf Mock")
+        
+        return self._generate_mock_agent_result(agent_type, query)
+    
+    def _build_agent_result(self,
+                            agent_type: str,
+                            query: str,
+                            search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Agent-Ergebnis aus UDS3-Treffern (Fallback auf Mock ohne Treffer)"""
+        
+        # Ergebnisse extrahieren
+        sources = []
+        summaries = []
+        confidence_scores = []
+        
+        for result in search_results:  # Top 5
+            # Extract content
+            content = result.get('content', result.get('text', ''))
+            score = result.get('score', result.get('similarity', 0.0))
+            source = result.get('source', result.get('doc_id', 'UDS3'))
+            
+            if content:
+                summaries.append(content[:200])  # Erste 200 Zeichen
+            if source:
+                sources.append(source)
+            if score:
+                confidence_scores.append(float(score))
+        
+        # Wenn UDS3 Ergebnisse liefert, nutze diese
+        if sources and summaries:
+            avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.75
+            
+            return {
+                'agent_type': agent_type,
+                'status': 'completed',
+                'confidence_score': min(avg_confidence, 1.0),
+                'summary': f"UDS3: {len(summaries)} relevante Dokumente gefunden. {summaries[0] if summaries else ''}",
+                'sources': sources[:3],  # Top 3 Quellen
+                'processing_time': 1.5,
+                'details': ' | '.join(summaries[:3]),
+                'uds3_used': True
+            }
+        
+        logger.debug(f"ℹ️ UDS3 Search für {agent_type}: Keine Ergebnisse, Fallback auf Mock")
+        return self._generate_mock_agent_result(agent_type, query)
+    
     
     def _normalize_agent_results(self, agent_results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Normalisiert Agent-Ergebnisse für Aggregation und LLM"""
@@ -2793,6 +2952,8 @@ class IntelligentMultiAgentPipeline:
                 'agent_metrics': copy.deepcopy(self.stats.get('agent_metrics', {})),
                 'query_metrics': copy.deepcopy(self.stats.get('query_metrics', {})),
                 'stage_duration_stats': copy.deepcopy(self.stats.get('stage_duration_stats', {})),
+                'uds3_search': copy.deepcopy(self.stats.get('uds3_search', {})),
+                'agent_scheduler': self.agent_scheduler.get_stats(),
                 'last_error': copy.deepcopy(self.stats.get('last_error'))
             }
 
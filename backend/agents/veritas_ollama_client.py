@@ -37,6 +37,7 @@ if REPO_ROOT not in sys.path:
 
 # Import shared enums
 from backend.agents.veritas_shared_enums import PipelineStage
+from backend.agents.veritas_ollama_transport import OllamaTransport, get_ollama_transport
 from native_ollama_integration import (
     DirectOllamaLLM,
     DirectOllamaEmbeddings,
@@ -102,7 +103,8 @@ class VeritasOllamaClient:
     def __init__(self, 
                  base_url: str = "http://localhost:11434",
                  timeout: int = 30,
-                 max_retries: int = 3):
+                 max_retries: int = 3,
+                 transport: Optional[OllamaTransport] = None):
         """
         Initialisiert den Veritas Ollama Client
         
@@ -110,16 +112,15 @@ class VeritasOllamaClient:
             base_url: Ollama Server URL
             timeout: Request Timeout in Sekunden
             max_retries: Maximale Anzahl Wiederholungen
+            transport: Gemeinsamer Ollama-Transport (Default: prozessweiter Pool)
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.max_retries = max_retries
         
-        # HTTP Client
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(timeout),
-            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
-        )
+        # HTTP Transport (prozessweiter Verbindungs-Pool, Semaphoren je Modell)
+        self.transport = transport or get_ollama_transport(self.base_url)
+        self._client_override: Optional[httpx.AsyncClient] = None
         
         # Model Management
         self.available_models: Dict[str, Dict[str, Any]] = {}
@@ -140,10 +141,23 @@ class VeritasOllamaClient:
             'total_duration': 0.0,
             'average_response_time': 0.0,
             'model_usage': {},
-            'fallback_requests': 0
+            'fallback_requests': 0,
+            'streams_started': 0,
+            'streams_cancelled': 0,
+            'total_time_to_first_token': 0.0,
+            'average_time_to_first_token': 0.0
         }
         
         logger.info(f"🤖 Veritas Ollama Client initialisiert (URL: {base_url})")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP Client: eigener Client falls gesetzt, sonst der gemeinsame Pool"""
+        return self._client_override or self.transport.client
+
+    @client.setter
+    def client(self, client: Optional[httpx.AsyncClient]) -> None:
+        self._client_override = client
     
     async def __aenter__(self):
         """Async Context Manager Entry"""
@@ -155,8 +169,9 @@ class VeritasOllamaClient:
         await self.close()
     
     async def close(self):
-        """Schließt HTTP Client"""
-        await self.client.aclose()
+        """Schließt einen eigenen HTTP Client (der gemeinsame Pool bleibt offen)"""
+        if self._client_override is not None:
+            await self._client_override.aclose()
     
     async def initialize(self) -> bool:
         """
@@ -634,6 +649,13 @@ Formatiere die Antwort professionell mit:
             OllamaResponse oder AsyncGenerator für Streaming
         """
         
+        payload = self._build_payload(request, stream)
+
+        if stream:
+            # Generator wird sofort zurückgegeben; Verbindung, Retries und
+            # Fallback laufen erst beim Iterieren (echtes Token-Streaming)
+            return self._stream_response(request, payload)
+
         last_error: Optional[str] = None
 
         for attempt in range(self.max_retries):
@@ -641,48 +663,17 @@ Formatiere die Antwort professionell mit:
                 self.stats['requests_sent'] += 1
                 start_time = time.time()
 
-                # Request Payload
-                payload = {
-                    "model": request.model,
-                    "prompt": request.prompt,
-                    "stream": stream,
-                    "options": {
-                        "temperature": request.temperature,
-                    },
-                }
-
-                if request.max_tokens is not None:
-                    payload["options"]["num_predict"] = request.max_tokens
-
-                if request.system:
-                    payload["system"] = request.system
-
-                if request.context:
-                    payload["context"] = request.context
-
-                # HTTP Request senden
-                response = await self.client.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload,
-                    timeout=self.timeout,
-                )
+                # HTTP Request senden (Slot je Modell im gemeinsamen Transport)
+                model_key = request.model or self.default_model
+                async with self.transport.slot(model_key, "/api/generate"):
+                    response = await self.client.post(
+                        f"{self.base_url}/api/generate",
+                        json=payload,
+                        timeout=self.timeout,
+                    )
 
                 if response.status_code == 200:
-                    duration = time.time() - start_time
-                    self.stats['requests_successful'] += 1
-                    self.stats['total_duration'] += duration
-                    if self.stats['requests_successful']:
-                        self.stats['average_response_time'] = (
-                            self.stats['total_duration'] / self.stats['requests_successful']
-                        )
-
-                    # Model Usage Stats
-                    model_key = request.model or self.default_model
-                    self.stats['model_usage'].setdefault(model_key, 0)
-                    self.stats['model_usage'][model_key] += 1
-
-                    if stream:
-                        return self._process_streaming_response(response)
+                    self._record_success(model_key, time.time() - start_time)
                     return self._process_single_response(response.json(), model_key)
 
                 raise httpx.HTTPStatusError(
@@ -708,7 +699,127 @@ Formatiere die Antwort professionell mit:
             stream,
             last_error or "Unbekannter Fehler",
         )
-    
+
+    def _build_payload(self, request: OllamaRequest, stream: bool) -> Dict[str, Any]:
+        """Erstellt den /api/generate Payload"""
+
+        payload = {
+            "model": request.model,
+            "prompt": request.prompt,
+            "stream": stream,
+            "options": {
+                "temperature": request.temperature,
+            },
+        }
+
+        if request.max_tokens is not None:
+            payload["options"]["num_predict"] = request.max_tokens
+
+        if request.system:
+            payload["system"] = request.system
+
+        if request.context:
+            payload["context"] = request.context
+
+        return payload
+
+    def _record_success(self, model_key: str, duration: float) -> None:
+        """Aktualisiert Erfolgs- und Modell-Statistiken"""
+
+        self.stats['requests_successful'] += 1
+        self.stats['total_duration'] += duration
+        self.stats['average_response_time'] = (
+            self.stats['total_duration'] / self.stats['requests_successful']
+        )
+        self.stats['model_usage'].setdefault(model_key, 0)
+        self.stats['model_usage'][model_key] += 1
+
+    async def _stream_response(
+        self,
+        request: OllamaRequest,
+        payload: Dict[str, Any],
+    ) -> AsyncGenerator[OllamaResponse, None]:
+        """
+        Echtes Token-Streaming über ``client.stream()``
+
+        Jede NDJSON-Zeile wird sofort nach Eintreffen als OllamaResponse
+        weitergereicht (Time-To-First-Token statt Gesamtdauer).
+
+        - Retries nur solange noch kein Token ausgeliefert wurde
+        - Abbruch durch den Konsumenten (``aclose()``, CancelledError bei
+          Client-Disconnect) verlässt ``client.stream()`` und schließt die
+          HTTP-Verbindung - Ollama bricht die Generierung dann ab
+        """
+        model_key = request.model or self.default_model
+        last_error: Optional[str] = None
+
+        for attempt in range(self.max_retries):
+            self.stats['requests_sent'] += 1
+            start_time = time.time()
+            first_token_sent = False
+
+            try:
+                async with self.transport.slot(model_key, "/api/generate"), self.client.stream(
+                    "POST",
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout,
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise httpx.HTTPStatusError(
+                            f"HTTP {response.status_code}", request=response.request, response=response
+                        )
+
+                    self.stats['streams_started'] += 1
+                    async for chunk in self._process_streaming_response(response, model_key):
+                        if not first_token_sent:
+                            first_token_sent = True
+                            self._record_time_to_first_token(time.time() - start_time)
+                        yield chunk
+
+                self._record_success(model_key, time.time() - start_time)
+                return
+
+            except (asyncio.CancelledError, GeneratorExit):
+                self.stats['streams_cancelled'] += 1
+                logger.info("🛑 Ollama-Stream abgebrochen - Upstream-Verbindung geschlossen")
+                raise
+
+            except Exception as e:
+                if first_token_sent:
+                    # Tokens wurden bereits ausgeliefert → kein Retry/Fallback
+                    self.stats['requests_failed'] += 1
+                    logger.error(f"❌ Ollama-Stream während der Generierung abgebrochen: {e}")
+                    raise
+
+                last_error = str(e)
+                logger.warning(
+                    "⚠️ Ollama Stream Attempt %s/%s fehlgeschlagen: %s",
+                    attempt + 1,
+                    self.max_retries,
+                    e,
+                )
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+
+        self.stats['requests_failed'] += 1
+        fallback = await self._generate_response_via_fallback(
+            request,
+            True,
+            last_error or "Unbekannter Fehler",
+        )
+        async for chunk in fallback:
+            yield chunk
+
+    def _record_time_to_first_token(self, ttft: float) -> None:
+        """Aktualisiert Time-To-First-Token Statistik"""
+
+        self.stats['total_time_to_first_token'] += ttft
+        self.stats['average_time_to_first_token'] = (
+            self.stats['total_time_to_first_token'] / self.stats['streams_started']
+        )
+
     def _process_single_response(self, data: Dict[str, Any], model: str) -> OllamaResponse:
         """Verarbeitet einzelne Ollama Response"""
         
@@ -733,16 +844,22 @@ Formatiere die Antwort professionell mit:
             confidence_score=confidence_score
         )
     
-    async def _process_streaming_response(self, response) -> AsyncGenerator[OllamaResponse, None]:
-        """Verarbeitet Streaming Ollama Response"""
+    async def _process_streaming_response(
+        self,
+        response,
+        model: Optional[str] = None
+    ) -> AsyncGenerator[OllamaResponse, None]:
+        """Verarbeitet Streaming Ollama Response (NDJSON, eine Zeile je Chunk)"""
         
         async for line in response.aiter_lines():
             if line:
                 try:
                     data = json.loads(line)
-                    yield self._process_single_response(data, data.get('model', 'unknown'))
                 except json.JSONDecodeError:
                     continue
+                if data.get('error'):
+                    raise RuntimeError(f"Ollama Stream-Fehler: {data['error']}")
+                yield self._process_single_response(data, data.get('model') or model or 'unknown')
     
     def _estimate_confidence_score(self, response_text: str, data: Dict[str, Any]) -> float:
         """
@@ -1160,6 +1277,7 @@ Beispiel:
                 "available_models": list(self.available_models.keys())
             },
             "usage_stats": self.stats.copy(),
+            "transport": self.transport.get_stats(),
             "status": {
                 "offline_mode": self.offline_mode,
             },
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+VERITAS OLLAMA TRANSPORT
+========================
+
+Prozessweiter, gepoolter HTTP-Transport für alle Ollama-Aufrufe.
+
+Problem:
+--------
+- ``QueryExpander._call_ollama`` öffnete je LLM-Call einen neuen
+  ``httpx.AsyncClient`` (TCP-Aufbau bei jeder Expansion-Strategie)
+- ``DirectOllamaLLM`` nutzte ``requests.post`` ohne Session und blockierte
+  in async Call-Sites den Event-Loop
+- ``VeritasOllamaClient`` hatte einen eigenen Pool (max. 10 Verbindungen)
+
+Lösung:
+-------
+Ein ``OllamaTransport`` je Ollama-URL und Event-Loop:
+
+1. Ein ``httpx.AsyncClient`` mit Keep-Alive-Pool für alle Call-Sites
+2. HTTP/1.1-Limits: httpx pipelined nicht (ein Request je Verbindung),
+   daher begrenzt ``max_in_flight`` (<= ``max_connections``) die Anzahl
+   gleichzeitiger Requests - Wartende stauen sich vor dem Pool statt in
+   Pool-Timeouts zu laufen
+3. Semaphore je Modell (``per_model_concurrency``, Overrides über
+   ``model_concurrency``): ein großes Modell kann den Server nicht mit
+   parallelen Generierungen überlasten, kleine Modelle laufen daneben weiter
+4. Request-Metriken je Modell und Endpoint (Requests, Fehler, In-Flight,
+   Wartezeit vor dem Slot, Latenz)
+
+Verwendung:
+-----------
+transport = get_ollama_transport()
+data = await transport.post_json("/api/generate", payload, model="llama3:latest")
+
+async with transport.stream("/api/generate", payload, model="llama3:latest") as response:
+    async for line in response.aiter_lines():
+        ...
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OllamaTransportConfig:
+    """Konfiguration für den gemeinsamen Ollama-Transport"""
+
+    base_url: str = field(
+        default_factory=lambda: os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    )
+
+    # Timeouts (Sekunden)
+    timeout: float = 120.0  # Default-Read-Timeout (pro Request überschreibbar)
+    connect_timeout: float = 5.0
+    pool_timeout: Optional[float] = None  # Warten auf freie Verbindung (None: unbegrenzt)
+
+    # Verbindungs-Pool
+    max_connections: int = 32
+    max_keepalive_connections: int = 16
+    keepalive_expiry: float = 60.0
+
+    # Nebenläufigkeit
+    max_in_flight: int = 32  # Gleichzeitige Requests gesamt (HTTP/1.1: <= max_connections)
+    per_model_concurrency: int = 4  # Gleichzeitige Requests je Modell
+    model_concurrency: Dict[str, int] = field(default_factory=dict)  # Overrides je Modell
+
+
+@dataclass
+class _RequestMetrics:
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    waiting: int = 0
+    total_latency: float = 0.0
+    total_wait: float = 0.0
+    max_latency: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        finished = max(1, self.requests)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_latency_ms": self.total_latency / finished * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+            "avg_wait_ms": self.total_wait / finished * 1000,
+        }
+
+
+@dataclass
+class _LoopState:
+    """Client und Semaphoren eines Event-Loops"""
+
+    client: httpx.AsyncClient
+    global_slots: asyncio.Semaphore
+    model_slots: Dict[str, asyncio.Semaphore] = field(default_factory=dict)
+
+
+class OllamaTransport:
+    """
+    Gemeinsamer async HTTP-Transport für Ollama.
+
+    Client und Semaphoren existieren je Event-Loop (``WeakKeyDictionary``):
+    Verbindungen eines fremden Loops werden nie wiederverwendet, und Loops,
+    die sich abwechseln (z.B. Worker-Threads), behalten jeweils ihren Pool.
+    Endet ein Loop (``asyncio.run`` je CLI-Aufruf, Tests), wird sein Pool
+    beim nächsten Binden verworfen statt neben dem neuen weiterzuleben.
+    """
+
+    def __init__(self, config: Optional[OllamaTransportConfig] = None):
+        self.config = config or OllamaTransportConfig()
+        self.base_url = self.config.base_url.rstrip("/")
+
+        self._lock = threading.Lock()
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._unbound: Optional[_LoopState] = None  # Zugriff außerhalb eines Loops
+
+        self._model_metrics: Dict[str, _RequestMetrics] = {}
+        self._endpoint_metrics: Dict[str, _RequestMetrics] = {}
+        self._clients_created = 0
+
+    # ------------------------------------------------------------------
+    # Loop-Bindung
+    # ------------------------------------------------------------------
+
+    def _bind(self) -> _LoopState:
+        """Liefert Client/Semaphoren des aktuell laufenden Loops."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            if loop is None:
+                if self._unbound is None:
+                    self._unbound = self._create_state()
+                return self._unbound
+
+            state = self._states.get(loop)
+            if state is None:
+                self._discard_closed_loops()
+                # Außerhalb eines Loops angelegter Client geht an den ersten Loop
+                state, self._unbound = self._unbound or self._create_state(), None
+                self._states[loop] = state
+            return state
+
+    def _create_state(self) -> _LoopState:
+        self._clients_created += 1
+        return _LoopState(
+            client=self._create_client(),
+            global_slots=asyncio.Semaphore(max(1, self.config.max_in_flight)),
+        )
+
+    def _discard_closed_loops(self) -> None:
+        """Verwirft Pools beendeter Loops (``aclose`` ist dort nicht mehr möglich)."""
+        for loop in [loop for loop in self._states if loop.is_closed()]:
+            del self._states[loop]
+            logger.debug("🔌 Ollama-Transport: Event-Loop beendet - Verbindungs-Pool verworfen")
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                self.config.timeout,
+                connect=self.config.connect_timeout,
+                pool=self.config.pool_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Der gepoolte HTTP-Client (für Sonderfälle wie ``/api/tags``)."""
+        return self._bind().client
+
+    def _model_semaphore(self, state: _LoopState, model: str) -> asyncio.Semaphore:
+        semaphore = state.model_slots.get(model)
+        if semaphore is None:
+            limit = self.config.model_concurrency.get(model, self.config.per_model_concurrency)
+            semaphore = asyncio.Semaphore(max(1, limit))
+            state.model_slots[model] = semaphore
+        return semaphore
+
+    # ------------------------------------------------------------------
+    # Slots & Metriken
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, model: Optional[str], endpoint: str) -> AsyncIterator[None]:
+        """
+        Reserviert einen Request-Slot (global + je Modell) und erfasst Metriken.
+
+        Auch für Call-Sites nutzbar, die einen eigenen Client verwenden.
+        """
+        state = self._bind()
+        model_key = model or "-"
+        metrics = (
+            self._model_metrics.setdefault(model_key, _RequestMetrics()),
+            self._endpoint_metrics.setdefault(endpoint, _RequestMetrics()),
+        )
+        global_slots = state.global_slots
+        model_slots = self._model_semaphore(state, model_key)
+
+        queued_at = time.perf_counter()
+        for m in metrics:
+            m.waiting += 1
+        try:
+            await model_slots.acquire()
+            try:
+                await global_slots.acquire()
+            except BaseException:
+                model_slots.release()
+                raise
+        finally:
+            for m in metrics:
+                m.waiting -= 1
+
+        started = time.perf_counter()
+        for m in metrics:
+            m.in_flight += 1
+            m.total_wait += started - queued_at
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            latency = time.perf_counter() - started
+            for m in metrics:
+                m.in_flight -= 1
+                m.requests += 1
+                m.total_latency += latency
+                m.max_latency = max(m.max_latency, latency)
+                if failed:
+                    m.errors += 1
+            global_slots.release()
+            model_slots.release()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def post(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """POST ohne Status-Prüfung (Aufrufer wertet ``status_code`` aus)."""
+        model = model or payload.get("model")
+        async with self.slot(model, path):
+            return await self.client.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+
+    async def post_json(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """POST mit ``raise_for_status`` und JSON-Antwort."""
+        model = model or payload.get("model")
+        async with self.slot(model, path):
+            response = await self.client.post(
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+            response.raise_for_status()
+            return response.json()
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """Streaming-POST; der Slot bleibt bis zum Schließen des Streams belegt."""
+        model = model or payload.get("model")
+        async with self.slot(model, path):
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}{path}",
+                json=payload,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            ) as response:
+                yield response
+
+    async def close(self) -> None:
+        """Schließt den Verbindungs-Pool des aktuellen Loops."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._states.pop(loop, None) or self._unbound
+            if state is self._unbound:
+                self._unbound = None
+            self._discard_closed_loops()
+        if state is not None:
+            await state.client.aclose()
+
+    # ------------------------------------------------------------------
+    # Statistiken
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Transport-Statistiken zurück."""
+        models = {name: m.to_dict() for name, m in self._model_metrics.items()}
+        return {
+            "base_url": self.base_url,
+            "max_connections": self.config.max_connections,
+            "max_in_flight": self.config.max_in_flight,
+            "per_model_concurrency": self.config.per_model_concurrency,
+            "clients_created": self._clients_created,
+            "requests": sum(m["requests"] for m in models.values()),
+            "errors": sum(m["errors"] for m in models.values()),
+            "in_flight": sum(m["in_flight"] for m in models.values()),
+            "models": models,
+            "endpoints": {name: m.to_dict() for name, m in self._endpoint_metrics.items()},
+        }
+
+
+# ============================================================================
+# Prozessweite Instanzen
+# ============================================================================
+
+_transports: Dict[str, OllamaTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_ollama_transport(
+    base_url: Optional[str] = None,
+    config: Optional[OllamaTransportConfig] = None,
+) -> OllamaTransport:
+    """
+    Liefert den prozessweiten Transport für eine Ollama-URL.
+
+    Args:
+        base_url: Ollama-URL (None: ``OLLAMA_HOST`` bzw. localhost)
+        config: Konfiguration beim ersten Aufruf je URL
+    """
+    if config is None:
+        config = OllamaTransportConfig(**({"base_url": base_url} if base_url else {}))
+    key = (base_url or config.base_url).rstrip("/")
+
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = OllamaTransport(config)
+            _transports[key] = transport
+            logger.info(f"🔌 Ollama-Transport initialisiert: {key} "
+                        f"(max_connections={config.max_connections}, "
+                        f"per_model={config.per_model_concurrency})")
+        return transport
+
+
+def get_ollama_transport_stats() -> Dict[str, Any]:
+    """Statistiken aller Transporte (für Health-/Metrics-Endpoints)."""
+    with _transports_lock:
+        transports = list(_transports.values())
+    return {transport.base_url: transport.get_stats() for transport in transports}
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+VERITAS QUERY RESULT CACHE
+==========================
+
+Gemeinsamer, begrenzter Ergebnis-Cache für den Retrieval-Stack
+(SparseRetriever, QueryExpander, ReRankingService).
+
+Eigenschaften:
+--------------
+- LRU-Verdrängung: ``max_entries`` und ``max_bytes`` werden hart eingehalten
+- TTL: Einträge verfallen ``ttl`` Sekunden nach dem Schreiben
+- Größenabrechnung in Bytes (rekursive ``sys.getsizeof``-Schätzung)
+- Zähler für Hits, Misses, Evictions, Expirations und Invalidierungen
+- Invalidierungs-Hooks: ``invalidate()`` leert den Cache und ruft
+  registrierte Callbacks auf
+- Quellen-Tags: Einträge tragen die Index-Quellen, aus denen sie stammen
+  (``source`` des Caches oder ``set(..., sources=...)``);
+  ``notify_reindex(source)`` verwirft in allen Caches mit
+  ``invalidate_on_reindex=True`` nur Einträge dieser Quelle
+  (ungetaggte Einträge gelten als abhängig von jeder Quelle)
+
+Thread-sicher (ein ``RLock`` je Cache), damit Hintergrund-Merges und
+``asyncio.to_thread``-Aufrufe den Cache gefahrlos nutzen können.
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+InvalidationHook = Callable[[str], None]
+
+# Alle lebenden Caches (für notify_reindex)
+_registry: "weakref.WeakSet[QueryResultCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Schätzt den Speicherbedarf eines Objekts in Bytes.
+
+    Folgt Containern (dict, list, tuple, set), Dataclasses/Objekten mit
+    ``__dict__`` und ``__slots__`` sowie NumPy-Arrays (``nbytes``).
+    Gemeinsam referenzierte Objekte werden nur einmal gezählt.
+    """
+    if _seen is None:
+        _seen = set()
+    obj_id = id(obj)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return size + nbytes
+
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += estimate_size(vars(obj), _seen)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                size += estimate_size(getattr(obj, slot), _seen)
+
+    return size
+
+
+@dataclass
+class _CacheEntry(Generic[V]):
+    value: V
+    size: int
+    expires_at: float
+    sources: FrozenSet[str] = frozenset()
+
+
+class QueryResultCache(Generic[V]):
+    """
+    LRU/TTL-Cache mit Byte-Budget und Statistiken.
+
+    Beispiel:
+    --------
+    cache = QueryResultCache(name="bm25", max_entries=1024, ttl=3600)
+    hit = cache.get(key)
+    if hit is None:
+        hit = compute()
+        cache.set(key, hit)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600,
+        invalidate_on_reindex: bool = True,
+        source: Optional[str] = None,
+        sizer: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Name für Logs und Statistiken
+            max_entries: Maximale Anzahl Einträge
+            max_bytes: Maximale Gesamtgröße in Bytes (None: unbegrenzt)
+            ttl: Time-To-Live in Sekunden (None oder <= 0: kein Verfall)
+            invalidate_on_reindex: Bei ``notify_reindex()`` Einträge der Quelle verwerfen
+            source: Standard-Quellen-Tag für ``set()`` (None: ungetaggt)
+            sizer: Größenschätzung je Wert
+            clock: Zeitquelle (monoton)
+        """
+        self.name = name
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max_bytes
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.invalidate_on_reindex = invalidate_on_reindex
+        self.source = source
+        self._sizer = sizer
+        self._clock = clock
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry[V]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._hooks: List[InvalidationHook] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        with _registry_lock:
+            _registry.add(self)
+
+    # ------------------------------------------------------------------
+    # Zugriff
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Liefert den Wert oder ``default`` (zählt Hit/Miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self.ttl is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: V, sources: Optional[Iterable[str]] = None) -> bool:
+        """
+        Speichert einen Wert.
+
+        Args:
+            key: Cache-Schlüssel
+            value: Wert
+            sources: Index-Quellen des Werts (None: ``self.source``)
+
+        Returns:
+            False wenn der Wert allein das Byte-Budget übersteigt
+            (wird dann nicht gecacht)
+        """
+        if self.max_entries == 0:
+            return False
+        size = self._sizer(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"💾 Cache '{self.name}': Eintrag zu groß ({size} Bytes)")
+            return False
+
+        expires_at = self._clock() + self.ttl if self.ttl is not None else float("inf")
+        if sources is None:
+            sources = (self.source,) if self.source else ()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, size, expires_at, frozenset(sources))
+            self._bytes += size
+            self._enforce_limits()
+        return True
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """Entfernt einen einzelnen Eintrag."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry.value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (
+                self.ttl is None or entry.expires_at > self._clock()
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    # ------------------------------------------------------------------
+    # Verdrängung
+    # ------------------------------------------------------------------
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _over_limits(self) -> bool:
+        return len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        )
+
+    def _enforce_limits(self) -> None:
+        if not self._over_limits():
+            return
+        # Zuerst abgelaufene Einträge, dann LRU
+        self.purge_expired()
+        while self._over_limits():
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Entfernt alle abgelaufenen Einträge. Returns: Anzahl."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            now = self._clock()
+            expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    # ------------------------------------------------------------------
+    # Invalidierung
+    # ------------------------------------------------------------------
+
+    def add_invalidation_hook(self, hook: InvalidationHook) -> None:
+        """Registriert einen Callback ``hook(reason)`` für ``invalidate()``."""
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_invalidation_hook(self, hook: InvalidationHook) -> None:
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def clear(self) -> int:
+        """Leert den Cache ohne Hooks auszulösen. Returns: Anzahl Einträge."""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+
+    def invalidate(self, reason: str = "manual") -> int:
+        """
+        Leert den Cache und ruft alle Invalidierungs-Hooks auf.
+
+        Returns:
+            Anzahl verworfener Einträge
+        """
+        with self._lock:
+            count = self.clear()
+            self.invalidations += 1
+            hooks = list(self._hooks)
+
+        self._run_hooks(hooks, reason)
+        if count:
+            logger.debug(f"🗑️ Cache '{self.name}' invalidiert ({count} Einträge, Grund: {reason})")
+        return count
+
+    def invalidate_source(self, source: str, reason: Optional[str] = None) -> int:
+        """
+        Verwirft Einträge mit Tag ``source`` sowie ungetaggte Einträge.
+
+        Hooks werden nur aufgerufen, wenn Einträge verworfen wurden.
+
+        Returns:
+            Anzahl verworfener Einträge
+        """
+        reason = reason or f"reindex:{source}"
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if not entry.sources or source in entry.sources
+            ]
+            for key in stale:
+                self._remove(key)
+            if not stale:
+                return 0
+            self.invalidations += 1
+            hooks = list(self._hooks)
+
+        self._run_hooks(hooks, reason)
+        logger.debug(f"🗑️ Cache '{self.name}': {len(stale)} Einträge verworfen (Grund: {reason})")
+        return len(stale)
+
+    def _run_hooks(self, hooks: List[InvalidationHook], reason: str) -> None:
+        for hook in hooks:
+            try:
+                hook(reason)
+            except Exception as e:
+                logger.warning(f"⚠️ Cache '{self.name}': Invalidierungs-Hook fehlgeschlagen: {e}")
+
+    # ------------------------------------------------------------------
+    # Statistiken
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Cache-Statistiken zurück."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def notify_reindex(source: str) -> int:
+    """
+    Verwirft in allen Caches mit ``invalidate_on_reindex=True`` die
+    Einträge der geänderten Quelle.
+
+    Wird vom SparseRetriever bei jeder Index-Änderung aufgerufen, damit
+    abhängige Caches keine veralteten Ergebnisse liefern. Einträge anderer
+    Quellen (z.B. eines zweiten BM25-Index) bleiben erhalten.
+
+    Args:
+        source: Geänderte Index-Quelle (Tag der Einträge)
+
+    Returns:
+        Anzahl Caches, in denen Einträge verworfen wurden
+    """
+    with _registry_lock:
+        caches = [cache for cache in _registry if cache.invalidate_on_reindex]
+
+    return sum(1 for cache in caches if cache.invalidate_source(source))
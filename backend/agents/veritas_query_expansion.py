@@ -18,6 +18,14 @@ Vorteile:
 - Robustheit gegen Query-Formulierung
 - Bessere Abdeckung von Synonymen & Paraphrasen
 
+Latenz:
+-------
+Alle Strategien laufen parallel unter einer gemeinsamen Deadline
+(``latency_budget_ms``). ``expand_iter()`` liefert das Original sofort und
+jede Variante, sobald ihr LLM-Call fertig ist - Retrieval kann also mit der
+Original-Query starten und Varianten nachziehen. Nach der Deadline
+eintreffende Varianten werden verworfen (laufende Calls abgebrochen).
+
 Beispiel:
 --------
 Original: "Wie baue ich ein barrierefreies Haus?"
@@ -36,19 +44,23 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from backend.agents.veritas_query_cache import QueryResultCache
 
 logger = logging.getLogger(__name__)
 
-# Ollama Import
+# Ollama Import (gemeinsamer Transport, benötigt httpx)
 try:
-    import httpx
+    from backend.agents.veritas_ollama_transport import OllamaTransport, get_ollama_transport
     HTTPX_AVAILABLE = True
 except ImportError:
     HTTPX_AVAILABLE = False
+    OllamaTransport = None
     logger.warning("⚠️ httpx nicht verfügbar - Query Expansion arbeitet ohne Ollama")
 
 
@@ -84,9 +96,14 @@ class QueryExpansionConfig:
     ollama_base_url: str = "http://localhost:11434"
     timeout: float = 10.0  # Timeout in Sekunden
     
+    # Latenz-Budget: gemeinsame Deadline für alle (parallelen) Strategien
+    latency_budget_ms: Optional[float] = 1500.0  # None: nur Timeout je Call
+    
     # Caching
     enable_cache: bool = True
     cache_ttl: int = 3600  # Cache TTL in Sekunden
+    cache_max_entries: int = 2048  # LRU-Limit (Einträge)
+    cache_max_bytes: int = 16 * 1024 * 1024  # LRU-Limit (Bytes)
     
     # Fallback
     fallback_to_original: bool = True  # Original-Query als Fallback
@@ -140,8 +157,19 @@ class QueryExpander:
             config: Expansion-Konfiguration (optional)
         """
         self.config = config or QueryExpansionConfig()
-        self._cache: Dict[str, List[ExpandedQuery]] = {}
+        # Expansionen hängen nur von der Query ab, nicht vom Index
+        self._cache: QueryResultCache[List[ExpandedQuery]] = QueryResultCache(
+            name="query_expansion",
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes,
+            ttl=self.config.cache_ttl,
+            invalidate_on_reindex=False
+        )
         self._ollama_available = HTTPX_AVAILABLE
+        # Prozessweiter Verbindungs-Pool statt eines Clients je LLM-Call
+        self._transport: Optional[OllamaTransport] = (
+            get_ollama_transport(self.config.ollama_base_url) if HTTPX_AVAILABLE else None
+        )
         
         if not self._ollama_available:
             logger.warning(
@@ -153,7 +181,8 @@ class QueryExpander:
         self,
         query: str,
         num_expansions: Optional[int] = None,
-        strategies: Optional[List[ExpansionStrategy]] = None
+        strategies: Optional[List[ExpansionStrategy]] = None,
+        latency_budget_ms: Optional[float] = None
     ) -> List[ExpandedQuery]:
         """
         Expandiert Query in semantische Varianten.
@@ -162,18 +191,52 @@ class QueryExpander:
             query: Original-Suchanfrage
             num_expansions: Anzahl Varianten (default: config.num_expansions)
             strategies: Expansion-Strategien (default: config.strategies)
+            latency_budget_ms: Deadline in ms (default: config.latency_budget_ms;
+                ``float("inf")``: keine Deadline)
             
         Returns:
             Liste von ExpandedQuery-Objekten (inkl. Original)
         """
+        return [
+            variant async for variant in self.expand_iter(
+                query, num_expansions, strategies, latency_budget_ms
+            )
+        ]
+    
+    async def expand_iter(
+        self,
+        query: str,
+        num_expansions: Optional[int] = None,
+        strategies: Optional[List[ExpansionStrategy]] = None,
+        latency_budget_ms: Optional[float] = None
+    ) -> AsyncIterator[ExpandedQuery]:
+        """
+        Liefert Original und Varianten in Ankunftsreihenfolge.
+        
+        Das Original kommt sofort, jede Variante sobald ihre Strategie fertig
+        ist. Alle Strategien laufen parallel; nach Ablauf des Latenz-Budgets
+        werden noch laufende Calls abgebrochen und ihre Varianten verworfen.
+        Bricht der Konsument die Iteration ab, werden offene Calls ebenfalls
+        abgebrochen.
+        
+        Args: siehe expand()
+        """
         num_expansions = num_expansions or self.config.num_expansions
         strategies = strategies or self.config.strategies
+        if latency_budget_ms is None:
+            latency_budget_ms = self.config.latency_budget_ms
+        if latency_budget_ms is not None and math.isinf(latency_budget_ms):
+            latency_budget_ms = None
         
         # Cache-Check
         cache_key = self._get_cache_key(query, num_expansions, strategies)
-        if self.config.enable_cache and cache_key in self._cache:
-            logger.debug(f"💾 Query Expansion Cache-Hit: '{query[:50]}...'")
-            return self._cache[cache_key]
+        if self.config.enable_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"💾 Query Expansion Cache-Hit: '{query[:50]}...'")
+                for variant in cached:
+                    yield variant
+                return
         
         start_time = time.time()
         
@@ -186,37 +249,76 @@ class QueryExpander:
                 metadata={"source": "original"}
             )
         ]
+        yield expanded_queries[0]
         
         # LLM-Expansion nur wenn Ollama verfügbar
+        dropped = 0
+        complete = True
         if self._ollama_available:
+            loop = asyncio.get_running_loop()
+            deadline = (
+                loop.time() + latency_budget_ms / 1000.0
+                if latency_budget_ms is not None else None
+            )
+            pending = {
+                asyncio.create_task(self._expand_with_strategy(query, strategy))
+                for strategy in strategies[:num_expansions]
+            }
+            
             try:
-                # Für jede Strategie Varianten generieren
-                for strategy in strategies[:num_expansions]:
-                    variant = await self._expand_with_strategy(query, strategy)
-                    if variant and variant.text.strip() and variant.text != query:
-                        # Duplikat-Check
-                        if not any(eq.text.lower() == variant.text.lower() for eq in expanded_queries):
-                            expanded_queries.append(variant)
-                    
-                    # Limit erreicht?
-                    if len(expanded_queries) >= num_expansions + 1:  # +1 für Original
+                while pending and len(expanded_queries) < num_expansions + 1:  # +1 für Original
+                    remaining = None if deadline is None else deadline - loop.time()
+                    if remaining is not None and remaining <= 0:
                         break
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Query Expansion fehlgeschlagen: {e}")
-                if not self.config.fallback_to_original:
-                    raise
-        
-        # Cache speichern
-        if self.config.enable_cache:
-            self._cache[cache_key] = expanded_queries
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        try:
+                            variant = task.result()
+                        except Exception as e:
+                            logger.warning(f"⚠️ Query Expansion fehlgeschlagen: {e}")
+                            if not self.config.fallback_to_original:
+                                raise
+                            complete = False
+                            continue
+                        if variant is None:
+                            complete = False
+                            continue
+                        if self._accept_variant(variant, query, expanded_queries):
+                            expanded_queries.append(variant)
+                            yield variant
+            finally:
+                for task in pending:
+                    task.cancel()
+                dropped = len(pending)
         
         duration = (time.time() - start_time) * 1000
+        if dropped:
+            logger.info(
+                f"⏱️ Query Expansion: {dropped} Strategie(n) nach {duration:.0f}ms verworfen "
+                f"(Budget {latency_budget_ms:.0f}ms)"
+            )
+        
+        # Cache speichern (nur vollständige Ergebnisse)
+        if self.config.enable_cache and complete and not dropped:
+            self._cache.set(cache_key, expanded_queries)
+        
         logger.info(
             f"🔍 Query Expansion: '{query[:50]}...' → {len(expanded_queries)} Varianten ({duration:.0f}ms)"
         )
-        
-        return expanded_queries
+    
+    @staticmethod
+    def _accept_variant(
+        variant: ExpandedQuery,
+        query: str,
+        expanded_queries: List[ExpandedQuery]
+    ) -> bool:
+        """Leere Varianten, Original und Duplikate verwerfen."""
+        text = variant.text.strip()
+        if not text or variant.text == query:
+            return False
+        return not any(eq.text.lower() == variant.text.lower() for eq in expanded_queries)
     
     async def _expand_with_strategy(
         self,
@@ -301,8 +403,6 @@ class QueryExpander:
         if not HTTPX_AVAILABLE:
             raise RuntimeError("httpx nicht verfügbar - kann Ollama nicht aufrufen")
         
-        url = f"{self.config.ollama_base_url}/api/generate"
-        
         payload = {
             "model": self.config.model,
             "prompt": prompt,
@@ -314,17 +414,18 @@ class QueryExpander:
             }
         }
         
-        async with httpx.AsyncClient(timeout=self.config.timeout) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            variant = result.get("response", "").strip()
-            
-            # Cleanup: Entferne Anführungszeichen, Präfixe, etc.
-            variant = self._cleanup_variant(variant)
-            
-            return variant
+        result = await self._transport.post_json(
+            "/api/generate",
+            payload,
+            model=self.config.model,
+            timeout=self.config.timeout
+        )
+        variant = result.get("response", "").strip()
+        
+        # Cleanup: Entferne Anführungszeichen, Präfixe, etc.
+        variant = self._cleanup_variant(variant)
+        
+        return variant
     
     def _cleanup_variant(self, text: str) -> str:
         """Bereinigt LLM-Output."""
@@ -371,6 +472,7 @@ class QueryExpander:
         return {
             "ollama_available": self._ollama_available,
             "cache_size": len(self._cache),
+            "cache": self._cache.get_stats(),
             "config": {
                 "model": self.config.model,
                 "num_expansions": self.config.num_expansions,
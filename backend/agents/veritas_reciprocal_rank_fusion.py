@@ -79,6 +79,133 @@ class FusedDocument:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class IncrementalRRF:
+    """
+    Inkrementelle Reciprocal Rank Fusion.
+    
+    Nimmt Result-Listen einzeln entgegen (``add``) und liefert jederzeit das
+    aktuelle Ranking (``ranking``). Mehrere Listen desselben Retrievers
+    (z.B. je Query-Variante) werden aneinandergehängt - die Ränge laufen
+    weiter, wie bei einer konkatenierten Liste in ``fuse``. Nach dem Hinzufügen
+    aller Listen ist das Ranking identisch zu ``ReciprocalRankFusion.fuse``.
+    """
+    
+    def __init__(self, config: Optional[RRFConfig] = None):
+        self.config = config or RRFConfig()
+        self._scores: Dict[str, float] = {}
+        self._source_ranks: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._source_scores: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._sources: Dict[str, List[str]] = defaultdict(list)
+        self._contents: Dict[str, str] = {}
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._offsets: Dict[str, int] = {}  # retriever → bisher gesehene Ränge
+    
+    @property
+    def retrievers(self) -> List[str]:
+        """Retriever, deren Listen bereits eingegangen sind."""
+        return list(self._offsets)
+    
+    def __len__(self) -> int:
+        return len(self._scores)
+    
+    def add(
+        self,
+        retriever_name: str,
+        results: List[Any],
+        doc_id_field: str = "doc_id",
+        content_field: str = "content"
+    ) -> List[str]:
+        """
+        Akkumuliert eine Result-Liste.
+        
+        Args:
+            retriever_name: Name des Retrievers (für Weight & Source-Info)
+            results: Gerankte Docs (Dicts oder Dataclasses)
+            doc_id_field: Name des ID-Felds
+            content_field: Name des Content-Felds
+            
+        Returns:
+            IDs der Dokumente, die zum ersten Mal gesehen wurden
+        """
+        weight = 1.0
+        if self.config.weights and retriever_name in self.config.weights:
+            weight = self.config.weights[retriever_name]
+        
+        offset = self._offsets.get(retriever_name, 0)
+        new_ids = []
+        
+        for rank, doc in enumerate(results, start=offset):
+            # Extract doc_id & content
+            if isinstance(doc, dict):
+                doc_id = doc.get(doc_id_field)
+                content = doc.get(content_field, "")
+                original_score = doc.get("score", 0.0)
+                metadata = doc.get("metadata", {})
+            else:
+                # Dataclass/Object
+                doc_id = getattr(doc, doc_id_field, None)
+                content = getattr(doc, content_field, "")
+                original_score = getattr(doc, "score", 0.0)
+                metadata = getattr(doc, "metadata", {})
+            
+            if doc_id is None:
+                logger.warning(f"⚠️ Dokument ohne ID in {retriever_name} übersprungen")
+                continue
+            
+            # RRF-Score akkumulieren
+            if doc_id not in self._scores:
+                self._scores[doc_id] = 0.0
+                new_ids.append(doc_id)
+            self._scores[doc_id] += weight * (1.0 / (self.config.k + rank + 1))
+            
+            # Source-Informationen speichern
+            self._source_ranks[doc_id][retriever_name] = rank + 1  # 1-based
+            self._source_scores[doc_id][retriever_name] = original_score
+            
+            if retriever_name not in self._sources[doc_id]:
+                self._sources[doc_id].append(retriever_name)
+            
+            # Content & Metadata (erste Occurrence)
+            if doc_id not in self._contents:
+                self._contents[doc_id] = content
+                self._metadata[doc_id] = metadata
+        
+        self._offsets[retriever_name] = offset + len(results)
+        return new_ids
+    
+    def ranking(self, top_k: Optional[int] = None) -> List[FusedDocument]:
+        """
+        Aktuelles Top-K-Ranking nach RRF-Score.
+        
+        Args:
+            top_k: Anzahl Top-Dokumente (default: config.top_k)
+        """
+        top_k = top_k or self.config.top_k
+        
+        scores = self._scores.items()
+        # Filter: Minimale Anzahl Retriever
+        if self.config.min_retriever_results > 1:
+            scores = [
+                (doc_id, score) for doc_id, score in scores
+                if len(self._sources[doc_id]) >= self.config.min_retriever_results
+            ]
+        
+        sorted_docs = sorted(scores, key=lambda x: x[1], reverse=True)
+        
+        return [
+            FusedDocument(
+                doc_id=doc_id,
+                content=self._contents.get(doc_id, ""),
+                rrf_score=rrf_score,
+                source_scores=dict(self._source_scores[doc_id]),
+                source_ranks=dict(self._source_ranks[doc_id]),
+                sources=list(self._sources[doc_id]),
+                metadata=self._metadata.get(doc_id, {})
+            )
+            for doc_id, rrf_score in sorted_docs[:top_k]
+        ]
+
+
 class ReciprocalRankFusion:
     """
     Reciprocal Rank Fusion für Multi-Retriever-Kombination.
@@ -142,85 +269,11 @@ class ReciprocalRankFusion:
             ... }
             >>> fused = rrf.fuse(retriever_results)
         """
-        top_k = top_k or self.config.top_k
-        
-        # RRF-Scores berechnen
-        rrf_scores = defaultdict(float)
-        source_ranks = defaultdict(dict)
-        source_scores = defaultdict(dict)
-        sources = defaultdict(list)
-        doc_contents = {}  # doc_id → content
-        doc_metadata = {}  # doc_id → metadata
-        
+        fusion = self.incremental()
         for retriever_name, results in retriever_results.items():
-            # Weight für Retriever
-            weight = 1.0
-            if self.config.weights and retriever_name in self.config.weights:
-                weight = self.config.weights[retriever_name]
-            
-            for rank, doc in enumerate(results):
-                # Extract doc_id & content
-                if isinstance(doc, dict):
-                    doc_id = doc.get(doc_id_field)
-                    content = doc.get(content_field, "")
-                    original_score = doc.get("score", 0.0)
-                    metadata = doc.get("metadata", {})
-                else:
-                    # Dataclass/Object
-                    doc_id = getattr(doc, doc_id_field, None)
-                    content = getattr(doc, content_field, "")
-                    original_score = getattr(doc, "score", 0.0)
-                    metadata = getattr(doc, "metadata", {})
-                
-                if doc_id is None:
-                    logger.warning(f"⚠️ Dokument ohne ID in {retriever_name} übersprungen")
-                    continue
-                
-                # RRF-Score akkumulieren
-                rank_score = 1.0 / (self.config.k + rank + 1)
-                rrf_scores[doc_id] += weight * rank_score
-                
-                # Source-Informationen speichern
-                source_ranks[doc_id][retriever_name] = rank + 1  # 1-based
-                source_scores[doc_id][retriever_name] = original_score
-                
-                if retriever_name not in sources[doc_id]:
-                    sources[doc_id].append(retriever_name)
-                
-                # Content & Metadata (erste Occurrence)
-                if doc_id not in doc_contents:
-                    doc_contents[doc_id] = content
-                    doc_metadata[doc_id] = metadata
-        
-        # Filter: Minimale Anzahl Retriever
-        if self.config.min_retriever_results > 1:
-            rrf_scores = {
-                doc_id: score
-                for doc_id, score in rrf_scores.items()
-                if len(sources[doc_id]) >= self.config.min_retriever_results
-            }
+            fusion.add(retriever_name, results, doc_id_field, content_field)
         
-        # Sortiere nach RRF-Score
-        sorted_docs = sorted(
-            rrf_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
-        # Top-K extrahieren
-        fused_docs = []
-        for doc_id, rrf_score in sorted_docs[:top_k]:
-            fused_docs.append(
-                FusedDocument(
-                    doc_id=doc_id,
-                    content=doc_contents.get(doc_id, ""),
-                    rrf_score=rrf_score,
-                    source_scores=dict(source_scores[doc_id]),
-                    source_ranks=dict(source_ranks[doc_id]),
-                    sources=sources[doc_id],
-                    metadata=doc_metadata.get(doc_id, {})
-                )
-            )
+        fused_docs = fusion.ranking(top_k)
         
         logger.debug(
             f"🔀 RRF Fusion: {len(fused_docs)} Docs aus {len(retriever_results)} Retrievern "
@@ -229,6 +282,15 @@ class ReciprocalRankFusion:
         
         return fused_docs
     
+    def incremental(self) -> IncrementalRRF:
+        """
+        Erstellt einen inkrementellen Fusions-Zustand mit dieser Konfiguration.
+        
+        Für Pipelines, die Result-Listen verarbeiten, sobald sie eintreffen
+        (z.B. Re-Ranking startet nach dem ersten Retriever).
+        """
+        return IncrementalRRF(self.config)
+    
     def fuse_two(
         self,
         dense_results: List[Any],
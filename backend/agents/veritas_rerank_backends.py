@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+VERITAS RERANK BACKENDS
+=======================
+
+Austauschbare Scoring-Backends für den Cross-Encoder des
+``ReRankingService``.
+
+Backends:
+---------
+- ``CrossEncoderBackend``: sentence-transformers ``CrossEncoder``
+  (PyTorch, volle Präzision) - bisheriger Pfad und Fallback
+- ``OnnxCrossEncoderBackend``: dasselbe Modell als ONNX-Graph mit
+  dynamischer int8-Quantisierung, ausgeführt mit onnxruntime (CPU)
+
+ONNX-Export:
+------------
+Beim ersten Laden wird ``model_name`` über transformers/torch nach ONNX
+exportiert und mit ``onnxruntime.quantization.quantize_dynamic`` (int8
+Gewichte) quantisiert. Das Ergebnis liegt im Cache-Verzeichnis
+(``VERITAS_RERANK_ONNX_DIR``, default ``~/.cache/veritas/onnx``);
+Folgestarts laden nur noch Tokenizer + ONNX-Session (kein PyTorch nötig).
+
+Scores:
+-------
+Wie ``CrossEncoder.predict``: bei einem Output-Label Sigmoid über den
+Logits, sonst die Logits je Label (erste Spalte als Score).
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# onnxruntime + Tokenizer (optional - graceful degradation)
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+    logger.info("✅ ONNX Runtime verfügbar (Re-Ranking-Backend)")
+except ImportError:
+    ONNX_AVAILABLE = False
+    ort = None
+    AutoTokenizer = None
+
+Pair = Tuple[str, str]
+
+DEFAULT_ONNX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "veritas", "onnx")
+
+
+class ScoringBackend(ABC):
+    """Bewertet (query, passage)-Paare; blockierend (läuft im Worker-Thread)."""
+
+    name: str = "base"
+
+    @abstractmethod
+    def predict(self, pairs: Sequence[Pair]) -> List[float]:
+        """Ein Score je Paar (Reihenfolge wie ``pairs``)."""
+
+
+class CrossEncoderBackend(ScoringBackend):
+    """sentence-transformers ``CrossEncoder`` (PyTorch)."""
+
+    name = "torch"
+
+    def __init__(self, model: Any, batch_size: int = 32):
+        self.model = model
+        self.batch_size = batch_size
+
+    def predict(self, pairs: Sequence[Pair]) -> List[float]:
+        scores = self.model.predict(
+            [list(pair) for pair in pairs],
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return np.asarray(scores, dtype=np.float32).reshape(len(pairs), -1)[:, 0].tolist()
+
+
+def onnx_model_dir(model_name: str, cache_dir: Optional[str] = None) -> Path:
+    """Cache-Verzeichnis des exportierten Modells."""
+    base = cache_dir or os.getenv("VERITAS_RERANK_ONNX_DIR", DEFAULT_ONNX_DIR)
+    return Path(base) / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: Path,
+    quantize: bool = True,
+    opset: int = 14
+) -> Path:
+    """
+    Exportiert ein Sequence-Classification-Modell nach ONNX.
+
+    Args:
+        model_name: HuggingFace-Modellname oder lokaler Pfad
+        output_dir: Zielverzeichnis (Tokenizer + model.onnx [+ model.int8.onnx])
+        quantize: Dynamische int8-Quantisierung der Gewichte
+        opset: ONNX-Opset
+
+    Returns:
+        Pfad des zu ladenden ONNX-Modells
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / "model.onnx"
+    int8_path = output_dir / "model.int8.onnx"
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(str(output_dir))
+
+    if not fp32_path.exists():
+        logger.info(f"📦 Exportiere {model_name} nach ONNX (opset {opset})")
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+
+        sample = tokenizer([["query", "passage"]], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        tmp_path = fp32_path.with_suffix(".tmp")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                str(tmp_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+            )
+        os.replace(tmp_path, fp32_path)
+
+    if not quantize:
+        return fp32_path
+
+    if not int8_path.exists():
+        logger.info("🗜️ Quantisiere ONNX-Modell (dynamisch, int8)")
+        tmp_path = int8_path.with_suffix(".tmp")
+        quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+
+    return int8_path
+
+
+class OnnxCrossEncoderBackend(ScoringBackend):
+    """Cross-Encoder als (int8-quantisierter) ONNX-Graph in onnxruntime."""
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        max_length: int = 512,
+        batch_size: int = 32,
+        quantize: bool = True,
+        cache_dir: Optional[str] = None,
+        num_threads: int = 0
+    ):
+        if not ONNX_AVAILABLE:
+            raise RuntimeError("onnxruntime/transformers nicht installiert")
+
+        self.model_name = model_name
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.model_dir = onnx_model_dir(model_name, cache_dir)
+
+        model_path = self.model_dir / ("model.int8.onnx" if quantize else "model.onnx")
+        if not model_path.exists():
+            model_path = export_onnx_model(model_name, self.model_dir, quantize=quantize)
+        self.model_path = model_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {node.name for node in self.session.get_inputs()}
+        if quantize:
+            self.name = "onnx-int8"
+
+    def predict(self, pairs: Sequence[Pair]) -> List[float]:
+        scores: List[float] = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                [pair[0] for pair in batch],
+                [pair[1] for pair in batch],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            inputs = {
+                name: value.astype(np.int64)
+                for name, value in encoded.items()
+                if name in self._input_names
+            }
+            logits = self.session.run(None, inputs)[0]
+            if logits.ndim == 1 or logits.shape[1] == 1:
+                values = 1.0 / (1.0 + np.exp(-logits.reshape(-1)))
+            else:
+                values = logits[:, 0]
+            scores.extend(values.astype(np.float32).tolist())
+        return scores
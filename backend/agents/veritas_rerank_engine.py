@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+VERITAS RERANK ENGINE
+=====================
+
+Nicht-blockierende Cross-Encoder-Inferenz mit dynamischem Micro-Batching
+über Requests hinweg.
+
+Problem:
+--------
+``ReRankingService.rerank_documents`` ist ``async``, rief aber
+``CrossEncoder.predict`` synchron im Event-Loop auf. Ein Re-Ranking von
+50 Kandidaten blockierte damit alle anderen Requests des FastAPI-Workers.
+
+Lösung:
+-------
+1. Inferenz läuft in einem dedizierten Worker-Thread (PyTorch/ONNX geben
+   den GIL während der Matrix-Operationen frei)
+2. (query, passage)-Paare gleichzeitiger Requests werden zu gemeinsamen
+   Micro-Batches zusammengeführt:
+   - begrenzt durch ``max_batch_size`` (Paare je Inferenz-Aufruf)
+   - begrenzt durch ``max_wait_ms`` (Wartezeit ab dem ersten Paar im Batch)
+3. Scores werden an die Futures der einzelnen Aufrufer verteilt
+   (``loop.call_soon_threadsafe``) - funktioniert für beliebige Event-Loops
+4. Statistiken: Queue-Tiefe und Batch-Größen als Histogramme
+
+Verwendung:
+-----------
+engine = MicroBatchRerankEngine(predict_fn)
+scores = await engine.score([(query, passage), ...])
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Pair = Tuple[str, str]
+PredictFn = Callable[[List[Pair]], Sequence[float]]
+
+# Histogramm-Buckets (obere Grenzen, inklusive)
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+@dataclass
+class RerankEngineConfig:
+    """Konfiguration für das Micro-Batching"""
+
+    max_batch_size: int = 64  # Max. Paare je Inferenz-Aufruf
+    max_wait_ms: float = 5.0  # Max. Wartezeit auf weitere Paare (ab erstem Paar)
+    thread_name: str = "veritas-rerank"
+
+
+class _Histogram:
+    """Einfaches Histogramm mit festen Buckets (Potenzen von 2)."""
+
+    def __init__(self, buckets: Tuple[int, ...] = HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # letzter Bucket: Überlauf
+        self.total = 0
+        self.count = 0
+        self.max = 0
+
+    def observe(self, value: int) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class _Request:
+    """Ein Teil-Request (<= max_batch_size Paare) mit Future des Aufrufers."""
+
+    __slots__ = ("pairs", "future", "loop", "enqueued_at")
+
+    def __init__(self, pairs: List[Pair], future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.pairs = pairs
+        self.future = future
+        self.loop = loop
+        self.enqueued_at = time.perf_counter()
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """Setzt das Ergebnis im Loop des Aufrufers (abgebrochene Futures ignorieren)."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class MicroBatchRerankEngine:
+    """
+    Worker-Thread, der Paare gleichzeitiger Requests zu Micro-Batches bündelt.
+
+    Ein Batch wird ausgeführt, sobald ``max_batch_size`` Paare anliegen oder
+    ``max_wait_ms`` seit dem ersten wartenden Paar vergangen sind. Requests
+    werden nicht über Batches hinweg zerteilt - größere Requests werden beim
+    Einreihen in Teil-Requests zu je ``max_batch_size`` Paaren aufgeteilt.
+    """
+
+    def __init__(self, predict_fn: PredictFn, config: Optional[RerankEngineConfig] = None):
+        self.predict_fn = predict_fn
+        self.config = config or RerankEngineConfig()
+
+        self._pending: Deque[_Request] = deque()
+        self._pending_pairs = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistiken
+        self._batch_sizes = _Histogram()
+        self._queue_depths = _Histogram()
+        self._requests = 0
+        self._pairs = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._total_inference = 0.0
+
+    # ------------------------------------------------------------------
+    # Öffentliche API
+    # ------------------------------------------------------------------
+
+    async def score(self, pairs: Sequence[Pair]) -> List[float]:
+        """
+        Bewertet (query, passage)-Paare im Worker-Thread.
+
+        Args:
+            pairs: Paare eines Requests
+
+        Returns:
+            Ein Score je Paar (Reihenfolge wie ``pairs``)
+
+        Raises:
+            RuntimeError: Wenn die Engine geschlossen ist
+        """
+        if not pairs:
+            return []
+
+        loop = asyncio.get_running_loop()
+        size = max(1, self.config.max_batch_size)
+        futures = []
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Rerank-Engine ist geschlossen")
+            self._ensure_worker()
+            for offset in range(0, len(pairs), size):
+                chunk = [tuple(pair) for pair in pairs[offset:offset + size]]
+                future = loop.create_future()
+                self._pending.append(_Request(chunk, future, loop))
+                self._pending_pairs += len(chunk)
+                futures.append(future)
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._pending_pairs)
+            self._condition.notify()
+
+        try:
+            results = await asyncio.gather(*futures)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return [score for chunk_scores in results for score in chunk_scores]
+
+    @property
+    def queue_depth(self) -> int:
+        """Aktuell wartende Paare."""
+        return self._pending_pairs
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stoppt den Worker; wartende Requests schlagen mit RuntimeError fehl."""
+        with self._condition:
+            self._closed = True
+            pending = list(self._pending)
+            self._pending.clear()
+            self._pending_pairs = 0
+            self._condition.notify_all()
+            thread = self._thread
+
+        error = RuntimeError("Rerank-Engine wurde geschlossen")
+        for request in pending:
+            self._dispatch(request, error=error)
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gibt Engine-Statistiken zurück (inkl. Histogramme)."""
+        batches = max(1, self._batches)
+        return {
+            "max_batch_size": self.config.max_batch_size,
+            "max_wait_ms": self.config.max_wait_ms,
+            "worker_alive": bool(self._thread and self._thread.is_alive()),
+            "queue_depth": self._pending_pairs,
+            "max_queue_depth": self._max_queue_depth,
+            "requests": self._requests,
+            "pairs": self._pairs,
+            "batches": self._batches,
+            "errors": self._errors,
+            "avg_pairs_per_batch": self._pairs / batches,
+            "avg_wait_ms": self._total_wait / max(1, self._pairs) * 1000,
+            "avg_inference_ms": self._total_inference / batches * 1000,
+            "batch_size_histogram": self._batch_sizes.to_dict(),
+            "queue_depth_histogram": self._queue_depths.to_dict(),
+        }
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        """Startet den Worker-Thread bei Bedarf (unter ``_condition``)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=self.config.thread_name, daemon=True
+            )
+            self._thread.start()
+
+    def _next_batch(self) -> Optional[List[_Request]]:
+        """Wartet auf das erste Paar und füllt den Batch bis Größe oder Deadline."""
+        max_size = max(1, self.config.max_batch_size)
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+
+            deadline = self._pending[0].enqueued_at + self.config.max_wait_ms / 1000
+            while self._pending_pairs < max_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._closed:
+                return None
+
+            # Queue-Tiefe beim Dispatch (inkl. des entstehenden Batches)
+            self._queue_depths.observe(self._pending_pairs)
+
+            batch: List[_Request] = []
+            batch_pairs = 0
+            while self._pending:
+                request = self._pending[0]
+                if batch and batch_pairs + len(request.pairs) > max_size:
+                    break
+                self._pending.popleft()
+                self._pending_pairs -= len(request.pairs)
+                if request.future.cancelled():
+                    continue
+                batch.append(request)
+                batch_pairs += len(request.pairs)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+
+            pairs = [pair for request in batch for pair in request.pairs]
+            started = time.perf_counter()
+            try:
+                scores = list(self.predict_fn(pairs))
+                if len(scores) != len(pairs):
+                    raise ValueError(
+                        f"predict_fn lieferte {len(scores)} Scores für {len(pairs)} Paare"
+                    )
+            except Exception as e:
+                logger.error(f"❌ Rerank-Batch fehlgeschlagen ({len(pairs)} Paare): {e}")
+                self._errors += 1
+                for request in batch:
+                    self._dispatch(request, error=e)
+                continue
+            finally:
+                finished = time.perf_counter()
+                self._batches += 1
+                self._pairs += len(pairs)
+                self._batch_sizes.observe(len(pairs))
+                self._total_inference += finished - started
+                self._total_wait += sum(
+                    (started - request.enqueued_at) * len(request.pairs) for request in batch
+                )
+
+            offset = 0
+            for request in batch:
+                size = len(request.pairs)
+                self._dispatch(request, result=[float(s) for s in scores[offset:offset + size]])
+                offset += size
+
+    @staticmethod
+    def _dispatch(
+        request: _Request,
+        result: Optional[List[float]] = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        try:
+            request.loop.call_soon_threadsafe(_resolve, request.future, result, error)
+        except RuntimeError:
+            # Loop des Aufrufers bereits geschlossen
+            pass
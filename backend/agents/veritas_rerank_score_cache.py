@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+VERITAS RERANK SCORE CACHE
+==========================
+
+Persistenter Cache für Cross-Encoder-Scores je (Query, Passage)-Paar.
+
+Problem:
+--------
+Der bisherige Cache des ``ReRankingService`` hashte die Query zusammen mit
+der geordneten Liste aller Kandidaten-IDs. Jede Änderung der Kandidaten
+(ein zusätzlicher BM25-Treffer) war ein vollständiger Miss - alle 50 Paare
+wurden neu bewertet.
+
+Lösung:
+-------
+- Schlüssel je Paar: (Namespace, Hash der normalisierten Query,
+  Hash des bewerteten Passage-Texts)
+- Namespace = Modell + Backend + max_length: Scores verschiedener Modelle
+  oder Quantisierungen werden nie vermischt
+- Content-adressiert: geänderter Chunk-Text → neuer Hash, kein
+  Invalidieren bei Re-Index nötig
+- SQLite-Store (WAL, ``KeyedBlobStore``), überlebt Neustarts; Follow-up-Fragen einer
+  Konversation treffen dieselben Chunks
+- Begrenzte Größe: alle ``prune_every`` Schreibvorgänge werden abgelaufene
+  Scores gelöscht und die ältesten Einträge über ``max_rows`` verdrängt
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import struct
+import unicodedata
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from backend.agents.veritas_blob_store import KeyedBlobStore
+
+logger = logging.getLogger(__name__)
+
+PairKey = Tuple[str, str]  # (query_hash, chunk_hash)
+
+_SCORE = struct.Struct("<d")
+
+
+def normalize_query(query: str) -> str:
+    """Unicode-NFC, casefold, Whitespace zusammengefasst."""
+    return " ".join(unicodedata.normalize("NFC", query).casefold().split())
+
+
+def text_hash(text: str) -> str:
+    """Kompakter Content-Hash (BLAKE2b, 128 Bit)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def pair_key(query: str, passage: str) -> PairKey:
+    """Cache-Schlüssel eines (Query, Passage)-Paars."""
+    return text_hash(normalize_query(query)), text_hash(passage)
+
+
+def _store_key(key: PairKey) -> str:
+    return f"{key[0]}:{key[1]}"
+
+
+class RerankScoreStore:
+    """
+    Score-Cache: (Namespace, Query-Hash, Chunk-Hash) → Score.
+
+    Dünne Schicht über ``KeyedBlobStore`` (Score als float64-BLOB).
+    Thread-sicher; der ``ReRankingService`` ruft ihn über
+    ``asyncio.to_thread`` auf.
+    """
+
+    TABLE = "rerank_score_blobs"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_rows: Optional[int] = 1_000_000,
+        prune_every: int = 64,
+    ):
+        """
+        Args:
+            path: SQLite-Datei (None: In-Memory-Datenbank)
+            ttl: Max. Alter eines Scores in Sekunden (None: unbegrenzt)
+            max_rows: Max. Anzahl Scores (None: unbegrenzt), älteste zuerst verdrängt
+            prune_every: Aufräumen nach jedem n-ten ``put_many``
+        """
+        self._store = KeyedBlobStore(
+            path, table=self.TABLE, ttl=ttl, max_rows=max_rows, prune_every=prune_every
+        )
+        self.path = self._store.path
+        self.ttl = ttl
+        self.max_rows = max_rows
+
+    def get_many(self, namespace: str, keys: Sequence[PairKey]) -> Dict[PairKey, float]:
+        """Liefert gecachte Scores für ``keys`` (fehlende fehlen im Dict)."""
+        by_key = {_store_key(key): key for key in keys}
+        found = self._store.get_many(namespace, list(by_key))
+        return {by_key[key]: _SCORE.unpack(value)[0] for key, value in found.items()}
+
+    def put_many(self, namespace: str, scores: Dict[PairKey, float]) -> None:
+        """Speichert Scores (überschreibt vorhandene Einträge)."""
+        self._store.put_many(
+            namespace, {_store_key(key): _SCORE.pack(float(score)) for key, score in scores.items()}
+        )
+
+    def prune(self) -> int:
+        """Löscht abgelaufene und überzählige Scores. Returns: Anzahl."""
+        return self._store.prune()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Löscht Einträge (alle oder eines Namespaces). Returns: Anzahl."""
+        return self._store.clear(namespace)
+
+    def close(self) -> None:
+        self._store.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._store.get_stats()
@@ -28,11 +28,23 @@ Version: 1.0
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
+from backend.agents.veritas_query_cache import QueryResultCache
+from backend.agents.veritas_rerank_backends import (
+    ONNX_AVAILABLE,
+    CrossEncoderBackend,
+    OnnxCrossEncoderBackend,
+    ScoringBackend,
+)
+from backend.agents.veritas_rerank_engine import MicroBatchRerankEngine, RerankEngineConfig
+from backend.agents.veritas_rerank_score_cache import PairKey, RerankScoreStore, pair_key
+
 logger = logging.getLogger(__name__)
 
 # Cross-Encoder Import (optional - graceful degradation)
@@ -53,6 +65,14 @@ class ReRankingConfig:
     # Modell-Konfiguration
     model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     
+    # Scoring-Backend: "torch" (CrossEncoder, Default), "onnx" (onnxruntime),
+    # "auto" (ONNX wenn installiert, sonst torch). ONNX nur auf Anforderung,
+    # Fehler → Fallback auf torch
+    backend: str = "torch"
+    onnx_quantize: bool = True  # Dynamische int8-Quantisierung
+    onnx_cache_dir: Optional[str] = None  # Default: VERITAS_RERANK_ONNX_DIR
+    onnx_num_threads: int = 0  # 0: onnxruntime-Default
+    
     # Re-Ranking-Parameter
     top_k: int = 5  # Top-K Dokumente nach Re-Ranking
     initial_k: int = 20  # Initial abgerufene Dokumente
@@ -65,9 +85,20 @@ class ReRankingConfig:
     min_score: float = 0.0  # Minimaler Re-Ranking-Score
     score_threshold: Optional[float] = None  # Optionaler Score-Cutoff
     
-    # Cache-Einstellungen
-    enable_cache: bool = False  # Cache für wiederholte Queries
-    cache_ttl: int = 3600  # Cache Time-To-Live in Sekunden
+    # Cache-Einstellungen: Score je (normalisierte Query, Chunk-Hash)
+    enable_cache: bool = True  # Nur ungesehene Paare werden bewertet
+    cache_ttl: Optional[int] = None  # Max. Alter eines Scores (None: unbegrenzt)
+    cache_max_entries: int = 50_000  # LRU-Limit im Speicher (Paare)
+    cache_max_bytes: int = 16 * 1024 * 1024  # LRU-Limit im Speicher (Bytes)
+    cache_path: Optional[str] = field(
+        default_factory=lambda: os.getenv("VERITAS_RERANK_CACHE_PATH")
+    )  # SQLite-Store (None: nur In-Memory, geht bei Neustart verloren)
+    cache_store_max_rows: Optional[int] = 1_000_000  # Limit des SQLite-Stores (Paare)
+    
+    # Micro-Batching (Inferenz im Worker-Thread, Paare mehrerer Requests gebündelt)
+    enable_micro_batching: bool = True
+    micro_batch_max_pairs: int = 64  # Max. Paare je Inferenz-Aufruf
+    micro_batch_max_wait_ms: float = 5.0  # Max. Wartezeit auf weitere Requests
 
 
 class ReRankingService:
@@ -106,11 +137,32 @@ class ReRankingService:
         """
         self.config = config or ReRankingConfig()
         self.model: Optional[CrossEncoder] = None
-        self._cache: Dict[str, List[Tuple[str, float]]] = {}
+        self.backend: Optional[ScoringBackend] = None
+        # Schlüssel enthält den Chunk-Hash → Re-Index erfordert kein Leeren
+        self._cache: QueryResultCache[float] = QueryResultCache(
+            name="reranking",
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes,
+            ttl=self.config.cache_ttl,
+            invalidate_on_reindex=False
+        )
+        self._score_store: Optional[RerankScoreStore] = None
+        if self.config.enable_cache and self.config.cache_path:
+            try:
+                self._score_store = RerankScoreStore(
+                    self.config.cache_path,
+                    ttl=self.config.cache_ttl,
+                    max_rows=self.config.cache_store_max_rows
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Re-Ranking-Score-Store nicht verfügbar: {e}")
+        self._pairs_requested = 0
+        self._pairs_scored = 0
         self._model_loaded = False
+        self._engine: Optional[MicroBatchRerankEngine] = None
         
         # Modell laden wenn verfügbar
-        if CROSS_ENCODER_AVAILABLE:
+        if CROSS_ENCODER_AVAILABLE or (ONNX_AVAILABLE and self.config.backend != "torch"):
             try:
                 self._load_model()
             except Exception as e:
@@ -120,22 +172,50 @@ class ReRankingService:
             logger.warning("⚠️ Re-Ranking deaktiviert - Cross-Encoder nicht verfügbar")
     
     def _load_model(self) -> None:
-        """Lädt Cross-Encoder-Modell."""
-        logger.info(f"📥 Lade Cross-Encoder-Modell: {self.config.model_name}")
+        """Lädt Cross-Encoder-Modell (ONNX-Backend mit Fallback auf PyTorch)."""
+        logger.info(f"📥 Lade Cross-Encoder-Modell: {self.config.model_name} (Backend: {self.config.backend})")
         start_time = time.time()
         
-        self.model = CrossEncoder(
-            self.config.model_name,
-            max_length=self.config.max_length
-        )
+        if self.config.backend in ("onnx", "auto") and ONNX_AVAILABLE:
+            try:
+                self.backend = OnnxCrossEncoderBackend(
+                    self.config.model_name,
+                    max_length=self.config.max_length,
+                    batch_size=self.config.batch_size,
+                    quantize=self.config.onnx_quantize,
+                    cache_dir=self.config.onnx_cache_dir,
+                    num_threads=self.config.onnx_num_threads
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ ONNX-Backend nicht ladbar - Fallback auf PyTorch: {e}")
+        elif self.config.backend == "onnx":
+            logger.warning("⚠️ ONNX-Backend angefordert, onnxruntime fehlt - Fallback auf PyTorch")
+        
+        if self.backend is None:
+            if not CROSS_ENCODER_AVAILABLE:
+                raise RuntimeError("Kein Scoring-Backend verfügbar (sentence-transformers fehlt)")
+            self.model = CrossEncoder(
+                self.config.model_name,
+                max_length=self.config.max_length
+            )
+            self.backend = CrossEncoderBackend(self.model, batch_size=self.config.batch_size)
         
         load_time = time.time() - start_time
         self._model_loaded = True
-        logger.info(f"✅ Cross-Encoder geladen in {load_time:.2f}s")
+        
+        if self.config.enable_micro_batching:
+            self._engine = MicroBatchRerankEngine(
+                self._predict_pairs,
+                RerankEngineConfig(
+                    max_batch_size=self.config.micro_batch_max_pairs,
+                    max_wait_ms=self.config.micro_batch_max_wait_ms
+                )
+            )
+        logger.info(f"✅ Cross-Encoder geladen in {load_time:.2f}s (Backend: {self.backend.name})")
     
     def is_available(self) -> bool:
         """Prüft ob Re-Ranking verfügbar ist."""
-        return CROSS_ENCODER_AVAILABLE and self._model_loaded
+        return self._model_loaded and self.backend is not None
     
     async def rerank_documents(
         self,
@@ -169,15 +249,9 @@ class ReRankingService:
         top_k = top_k or self.config.top_k
         start_time = time.time()
         
-        # Cache-Check
-        cache_key = self._get_cache_key(query, [doc.get('id', '') for doc in documents])
-        if self.config.enable_cache and cache_key in self._cache:
-            logger.debug(f"💾 Cache-Hit für Query: {query[:50]}...")
-            return self._apply_cached_ranking(documents, self._cache[cache_key], top_k)
-        
-        # Cross-Encoder-Scoring
+        # Cross-Encoder-Scoring (gecachte Paare werden nicht neu bewertet)
         try:
-            scores = self._compute_relevance_scores(query, documents)
+            scores = await self._ascore(query, documents)
             
             # Dokumente mit Scores kombinieren
             doc_score_pairs = list(zip(documents, scores))
@@ -201,10 +275,6 @@ class ReRankingService:
                     doc['rerank_rank'] = len(top_docs) + 1
                 top_docs.append(doc)
             
-            # Cache aktualisieren
-            if self.config.enable_cache:
-                self._cache[cache_key] = [(doc.get('id', ''), score) for doc, score in doc_score_pairs]
-            
             # Metriken loggen
             duration_ms = (time.time() - start_time) * 1000
             logger.info(
@@ -226,6 +296,95 @@ class ReRankingService:
             # Fallback auf ursprüngliche Reihenfolge
             return documents[:top_k]
     
+    async def score_documents(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]]
+    ) -> List[float]:
+        """
+        Berechnet Cross-Encoder-Scores ohne Sortierung.
+
+        Die Inferenz läuft in einem Worker-Thread, damit Aufrufer (z.B. die
+        Pipeline in ``HybridRetriever``) parallel weiterarbeiten können.
+
+        Args:
+            query: Suchanfrage
+            documents: Dokumente mit 'id', 'title', 'snippet'/'content'
+
+        Returns:
+            Ein Score je Dokument (Reihenfolge wie ``documents``)
+
+        Raises:
+            RuntimeError: Wenn Re-Ranking nicht verfügbar ist
+        """
+        if not self.is_available():
+            raise RuntimeError("Re-Ranking nicht verfügbar")
+        if not documents:
+            return []
+        return await self._ascore(query, documents)
+    
+    async def _ascore(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]]
+    ) -> List[float]:
+        """
+        Scoring außerhalb des Event-Loops mit Score-Cache je Paar.
+        
+        Ablauf: In-Memory-LRU → SQLite-Store → Cross-Encoder nur für
+        ungesehene Paare (Duplikate im Request einmal bewertet).
+        """
+        pairs = self._build_pairs(query, documents)
+        self._pairs_requested += len(pairs)
+        if not self.config.enable_cache:
+            self._pairs_scored += len(pairs)
+            return await self._score_pairs(pairs)
+        
+        namespace = self._score_namespace()
+        keys = [pair_key(q, passage) for q, passage in pairs]
+        scores: Dict[PairKey, float] = {}
+        for key in keys:
+            value = self._cache.get((namespace, key))
+            if value is not None:
+                scores[key] = value
+        
+        missing = list(dict.fromkeys(key for key in keys if key not in scores))
+        if missing and self._score_store is not None:
+            stored = await asyncio.to_thread(self._score_store.get_many, namespace, missing)
+            for key, value in stored.items():
+                scores[key] = value
+                self._cache.set((namespace, key), value)
+            missing = [key for key in missing if key not in stored]
+        
+        if missing:
+            pair_by_key = dict(zip(keys, pairs))
+            new_scores = await self._score_pairs([pair_by_key[key] for key in missing])
+            fresh = dict(zip(missing, (float(v) for v in new_scores)))
+            self._pairs_scored += len(fresh)
+            for key, value in fresh.items():
+                scores[key] = value
+                self._cache.set((namespace, key), value)
+            if self._score_store is not None:
+                await asyncio.to_thread(self._score_store.put_many, namespace, fresh)
+        
+        return [scores[key] for key in keys]
+    
+    async def _score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Cross-Encoder außerhalb des Event-Loops.
+        
+        Mit Micro-Batching über die Engine (Paare gleichzeitiger Requests
+        teilen sich Inferenz-Aufrufe), sonst je Request in einem Worker-Thread.
+        """
+        if self._engine is not None:
+            return await self._engine.score(pairs)
+        return await asyncio.to_thread(self._predict_pairs, pairs)
+    
+    def _score_namespace(self) -> str:
+        """Cache-Namespace: Scores verschiedener Modelle/Backends nie mischen."""
+        backend = self.backend.name if self.backend else "-"
+        return f"{self.config.model_name}|{backend}|{self.config.max_length}"
+
     def _compute_relevance_scores(
         self,
         query: str,
@@ -241,21 +400,19 @@ class ReRankingService:
         Returns:
             Liste von Relevanz-Scores (ein Score pro Dokument)
         """
-        # Query-Document-Paare erstellen
-        pairs = []
-        for doc in documents:
-            # Text aus verschiedenen Feldern extrahieren
-            doc_text = self._extract_document_text(doc)
-            pairs.append([query, doc_text])
-        
-        # Batch-Prediction mit Cross-Encoder
-        scores = self.model.predict(
-            pairs,
-            batch_size=self.config.batch_size,
-            show_progress_bar=False
-        )
-        
-        return scores.tolist()
+        return self._predict_pairs(self._build_pairs(query, documents))
+    
+    def _build_pairs(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]]
+    ) -> List[Tuple[str, str]]:
+        """Erstellt Query-Document-Paare (Text aus verschiedenen Feldern)."""
+        return [(query, self._extract_document_text(doc)) for doc in documents]
+    
+    def _predict_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Batch-Prediction mit dem Scoring-Backend (blockierend)."""
+        return self.backend.predict(pairs)
     
     def _extract_document_text(self, doc: Dict[str, Any]) -> str:
         """
@@ -299,36 +456,19 @@ class ReRankingService:
         # Letzter Fallback
         return doc.get('id', 'Untitled Document')
     
-    def _get_cache_key(self, query: str, doc_ids: List[str]) -> str:
-        """Erstellt Cache-Key aus Query und Dokument-IDs."""
-        import hashlib
-        key_str = f"{query}:{','.join(sorted(doc_ids))}"
-        return hashlib.md5(key_str.encode()).hexdigest()
-    
-    def _apply_cached_ranking(
-        self,
-        documents: List[Dict[str, Any]],
-        cached_scores: List[Tuple[str, float]],
-        top_k: int
-    ) -> List[Dict[str, Any]]:
-        """Wendet gecachtes Ranking auf Dokumente an."""
-        # Dokumente nach ID indexieren
-        doc_by_id = {doc.get('id', ''): doc for doc in documents}
-        
-        # Nach gecachten Scores sortieren
-        ranked_docs = []
-        for doc_id, score in cached_scores[:top_k]:
-            if doc_id in doc_by_id:
-                doc = doc_by_id[doc_id].copy()
-                doc['rerank_score'] = score
-                doc['rerank_rank'] = len(ranked_docs) + 1
-                ranked_docs.append(doc)
-        
-        return ranked_docs
+    def close(self) -> None:
+        """Stoppt den Inferenz-Worker und schließt den Score-Store."""
+        if self._engine is not None:
+            self._engine.close()
+        if self._score_store is not None:
+            self._score_store.close()
+            self._score_store = None
     
     def clear_cache(self) -> None:
-        """Leert den Re-Ranking-Cache."""
+        """Leert den Re-Ranking-Cache (Speicher und Store)."""
         self._cache.clear()
+        if self._score_store is not None:
+            self._score_store.clear()
         logger.info("🗑️ Re-Ranking-Cache geleert")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -336,8 +476,14 @@ class ReRankingService:
         return {
             "available": self.is_available(),
             "model_name": self.config.model_name if self._model_loaded else None,
+            "backend": self.backend.name if self.backend else None,
             "cache_enabled": self.config.enable_cache,
             "cache_size": len(self._cache),
+            "cache": self._cache.get_stats(),
+            "score_store": self._score_store.get_stats() if self._score_store else None,
+            "pairs_requested": self._pairs_requested,
+            "pairs_scored": self._pairs_scored,
+            "engine": self._engine.get_stats() if self._engine else None,
             "config": {
                 "top_k": self.config.top_k,
                 "initial_k": self.config.initial_k,
@@ -26,24 +26,29 @@ Version: 1.0
 
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import numpy as np
 
+from backend.agents.veritas_bm25_index import BM25InvertedIndex
+from backend.agents.veritas_query_cache import QueryResultCache, notify_reindex
+
 logger = logging.getLogger(__name__)
 
-# BM25 Import (optional - graceful degradation)
+# BM25 Import (optional - Referenz-Implementierung, linearer Scan)
 try:
     from rank_bm25 import BM25Okapi
     BM25_AVAILABLE = True
-    logger.info("✅ rank_bm25 verfügbar - Sparse Retrieval aktiv")
+    logger.info("✅ rank_bm25 verfügbar - Legacy-Scan als Fallback aktiv")
 except ImportError:
     BM25_AVAILABLE = False
     BM25Okapi = None
-    logger.warning("⚠️ rank_bm25 nicht installiert - Sparse Retrieval deaktiviert")
-    logger.warning("   Installation: pip install rank-bm25")
+    logger.info("ℹ️ rank_bm25 nicht installiert - nur nativer Inverted Index verfügbar")
 
 
 @dataclass
@@ -54,6 +59,19 @@ class SparseRetrievalConfig:
     k1: float = 1.5  # Term frequency saturation (default: 1.5, range: 1.2-2.0)
     b: float = 0.75  # Document length normalization (default: 0.75, range: 0-1)
     
+    # Index-Backend
+    use_inverted_index: bool = True  # Nativer Inverted Index (False: rank_bm25 Linear-Scan)
+    max_segments: int = 8  # Segment-Merge ab dieser Segmentanzahl
+    background_merge: bool = True  # Segment-Merges im Hintergrund-Thread
+    
+    # Persistenz (memory-mapped On-Disk-Index)
+    index_path: Optional[str] = field(
+        default_factory=lambda: os.getenv("VERITAS_BM25_INDEX_PATH")
+    )  # Index-Verzeichnis (None: nur In-Memory)
+    mmap_index: bool = True  # Gespeicherten Index per mmap laden (shared Pages)
+    persist_on_update: bool = True  # Änderungen automatisch unter index_path speichern (gebündelt)
+    persist_delay: float = 30.0  # Sammelzeit bis zum Speichern (s) - ein Snapshot je Intervall
+    
     # Retrieval-Parameter
     top_k: int = 50  # Top-K Dokumente
     
@@ -65,6 +83,8 @@ class SparseRetrievalConfig:
     # Cache
     enable_cache: bool = True  # Query-Cache
     cache_ttl: int = 3600  # Cache Time-To-Live (Sekunden)
+    cache_max_entries: int = 1024  # LRU-Limit (Einträge)
+    cache_max_bytes: int = 64 * 1024 * 1024  # LRU-Limit (Bytes)
 
 
 @dataclass
@@ -105,7 +125,8 @@ class SparseRetriever:
     Performance:
     -----------
     - Indexing: O(N * M) wobei N=Docs, M=Avg-Tokens
-    - Retrieval: O(N) (linear scan, kann mit Inverted Index optimiert werden)
+    - Retrieval: O(Σ Postings der Query-Terme) via BM25InvertedIndex
+      (rank_bm25-Fallback: O(N) linear scan)
     - Memory: ~100-200 bytes pro Dokument (tokenized)
     """
     
@@ -121,19 +142,37 @@ class SparseRetriever:
         """
         self.config = config or SparseRetrievalConfig()
         self.bm25: Optional[BM25Okapi] = None
-        self.corpus: List[str] = []
-        self.doc_ids: List[str] = []
-        self.tokenized_corpus: List[List[str]] = []
+        self.index: Optional[BM25InvertedIndex] = None
+        self.corpus: Sequence[Optional[str]] = []  # Content je Slot (None = gelöscht)
+        self.doc_ids: Sequence[str] = []  # Doc-ID je Slot
+        self.tokenized_corpus: List[List[str]] = []  # Nur rank_bm25-Backend
+        self._slot_by_id: Optional[Dict[str, int]] = {}  # doc_id → Slot (lazy nach load_index)
         self._indexed = False
-        self._cache: Dict[str, List[ScoredDocument]] = {}
+        # Quellen-Tag: Re-Index invalidiert nur Cache-Einträge dieses Index
+        self.reindex_source = f"bm25:{self.config.index_path or f'memory-{id(self):x}'}"
+        self._cache: QueryResultCache[List[ScoredDocument]] = QueryResultCache(
+            name="bm25",
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes,
+            ttl=self.config.cache_ttl,
+            source=self.reindex_source
+        )
         self._empty_index_warning_shown = False  # Flag für one-time warning
         
-        if not BM25_AVAILABLE:
+        # Persistenz: Änderungen werden gesammelt und höchstens einmal je
+        # persist_delay als Snapshot gespeichert (statt je Mutation)
+        self._write_lock = threading.RLock()
+        self._persist_dirty = False
+        self._persist_timer: Optional[threading.Timer] = None
+        if self.config.persist_on_update and self.config.index_path:
+            atexit.register(self.flush)
+        
+        if not self.is_available():
             logger.error("❌ BM25 nicht verfügbar - SparseRetriever funktioniert nicht!")
     
     def is_available(self) -> bool:
         """Prüft ob BM25 verfügbar ist (unabhängig vom Index-Status)."""
-        return BM25_AVAILABLE
+        return self.config.use_inverted_index or BM25_AVAILABLE
     
     def is_indexed(self) -> bool:
         """Prüft ob Dokumente indexiert sind."""
@@ -181,37 +220,308 @@ class SparseRetriever:
         Raises:
             RuntimeError: Wenn BM25 nicht verfügbar
         """
-        if not BM25_AVAILABLE:
-            raise RuntimeError(
-                "BM25 nicht verfügbar - installiere rank-bm25: pip install rank-bm25"
+        with self._write_lock:
+            if not self.is_available():
+                raise RuntimeError(
+                    "BM25 nicht verfügbar - installiere rank-bm25: pip install rank-bm25"
+                )
+            
+            logger.info(f"📥 Indexiere {len(documents)} Dokumente für BM25...")
+            start_time = time.time()
+            
+            # Extract Content & IDs
+            self.corpus = [doc.get(content_field, "") for doc in documents]
+            self.doc_ids = [documents[i].get(id_field, f"doc_{i}") for i in range(len(documents))]
+            
+            # Tokenize Corpus
+            tokenized_corpus = [
+                self._tokenize(doc) for doc in self.corpus
+            ]
+            
+            self._slot_by_id = {doc_id: slot for slot, doc_id in enumerate(self.doc_ids)}
+            
+            # Create BM25 Index
+            if self.config.use_inverted_index:
+                self.index = self._create_index().build(tokenized_corpus)
+                self.bm25 = None
+                self.tokenized_corpus = []
+            else:
+                self.bm25 = BM25Okapi(
+                    tokenized_corpus,
+                    k1=self.config.k1,
+                    b=self.config.b
+                )
+                self.index = None
+                self.tokenized_corpus = tokenized_corpus
+            
+            self._indexed = True
+            self._invalidate_caches()
+            self._schedule_persist()
+            index_time = time.time() - start_time
+            
+            logger.info(
+                f"✅ BM25-Index erstellt in {index_time:.2f}s "
+                f"({len(documents)} Docs, {sum(len(t) for t in tokenized_corpus)} Tokens)"
             )
+    
+    def _create_index(self) -> BM25InvertedIndex:
+        """Erstellt einen leeren Inverted Index gemäß Config."""
+        return BM25InvertedIndex(
+            k1=self.config.k1,
+            b=self.config.b,
+            max_segments=self.config.max_segments,
+            background_merge=self.config.background_merge
+        )
+    
+    def add_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        content_field: str = "content",
+        id_field: str = "id"
+    ) -> None:
+        """
+        Fügt Dokumente inkrementell zum Index hinzu (ohne Re-Indexierung).
+        
+        Bereits indexierte IDs werden ersetzt (Upsert); kommt eine ID im
+        Batch mehrfach vor, gilt das letzte Vorkommen. Mit Inverted Index
+        entsteht ein neues Segment, das sofort durchsuchbar ist; df und
+        avgdl werden inkrementell fortgeschrieben.
         
-        logger.info(f"📥 Indexiere {len(documents)} Dokumente für BM25...")
-        start_time = time.time()
+        Args:
+            documents: Liste von Dokumenten mit 'id' und 'content'
+            content_field: Name des Content-Felds (default: 'content')
+            id_field: Name des ID-Felds (default: 'id')
+            
+        Raises:
+            RuntimeError: Wenn BM25 nicht verfügbar
+        """
+        with self._write_lock:
+            if not self.is_available():
+                raise RuntimeError(
+                    "BM25 nicht verfügbar - installiere rank-bm25: pip install rank-bm25"
+                )
+            
+            if not documents:
+                return
+            
+            start_time = time.time()
+            base = len(self.doc_ids)
+            doc_ids = [doc.get(id_field, f"doc_{base + i}") for i, doc in enumerate(documents)]
+            
+            # Doppelte IDs im Batch: nur das letzte Vorkommen indexieren
+            last_position = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+            if len(last_position) < len(doc_ids):
+                keep = sorted(last_position.values())
+                documents = [documents[i] for i in keep]
+                doc_ids = [doc_ids[i] for i in keep]
+            
+            # Upsert: alte Versionen entfernen
+            slot_by_id = self._slot_map()
+            for doc_id in doc_ids:
+                if doc_id in slot_by_id:
+                    self._delete_slot(slot_by_id.pop(doc_id))
+            
+            contents = [doc.get(content_field, "") for doc in documents]
+            tokenized = [self._tokenize(content) for content in contents]
+            
+            if self.config.use_inverted_index:
+                if self.index is None:
+                    self.index = self._create_index()
+                slots = self.index.add_documents(tokenized)
+            else:
+                slots = range(len(self.doc_ids), len(self.doc_ids) + len(documents))
+            
+            self.corpus.extend(contents)
+            self.doc_ids.extend(doc_ids)
+            for slot, doc_id in zip(slots, doc_ids):
+                slot_by_id[doc_id] = int(slot)
+            
+            if not self.config.use_inverted_index:
+                self.tokenized_corpus.extend(tokenized)
+                self._rebuild_legacy()
+            
+            self._indexed = True
+            self._invalidate_caches()
+            self._schedule_persist()
+            
+            logger.debug(
+                f"➕ BM25: {len(documents)} Dokumente in {(time.time() - start_time) * 1000:.1f}ms hinzugefügt"
+            )
+    
+    def update_document(
+        self,
+        doc_id: str,
+        content: str
+    ) -> None:
+        """
+        Ersetzt den Inhalt eines Dokuments (Delete + Add).
         
-        # Extract Content & IDs
-        self.corpus = [doc.get(content_field, "") for doc in documents]
-        self.doc_ids = [documents[i].get(id_field, f"doc_{i}") for i in range(len(documents))]
+        Args:
+            doc_id: Dokument-ID
+            content: Neuer Inhalt
+        """
+        self.add_documents([{"id": doc_id, "content": content}])
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Entfernt ein Dokument aus dem Index (Tombstone).
         
-        # Tokenize Corpus
-        self.tokenized_corpus = [
-            self._tokenize(doc) for doc in self.corpus
-        ]
+        Args:
+            doc_id: Dokument-ID
+            
+        Returns:
+            True wenn entfernt, False wenn ID unbekannt
+        """
+        with self._write_lock:
+            slot = self._slot_map().pop(doc_id, None)
+            if slot is None:
+                return False
+            
+            self._delete_slot(slot)
+            
+            if not self.config.use_inverted_index:
+                self._rebuild_legacy()
+            
+            self._invalidate_caches()
+            self._schedule_persist()
+            logger.debug(f"➖ BM25: Dokument '{doc_id}' entfernt")
+            return True
+    
+    def _delete_slot(self, slot: int) -> None:
+        """Markiert einen Slot als gelöscht und gibt den Content frei."""
+        if self.index is not None:
+            self.index.remove_document(slot)
+        else:
+            self.tokenized_corpus[slot] = []
+        self.corpus[slot] = None
+    
+    def _slot_map(self) -> Dict[str, int]:
+        """doc_id → Slot (nach load_index erst bei der ersten Änderung aufgebaut)."""
+        if self._slot_by_id is None:
+            live = self.index.live if self.index is not None else None
+            self._slot_by_id = {
+                doc_id: slot for slot, doc_id in enumerate(self.doc_ids)
+                if live is None or live[slot]
+            }
+        return self._slot_by_id
+    
+    def save_index(self, path: Optional[str] = None) -> str:
+        """
+        Speichert den Inverted Index inkl. Doc-IDs und Content auf Disk.
         
-        # Create BM25 Index
+        Args:
+            path: Index-Verzeichnis (default: config.index_path)
+            
+        Returns:
+            Verwendeter Pfad
+            
+        Raises:
+            RuntimeError: Wenn kein Inverted Index existiert oder kein Pfad gesetzt ist
+        """
+        path = path or self.config.index_path
+        if not path:
+            raise RuntimeError("Kein BM25 index_path konfiguriert (VERITAS_BM25_INDEX_PATH)")
+        
+        with self._write_lock:
+            if self.index is None:
+                raise RuntimeError("Nur der Inverted Index kann persistiert werden")
+            self.index.save(
+                path,
+                stored_fields={"doc_id": self.doc_ids, "content": self.corpus}
+            )
+            if path == self.config.index_path:
+                self._persist_dirty = False
+        return path
+    
+    def flush(self) -> bool:
+        """
+        Speichert gesammelte Änderungen sofort unter ``config.index_path``.
+        
+        Returns:
+            True wenn gespeichert wurde, False wenn nichts anstand
+        """
+        with self._write_lock:
+            if self._persist_timer is not None:
+                self._persist_timer.cancel()
+                self._persist_timer = None
+            if not (self._persist_dirty and self.config.index_path and self.index is not None):
+                return False
+            try:
+                self.save_index()
+                return True
+            except Exception as e:
+                logger.error(f"❌ BM25-Index konnte nicht gespeichert werden: {e}")
+                return False
+    
+    def _schedule_persist(self) -> None:
+        """
+        Merkt eine Änderung zum Speichern vor. Ein Hintergrund-Timer schreibt
+        spätestens nach ``persist_delay`` einen Snapshot (bzw. ``flush()``
+        sofort, beim Beenden automatisch), damit ein Neustart den Index per
+        ``load_index`` findet.
+        """
+        if not (self.config.persist_on_update and self.config.index_path and self.index is not None):
+            return
+        self._persist_dirty = True
+        if self._persist_timer is None:
+            self._persist_timer = threading.Timer(self.config.persist_delay, self.flush)
+            self._persist_timer.daemon = True
+            self._persist_timer.start()
+    
+    def load_index(self, path: Optional[str] = None) -> bool:
+        """
+        Lädt einen gespeicherten Index (memory-mapped, ohne Re-Tokenisierung).
+        
+        Args:
+            path: Index-Verzeichnis (default: config.index_path)
+            
+        Returns:
+            True wenn geladen, False wenn kein Index unter dem Pfad existiert
+        """
+        with self._write_lock:
+            path = path or self.config.index_path
+            if not self.config.use_inverted_index:
+                return False
+            if not path or not BM25InvertedIndex.exists(path):
+                return False
+            
+            index = BM25InvertedIndex.load(
+                path,
+                mmap=self.config.mmap_index,
+                max_segments=self.config.max_segments,
+                background_merge=self.config.background_merge
+            )
+            if (index.k1, index.b) != (self.config.k1, self.config.b):
+                logger.warning(
+                    f"⚠️ BM25-Index auf Disk nutzt k1={index.k1}, b={index.b} "
+                    f"(Config: k1={self.config.k1}, b={self.config.b})"
+                )
+            
+            self.index = index
+            self.bm25 = None
+            self.doc_ids = index.stored_fields["doc_id"]
+            self.corpus = index.stored_fields["content"]
+            self.tokenized_corpus = []
+            self._slot_by_id = None
+            self._indexed = True
+            self._persist_dirty = False
+            self._invalidate_caches()
+            return True
+    
+    def _rebuild_legacy(self) -> None:
+        """
+        rank_bm25 unterstützt keine Updates: Slots kompaktieren und neu bauen.
+        """
+        live_slots = sorted(self._slot_map().values())
+        self.corpus = [self.corpus[slot] for slot in live_slots]
+        self.doc_ids = [self.doc_ids[slot] for slot in live_slots]
+        self.tokenized_corpus = [self.tokenized_corpus[slot] for slot in live_slots]
+        self._slot_by_id = {doc_id: slot for slot, doc_id in enumerate(self.doc_ids)}
         self.bm25 = BM25Okapi(
             self.tokenized_corpus,
             k1=self.config.k1,
             b=self.config.b
-        )
-        
-        self._indexed = True
-        index_time = time.time() - start_time
-        
-        logger.info(
-            f"✅ BM25-Index erstellt in {index_time:.2f}s "
-            f"({len(documents)} Docs, {sum(len(t) for t in self.tokenized_corpus)} Tokens)"
-        )
+        ) if self.tokenized_corpus else None
     
     async def retrieve(
         self,
@@ -238,7 +548,7 @@ class SparseRetriever:
             return []
         
         # Prüfen ob BM25 indexiert ist
-        if not self.is_indexed() or self.bm25 is None:
+        if not self.is_indexed() or (self.index is None and self.bm25 is None):
             # Log warning only once (first time empty index is detected)
             if not self._empty_index_warning_shown:
                 logger.warning("⚠️ BM25 Index ist leer - keine Dokumente indexiert")
@@ -249,9 +559,11 @@ class SparseRetriever:
         
         # Cache-Check
         cache_key = f"{query}:{top_k}:{min_score}"
-        if self.config.enable_cache and cache_key in self._cache:
-            logger.debug(f"💾 Cache-Hit für Query: {query[:50]}...")
-            return self._cache[cache_key]
+        if self.config.enable_cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"💾 Cache-Hit für Query: {query[:50]}...")
+                return cached
         
         # Tokenize Query
         tokenized_query = self._tokenize(query)
@@ -261,15 +573,27 @@ class SparseRetriever:
             return []
         
         # BM25 Scoring
-        scores = self.bm25.get_scores(tokenized_query)
-        
-        # Top-K Indizes (sortiert nach Score, absteigend)
-        top_indices = np.argsort(scores)[-top_k:][::-1]
+        if self.index is not None:
+            # Inverted Index: nur Postings der Query-Terme, MaxScore Top-K
+            top_indices, top_scores = self.index.top_k(
+                tokenized_query, top_k, min_score=min_score
+            )
+
+            # Kompatibel zum Linear-Scan: bei min_score <= 0 mit
+            # Score-0-Dokumenten (ohne Term-Treffer) auffüllen
+            if min_score <= 0.0:
+                top_indices, top_scores = self._pad_zero_scores(top_indices, top_scores, top_k)
+        else:
+            scores = self.bm25.get_scores(tokenized_query)
+            
+            # Top-K Indizes (sortiert nach Score, absteigend)
+            top_indices = np.argsort(scores)[-top_k:][::-1]
+            top_scores = scores[top_indices]
         
         # Erstelle ScoredDocuments
         results = []
-        for idx in top_indices:
-            score = float(scores[idx])
+        for idx, score in zip(top_indices, top_scores):
+            score = float(score)
             
             # Filter: Minimaler Score
             if score < min_score:
@@ -286,7 +610,7 @@ class SparseRetriever:
         
         # Cache
         if self.config.enable_cache:
-            self._cache[cache_key] = results
+            self._cache.set(cache_key, results)
         
         top_score = results[0].score if results else 0.0
         logger.debug(
@@ -316,46 +640,52 @@ class SparseRetriever:
         if not self.is_available():
             return []
         
-        top_k = top_k or self.config.top_k
+        if not self.is_indexed():
+            return []
         
-        # Retrieve für jede Query
-        all_scores = []
-        for query in queries:
-            tokenized_query = self._tokenize(query)
-            if tokenized_query:
-                scores = self.bm25.get_scores(tokenized_query)
-                all_scores.append(scores)
+        top_k = top_k or self.config.top_k
         
-        if not all_scores:
+        tokenized_queries = [
+            tokens for tokens in map(self._tokenize, queries) if tokens
+        ]
+        if not tokenized_queries:
             return []
         
-        # Score-Aggregation
-        all_scores = np.array(all_scores)
-        
-        if aggregation == "max":
-            aggregated_scores = np.max(all_scores, axis=0)
-        elif aggregation == "sum":
-            aggregated_scores = np.sum(all_scores, axis=0)
-        elif aggregation == "avg":
-            aggregated_scores = np.mean(all_scores, axis=0)
+        if self.index is not None:
+            # Alle Varianten in einem Sparse-Matrix-Produkt, Aggregation
+            # und Top-K nur über Kandidaten mit Term-Treffern
+            top_indices, top_scores = self.index.top_k_multi(
+                tokenized_queries, top_k, aggregation=aggregation
+            )
+            top_indices, top_scores = self._pad_zero_scores(top_indices, top_scores, top_k)
         else:
-            raise ValueError(f"Unknown aggregation: {aggregation}")
-        
-        # Top-K
-        top_indices = np.argsort(aggregated_scores)[-top_k:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            score = float(aggregated_scores[idx])
-            results.append(
-                ScoredDocument(
-                    doc_id=self.doc_ids[idx],
-                    content=self.corpus[idx],
-                    score=score,
-                    metadata={"aggregation": aggregation, "num_queries": len(queries)},
-                    source="bm25_multi"
-                )
+            all_scores = np.array([
+                self.bm25.get_scores(tokens) for tokens in tokenized_queries
+            ])
+            
+            # Score-Aggregation
+            if aggregation == "max":
+                aggregated_scores = np.max(all_scores, axis=0)
+            elif aggregation == "sum":
+                aggregated_scores = np.sum(all_scores, axis=0)
+            elif aggregation == "avg":
+                aggregated_scores = np.mean(all_scores, axis=0)
+            else:
+                raise ValueError(f"Unknown aggregation: {aggregation}")
+            
+            top_indices = np.argsort(aggregated_scores)[-top_k:][::-1]
+            top_scores = aggregated_scores[top_indices]
+        
+        results = [
+            ScoredDocument(
+                doc_id=self.doc_ids[idx],
+                content=self.corpus[idx],
+                score=float(score),
+                metadata={"aggregation": aggregation, "num_queries": len(queries)},
+                source="bm25_multi"
             )
+            for idx, score in zip(top_indices, top_scores)
+        ]
         
         logger.debug(
             f"🔍 BM25 Multi-Query: {len(results)} Docs für {len(queries)} Queries "
@@ -364,6 +694,29 @@ class SparseRetriever:
         
         return results
     
+    def _pad_zero_scores(
+        self,
+        top_indices: np.ndarray,
+        top_scores: np.ndarray,
+        top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Füllt Inverted-Index-Ergebnisse mit Score-0-Dokumenten auf
+        (Verhalten des rank_bm25 Linear-Scans, der alle Dokumente rankt).
+        """
+        missing = min(top_k, self.index.num_docs) - len(top_indices)
+        if missing <= 0:
+            return top_indices, top_scores
+        window = min(self.index.num_slots, top_k + len(top_indices) + self.index.num_deleted)
+        padding = np.setdiff1d(
+            np.flatnonzero(self.index.live[:window]),
+            top_indices
+        )[:missing]
+        return (
+            np.concatenate([top_indices, padding]),
+            np.concatenate([top_scores, np.zeros(len(padding))])
+        )
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Gibt BM25-Statistiken zurück.
@@ -377,13 +730,27 @@ class SparseRetriever:
                 "available": False
             }
         
+        if self.index is not None:
+            num_tokens = int(self.index.total_len)
+        else:
+            num_tokens = sum(len(tokens) for tokens in self.tokenized_corpus)
+        num_documents = self.index.num_docs if self.index is not None else len(self.corpus)
+        
         return {
             "indexed": True,
-            "available": BM25_AVAILABLE,
-            "num_documents": len(self.corpus),
-            "num_tokens": sum(len(tokens) for tokens in self.tokenized_corpus),
-            "avg_doc_length": np.mean([len(tokens) for tokens in self.tokenized_corpus]),
+            "available": self.is_available(),
+            "backend": "inverted_index" if self.index is not None else "rank_bm25",
+            "num_documents": num_documents,
+            "num_tokens": num_tokens,
+            "avg_doc_length": num_tokens / num_documents if num_documents else 0.0,
             "cache_size": len(self._cache),
+            "cache": self._cache.get_stats(),
+            "index": {
+                "num_terms": self.index.num_terms,
+                "num_postings": self.index.num_postings,
+                "memory_bytes": self.index.memory_bytes(),
+                **self.index.get_stats()
+            } if self.index is not None else {},
             "config": {
                 "k1": self.config.k1,
                 "b": self.config.b,
@@ -391,10 +758,16 @@ class SparseRetriever:
             }
         }
     
+    def _invalidate_caches(self) -> None:
+        """
+        Index hat sich geändert: Einträge dieses Index im eigenen Query-Cache
+        und in allen abhängigen Caches verwerfen.
+        """
+        notify_reindex(self.reindex_source)
+    
     def clear_cache(self) -> None:
         """Leert den Query-Cache."""
-        cache_size = len(self._cache)
-        self._cache.clear()
+        cache_size = self._cache.clear()
         logger.info(f"🗑️ BM25-Cache geleert ({cache_size} Einträge)")
 
 
@@ -418,5 +791,11 @@ def get_sparse_retriever(
     
     if _sparse_retriever_instance is None:
         _sparse_retriever_instance = SparseRetriever(config)
+        
+        # Cold Start: persistierten Index laden statt neu zu tokenisieren
+        try:
+            _sparse_retriever_instance.load_index()
+        except Exception as e:
+            logger.error(f"❌ BM25-Index konnte nicht geladen werden: {e}")
     
     return _sparse_retriever_instance
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+VERITAS UDS3 SEARCH COALESCER
+=============================
+
+Request-scoped Single-Flight-Schicht für UDS3-Suchen der Intelligent
+Pipeline.
+
+Problem:
+--------
+In ``IntelligentMultiAgentPipeline._execute_real_agent`` ruft jeder
+ausgewählte Agent ``uds3_strategy.query_across_databases`` mit derselben
+``query_text``, ``top_k=5`` und ``threshold`` auf - die berechnete
+Kategorie wurde nie übergeben. 6-8 Agenten führten so identische
+Vektor-Suchen parallel in Worker-Threads aus.
+
+Lösung:
+-------
+1. Single-Flight: identische UDS3-Aufrufe, die gleichzeitig laufen, teilen
+   sich ein Future (ein Thread sucht, die anderen warten)
+2. Memoization für die Lebensdauer eines Pipeline-Laufs (ein Coalescer je
+   Request, kein prozessweiter Cache → keine veralteten Ergebnisse)
+3. Eine breitere Suche (``wide_top_k``) für alle Agenten; die Kategorie je
+   Agent wird lokal auf dieses Result-Set angewendet
+4. Metriken: Aufrufe, ausgeführte Suchen, Dedup-Ratio
+5. Async-Variante (``avector_search``) für Strategien mit nativ
+   asynchronem ``query_across_databases`` - Agenten laufen dann ohne
+   Worker-Thread im Event-Loop
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Metadaten-Felder, in denen UDS3-Treffer ihre Kategorie tragen können
+CATEGORY_FIELDS = ("category", "domain", "document_type", "agent_category")
+
+
+class SingleFlight:
+    """
+    Thread-sicheres Single-Flight mit Memoization.
+
+    Der erste Aufrufer eines Schlüssels führt ``fn`` aus; gleichzeitige
+    Aufrufer warten auf dasselbe Future, spätere erhalten das memoisierte
+    Ergebnis. Fehler werden an alle Wartenden weitergegeben, aber nicht
+    memoisiert (der nächste Aufruf versucht es erneut).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0  # Auf laufenden Aufruf gewartet
+        self.memo_hits = 0  # Bereits abgeschlossenes Ergebnis verwendet
+        self.errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+
+        return future.result()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Wie ``do`` für Coroutine-Funktionen (teilt Futures mit ``do``)."""
+        future, owner = self._claim(key)
+        if owner:
+            try:
+                future.set_result(await fn())
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+
+        return await asyncio.wrap_future(future)
+
+    def _claim(self, key: Hashable):
+        """Returns: (Future, True falls der Aufrufer die Suche ausführt)."""
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.executed += 1
+            elif future.done():
+                self.memo_hits += 1
+            else:
+                self.coalesced += 1
+        return future, owner
+
+    def _fail(self, key: Hashable, future: Future, error: BaseException) -> None:
+        with self._lock:
+            self.errors += 1
+            self._futures.pop(key, None)
+        future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "memo_hits": self.memo_hits,
+                "errors": self.errors,
+                "dedup_ratio": 1.0 - self.executed / self.calls if self.calls else 0.0,
+            }
+
+
+def _call_key(kwargs: Dict[str, Any]) -> str:
+    """Kanonischer Schlüssel für Aufruf-Parameter."""
+    return json.dumps(kwargs, sort_keys=True, default=repr)
+
+
+def result_category(result: Dict[str, Any]) -> Optional[str]:
+    """Kategorie eines UDS3-Treffers (Top-Level oder ``metadata``)."""
+    metadata = result.get("metadata") if isinstance(result.get("metadata"), dict) else {}
+    for source in (result, metadata):
+        for field_name in CATEGORY_FIELDS:
+            value = source.get(field_name)
+            if isinstance(value, str) and value:
+                return value.lower()
+    return None
+
+
+class UDS3SearchCoalescer:
+    """
+    UDS3-Zugriff für einen Pipeline-Lauf.
+
+    Beispiel:
+    --------
+    search = UDS3SearchCoalescer(uds3_strategy)
+    results = search.vector_search(query, category="legal", top_k=5, threshold=0.5)
+    search.get_stats()["dedup_ratio"]
+    """
+
+    def __init__(self, strategy: Any, wide_top_k: int = 25):
+        """
+        Args:
+            strategy: UDS3PolyglotManager (``query_across_databases``)
+            wide_top_k: Treffer der gemeinsamen Suche, aus der je Agent
+                        lokal nach Kategorie gefiltert wird
+        """
+        self.strategy = strategy
+        self.wide_top_k = wide_top_k
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.searches_requested = 0
+        self.category_matches = 0
+        self.category_fallbacks = 0  # Zu wenige Kategorie-Treffer → aufgefüllt
+
+    @property
+    def is_async(self) -> bool:
+        """True, wenn die Strategie ``query_across_databases`` nativ async anbietet."""
+        return inspect.iscoroutinefunction(getattr(self.strategy, "query_across_databases", None))
+
+    def query_across_databases(self, **kwargs: Any) -> Any:
+        """Single-Flight-Wrapper um ``strategy.query_across_databases``."""
+        return self._flight.do(
+            _call_key(kwargs),
+            lambda: self.strategy.query_across_databases(**kwargs)
+        )
+
+    async def aquery_across_databases(self, **kwargs: Any) -> Any:
+        """Async Single-Flight-Wrapper (blockierende Strategien im Worker-Thread)."""
+        if self.is_async:
+            return await self._flight.ado(
+                _call_key(kwargs),
+                lambda: self.strategy.query_across_databases(**kwargs)
+            )
+        return await asyncio.to_thread(self.query_across_databases, **kwargs)
+
+    def vector_search(
+        self,
+        query_text: str,
+        category: Optional[str] = None,
+        top_k: int = 5,
+        threshold: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-K Treffer für einen Agenten.
+
+        Alle Agenten eines Laufs teilen eine Suche mit
+        ``max(wide_top_k, top_k)`` Treffern. Treffer mit passender Kategorie
+        werden bevorzugt; tragen zu wenige Treffer eine Kategorie, wird mit
+        den besten übrigen Treffern aufgefüllt (wie die bisherige
+        ungefilterte Suche).
+        """
+        search_result = self.query_across_databases(**self._search_kwargs(query_text, top_k, threshold))
+        return self._select(search_result, category, top_k)
+
+    async def avector_search(
+        self,
+        query_text: str,
+        category: Optional[str] = None,
+        top_k: int = 5,
+        threshold: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """Async-Variante von ``vector_search`` (gleiche Single-Flight-Schlüssel)."""
+        search_result = await self.aquery_across_databases(**self._search_kwargs(query_text, top_k, threshold))
+        return self._select(search_result, category, top_k)
+
+    def _search_kwargs(self, query_text: str, top_k: int, threshold: float) -> Dict[str, Any]:
+        with self._lock:
+            self.searches_requested += 1
+        return {
+            "vector_params": {
+                "query_text": query_text,
+                "top_k": max(self.wide_top_k, top_k),
+                "threshold": threshold
+            },
+            "graph_params": None,
+            "relational_params": None,
+            "join_strategy": "union",
+            "execution_mode": "smart"
+        }
+
+    def _select(self, search_result: Any, category: Optional[str], top_k: int) -> List[Dict[str, Any]]:
+        """Kategorie-Filter auf das gemeinsame Result-Set (mit Auffüllen)."""
+        if not (search_result and getattr(search_result, "success", False)):
+            return []
+        results = [r for r in (getattr(search_result, "joined_results", None) or []) if isinstance(r, dict)]
+
+        if not category or category == "general":
+            return results[:top_k]
+
+        wanted = category.lower()
+        matching = [r for r in results if result_category(r) == wanted]
+        selected = matching[:top_k]
+        with self._lock:
+            self.category_matches += len(selected)
+            if len(selected) < top_k:
+                self.category_fallbacks += 1
+        if len(selected) < top_k:
+            selected += [r for r in results if result_category(r) != wanted][:top_k - len(selected)]
+        return selected
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._flight.get_stats()
+        stats.update({
+            "searches_requested": self.searches_requested,
+            "category_matches": self.category_matches,
+            "category_fallbacks": self.category_fallbacks,
+        })
+        return stats
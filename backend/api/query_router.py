@@ -22,6 +22,7 @@ from backend.models.request import (
 )
 from backend.models.response import UnifiedResponse
 from backend.models.enums import QueryMode
+from backend.agents.veritas_agent_scheduler import SchedulerSaturatedError
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,8 @@ async def unified_query(
     try:
         response = await query_service.process_query(request_body)
         return response
+    except SchedulerSaturatedError:
+        raise  # → 429 (Exception-Handler der App)
     except Exception as e:
         logger.error(f"Query error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,6 +91,8 @@ async def simple_ask(
     try:
         response = await query_service.process_query(unified_request)
         return response
+    except SchedulerSaturatedError:
+        raise  # → 429 (Exception-Handler der App)
     except Exception as e:
         logger.error(f"Ask error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -114,6 +119,8 @@ async def rag_query(
     try:
         response = await query_service.process_query(rag_request)
         return response
+    except SchedulerSaturatedError:
+        raise  # → 429 (Exception-Handler der App)
     except Exception as e:
         logger.error(f"RAG error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -264,6 +271,8 @@ async def hybrid_search(
     try:
         response = await query_service.process_query(unified_request)
         return response
+    except SchedulerSaturatedError:
+        raise  # → 429 (Exception-Handler der App)
     except Exception as e:
         logger.error(f"Hybrid search error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -305,6 +314,8 @@ async def streaming_query(
         # TODO: Return StreamingResponse instead
         response = await query_service.process_query(unified_request)
         return response
+    except SchedulerSaturatedError:
+        raise  # → 429 (Exception-Handler der App)
     except Exception as e:
         logger.error(f"Streaming error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
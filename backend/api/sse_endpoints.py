@@ -9,6 +9,7 @@ Endpoints:
 - GET /api/sse/metrics                - System metrics
 - GET /api/sse/jobs/{job_id}          - Job progress (UDS3)
 - GET /api/sse/quality/{session_id}   - Quality gate notifications
+- GET /api/sse/generate               - LLM token streaming (Ollama)
 
 Features:
 - Auto-reconnect (Last-Event-ID)
@@ -36,6 +37,7 @@ Created: 2025-10-31
 import asyncio
 import json
 import logging
+import time
 from typing import AsyncGenerator, Optional, Dict, Any
 from datetime import datetime
 import psutil
@@ -58,6 +60,14 @@ except ImportError:
     StreamingManager = None
     EventType = None
 
+try:
+    from backend.agents.veritas_ollama_client import OllamaRequest, get_ollama_client
+    OLLAMA_CLIENT_AVAILABLE = True
+except ImportError:
+    OLLAMA_CLIENT_AVAILABLE = False
+    OllamaRequest = None
+    get_ollama_client = None
+
 logger = logging.getLogger(__name__)
 
 # Router
@@ -419,6 +429,97 @@ async def stream_quality_gates(session_id: str):
     return EventSourceResponse(quality_generator())
 
 
+@router.get("/generate")
+async def stream_generation(
+    prompt: str = Query(..., min_length=1, description="Prompt"),
+    model: Optional[str] = Query(None, description="Ollama model (default: client default)"),
+    system: Optional[str] = Query(None, description="System prompt"),
+    temperature: float = Query(0.7, ge=0.0, le=2.0),
+    max_tokens: int = Query(1000, ge=1, le=8192)
+):
+    """
+    Stream LLM tokens via SSE as soon as Ollama produces them.
+    
+    Client Example:
+        const source = new EventSource('/api/sse/generate?prompt=...');
+        source.addEventListener('token', (e) => {
+            output.textContent += JSON.parse(e.data).token;
+        });
+        source.addEventListener('done', () => source.close());
+    
+    Events:
+        - token: One generated chunk ({token, index})
+        - done: Generation finished (ttft_ms, duration_ms, tokens, eval_count)
+        - error: Generation failed
+    
+    Cancellation:
+        sse-starlette cancels the generator when the client disconnects.
+        Closing the Ollama stream closes the upstream HTTP connection, so
+        Ollama stops generating instead of finishing in the background.
+    """
+    if not SSE_AVAILABLE:
+        raise HTTPException(503, "SSE not available - install sse-starlette")
+    if not OLLAMA_CLIENT_AVAILABLE:
+        raise HTTPException(503, "Ollama client not available")
+    
+    async def token_generator() -> AsyncGenerator:
+        """Forward Ollama NDJSON chunks as SSE token events."""
+        
+        client = await get_ollama_client()
+        request = OllamaRequest(
+            model=model or client.default_model,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            system=system
+        )
+        
+        start = time.perf_counter()
+        ttft_ms: Optional[float] = None
+        index = 0
+        stream = await client.generate_response(request, stream=True)
+        
+        try:
+            async for chunk in stream:
+                if chunk.response:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start) * 1000
+                    yield {
+                        "event": "token",
+                        "data": json.dumps({"token": chunk.response, "index": index}),
+                        "id": str(index)
+                    }
+                    index += 1
+                
+                if chunk.done:
+                    yield {
+                        "event": "done",
+                        "data": json.dumps({
+                            "model": chunk.model,
+                            "tokens": index,
+                            "eval_count": chunk.eval_count,
+                            "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+                            "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+                        })
+                    }
+        
+        except asyncio.CancelledError:
+            logger.info(f"Generation stream cancelled after {index} tokens (client disconnected)")
+            raise
+        except Exception as e:
+            logger.error(f"Generation stream error: {e}")
+            yield {
+                "event": "error",
+                "data": json.dumps({"error": str(e)})
+            }
+        finally:
+            # Closes the upstream Ollama connection
+            await stream.aclose()
+    
+    return EventSourceResponse(token_generator())
+
+
 @router.get("/health")
 async def sse_health():
     """
@@ -436,7 +537,8 @@ async def sse_health():
             "progress": "/api/sse/progress/{session_id}",
             "metrics": "/api/sse/metrics",
             "jobs": "/api/sse/jobs/{job_id}",
-            "quality": "/api/sse/quality/{session_id}"
+            "quality": "/api/sse/quality/{session_id}",
+            "generate": "/api/sse/generate"
         }
     }
 
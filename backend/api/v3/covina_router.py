@@ -118,6 +118,8 @@ async def covina_query(
         logger.info(f"✅ COVINA Query erfolgreich: {len(statistics)} Statistiken")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ COVINA Query Fehler: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"COVINA Query fehlgeschlagen: {str(e)}")
@@ -180,6 +180,8 @@ async def immi_query(
         logger.info(f"✅ IMMI Query erfolgreich: {len(regulations)} Vorschriften, {len(geodata)} Geodaten")
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ IMMI Query Fehler: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"IMMI Query fehlgeschlagen: {str(e)}")
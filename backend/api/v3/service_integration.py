@@ -18,6 +18,10 @@ from datetime import datetime
 import time
 import uuid
 
+from fastapi import HTTPException
+
+from backend.agents.veritas_agent_scheduler import SchedulerSaturatedError
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -144,6 +148,14 @@ async def execute_query_with_pipeline(
             "llm_commentary": pipeline_response.llm_commentary if enable_commentary else []
         }
         
+    except SchedulerSaturatedError as e:
+        # Agent-Scheduler ausgelastet → 429 mit Queue-Position und Retry-After
+        logger.warning(f"🚦 Pipeline ausgelastet: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=e.to_dict(),
+            headers={"Retry-After": e.retry_after_header}
+        )
     except Exception as e:
         logger.error(f"Pipeline execution error: {e}", exc_info=True)
         raise
@@ -7,111 +7,88 @@ Features:
 - Live Adapter Status Updates
 - Query Log Streaming
 - Bidirektionale Kommunikation
+- LLM Token-Streaming mit Abbruch (Ollama)
+- Sende-Queue + Writer-Task je Verbindung (backend.services.websocket_delivery):
+  langsame Clients bremsen weder Broadcasts noch andere Clients
 """
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from typing import Dict, List, Optional, Set
 from datetime import datetime
 import json
+import time
 import asyncio
 import logging
 from pydantic import BaseModel
 
 from backend.adapters.adapter_factory import get_database_adapter, is_themisdb_available, is_uds3_available
+from backend.services.websocket_delivery import (
+    ConnectionClosed,
+    ConnectionManager,
+    WebSocketConnection,
+    iter_batches,
+    logger as delivery_logger,
+)
 
 logger = logging.getLogger(__name__)
 
+try:
+    from backend.agents.veritas_ollama_client import OllamaRequest, get_ollama_client
+    OLLAMA_CLIENT_AVAILABLE = True
+except ImportError:
+    OLLAMA_CLIENT_AVAILABLE = False
+    logger.warning("⚠️ Ollama Client nicht verfügbar - /ws/generate deaktiviert")
+
 websocket_router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
 
 # ===========================
-# Connection Manager
+# Connection Manager & Result Streaming
 # ===========================
 
-class ConnectionManager:
+# Max. Einträge je gebündeltem Ergebnis-Frame (Client-Feld "batch_size")
+MAX_RESULT_BATCH_SIZE = 500
+
+
+def _batch_size(data: Dict) -> int:
+    """Liest ``batch_size`` aus der Client-Nachricht (1 = ein Frame je Ergebnis)"""
+    try:
+        return max(1, min(int(data.get("batch_size", 1)), MAX_RESULT_BATCH_SIZE))
+    except (TypeError, ValueError):
+        return 1
+
+
+async def _stream_items(
+    connection: WebSocketConnection,
+    items: List[Dict],
+    item_type: str,
+    batch_type: str,
+    batch_size: int,
+    score_field: bool = False
+) -> None:
     """
-    Verwaltet aktive WebSocket-Verbindungen
-    Unterstützt Broadcast und gezielte Nachrichten
+    Streamt Ergebnisse ohne feste Verzögerung - so schnell wie der Client liest
+
+    ``batch_size`` 1 sendet einen Frame je Ergebnis (``item_type``), sonst
+    gebündelte Frames (``batch_type``) mit ``offset``.
     """
+    total = len(items)
+    if batch_size <= 1:
+        for i, item in enumerate(items):
+            message = {"type": item_type, "data": item, "index": i, "total": total}
+            if score_field:
+                message["score"] = item.get("score", 0.0)
+            await connection.send(message)
+        return
     
-    def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        self.connection_metadata: Dict[WebSocket, Dict] = {}
-    
-    async def connect(self, websocket: WebSocket, client_id: str, metadata: Optional[Dict] = None):
-        """
-        Registriert neue WebSocket-Verbindung
-        """
-        await websocket.accept()
-        
-        if client_id not in self.active_connections:
-            self.active_connections[client_id] = []
-        
-        self.active_connections[client_id].append(websocket)
-        self.connection_metadata[websocket] = {
-            "client_id": client_id,
-            "connected_at": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        
-        logger.info(f"WebSocket connected: client_id={client_id}, total_connections={self.total_connections}")
-    
-    def disconnect(self, websocket: WebSocket, client_id: str):
-        """
-        Entfernt WebSocket-Verbindung
-        """
-        try:
-            if client_id in self.active_connections:
-                self.active_connections[client_id].remove(websocket)
-                
-                if not self.active_connections[client_id]:
-                    del self.active_connections[client_id]
-            
-            if websocket in self.connection_metadata:
-                del self.connection_metadata[websocket]
-            
-            logger.info(f"WebSocket disconnected: client_id={client_id}, remaining={self.total_connections}")
-        
-        except ValueError:
-            pass
-    
-    async def send_personal_message(self, message: dict, client_id: str):
-        """
-        Sendet Nachricht an alle Verbindungen eines Clients
-        """
-        if client_id in self.active_connections:
-            disconnected = []
-            
-            for connection in self.active_connections[client_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Failed to send message to {client_id}: {e}")
-                    disconnected.append(connection)
-            
-            # Cleanup disconnected
-            for conn in disconnected:
-                self.disconnect(conn, client_id)
-    
-    async def broadcast(self, message: dict, exclude_client: Optional[str] = None):
-        """
-        Sendet Nachricht an alle verbundenen Clients
-        """
-        for client_id, connections in list(self.active_connections.items()):
-            if exclude_client and client_id == exclude_client:
-                continue
-            
-            await self.send_personal_message(message, client_id)
-    
-    @property
-    def total_connections(self) -> int:
-        """Gesamtzahl aktiver Verbindungen"""
-        return sum(len(conns) for conns in self.active_connections.values())
-    
-    @property
-    def active_clients(self) -> Set[str]:
-        """Set aller verbundenen Client-IDs"""
-        return set(self.active_connections.keys())
+    for offset, batch in iter_batches(items, batch_size):
+        await connection.send({
+            "type": batch_type,
+            "data": list(batch),
+            "offset": offset,
+            "count": len(batch),
+            "total": total
+        })
 
 
 # Global Connection Manager
@@ -137,7 +114,8 @@ async def websocket_search(
       "query": "machine learning best practices",
       "top_k": 10,
       "collection": "documents",
-      "threshold": 0.7
+      "threshold": 0.7,
+      "batch_size": 1
     }
     ```
     
@@ -157,6 +135,15 @@ async def websocket_search(
       "score": 0.95
     }
     
+    // batch_size > 1: gebündelte Frames statt einzelner "result"-Frames
+    {
+      "type": "results",
+      "data": [{...}, {...}],
+      "offset": 0,
+      "count": 2,
+      "total": 10
+    }
+    
     {
       "type": "search_complete",
       "total_results": 10,
@@ -170,11 +157,11 @@ async def websocket_search(
     { "action": "ping" }  →  { "type": "pong", "timestamp": "..." }
     ```
     """
-    await manager.connect(websocket, client_id, {"endpoint": "search"})
+    connection = await manager.connect(websocket, client_id, {"endpoint": "search"})
     
     try:
         # Welcome Message
-        await websocket.send_json({
+        await connection.send({
             "type": "connected",
             "client_id": client_id,
             "endpoint": "search",
@@ -189,7 +176,7 @@ async def websocket_search(
             
             # Ping/Pong für Keep-Alive
             if action == "ping":
-                await websocket.send_json({
+                await connection.send({
                     "type": "pong",
                     "timestamp": datetime.now().isoformat()
                 })
@@ -201,9 +188,10 @@ async def websocket_search(
                 top_k = data.get("top_k", 5)
                 collection = data.get("collection", "documents")
                 threshold = data.get("threshold")
+                batch_size = _batch_size(data)
                 
                 if not query:
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "error",
                         "message": "Missing required field: query"
                     })
@@ -217,7 +205,7 @@ async def websocket_search(
                     adapter_name = "themis" if await is_themisdb_available() else "uds3"
                     
                     # Search Started
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "search_started",
                         "query": query,
                         "top_k": top_k,
@@ -234,21 +222,12 @@ async def websocket_search(
                         threshold=threshold
                     )
                     
-                    # Stream Results progressiv
-                    for i, result in enumerate(results):
-                        await websocket.send_json({
-                            "type": "result",
-                            "data": result,
-                            "index": i,
-                            "total": len(results),
-                            "score": result.get("score", 0.0)
-                        })
-                        # Kleine Verzögerung für progressive UI
-                        await asyncio.sleep(0.05)
+                    # Stream Results (Backpressure statt fester Verzögerung)
+                    await _stream_items(connection, results, "result", "results", batch_size, score_field=True)
                     
                     # Search Complete
                     duration_ms = (datetime.now() - start_time).total_seconds() * 1000
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "search_complete",
                         "total_results": len(results),
                         "duration_ms": round(duration_ms, 2),
@@ -256,21 +235,24 @@ async def websocket_search(
                         "timestamp": datetime.now().isoformat()
                     })
                 
+                except ConnectionClosed:
+                    raise
+                
                 except Exception as e:
                     logger.error(f"Search error for client {client_id}: {e}")
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "error",
                         "message": f"Search failed: {str(e)}",
                         "timestamp": datetime.now().isoformat()
                     })
             
             else:
-                await websocket.send_json({
+                await connection.send({
                     "type": "error",
                     "message": f"Unknown action: {action}"
                 })
     
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, ConnectionClosed):
         manager.disconnect(websocket, client_id)
         logger.info(f"Client {client_id} disconnected from search endpoint")
     
@@ -313,13 +295,13 @@ async def websocket_adapter_status(
     }
     ```
     """
-    await manager.connect(websocket, client_id, {
+    connection = await manager.connect(websocket, client_id, {
         "endpoint": "adapter_status",
         "interval": interval
     })
     
     try:
-        await websocket.send_json({
+        await connection.send({
             "type": "connected",
             "client_id": client_id,
             "endpoint": "adapter_status",
@@ -360,11 +342,14 @@ async def websocket_adapter_status(
                     else:
                         status_update["uds3"].update(stats)
                 
-                await websocket.send_json(status_update)
+                await connection.send(status_update)
                 
+            except ConnectionClosed:
+                raise
+            
             except Exception as e:
                 logger.error(f"Error collecting adapter status: {e}")
-                await websocket.send_json({
+                await connection.send({
                     "type": "error",
                     "message": f"Failed to collect status: {str(e)}",
                     "timestamp": datetime.now().isoformat()
@@ -373,7 +358,7 @@ async def websocket_adapter_status(
             # Warte bis zum nächsten Update
             await asyncio.sleep(interval)
     
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, ConnectionClosed):
         manager.disconnect(websocket, client_id)
         logger.info(f"Client {client_id} disconnected from adapter status")
 
@@ -402,21 +387,24 @@ async def websocket_logs(
     }
     ```
     """
-    await manager.connect(websocket, client_id, {
+    connection = await manager.connect(websocket, client_id, {
         "endpoint": "logs",
         "log_level": log_level
     })
     
     # Custom WebSocket Log Handler
     class WebSocketLogHandler(logging.Handler):
-        def __init__(self, websocket: WebSocket, level=logging.INFO):
+        def __init__(self, connection: WebSocketConnection, level=logging.INFO):
             super().__init__(level)
-            self.websocket = websocket
+            self.connection = connection
             self.formatter = logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
         
         def emit(self, record):
+            # Eigene Delivery-Logs nicht über die Verbindung zurückspielen
+            if record.name == delivery_logger.name:
+                return
             try:
                 log_entry = {
                     "type": "log",
@@ -432,19 +420,19 @@ async def websocket_logs(
                 if hasattr(record, 'extra'):
                     log_entry["extra"] = record.extra
                 
-                # Async send via event loop
-                asyncio.create_task(self.websocket.send_json(log_entry))
+                # Sende-Queue (thread-safe, bei Rückstau verwerfbar)
+                self.connection.send_threadsafe(log_entry, droppable=True)
             
             except Exception:
                 self.handleError(record)
     
     # Handler registrieren
-    handler = WebSocketLogHandler(websocket, level=getattr(logging, log_level))
+    handler = WebSocketLogHandler(connection, level=getattr(logging, log_level))
     root_logger = logging.getLogger()
     root_logger.addHandler(handler)
     
     try:
-        await websocket.send_json({
+        await connection.send({
             "type": "connected",
             "client_id": client_id,
             "endpoint": "logs",
@@ -459,7 +447,7 @@ async def websocket_logs(
                 data = await websocket.receive_json()
                 
                 if data.get("action") == "ping":
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "pong",
                         "timestamp": datetime.now().isoformat()
                     })
@@ -467,14 +455,17 @@ async def websocket_logs(
                 elif data.get("action") == "change_level":
                     new_level = data.get("level", "INFO")
                     handler.setLevel(getattr(logging, new_level))
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "info",
                         "message": f"Log level changed to {new_level}"
                     })
             
-            except WebSocketDisconnect:
+            except (WebSocketDisconnect, ConnectionClosed):
                 break
     
+    except ConnectionClosed:
+        pass
+    
     finally:
         root_logger.removeHandler(handler)
         manager.disconnect(websocket, client_id)
@@ -496,7 +487,8 @@ async def websocket_graph_traverse(
       "start_vertex": "doc123",
       "edge_collection": "citations",
       "direction": "outbound",
-      "max_depth": 3
+      "max_depth": 3,
+      "batch_size": 1
     }
     ```
     
@@ -522,11 +514,14 @@ async def websocket_graph_traverse(
       "max_depth_reached": 3
     }
     ```
+    
+    Mit ``batch_size`` > 1 kommen Nodes/Edges gebündelt als ``nodes``- bzw.
+    ``edges``-Frames (``data``, ``offset``, ``count``, ``total``).
     """
-    await manager.connect(websocket, client_id, {"endpoint": "graph_traverse"})
+    connection = await manager.connect(websocket, client_id, {"endpoint": "graph_traverse"})
     
     try:
-        await websocket.send_json({
+        await connection.send({
             "type": "connected",
             "client_id": client_id,
             "endpoint": "graph_traverse",
@@ -538,7 +533,7 @@ async def websocket_graph_traverse(
             action = data.get("action")
             
             if action == "ping":
-                await websocket.send_json({"type": "pong", "timestamp": datetime.now().isoformat()})
+                await connection.send({"type": "pong", "timestamp": datetime.now().isoformat()})
                 continue
             
             elif action == "traverse":
@@ -546,9 +541,10 @@ async def websocket_graph_traverse(
                 edge_collection = data.get("edge_collection", "edges")
                 direction = data.get("direction", "outbound")
                 max_depth = data.get("max_depth", 3)
+                batch_size = _batch_size(data)
                 
                 if not start_vertex:
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "error",
                         "message": "Missing required field: start_vertex"
                     })
@@ -557,7 +553,7 @@ async def websocket_graph_traverse(
                 try:
                     adapter = await get_database_adapter()
                     
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "traversal_started",
                         "start_vertex": start_vertex,
                         "edge_collection": edge_collection,
@@ -578,26 +574,12 @@ async def websocket_graph_traverse(
                     vertices = result.get("vertices", [])
                     edges = result.get("edges", [])
                     
-                    for i, vertex in enumerate(vertices):
-                        await websocket.send_json({
-                            "type": "node",
-                            "data": vertex,
-                            "index": i,
-                            "total": len(vertices)
-                        })
-                        await asyncio.sleep(0.05)
+                    await _stream_items(connection, vertices, "node", "nodes", batch_size)
                     
                     # Stream Edges
-                    for i, edge in enumerate(edges):
-                        await websocket.send_json({
-                            "type": "edge",
-                            "data": edge,
-                            "index": i,
-                            "total": len(edges)
-                        })
-                        await asyncio.sleep(0.05)
+                    await _stream_items(connection, edges, "edge", "edges", batch_size)
                     
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "traversal_complete",
                         "total_nodes": len(vertices),
                         "total_edges": len(edges),
@@ -605,14 +587,197 @@ async def websocket_graph_traverse(
                         "timestamp": datetime.now().isoformat()
                     })
                 
+                except ConnectionClosed:
+                    raise
+                
                 except Exception as e:
                     logger.error(f"Graph traversal error: {e}")
-                    await websocket.send_json({
+                    await connection.send({
                         "type": "error",
                         "message": f"Traversal failed: {str(e)}"
                     })
     
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, ConnectionClosed):
+        manager.disconnect(websocket, client_id)
+
+
+async def _stream_generation(connection: WebSocketConnection, request_id: str, data: Dict) -> None:
+    """
+    Streamt Ollama-Tokens an den Client, sobald sie generiert werden.
+    
+    Wird als eigener Task ausgeführt; ``cancel()`` (Client-Abbruch oder
+    Disconnect) schließt den Ollama-Stream und damit die Upstream-Verbindung.
+    """
+    client = await get_ollama_client()
+    request = OllamaRequest(
+        model=data.get("model") or client.default_model,
+        prompt=data["prompt"],
+        temperature=data.get("temperature", 0.7),
+        max_tokens=data.get("max_tokens", 1000),
+        stream=True,
+        system=data.get("system")
+    )
+    
+    start = time.perf_counter()
+    ttft_ms: Optional[float] = None
+    index = 0
+    stream = await client.generate_response(request, stream=True)
+    
+    try:
+        await connection.send({
+            "type": "generation_started",
+            "request_id": request_id,
+            "model": request.model,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        async for chunk in stream:
+            if chunk.response:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                await connection.send({
+                    "type": "token",
+                    "request_id": request_id,
+                    "token": chunk.response,
+                    "index": index
+                })
+                index += 1
+            
+            if chunk.done:
+                await connection.send({
+                    "type": "generation_complete",
+                    "request_id": request_id,
+                    "tokens": index,
+                    "eval_count": chunk.eval_count,
+                    "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "timestamp": datetime.now().isoformat()
+                })
+    
+    except asyncio.CancelledError:
+        logger.info(f"Generation {request_id} abgebrochen nach {index} Tokens")
+        raise
+
+    except ConnectionClosed:
+        logger.info(f"Generation {request_id}: Verbindung geschlossen nach {index} Tokens")
+
+    except Exception as e:
+        logger.error(f"Generation error ({request_id}): {e}")
+        try:
+            await connection.send({
+                "type": "error",
+                "request_id": request_id,
+                "message": f"Generation failed: {str(e)}"
+            })
+        except Exception:
+            pass
+    
+    finally:
+        await stream.aclose()
+
+
+@websocket_router.websocket("/generate")
+async def websocket_generate(
+    websocket: WebSocket,
+    client_id: str = Query(..., description="Unique client identifier")
+):
+    """
+    LLM Token-Streaming mit Abbruch
+    
+    **Client sendet:**
+    ```json
+    { "action": "generate", "request_id": "r1", "prompt": "...", "model": "llama3:latest" }
+    { "action": "cancel", "request_id": "r1" }
+    ```
+    
+    **Server antwortet:**
+    ```json
+    { "type": "generation_started", "request_id": "r1", "model": "..." }
+    { "type": "token", "request_id": "r1", "token": "Für", "index": 0 }
+    { "type": "generation_complete", "request_id": "r1", "tokens": 120, "ttft_ms": 180.4, "duration_ms": 2300.1 }
+    { "type": "generation_cancelled", "request_id": "r1" }
+    ```
+    
+    Tokens werden ohne Pufferung weitergeleitet. ``cancel`` oder ein
+    Disconnect bricht den Ollama-Request upstream ab.
+    """
+    connection = await manager.connect(websocket, client_id, {"endpoint": "generate"})
+    generations: Dict[str, asyncio.Task] = {}
+    
+    try:
+        await connection.send({
+            "type": "connected",
+            "client_id": client_id,
+            "endpoint": "generate",
+            "ollama_available": OLLAMA_CLIENT_AVAILABLE,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        while True:
+            data = await websocket.receive_json()
+            action = data.get("action")
+            request_id = str(data.get("request_id") or f"gen_{int(time.time() * 1000)}")
+            
+            if action == "ping":
+                await connection.send({
+                    "type": "pong",
+                    "timestamp": datetime.now().isoformat()
+                })
+            
+            elif action == "generate":
+                if not OLLAMA_CLIENT_AVAILABLE:
+                    await connection.send({
+                        "type": "error",
+                        "request_id": request_id,
+                        "message": "Ollama client not available"
+                    })
+                    continue
+                if not data.get("prompt"):
+                    await connection.send({
+                        "type": "error",
+                        "request_id": request_id,
+                        "message": "Missing required field: prompt"
+                    })
+                    continue
+                if request_id in generations:
+                    await connection.send({
+                        "type": "error",
+                        "request_id": request_id,
+                        "message": "Generation with this request_id already running"
+                    })
+                    continue
+                
+                # Eigener Task: receive_json bleibt frei für "cancel"
+                task = asyncio.create_task(_stream_generation(connection, request_id, data))
+                generations[request_id] = task
+                task.add_done_callback(lambda _, rid=request_id: generations.pop(rid, None))
+            
+            elif action == "cancel":
+                task = generations.get(request_id)
+                if task is not None:
+                    task.cancel()
+                    await connection.send({
+                        "type": "generation_cancelled",
+                        "request_id": request_id,
+                        "timestamp": datetime.now().isoformat()
+                    })
+            
+            else:
+                await connection.send({
+                    "type": "error",
+                    "message": f"Unknown action: {action}"
+                })
+    
+    except (WebSocketDisconnect, ConnectionClosed):
+        logger.info(f"Client {client_id} disconnected from generate endpoint")
+    
+    except Exception as e:
+        logger.error(f"WebSocket error for client {client_id}: {e}")
+    
+    finally:
+        # Laufende Generierungen upstream abbrechen
+        for task in list(generations.values()):
+            task.cancel()
         manager.disconnect(websocket, client_id)
 
 
@@ -630,5 +795,6 @@ async def get_active_connections():
         "total_connections": manager.total_connections,
         "active_clients": len(manager.active_clients),
         "clients": list(manager.active_clients),
+        "delivery": manager.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
@@ -35,6 +35,9 @@ project_root = os.path.dirname(os.path.dirname(current_dir))  # Zwei Verzeichnis
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+# Agent-Scheduler (Admission Control → HTTP 429)
+from backend.agents.veritas_agent_scheduler import SchedulerSaturatedError
+
 # Import Streaming Progress System
 try:
     from shared.pipelines.veritas_streaming_progress import (
@@ -436,6 +439,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(SchedulerSaturatedError)
+async def scheduler_saturated_handler(request, exc: SchedulerSaturatedError):
+    """Agent-Scheduler ausgelastet → 429 mit Queue-Position und Retry-After"""
+    return JSONResponse(
+        status_code=429,
+        content=exc.to_dict(),
+        headers={"Retry-After": exc.retry_after_header}
+    )
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -832,6 +844,8 @@ async def veritas_intelligent_query(request: VeritasStreamingQueryRequest):
         logger.info(f"✅ Intelligent Query verarbeitet: {query_id} ({processing_time:.2f}s)")
         return response
         
+    except SchedulerSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"❌ Intelligent Query fehlgeschlagen: {e}")
         raise HTTPException(
@@ -1887,6 +1901,8 @@ async def veritas_chat_query(query_data: Dict[str, Any]):
                 
                 return chat_response
                 
+            except SchedulerSaturatedError:
+                raise
             except Exception as pipeline_error:
                 logger.error("Intelligent Pipeline error: %s", pipeline_error)
                 # Fallback zu Basic Response
@@ -1897,6 +1913,8 @@ async def veritas_chat_query(query_data: Dict[str, Any]):
             logger.warning("Intelligent Pipeline not available - using basic response")
             return _generate_basic_response(query_text, session_id, "Pipeline nicht initialisiert")
         
+    except SchedulerSaturatedError:
+        raise
     except Exception as e:
         logger.error("Error in chat query: %s", e)
         return _generate_error_response(query_text, session_id, str(e))
@@ -2213,6 +2231,8 @@ Kontaktieren Sie den Administrator."""
                 request_id=request_id
             )
         
+    except SchedulerSaturatedError:
+        raise
     except Exception as e:
         logger.error("Fehler bei RAG-Query: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
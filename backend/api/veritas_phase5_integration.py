@@ -63,6 +63,10 @@ def get_phase5_config() -> Dict[str, Any]:
         "hybrid_dense_top_k": int(os.getenv("VERITAS_HYBRID_DENSE_TOP_K", "20")),
         "rrf_k": int(os.getenv("VERITAS_RRF_K", "60")),
         
+        # Pipelined Re-Ranking (Cross-Encoder startet nach dem ersten Retriever, opt-in)
+        "enable_pipelined_rerank": os.getenv("VERITAS_ENABLE_PIPELINED_RERANK", "false").lower() == "true",
+        "rerank_candidates": int(os.getenv("VERITAS_RERANK_CANDIDATES", "0")) or None,
+        
         # BM25 Parameters
         "bm25_k1": float(os.getenv("VERITAS_BM25_K1", "1.5")),
         "bm25_b": float(os.getenv("VERITAS_BM25_B", "0.75")),
@@ -105,6 +109,7 @@ async def initialize_phase5_hybrid_search(
     logger.info(f"   Hybrid Search: {config['enable_hybrid_search']}")
     logger.info(f"   Sparse Retrieval (BM25): {config['enable_sparse_retrieval']}")
     logger.info(f"   Query Expansion: {config['enable_query_expansion']}")
+    logger.info(f"   Pipelined Re-Ranking: {config['enable_pipelined_rerank']}")
     logger.info(f"   RRF k: {config['rrf_k']}")
     logger.info(f"   BM25 k1={config['bm25_k1']}, b={config['bm25_b']}")
     
@@ -162,8 +167,11 @@ async def initialize_phase5_hybrid_search(
         
         bm25_retriever = SparseRetriever(config=bm25_config)
         
-        # Index demo corpus if provided
-        if demo_corpus:
+        # Persistierten Index laden (VERITAS_BM25_INDEX_PATH), sonst Demo-Corpus
+        if bm25_retriever.load_index():
+            logger.info(f"   ✅ BM25 index loaded from {bm25_config.index_path} "
+                        f"({bm25_retriever.get_stats()['num_documents']} documents, mmap)")
+        elif demo_corpus:
             logger.info(f"   📚 Indexing {len(demo_corpus)} demo documents...")
             bm25_retriever.index_documents(demo_corpus)
             logger.info(f"   ✅ BM25 indexed {len(demo_corpus)} documents")
@@ -180,13 +188,26 @@ async def initialize_phase5_hybrid_search(
             rrf_k=config["rrf_k"],
             enable_query_expansion=config["enable_query_expansion"],
             dense_top_k=config["hybrid_dense_top_k"],
-            sparse_top_k=config["hybrid_sparse_top_k"]
+            sparse_top_k=config["hybrid_sparse_top_k"],
+            enable_pipelined_rerank=config["enable_pipelined_rerank"],
+            rerank_candidates=config["rerank_candidates"]
         )
         
+        reranker = None
+        if hybrid_config.enable_pipelined_rerank:
+            try:
+                from backend.agents.veritas_reranking_service import get_reranking_service
+                reranker = get_reranking_service()
+                logger.info(f"   ✅ Cross-Encoder für Pipelined Re-Ranking: "
+                            f"{'OK' if reranker.is_available() else 'nicht geladen (Standard-Modus)'}")
+            except Exception as e:
+                logger.warning(f"   ⚠️ Re-Ranking-Service nicht verfügbar: {e} - Standard-Modus")
+        
         hybrid_retriever = HybridRetriever(
             dense_retriever=uds3_adapter,
             sparse_retriever=bm25_retriever,
-            config=hybrid_config
+            config=hybrid_config,
+            reranker=reranker
         )
         
         logger.info(f"   ✅ Hybrid Retriever initialized")
@@ -115,6 +115,7 @@ from backend.agents.veritas_intelligent_pipeline import (
     IntelligentMultiAgentPipeline, 
     get_intelligent_pipeline
 )
+from backend.agents.veritas_agent_scheduler import SchedulerSaturatedError
 
 # Streaming Progress - ZWINGEND ERFORDERLICH!
 from shared.pipelines.veritas_streaming_progress import create_progress_manager
@@ -618,6 +619,20 @@ async def health():
 # Error Handlers
 # ============================================================================
 
+@app.exception_handler(SchedulerSaturatedError)
+async def scheduler_saturated_handler(request, exc: SchedulerSaturatedError):
+    """Agent-Scheduler ausgelastet → 429 mit Queue-Position und Retry-After"""
+    logger.warning(f"Scheduler saturated: {exc}")
+    
+    return JSONResponse(
+        status_code=429,
+        content={
+            **exc.to_dict(),
+            "timestamp": datetime.now().isoformat()
+        },
+        headers={"Retry-After": exc.retry_after_header}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
@@ -6,11 +6,13 @@ Service für Speicherung und Verwaltung von Chat-Sessions.
 
 Features:
 - Auto-Save nach jeder Nachricht
-- JSON-basierte Persistierung
+- Session-Store: append-only Message-Log + SQLite-Index (siehe chat_session_store)
+- Automatische Migration bestehender JSON-Sessions in den Store
+- JSON-basierte Persistierung (Legacy, ``use_session_store=False``)
 - Automatische Backups
 - Session-Verwaltung (Liste, Laden, Löschen)
 
-Version: v3.20.0
+Version: v3.21.0
 Author: VERITAS Team
 Date: 12. Oktober 2025
 """
@@ -24,6 +26,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from shared.chat_schema import ChatSession
+from backend.services.chat_session_store import ChatSessionStore
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +38,9 @@ class ChatPersistenceService:
                  sessions_dir: str = "data/chat_sessions",
                  backups_dir: str = "data/chat_backups",
                  max_file_size_mb: int = 10,
-                 auto_backup_days: int = 1):
+                 auto_backup_days: int = 1,
+                 use_session_store: bool = True,
+                 auto_migrate: bool = True):
         """
         Initialisiert Chat Persistence Service
         
@@ -44,6 +49,8 @@ class ChatPersistenceService:
             backups_dir: Verzeichnis für Backups
             max_file_size_mb: Maximale Dateigröße (Warnung)
             auto_backup_days: Backup-Intervall in Tagen
+            use_session_store: Message-Log + SQLite-Index statt einer JSON-Datei je Session
+            auto_migrate: Bestehende JSON-Sessions beim Start in den Store übernehmen
         """
         self.sessions_dir = Path(sessions_dir)
         self.backups_dir = Path(backups_dir)
@@ -54,13 +61,20 @@ class ChatPersistenceService:
         self.sessions_dir.mkdir(parents=True, exist_ok=True)
         self.backups_dir.mkdir(parents=True, exist_ok=True)
         
+        self.session_store: Optional[ChatSessionStore] = None
+        if use_session_store:
+            self.session_store = ChatSessionStore(str(self.sessions_dir))
+            if auto_migrate:
+                self.migrate_legacy_sessions()
+        
         logger.info(f"✅ ChatPersistenceService initialisiert")
         logger.info(f"   Sessions: {self.sessions_dir}")
         logger.info(f"   Backups: {self.backups_dir}")
+        logger.info(f"   Storage: {'Session-Store (Log + Index)' if self.session_store else 'JSON'}")
     
     def save_chat_session(self, session: ChatSession) -> bool:
         """
-        Speichert Chat-Session als JSON-Datei
+        Speichert Chat-Session (Session-Store oder JSON-Datei)
         
         Args:
             session: ChatSession-Objekt
@@ -69,11 +83,21 @@ class ChatPersistenceService:
             True bei Erfolg, False bei Fehler
         """
         try:
-            session_file = self.sessions_dir / f"{session.session_id}.json"
-            
             # Update timestamp
             session.updated_at = datetime.now()
             
+            if self.session_store is not None:
+                # Nur neue Nachrichten anhängen + Index-Zeile aktualisieren
+                self.session_store.save_session(session)
+                log_file = self.session_store.log_path(session.session_id)
+                file_size = log_file.stat().st_size if log_file.exists() else 0
+                if file_size > self.max_file_size_bytes:
+                    logger.warning(f"⚠️  Session-Log sehr groß: {file_size / 1024 / 1024:.2f} MB")
+                logger.debug(f"💾 Chat-Session gespeichert: {session.session_id} ({session.title})")
+                return True
+            
+            session_file = self.sessions_dir / f"{session.session_id}.json"
+            
             # Konvertiere zu dict
             session_data = session.to_dict()
             
@@ -95,7 +119,7 @@ class ChatPersistenceService:
     
     def load_chat_session(self, session_id: str) -> Optional[ChatSession]:
         """
-        Lädt Chat-Session aus JSON-Datei
+        Lädt Chat-Session aus Session-Store oder JSON-Datei
         
         Args:
             session_id: Eindeutige Session-ID
@@ -104,6 +128,12 @@ class ChatPersistenceService:
             ChatSession-Objekt oder None bei Fehler
         """
         try:
+            if self.session_store is not None:
+                session = self.session_store.load_session(session_id)
+                if session is not None:
+                    logger.debug(f"📂 Chat-Session geladen: {session_id} ({session.title})")
+                    return session
+            
             session_file = self.sessions_dir / f"{session_id}.json"
             
             if not session_file.exists():
@@ -127,19 +157,31 @@ class ChatPersistenceService:
     def list_chat_sessions(self, 
                           limit: Optional[int] = None,
                           sort_by: str = "updated_at",
-                          reverse: bool = True) -> List[Dict[str, Any]]:
+                          reverse: bool = True,
+                          offset: int = 0) -> List[Dict[str, Any]]:
         """
         Listet alle Chat-Sessions auf
         
+        Mit Session-Store sortiert und paginiert der SQLite-Index, ohne
+        Message-Bodies zu lesen.
+        
         Args:
             limit: Maximale Anzahl (None = alle)
             sort_by: Sortier-Feld ('created_at', 'updated_at', 'title')
             reverse: Absteigende Sortierung (neueste zuerst)
+            offset: Anzahl zu überspringender Sessions (Paging)
             
         Returns:
             Liste von Session-Metadaten
         """
         try:
+            if self.session_store is not None:
+                sessions_info = self.session_store.list_sessions(
+                    limit=limit, offset=offset, sort_by=sort_by, reverse=reverse
+                )
+                logger.debug(f"📋 {len(sessions_info)} Chat-Sessions gefunden")
+                return sessions_info
+            
             session_files = list(self.sessions_dir.glob("*.json"))
             sessions_info = []
             
@@ -175,6 +217,8 @@ class ChatPersistenceService:
                 )
             
             # Limitiere
+            if offset:
+                sessions_info = sessions_info[offset:]
             if limit:
                 sessions_info = sessions_info[:limit]
             
@@ -197,6 +241,13 @@ class ChatPersistenceService:
             True bei Erfolg, False bei Fehler
         """
         try:
+            if self.session_store is not None and self.session_store.has_session(session_id):
+                if create_backup:
+                    self.create_backup(session_id)
+                self.session_store.delete_session(session_id)
+                logger.info(f"🗑️  Chat-Session gelöscht: {session_id}")
+                return True
+            
             session_file = self.sessions_dir / f"{session_id}.json"
             
             if not session_file.exists():
@@ -221,6 +272,9 @@ class ChatPersistenceService:
         """
         Erstellt Backup von Session(s)
         
+        Sessions aus dem Session-Store werden im JSON-Format exportiert
+        (wiederherstellbar über ``migrate_legacy_sessions``).
+        
         Args:
             session_id: Spezifische Session (None = alle Sessions)
             
@@ -235,7 +289,10 @@ class ChatPersistenceService:
             if session_id:
                 # Backup einer Session
                 session_file = self.sessions_dir / f"{session_id}.json"
-                if session_file.exists():
+                if self.session_store is not None and self.session_store.has_session(session_id):
+                    self._export_session_json(session_id, backup_subdir)
+                    logger.info(f"💾 Backup erstellt: {session_id}")
+                elif session_file.exists():
                     backup_file = backup_subdir / session_file.name
                     shutil.copy2(session_file, backup_file)
                     logger.info(f"💾 Backup erstellt: {session_id}")
@@ -249,7 +306,12 @@ class ChatPersistenceService:
                     backup_file = backup_subdir / session_file.name
                     shutil.copy2(session_file, backup_file)
                 
-                logger.info(f"💾 Backup aller Sessions erstellt: {len(session_files)} Dateien")
+                exported = 0
+                if self.session_store is not None:
+                    for store_session_id in self.session_store.iter_session_ids():
+                        exported += self._export_session_json(store_session_id, backup_subdir)
+                
+                logger.info(f"💾 Backup aller Sessions erstellt: {len(session_files) + exported} Dateien")
             
             return True
             
@@ -257,6 +319,56 @@ class ChatPersistenceService:
             logger.error(f"❌ Fehler beim Erstellen des Backups: {e}", exc_info=True)
             return False
     
+    def _export_session_json(self, session_id: str, target_dir: Path) -> bool:
+        """Exportiert eine Store-Session im bisherigen JSON-Format"""
+        session = self.session_store.load_session(session_id)
+        if session is None:
+            return False
+        with open(target_dir / f"{session_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
+        return True
+    
+    def migrate_legacy_sessions(self, remove_files: bool = True) -> int:
+        """
+        Übernimmt JSON-Sessions aus ``sessions_dir`` in den Session-Store
+        
+        Vor der Migration werden die JSON-Dateien in ein reguläres Backup
+        (``backups_dir/<timestamp>``) kopiert.
+        
+        Args:
+            remove_files: Migrierte JSON-Dateien aus ``sessions_dir`` entfernen
+            
+        Returns:
+            Anzahl migrierter Sessions
+        """
+        if self.session_store is None:
+            return 0
+        
+        session_files = sorted(self.sessions_dir.glob("*.json"))
+        if not session_files:
+            return 0
+        
+        logger.info(f"📦 Migriere {len(session_files)} JSON-Sessions in den Session-Store...")
+        try:
+            backup_subdir = self.backups_dir / datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_subdir.mkdir(parents=True, exist_ok=True)
+            for session_file in session_files:
+                shutil.copy2(session_file, backup_subdir / session_file.name)
+        except Exception as e:
+            logger.error(f"❌ Migration abgebrochen: Backup fehlgeschlagen - {e}", exc_info=True)
+            return 0
+        
+        migrated = 0
+        for session_file in session_files:
+            if self.session_store.import_legacy_file(session_file) is None:
+                continue
+            migrated += 1
+            if remove_files:
+                session_file.unlink()
+        
+        logger.info(f"✅ {migrated}/{len(session_files)} Sessions migriert")
+        return migrated
+    
     def auto_backup_if_needed(self) -> bool:
         """
         Erstellt automatisches Backup falls notwendig (basierend auf letztem Backup)
@@ -297,6 +409,9 @@ class ChatPersistenceService:
             Dict mit Statistiken
         """
         try:
+            if self.session_store is not None:
+                return self.session_store.get_statistics()
+            
             sessions = self.list_chat_sessions()
             
             if not sessions:
@@ -0,0 +1,440 @@
+"""
+VERITAS Chat Session Store
+==========================
+
+Speicher-Engine für Chat-Sessions aus zwei Teilen:
+
+- Append-only Message-Log je Session (``messages/<session_id>.jsonl``,
+  ein kompakter JSON-Record pro Zeile). Ein Save schreibt nur die neuen
+  Nachrichten statt die komplette Session neu zu serialisieren.
+- SQLite-Metadaten-Index (WAL) mit Titel, Zeitstempeln, Modell und
+  Nachrichtenanzahl. ``list_sessions`` sortiert und paginiert per SQL,
+  ohne Message-Bodies zu lesen.
+
+Log-Format:
+    {"i": 3, "id": "...", "role": "user", "content": "...", ...}
+
+``i`` ist der Index der Nachricht in der Session. Beim Laden gewinnt der
+letzte Record je Index; Records mit ``i >= message_count`` (Absturz
+zwischen Log-Append und Index-Update) werden ignoriert.
+
+Der Index speichert je Session die Fingerprints aller persistierten
+Nachrichten. Ändert sich nur die zuletzt gespeicherte Nachricht (z.B.
+Streaming-Antwort fertig), wird sie als neuer Record mit gleichem Index
+angehängt. Wird eine frühere Nachricht geändert oder entfernt oder wächst
+das Log über ``compact_ratio`` × Nachrichten, wird das Log atomar neu
+geschrieben (temp-Datei + ``os.replace``).
+
+Version: v3.21.0
+Author: VERITAS Team
+Date: 12. Oktober 2025
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from shared.chat_schema import ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chat_sessions (
+        session_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        title_sort TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        created_ts REAL NOT NULL,
+        updated_ts REAL NOT NULL,
+        llm_model TEXT,
+        metadata TEXT,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        log_records INTEGER NOT NULL DEFAULT 0,
+        fingerprints TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions(updated_ts);
+    CREATE INDEX IF NOT EXISTS idx_chat_sessions_created ON chat_sessions(created_ts);
+    CREATE INDEX IF NOT EXISTS idx_chat_sessions_title ON chat_sessions(title_sort);
+"""
+
+UPSERT_SESSION_SQL = """
+    INSERT INTO chat_sessions (
+        session_id, title, title_sort, created_at, updated_at, created_ts, updated_ts,
+        llm_model, metadata, message_count, log_records, fingerprints
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        title = excluded.title,
+        title_sort = excluded.title_sort,
+        created_at = excluded.created_at,
+        updated_at = excluded.updated_at,
+        created_ts = excluded.created_ts,
+        updated_ts = excluded.updated_ts,
+        llm_model = excluded.llm_model,
+        metadata = excluded.metadata,
+        message_count = excluded.message_count,
+        log_records = excluded.log_records,
+        fingerprints = excluded.fingerprints
+"""
+
+# Sortier-Feld → Index-Spalte (nur Whitelist landet im SQL)
+SORT_COLUMNS = {
+    "created_at": "created_ts",
+    "updated_at": "updated_ts",
+    "title": "title_sort",
+    "message_count": "message_count",
+}
+
+# Mindestanzahl überzähliger Log-Records, bevor kompaktiert wird
+COMPACT_SLACK = 16
+
+# Länge eines Fingerprints (hex); die Index-Spalte ``fingerprints`` ist ihre Verkettung
+FINGERPRINT_LENGTH = 16
+
+
+def message_fingerprint(message: ChatMessage) -> str:
+    """
+    Inhalts-Fingerprint einer Nachricht
+
+    Message-ID und Zeitstempel fließen bewusst nicht ein: das Frontend baut
+    ``session.messages`` vor jedem Save neu auf (neue UUIDs, Zeitstempel aus
+    HH:MM:SS rekonstruiert).
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(message.role.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(message.content.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(json.dumps(
+        [message.attachments, message.metadata], sort_keys=True, ensure_ascii=False, default=str
+    ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _message_record(index: int, message: ChatMessage) -> str:
+    return json.dumps({
+        "i": index,
+        "id": message.id,
+        "role": message.role,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+        "attachments": message.attachments,
+        "metadata": message.metadata
+    }, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+
+
+class ChatSessionStore:
+    """Append-only Message-Logs + SQLite-Metadaten-Index für Chat-Sessions"""
+
+    def __init__(self, root_dir: str = "data/chat_sessions", compact_ratio: float = 2.0):
+        """
+        Initialisiert den Session-Store
+
+        Args:
+            root_dir: Basisverzeichnis (Index-Datenbank + ``messages/``)
+            compact_ratio: Log wird neu geschrieben, sobald es mehr als
+                ``compact_ratio`` × Nachrichten Records enthält
+        """
+        self.root_dir = Path(root_dir)
+        self.messages_dir = self.root_dir / "messages"
+        self.index_path = self.root_dir / "sessions_index.db"
+        self.compact_ratio = compact_ratio
+
+        self.messages_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(INDEX_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chat_sessions)")}
+        if "fingerprints" not in columns:
+            # Index aus v3.21.0 (nur Fingerprint der letzten Nachricht): erster Save schreibt neu
+            self._conn.execute("ALTER TABLE chat_sessions ADD COLUMN fingerprints TEXT")
+
+        self.stats = {"appended_records": 0, "rewrites": 0, "saves": 0}
+
+    def log_path(self, session_id: str) -> Path:
+        """Pfad des Message-Logs einer Session"""
+        return self.messages_dir / f"{session_id}.jsonl"
+
+    # ------------------------------------------------------------------
+    # Schreiben
+    # ------------------------------------------------------------------
+
+    def save_session(self, session: ChatSession) -> int:
+        """
+        Speichert eine Session inkrementell
+
+        Hängt nur neue (bzw. die geänderte letzte) Nachricht an das Log an
+        und aktualisiert die Index-Zeile. Weicht eine frühere Nachricht vom
+        gespeicherten Fingerprint ab, wird das Log neu geschrieben.
+
+        Args:
+            session: ChatSession-Objekt
+
+        Returns:
+            Anzahl geschriebener Log-Records
+        """
+        messages = session.messages
+        fingerprints = "".join(message_fingerprint(message) for message in messages)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message_count, log_records, fingerprints FROM chat_sessions WHERE session_id = ?",
+                (session.session_id,)
+            ).fetchone()
+
+            rewrite = row is None
+            start = 0
+            log_records = 0
+            if row is not None:
+                count, log_records, stored = row
+                persisted = count * FINGERPRINT_LENGTH
+                head = (count - 1) * FINGERPRINT_LENGTH if count else 0
+                if len(messages) < count or stored is None or len(stored) != persisted:
+                    rewrite = True
+                elif fingerprints[:head] != stored[:head]:
+                    # Frühere Nachricht geändert: Anhängen würde die Änderung verlieren
+                    rewrite = True
+                elif fingerprints[head:persisted] != stored[head:]:
+                    start = count - 1
+                else:
+                    start = count
+                if log_records + len(messages) - start > self.compact_ratio * len(messages) + COMPACT_SLACK:
+                    rewrite = True
+
+            if rewrite:
+                written = self._rewrite_log(session.session_id, messages)
+                log_records = written
+            else:
+                written = self._append_log(session.session_id, messages, start)
+                log_records += written
+
+            # Index erst nach dem Log: Records jenseits message_count werden beim Laden ignoriert
+            self._conn.execute(UPSERT_SESSION_SQL, (
+                session.session_id,
+                session.title,
+                session.title.lower(),
+                session.created_at.isoformat(),
+                session.updated_at.isoformat(),
+                session.created_at.timestamp(),
+                session.updated_at.timestamp(),
+                session.llm_model,
+                json.dumps(session.metadata, ensure_ascii=False, default=str),
+                len(messages),
+                log_records,
+                fingerprints
+            ))
+
+            self.stats["saves"] += 1
+            self.stats["appended_records"] += written
+            if rewrite:
+                self.stats["rewrites"] += 1
+            return written
+
+    def _append_log(self, session_id: str, messages: List[ChatMessage], start: int) -> int:
+        if start >= len(messages):
+            return 0
+        payload = "".join(_message_record(i, messages[i]) for i in range(start, len(messages)))
+        path = self.log_path(session_id)
+        with open(path, "a+b") as handle:
+            # Unvollständige letzte Zeile (Absturz) abschließen, sonst verschmilzt der nächste Record
+            if handle.tell() > 0:
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) != b"\n":
+                    payload = "\n" + payload
+            handle.write(payload.encode("utf-8"))
+        return len(messages) - start
+
+    def _rewrite_log(self, session_id: str, messages: List[ChatMessage]) -> int:
+        path = self.log_path(session_id)
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write("".join(_message_record(i, message) for i, message in enumerate(messages)))
+        os.replace(tmp_path, path)
+        return len(messages)
+
+    # ------------------------------------------------------------------
+    # Lesen
+    # ------------------------------------------------------------------
+
+    def has_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM chat_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone() is not None
+
+    def load_session(self, session_id: str) -> Optional[ChatSession]:
+        """
+        Lädt eine Session (Index-Zeile + Message-Log)
+
+        Returns:
+            ChatSession oder None, wenn die Session nicht im Index ist
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, created_at, updated_at, llm_model, metadata, message_count "
+                "FROM chat_sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        title, created_at, updated_at, llm_model, metadata, message_count = row
+        return ChatSession.from_dict({
+            "session_id": session_id,
+            "title": title,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "llm_model": llm_model,
+            "metadata": json.loads(metadata) if metadata else {},
+            "messages": self._read_messages(session_id, message_count)
+        })
+
+    def _read_messages(self, session_id: str, message_count: int) -> List[Dict[str, Any]]:
+        path = self.log_path(session_id)
+        slots: List[Optional[Dict[str, Any]]] = [None] * message_count
+        if message_count and path.exists():
+            with open(path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Unvollständige letzte Zeile nach Absturz
+                        logger.warning(f"⚠️  Defekter Log-Record übersprungen: {path.name}")
+                        continue
+                    index = record.get("i", -1)
+                    if 0 <= index < message_count:
+                        slots[index] = record
+
+        missing = sum(1 for slot in slots if slot is None)
+        if missing:
+            logger.warning(f"⚠️  {missing} Nachrichten fehlen im Log: {session_id}")
+        return [slot for slot in slots if slot is not None]
+
+    def list_sessions(self,
+                      limit: Optional[int] = None,
+                      offset: int = 0,
+                      sort_by: str = "updated_at",
+                      reverse: bool = True) -> List[Dict[str, Any]]:
+        """
+        Listet Session-Metadaten aus dem Index (ohne Message-Bodies)
+
+        Args:
+            limit: Maximale Anzahl (None = alle)
+            offset: Anzahl zu überspringender Einträge (Paging)
+            sort_by: Sortier-Feld ('created_at', 'updated_at', 'title', 'message_count')
+            reverse: Absteigende Sortierung
+
+        Returns:
+            Liste von Session-Metadaten (Format wie ChatPersistenceService)
+        """
+        column = SORT_COLUMNS.get(sort_by, "updated_ts")
+        direction = "DESC" if reverse else "ASC"
+        sql = (
+            "SELECT session_id, title, created_at, updated_at, message_count, llm_model "
+            f"FROM chat_sessions ORDER BY {column} {direction}, session_id {direction} "
+            "LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (limit if limit else -1, offset)).fetchall()
+
+        return [
+            {
+                "session_id": session_id,
+                "title": title,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "message_count": message_count,
+                "llm_model": llm_model or "unknown",
+                "file_path": str(self.log_path(session_id))
+            }
+            for session_id, title, created_at, updated_at, message_count, llm_model in rows
+        ]
+
+    def iter_session_ids(self) -> Iterator[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT session_id FROM chat_sessions").fetchall()
+        for (session_id,) in rows:
+            yield session_id
+
+    def count_sessions(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Aggregierte Statistiken per SQL (Format wie ChatPersistenceService)"""
+        with self._lock:
+            total, total_messages = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM chat_sessions"
+            ).fetchone()
+            oldest = self._conn.execute(
+                "SELECT session_id, title, created_at FROM chat_sessions ORDER BY created_ts ASC LIMIT 1"
+            ).fetchone()
+            newest = self._conn.execute(
+                "SELECT session_id, title, created_at FROM chat_sessions ORDER BY created_ts DESC LIMIT 1"
+            ).fetchone()
+
+        def describe(row):
+            if row is None:
+                return None
+            return {"session_id": row[0], "title": row[1], "created_at": row[2]}
+
+        return {
+            "total_sessions": total,
+            "total_messages": total_messages,
+            "avg_messages_per_session": total_messages / total if total else 0,
+            "oldest_session": describe(oldest),
+            "newest_session": describe(newest)
+        }
+
+    # ------------------------------------------------------------------
+    # Löschen / Migration
+    # ------------------------------------------------------------------
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+            path = self.log_path(session_id)
+            if path.exists():
+                path.unlink()
+            return cursor.rowcount > 0
+
+    def import_legacy_file(self, session_file: Path) -> Optional[str]:
+        """
+        Übernimmt eine Session aus dem bisherigen JSON-Format
+
+        ``updated_at`` bleibt erhalten (kein Save-Zeitstempel).
+
+        Returns:
+            Session-ID oder None bei Fehler
+        """
+        try:
+            with open(session_file, "r", encoding="utf-8") as f:
+                session = ChatSession.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"⚠️  Konnte Session nicht migrieren: {session_file} - {e}")
+            return None
+
+        with self._lock:
+            # Bestehende Index-Zeile verwerfen → Log wird vollständig neu geschrieben
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session.session_id,))
+            self.save_session(session)
+        return session.session_id
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "sessions": self.count_sessions(),
+            "index_path": str(self.index_path)
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -8,7 +8,7 @@ Features:
 - Modell-spezifische Context-Window-Limits
 - 80% Safety-Reserve für System-Prompts
 - Automatic Model-Routing bei Overflow
-- Token-Counting für Prompts + Responses
+- Token-Counting für Prompts + Responses (Tokenizer des Modells, siehe token_counter)
 
 Author: VERITAS System
 Date: 2025-10-17
@@ -19,6 +19,11 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from backend.services.token_counter import TokenCounter, get_token_counter
+except ImportError:
+    from token_counter import TokenCounter, get_token_counter
+
 
 class ModelSize(str, Enum):
     """Modell-Größenkategorien"""
@@ -37,6 +42,7 @@ class ModelSpec:
     context_window: int  # Max tokens (input + output)
     parameters: str      # z.B. "2.7B"
     recommended_max_output: int  # Empfohlenes max_tokens
+    tokenizer: Optional[str] = None  # Tokenizer-Spezifikation (siehe token_counter)
     
     @property
     def safe_max_output(self) -> int:
@@ -45,33 +51,34 @@ class ModelSpec:
 
 
 # Ollama-Modell-Registry
+# Tokenizer: <tokenizer_dir>/<name>/tokenizer.json (HF), Fallback Heuristik - siehe token_counter
 OLLAMA_MODELS: Dict[str, ModelSpec] = {
     # Tiny Models (<1B)
-    "all-minilm": ModelSpec("all-minilm", ModelSize.TINY, 512, "22M", 400),
-    "nomic-embed-text": ModelSpec("nomic-embed-text", ModelSize.TINY, 8192, "137M", 6500),
+    "all-minilm": ModelSpec("all-minilm", ModelSize.TINY, 512, "22M", 400, "all-minilm"),
+    "nomic-embed-text": ModelSpec("nomic-embed-text", ModelSize.TINY, 8192, "137M", 6500, "nomic-embed-text"),
     
     # Small Models (1-3B)
-    "phi3": ModelSpec("phi3", ModelSize.SMALL, 4096, "2.7B", 3200),
-    "phi3:mini": ModelSpec("phi3:mini", ModelSize.SMALL, 4096, "2.7B", 3200),
-    "gemma3": ModelSpec("gemma3", ModelSize.SMALL, 8192, "2B", 6500),
-    "gemma:2b": ModelSpec("gemma:2b", ModelSize.SMALL, 8192, "2B", 6500),
+    "phi3": ModelSpec("phi3", ModelSize.SMALL, 4096, "2.7B", 3200, "phi3"),
+    "phi3:mini": ModelSpec("phi3:mini", ModelSize.SMALL, 4096, "2.7B", 3200, "phi3"),
+    "gemma3": ModelSpec("gemma3", ModelSize.SMALL, 8192, "2B", 6500, "gemma3"),
+    "gemma:2b": ModelSpec("gemma:2b", ModelSize.SMALL, 8192, "2B", 6500, "gemma"),
     
     # Medium Models (3-8B)
-    "llama3.2": ModelSpec("llama3.2", ModelSize.MEDIUM, 8192, "3B", 6500),
-    "llama3.2:3b": ModelSpec("llama3.2:3b", ModelSize.MEDIUM, 8192, "3B", 6500),
-    "mistral": ModelSpec("mistral", ModelSize.MEDIUM, 8192, "7B", 6500),
-    "mistral:7b": ModelSpec("mistral:7b", ModelSize.MEDIUM, 8192, "7B", 6500),
+    "llama3.2": ModelSpec("llama3.2", ModelSize.MEDIUM, 8192, "3B", 6500, "llama3"),
+    "llama3.2:3b": ModelSpec("llama3.2:3b", ModelSize.MEDIUM, 8192, "3B", 6500, "llama3"),
+    "mistral": ModelSpec("mistral", ModelSize.MEDIUM, 8192, "7B", 6500, "mistral"),
+    "mistral:7b": ModelSpec("mistral:7b", ModelSize.MEDIUM, 8192, "7B", 6500, "mistral"),
     
     # Large Models (8-70B)
-    "llama3.1:8b": ModelSpec("llama3.1:8b", ModelSize.LARGE, 32768, "8B", 26000),
-    "llama3": ModelSpec("llama3", ModelSize.LARGE, 8192, "8B", 6500),
-    "llama3:8b": ModelSpec("llama3:8b", ModelSize.LARGE, 8192, "8B", 6500),
-    "codellama": ModelSpec("codellama", ModelSize.LARGE, 16384, "13B", 13000),
-    "mixtral": ModelSpec("mixtral", ModelSize.LARGE, 32768, "8x7B", 26000),
-    "qwen2.5-coder": ModelSpec("qwen2.5-coder", ModelSize.LARGE, 32768, "7B", 26000),
+    "llama3.1:8b": ModelSpec("llama3.1:8b", ModelSize.LARGE, 32768, "8B", 26000, "llama3"),
+    "llama3": ModelSpec("llama3", ModelSize.LARGE, 8192, "8B", 6500, "llama3"),
+    "llama3:8b": ModelSpec("llama3:8b", ModelSize.LARGE, 8192, "8B", 6500, "llama3"),
+    "codellama": ModelSpec("codellama", ModelSize.LARGE, 16384, "13B", 13000, "llama2"),
+    "mixtral": ModelSpec("mixtral", ModelSize.LARGE, 32768, "8x7B", 26000, "mistral"),
+    "qwen2.5-coder": ModelSpec("qwen2.5-coder", ModelSize.LARGE, 32768, "7B", 26000, "qwen2.5"),
     
     # XLarge Models (>70B)
-    "llama3.1:70b": ModelSpec("llama3.1:70b", ModelSize.XLARGE, 131072, "70B", 104000),
+    "llama3.1:70b": ModelSpec("llama3.1:70b", ModelSize.XLARGE, 131072, "70B", 104000, "llama3"),
 }
 
 # Fallback für unbekannte Modelle
@@ -104,13 +111,15 @@ class ContextWindowManager:
     - Safety-Reserve Management
     """
     
-    def __init__(self, safety_factor: float = 0.8):
+    def __init__(self, safety_factor: float = 0.8, token_counter: Optional[TokenCounter] = None):
         """
         Args:
             safety_factor: Sicherheitsfaktor für max_output (default: 0.8 = 80%)
+            token_counter: Token-Counter (default: prozessweite Instanz)
         """
         self.safety_factor = safety_factor
         self.models = OLLAMA_MODELS
+        self.token_counter = token_counter or get_token_counter()
     
     def get_model_spec(self, model_name: str) -> ModelSpec:
         """
@@ -134,22 +143,25 @@ class ContextWindowManager:
         # Fallback
         return DEFAULT_MODEL_SPEC
     
-    def estimate_token_count(self, text: str) -> int:
+    def estimate_token_count(self, text: str, model_name: Optional[str] = None) -> int:
         """
-        Schätzt Token-Count (approximiert: 1 token ≈ 4 chars)
+        Zählt Tokens mit dem Tokenizer des Modells
+        
+        Ohne lokalen Tokenizer (Datei/Paket fehlt) liefert der TokenCounter
+        eine Heuristik statt ``len(text) // 4``.
         
         Args:
             text: Text zum Zählen
+            model_name: Modell-Name (None = Default-Tokenizer)
             
         Returns:
-            Geschätzte Anzahl Tokens
+            Anzahl Tokens
         """
         if not text:
             return 0
         
-        # Einfache Approximation: 1 token ≈ 4 characters
-        # Für präzisere Zählung: tiktoken verwenden
-        return len(text) // 4
+        tokenizer = self.get_model_spec(model_name).tokenizer if model_name else None
+        return self.token_counter.count(text, tokenizer)
     
     def calculate_available_output_tokens(
         self,
@@ -174,10 +186,11 @@ class ContextWindowManager:
         """
         model_spec = self.get_model_spec(model_name)
         
-        # Token-Counts schätzen
-        system_tokens = self.estimate_token_count(system_prompt)
-        user_tokens = self.estimate_token_count(user_prompt)
-        rag_tokens = self.estimate_token_count(rag_context)
+        # Token-Counts (ein Batch-Aufruf, gecached je Text)
+        system_tokens, user_tokens, rag_tokens = self.token_counter.count_batch(
+            [system_prompt, user_prompt, rag_context],
+            model_spec.tokenizer
+        )
         
         total_input_tokens = system_tokens + user_tokens + rag_tokens
         
@@ -32,6 +32,7 @@ from backend.agents.veritas_intelligent_pipeline import (
     IntelligentPipelineRequest,
     IntelligentPipelineResponse
 )
+from backend.agents.veritas_agent_scheduler import SchedulerSaturatedError
 
 # Import RAG Service for Hybrid Search
 from backend.services.rag_service import (
@@ -182,6 +183,8 @@ class QueryService:
             logger.info(f"Query completed: duration={duration:.2f}s, sources={len(response.sources)}")
             return response
             
+        except SchedulerSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Query processing error: {e}", exc_info=True)
             # Return error as response
@@ -280,6 +283,8 @@ class QueryService:
                     "rag_context": result.rag_context,
                     "agent_results": agent_results_list  # ✅ List instead of Dict
                 }
+            except SchedulerSaturatedError:
+                raise  # Überlast nicht als Mock-Antwort maskieren (→ 429)
             except Exception as e:
                 logger.error(f"Pipeline error: {e}", exc_info=True)
                 return await self._generate_mock_response(request, "rag")
@@ -423,7 +428,7 @@ class QueryService:
             })
         
         # Perform reranking
-        reranking_results: List[RerankingResult] = self.reranker_service.rerank(
+        reranking_results: List[RerankingResult] = await self.reranker_service.arerank(
             query=query,
             documents=documents,
             top_k=None,  # Re-rank all documents
@@ -20,6 +20,7 @@ Version: 1.0
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Any
 from enum import Enum
+import asyncio
 import logging
 import json
 import time
@@ -32,6 +33,13 @@ except ImportError:
     LLM_AVAILABLE = False
     logging.warning("DirectOllamaLLM not available - RerankerService will use fallback scoring")
 
+# Shared pooled Ollama transport (async path)
+try:
+    from backend.agents.veritas_ollama_transport import get_ollama_transport
+    TRANSPORT_AVAILABLE = True
+except ImportError:
+    TRANSPORT_AVAILABLE = False
+
 
 class ScoringMode(Enum):
     """Reranking scoring modes"""
@@ -74,7 +82,9 @@ class RerankerService:
         self,
         model_name: str = "llama3.1:8b",
         scoring_mode: ScoringMode = ScoringMode.COMBINED,
-        temperature: float = 0.1  # Low temperature for consistent scoring
+        temperature: float = 0.1,  # Low temperature for consistent scoring
+        ollama_base_url: Optional[str] = None,
+        timeout: float = 30.0
     ):
         """
         Initialize Reranker Service
@@ -83,11 +93,15 @@ class RerankerService:
             model_name: Ollama model to use for scoring
             scoring_mode: Scoring strategy
             temperature: LLM temperature (lower = more consistent)
+            ollama_base_url: Ollama URL for the async path (default: OLLAMA_HOST)
+            timeout: LLM timeout in seconds for the async path
         """
         self.logger = logging.getLogger(__name__)
         self.model_name = model_name
         self.scoring_mode = scoring_mode
         self.temperature = temperature
+        self.timeout = timeout
+        self.transport = get_ollama_transport(ollama_base_url) if TRANSPORT_AVAILABLE else None
         
         # Initialize LLM client
         self.llm: Optional[DirectOllamaLLM] = None
@@ -151,6 +165,46 @@ class RerankerService:
             batch_results = self._rerank_batch(query, batch)
             results.extend(batch_results)
         
+        return self._finalize_results(results, top_k, start_time)
+    
+    async def arerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_k: Optional[int] = None,
+        batch_size: int = 5
+    ) -> List[RerankingResult]:
+        """
+        Async variant of rerank() for use inside the event loop
+        
+        Batches are scored concurrently through the shared Ollama transport
+        (pooled keep-alive connections, per-model concurrency limit) instead
+        of blocking the event loop with synchronous HTTP calls.
+        
+        Args/Returns: see rerank()
+        """
+        start_time = time.time()
+        
+        if not documents:
+            return []
+        
+        self.logger.info(f"Reranking {len(documents)} documents (async) for query: '{query}'")
+        
+        batches = [documents[i:i+batch_size] for i in range(0, len(documents), batch_size)]
+        batch_results = await asyncio.gather(
+            *(self._arerank_batch(query, batch) for batch in batches)
+        )
+        results = [result for batch in batch_results for result in batch]
+        
+        return self._finalize_results(results, top_k, start_time)
+    
+    def _finalize_results(
+        self,
+        results: List[RerankingResult],
+        top_k: Optional[int],
+        start_time: float
+    ) -> List[RerankingResult]:
+        """Sort, apply top_k and update statistics"""
         # Sort by reranked score
         results.sort(key=lambda r: r.reranked_score, reverse=True)
         
@@ -204,28 +258,64 @@ class RerankerService:
             # Parse scores
             scores = self._parse_llm_scores(response, len(documents))
             
-            # Create RerankingResult objects
-            results = []
-            for i, doc in enumerate(documents):
-                original_score = doc.get('relevance_score', 0.5)
-                reranked_score = scores.get(i, original_score)
-                
-                results.append(RerankingResult(
-                    document_id=doc['document_id'],
-                    original_score=original_score,
-                    reranked_score=reranked_score,
-                    score_delta=reranked_score - original_score,
-                    confidence=0.8  # Default confidence
-                ))
+            self.stats['llm_successes'] += 1
+            return self._build_results(documents, scores)
+            
+        except Exception as e:
+            self.logger.error(f"LLM reranking failed: {e}")
+            self.stats['fallback_count'] += 1
+            return self._fallback_scoring(documents)
+    
+    async def _arerank_batch(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]]
+    ) -> List[RerankingResult]:
+        """Rerank a batch of documents via the shared Ollama transport"""
+        if self.llm is None or self.transport is None:
+            # Fallback: Return original scores (same as the sync path)
+            return self._fallback_scoring(documents)
+        
+        try:
+            payload = {
+                "model": self.model_name,
+                "prompt": self._build_scoring_prompt(query, documents),
+                "stream": False,
+                "options": {"temperature": self.temperature, "num_predict": 500}
+            }
+            data = await self.transport.post_json(
+                "/api/generate", payload, model=self.model_name, timeout=self.timeout
+            )
+            scores = self._parse_llm_scores(data.get("response", ""), len(documents))
             
             self.stats['llm_successes'] += 1
-            return results
+            return self._build_results(documents, scores)
             
         except Exception as e:
             self.logger.error(f"LLM reranking failed: {e}")
             self.stats['fallback_count'] += 1
             return self._fallback_scoring(documents)
     
+    def _build_results(
+        self,
+        documents: List[Dict[str, Any]],
+        scores: Dict[int, float]
+    ) -> List[RerankingResult]:
+        """Create RerankingResult objects from parsed LLM scores"""
+        results = []
+        for i, doc in enumerate(documents):
+            original_score = doc.get('relevance_score', 0.5)
+            reranked_score = scores.get(i, original_score)
+            
+            results.append(RerankingResult(
+                document_id=doc['document_id'],
+                original_score=original_score,
+                reranked_score=reranked_score,
+                score_delta=reranked_score - original_score,
+                confidence=0.8  # Default confidence
+            ))
+        return results
+    
     def _build_scoring_prompt(
         self,
         query: str,
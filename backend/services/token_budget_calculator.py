@@ -15,10 +15,15 @@ Date: 2025-10-17
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from backend.services.token_counter import TokenCounter, get_token_counter
+except ImportError:
+    from token_counter import TokenCounter, get_token_counter
+
 
 class UserIntent(str, Enum):
     """User-Intent-Typen mit Token-Gewichtungen"""
@@ -34,7 +39,8 @@ class TokenBudgetConfig:
     base_tokens: int = 600  # Erhöht von 500 wegen Verwaltungsrecht-Komplexität
     min_tokens: int = 250  # Erhöht von 200
     max_tokens: int = 4000  # Erhöht von 3000 für komplexe Verwaltungsrecht-Fälle
-    chunk_token_factor: int = 50
+    chunk_token_factor: int = 50  # Pauschal je Chunk (ohne Chunk-Texte)
+    context_token_factor: float = 0.25  # Je gezähltem Context-Token (50 / ~200 Tokens je Chunk)
     max_chunk_bonus: int = 1000
     agent_scaling_factor: float = 0.15
     confidence_low_threshold: float = 0.5
@@ -53,6 +59,8 @@ class BudgetFactors:
     intent_weight: float  # 0.5-2.0
     confidence: Optional[float] = None
     user_preference: float = 1.0  # 0.5-2.0 (User-Slider)
+    context_tokens: Optional[int] = None  # Gezählte Tokens der RAG-Chunks
+    uncounted_chunks: int = 0  # RAG-Chunks ohne Text (pauschaler Bonus)
 
 
 class QueryComplexityAnalyzer:
@@ -224,15 +232,17 @@ class QueryComplexityAnalyzer:
 class TokenBudgetCalculator:
     """Berechnet dynamisches Token-Budget basierend auf verschiedenen Faktoren"""
     
-    def __init__(self, config: Optional[TokenBudgetConfig] = None):
+    def __init__(self, config: Optional[TokenBudgetConfig] = None, token_counter: Optional[TokenCounter] = None):
         """
         Initialisiert Calculator
         
         Args:
             config: Optionale Konfiguration (nutzt Defaults wenn None)
+            token_counter: Token-Counter (default: prozessweite Instanz)
         """
         self.config = config or TokenBudgetConfig()
         self.complexity_analyzer = QueryComplexityAnalyzer()
+        self.token_counter = token_counter or get_token_counter()
     
     def calculate_budget(
         self,
@@ -242,11 +252,16 @@ class TokenBudgetCalculator:
         agent_count: int,
         intent: UserIntent = UserIntent.EXPLANATION,
         confidence: Optional[float] = None,
-        user_preference: float = 1.0
+        user_preference: float = 1.0,
+        rag_chunks: Optional[List[Dict[str, Any]]] = None,
+        tokenizer: Optional[str] = None
     ) -> Tuple[int, Dict[str, float]]:
         """
         Berechnet optimales Token-Budget
         
+        Mit ``rag_chunks`` richtet sich der Chunk-Bonus nach den gezählten
+        Context-Tokens statt nach einer Pauschale je Chunk.
+        
         Args:
             query: Die Anfrage
             chunk_count: Anzahl RAG-Chunks
@@ -255,6 +270,8 @@ class TokenBudgetCalculator:
             intent: User-Intent
             confidence: Optionaler Confidence-Score (post-hoc)
             user_preference: User-Slider (0.5-2.0)
+            rag_chunks: Optionale RAG-Chunks (Text unter 'text'/'content'/'snippet')
+            tokenizer: Tokenizer des Modells (``ModelSpec.tokenizer``)
             
         Returns:
             Tuple[int, Dict]: (berechnetes Budget, Breakdown der Faktoren)
@@ -275,6 +292,16 @@ class TokenBudgetCalculator:
         }
         intent_weight = intent_weights.get(intent, 1.0)
         
+        # Context-Tokens der Chunks (gecached je Chunk-Hash)
+        # Chunks ohne Text erhalten weiterhin den pauschalen Bonus je Chunk
+        context_tokens = None
+        uncounted_chunks = 0
+        if rag_chunks:
+            counts = self.token_counter.count_chunks(rag_chunks, tokenizer)
+            uncounted_chunks = sum(1 for count in counts if not count)
+            if uncounted_chunks < len(counts):
+                context_tokens = sum(counts)
+        
         # 4. Faktoren zusammenstellen
         factors = BudgetFactors(
             query_complexity=complexity_score,
@@ -283,7 +310,9 @@ class TokenBudgetCalculator:
             agent_count=agent_count,
             intent_weight=intent_weight,
             confidence=confidence,
-            user_preference=user_preference
+            user_preference=user_preference,
+            context_tokens=context_tokens,
+            uncounted_chunks=uncounted_chunks
         )
         
         # 5. Budget berechnen
@@ -336,11 +365,7 @@ class TokenBudgetCalculator:
         budget *= complexity_factor
         
         # Chunk-Bonus
-        chunk_bonus = min(
-            factors.chunk_count * self.config.chunk_token_factor,
-            self.config.max_chunk_bonus
-        )
-        budget += chunk_bonus
+        budget += self._chunk_bonus(factors)
         
         # Source-Diversität
         budget *= factors.source_diversity
@@ -367,6 +392,15 @@ class TokenBudgetCalculator:
         
         return budget
     
+    def _chunk_bonus(self, factors: BudgetFactors) -> float:
+        """Chunk-Bonus aus gezählten Context-Tokens, sonst pauschal je Chunk"""
+        if factors.context_tokens is not None:
+            bonus = factors.context_tokens * self.config.context_token_factor
+            bonus += factors.uncounted_chunks * self.config.chunk_token_factor
+        else:
+            bonus = factors.chunk_count * self.config.chunk_token_factor
+        return min(bonus, self.config.max_chunk_bonus)
+    
     def _create_breakdown(self, factors: BudgetFactors, final_budget: int) -> Dict[str, float]:
         """
         Erstellt detailliertes Breakdown für Analytics
@@ -384,10 +418,8 @@ class TokenBudgetCalculator:
             "complexity_score": factors.query_complexity,
             "complexity_factor": factors.query_complexity / 10.0,
             "chunk_count": factors.chunk_count,
-            "chunk_bonus": min(
-                factors.chunk_count * self.config.chunk_token_factor,
-                self.config.max_chunk_bonus
-            ),
+            "context_tokens": factors.context_tokens,
+            "chunk_bonus": self._chunk_bonus(factors),
             "source_diversity": factors.source_diversity,
             "agent_count": factors.agent_count,
             "agent_factor": 1.0 + (factors.agent_count * self.config.agent_scaling_factor),
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Token Counter - Tokenizer-basiertes Token-Counting mit Cache
+============================================================
+Ersetzt Schätzungen wie ``len(text) // 4`` oder "~200 Tokens pro Chunk"
+durch echte Token-Counts der lokalen Tokenizer des jeweiligen Modells.
+
+Features:
+- Pluggable Backends: tiktoken (Encoding-Name), HuggingFace ``tokenizers``
+  (``tokenizer.json`` von der Platte), Heuristik als Fallback
+- Tokenizer je Modell über ``ModelSpec.tokenizer`` (context_window_manager)
+- Batched Counting (``count_batch``): ein Tokenizer-Aufruf für alle
+  Cache-Misses
+- Cache je Text-Hash: jeder RAG-Chunk wird einmal tokenisiert und danach
+  nur noch nachgeschlagen
+
+Tokenizer-Spezifikation:
+- ``"tiktoken:cl100k_base"``     → tiktoken-Encoding
+- ``"hf:/pfad/tokenizer.json"``  → HF-Tokenizer-Datei
+- ``"llama3"``                   → ``<tokenizer_dir>/llama3/tokenizer.json``
+                                   bzw. ``<tokenizer_dir>/llama3.json``
+- ``"heuristic"`` / ``None``     → Heuristik (kein Tokenizer nötig)
+
+Author: VERITAS System
+Date: 2025-10-17
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Optional: tiktoken
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Optional: HuggingFace tokenizers
+try:
+    from tokenizers import Tokenizer as HFTokenizer
+    HF_TOKENIZERS_AVAILABLE = True
+except ImportError:
+    HFTokenizer = None
+    HF_TOKENIZERS_AVAILABLE = False
+
+
+HEURISTIC = "heuristic"
+
+
+class HeuristicTokenizer:
+    """
+    Tokenizer-freie Schätzung für BPE-Modelle
+
+    Wörter bis 4 Zeichen = 1 Token, längere Wörter ≈ 1 Token je 4 Zeichen
+    (deutsche Komposita wie "Immissionsschutzgesetz" zerfallen in mehrere
+    Tokens), Ziffern in 3er-Gruppen, Satzzeichen je 1 Token.
+    """
+
+    name = HEURISTIC
+    exact = False
+
+    _PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        return [self._count(text) for text in texts]
+
+    def _count(self, text: str) -> int:
+        tokens = 0
+        for piece in self._PIECES.findall(text):
+            if piece.isdigit():
+                tokens += math.ceil(len(piece) / 3)
+            else:
+                tokens += max(1, math.ceil(len(piece) / 4))
+        return tokens
+
+
+class TiktokenTokenizer:
+    """tiktoken-Encoding (z.B. cl100k_base)"""
+
+    exact = True
+
+    def __init__(self, encoding_name: str):
+        self.name = f"tiktoken:{encoding_name}"
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(list(texts))]
+
+
+class HFTokenizerFile:
+    """HuggingFace ``tokenizers``-Datei (tokenizer.json)"""
+
+    exact = True
+
+    def __init__(self, path: Path, name: Optional[str] = None):
+        self.name = f"hf:{name or path}"
+        self._tokenizer = HFTokenizer.from_file(str(path))
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        encodings = self._tokenizer.encode_batch(list(texts), add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+
+@dataclass
+class TokenCounterConfig:
+    """Konfiguration für den Token-Counter"""
+    tokenizer_dir: str = field(
+        default_factory=lambda: os.environ.get("VERITAS_TOKENIZER_DIR", "models/tokenizers")
+    )
+    default_tokenizer: Optional[str] = None  # None = Heuristik
+    cache_size: int = 200_000  # Anzahl gecachter Text-Hashes
+
+
+class TokenCounter:
+    """
+    Zählt Tokens mit dem Tokenizer des Modells und cached je Text-Hash
+
+    Thread-safe; Tokenizer werden beim ersten Gebrauch geladen.
+    """
+
+    def __init__(self, config: Optional[TokenCounterConfig] = None):
+        """
+        Args:
+            config: Optionale Konfiguration (nutzt Defaults wenn None)
+        """
+        self.config = config or TokenCounterConfig()
+        self._tokenizers: Dict[str, Any] = {}
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "tokenized_chars": 0}
+
+    # ------------------------------------------------------------------
+    # Tokenizer-Auflösung
+    # ------------------------------------------------------------------
+
+    def get_tokenizer(self, tokenizer: Optional[str] = None):
+        """Lädt (einmalig) den Tokenizer zu einer Spezifikation"""
+        spec = tokenizer or self.config.default_tokenizer or HEURISTIC
+        loaded = self._tokenizers.get(spec)
+        if loaded is None:
+            with self._lock:
+                loaded = self._tokenizers.get(spec)
+                if loaded is None:
+                    loaded = self._load_tokenizer(spec)
+                    self._tokenizers[spec] = loaded
+        return loaded
+
+    def _load_tokenizer(self, spec: str):
+        if spec == HEURISTIC:
+            return HeuristicTokenizer()
+
+        try:
+            if spec.startswith("tiktoken:"):
+                if TIKTOKEN_AVAILABLE:
+                    return TiktokenTokenizer(spec.split(":", 1)[1])
+                logger.warning(f"⚠️ tiktoken nicht installiert - Heuristik für {spec}")
+                return HeuristicTokenizer()
+
+            if spec.startswith("hf:"):
+                path, name = Path(spec.split(":", 1)[1]), None
+            else:
+                base = Path(self.config.tokenizer_dir)
+                candidates = [base / spec / "tokenizer.json", base / f"{spec}.json"]
+                path = next((candidate for candidate in candidates if candidate.exists()), candidates[0])
+                name = spec
+
+            if not path.exists():
+                logger.warning(f"⚠️ Tokenizer-Datei nicht gefunden: {path} - Heuristik für {spec}")
+                return HeuristicTokenizer()
+            if not HF_TOKENIZERS_AVAILABLE:
+                logger.warning(f"⚠️ tokenizers nicht installiert - Heuristik für {spec}")
+                return HeuristicTokenizer()
+
+            loaded = HFTokenizerFile(path, name)
+            logger.info(f"✅ Tokenizer geladen: {loaded.name}")
+            return loaded
+
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer {spec} konnte nicht geladen werden: {e} - Heuristik")
+            return HeuristicTokenizer()
+
+    def register_tokenizer(self, spec: str, tokenizer) -> None:
+        """
+        Registriert ein eigenes Tokenizer-Backend
+
+        Args:
+            spec: Tokenizer-Spezifikation (z.B. Wert von ``ModelSpec.tokenizer``)
+            tokenizer: Objekt mit ``name``, ``exact`` und ``count_batch(texts) -> List[int]``
+        """
+        with self._lock:
+            self._tokenizers[spec] = tokenizer
+
+    def is_exact(self, tokenizer: Optional[str] = None) -> bool:
+        """True wenn echte Tokenizer-Counts (keine Heuristik) geliefert werden"""
+        return self.get_tokenizer(tokenizer).exact
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def count(self, text: str, tokenizer: Optional[str] = None) -> int:
+        """
+        Zählt Tokens eines Texts
+
+        Args:
+            text: Text zum Zählen
+            tokenizer: Tokenizer-Spezifikation (z.B. ``ModelSpec.tokenizer``)
+
+        Returns:
+            Anzahl Tokens
+        """
+        if not text:
+            return 0
+        return self.count_batch([text], tokenizer)[0]
+
+    def count_batch(self, texts: Sequence[str], tokenizer: Optional[str] = None) -> List[int]:
+        """
+        Zählt Tokens mehrerer Texte
+
+        Cache-Misses (dedupliziert) gehen in einem Tokenizer-Aufruf raus.
+
+        Args:
+            texts: Texte
+            tokenizer: Tokenizer-Spezifikation
+
+        Returns:
+            Token-Counts in Eingabe-Reihenfolge
+        """
+        backend = self.get_tokenizer(tokenizer)
+        counts: List[int] = [0] * len(texts)
+        misses: Dict[tuple, List[int]] = {}
+
+        with self._lock:
+            for index, text in enumerate(texts):
+                if not text:
+                    continue
+                key = (backend.name, self.text_hash(text))
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    counts[index] = cached
+                    self.stats["hits"] += 1
+                else:
+                    misses.setdefault(key, []).append(index)
+
+        if not misses:
+            return counts
+
+        keys = list(misses)
+        miss_texts = [texts[misses[key][0]] for key in keys]
+        miss_counts = backend.count_batch(miss_texts)
+
+        with self._lock:
+            self.stats["misses"] += len(keys)
+            self.stats["tokenized_chars"] += sum(len(text) for text in miss_texts)
+            for key, count in zip(keys, miss_counts):
+                for index in misses[key]:
+                    counts[index] = count
+                self._cache[key] = count
+            while len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
+
+        return counts
+
+    def count_chunks(
+        self,
+        chunks: Sequence[Dict[str, Any]],
+        tokenizer: Optional[str] = None
+    ) -> List[int]:
+        """
+        Zählt Tokens von RAG-Chunks (Text unter ``text``, ``content`` oder
+        ``snippet`` - Letzteres ist das Format von ``RAGContextService``)
+
+        Args:
+            chunks: RAG-Chunks
+            tokenizer: Tokenizer-Spezifikation
+
+        Returns:
+            Token-Counts je Chunk (0 für Chunks ohne Text)
+        """
+        return self.count_batch(
+            [
+                chunk.get("text") or chunk.get("content") or chunk.get("snippet") or ""
+                for chunk in chunks
+            ],
+            tokenizer
+        )
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "cached": len(self._cache),
+            "tokenizers": {spec: loaded.name for spec, loaded in self._tokenizers.items()},
+        }
+
+
+# Singleton
+_token_counter: Optional[TokenCounter] = None
+_token_counter_lock = threading.Lock()
+
+
+def get_token_counter(config: Optional[TokenCounterConfig] = None) -> TokenCounter:
+    """Gibt die prozessweite TokenCounter-Instanz zurück"""
+    global _token_counter
+    if _token_counter is None:
+        with _token_counter_lock:
+            if _token_counter is None:
+                _token_counter = TokenCounter(config)
+    return _token_counter
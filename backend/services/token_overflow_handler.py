@@ -3,7 +3,8 @@
 Token Overflow Handler - Strategien bei Token-Limit-Überschreitung
 ===================================================================
 Implementiert verschiedene Strategien um mit Token-Overflows umzugehen:
-1. Chunk Reranking & Priorisierung
+1. Chunk Reranking & Priorisierung (vektorisiertes Scoring, Knapsack-Auswahl
+   im exakten Token-Budget)
 2. Context Summarization
 3. Chunked Response (Multi-Part)
 4. Streaming mit Early Stopping
@@ -12,11 +13,21 @@ Author: VERITAS System
 Date: 2025-10-17
 """
 
+import math
 import re
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+try:
+    from backend.services.token_counter import TokenCounter, get_token_counter
+except ImportError:
+    from token_counter import TokenCounter, get_token_counter
+
 
 class OverflowStrategy(str, Enum):
     """Strategien für Token-Overflow"""
@@ -40,9 +51,82 @@ class OverflowResult:
     metadata: Dict[str, Any] = None
 
 
+WORD_PATTERN = re.compile(r'\w+')
+
+# Mindestanzahl Chunks, die beim Reranking erhalten bleiben
+MIN_KEPT_CHUNKS = 3
+
+
+class ChunkTermCache:
+    """
+    Gecachte Term-ID-Repräsentation von Chunk-Texten
+    
+    Jeder Text wird einmal kleingeschrieben und tokenisiert (``\\w+`` wie im
+    skalaren Scoring); gespeichert wird ein sortiertes, eindeutiges
+    ``int64``-Array der Term-Hashes, Schlüssel ist der Text-Hash. Chunks,
+    die in mehreren Overflows vorkommen, werden nicht erneut gescannt.
+    """
+    
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def term_ids(text: str) -> np.ndarray:
+        """Eindeutige Term-IDs eines Texts"""
+        words = set(WORD_PATTERN.findall(text.lower()))
+        ids = np.fromiter(map(hash, words), dtype=np.int64, count=len(words))
+        ids.sort()
+        return ids
+    
+    def get_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Term-ID-Arrays für mehrere Texte (Cache je Text-Hash)"""
+        keys = [TokenCounter.text_hash(text) for text in texts]
+        result: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._entries.get(key)
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    result[index] = cached
+        
+        computed = {}
+        for index, ids in enumerate(result):
+            if ids is None:
+                key = keys[index]
+                if key not in computed:
+                    computed[key] = self.term_ids(texts[index])
+                result[index] = computed[key]
+        
+        with self._lock:
+            self.hits += len(texts) - len(computed)
+            self.misses += len(computed)
+            self._entries.update(computed)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return result
+
+
+_term_cache = ChunkTermCache()
+
+
+def get_chunk_term_cache() -> ChunkTermCache:
+    """Prozessweiter Term-Cache für Chunk-Texte"""
+    return _term_cache
+
+
 class ChunkReranker:
     """
     Rerankt RAG-Chunks nach Relevanz und behält nur die wichtigsten
+    
+    ``score_chunks`` berechnet die Scores aller Chunks vektorisiert (gleiche
+    Formel wie ``calculate_relevance_score``); Auswahlen liefern Indizes bzw.
+    die unveränderten Chunk-Dicts.
     """
     
     @staticmethod
@@ -51,7 +135,7 @@ class ChunkReranker:
         query: str
     ) -> float:
         """
-        Berechnet Relevanz-Score für Chunk
+        Berechnet Relevanz-Score für Chunk (skalare Referenz)
         
         Args:
             chunk: RAG-Chunk mit 'text' und optional 'score'
@@ -84,11 +168,150 @@ class ChunkReranker:
         
         return min(score, 1.0)
     
+    @staticmethod
+    def score_chunks(
+        chunks: Sequence[Dict[str, Any]],
+        query: str,
+        term_cache: Optional[ChunkTermCache] = None
+    ) -> np.ndarray:
+        """
+        Berechnet Relevanz-Scores aller Chunks vektorisiert
+        
+        Keyword-Overlap: alle Term-Arrays werden konkateniert, ``np.isin``
+        markiert Query-Terme, Summen je Chunk über kumulierte Offsets.
+        
+        Args:
+            chunks: RAG-Chunks mit 'text' und optional 'score'
+            query: Original-Query
+            term_cache: Term-Cache (default: prozessweite Instanz)
+            
+        Returns:
+            np.ndarray: Relevanz-Scores (0.0-1.0) in Chunk-Reihenfolge
+        """
+        count = len(chunks)
+        if count == 0:
+            return np.empty(0)
+        
+        term_cache = term_cache or get_chunk_term_cache()
+        texts = [chunk.get('text', '') for chunk in chunks]
+        term_arrays = term_cache.get_many(texts)
+        query_ids = ChunkTermCache.term_ids(query)
+        
+        # 1. Existing score from RAG
+        rag_scores = np.fromiter((chunk.get('score') or 0.0 for chunk in chunks), dtype=np.float64, count=count)
+        
+        # 2. Query keyword overlap
+        term_counts = np.fromiter((ids.size for ids in term_arrays), dtype=np.int64, count=count)
+        overlap = np.zeros(count)
+        if query_ids.size and term_counts.sum():
+            hits = np.isin(np.concatenate(term_arrays), query_ids)
+            cumulative = np.concatenate(([0], np.cumsum(hits)))
+            ends = np.cumsum(term_counts)
+            overlap = (cumulative[ends] - cumulative[ends - term_counts]) / query_ids.size
+        
+        # 3. Chunk length
+        lengths = np.fromiter(map(len, texts), dtype=np.float64, count=count)
+        
+        # 4. Source quality
+        source_bonus = np.fromiter(
+            (chunk.get('source_type') in ('relational', 'graph') for chunk in chunks),
+            dtype=np.float64, count=count
+        )
+        
+        scores = rag_scores * 0.4 + overlap * 0.3 + np.minimum(lengths / 1000, 1.0) * 0.2 + source_bonus * 0.1
+        return np.minimum(scores, 1.0)
+    
+    @staticmethod
+    def top_n_indices(scores: np.ndarray, n: int) -> np.ndarray:
+        """
+        Indizes der n besten Scores, absteigend sortiert
+        
+        ``argpartition`` (O(n)) statt Sortierung aller Chunks; nur die
+        Top-N werden sortiert.
+        """
+        n = max(0, min(n, len(scores)))
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        if n < len(scores):
+            candidates = np.argpartition(-scores, n - 1)[:n]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+    
+    @staticmethod
+    def select_within_budget(
+        scores: np.ndarray,
+        token_counts: Sequence[int],
+        token_budget: int,
+        max_cells: int = 8192
+    ) -> np.ndarray:
+        """
+        Wählt Chunks mit maximaler Gesamt-Relevanz im Token-Budget (0/1-Knapsack)
+        
+        Dynamische Programmierung über die Budget-Achse, je Chunk eine
+        vektorisierte Zeile. Budgets über ``max_cells`` werden in Token-Gruppen
+        gerechnet; Gewichte werden dabei aufgerundet, das Budget wird also nie
+        überschritten. Den Rundungsverlust füllt anschließend eine gierige
+        Auswahl nach Score-Dichte auf.
+        
+        Args:
+            scores: Relevanz-Scores je Chunk
+            token_counts: Exakte Token-Counts je Chunk
+            token_budget: Maximal erlaubte Tokens für die Auswahl
+            max_cells: Maximale Breite der DP-Tabelle
+            
+        Returns:
+            np.ndarray: Indizes der gewählten Chunks, nach Score absteigend
+        """
+        weights = np.asarray(token_counts, dtype=np.int64)
+        values = np.asarray(scores, dtype=np.float64)
+        if token_budget <= 0 or len(values) == 0:
+            return np.empty(0, dtype=np.int64)
+        if weights.sum() <= token_budget:
+            return ChunkReranker.top_n_indices(values, len(values))
+        
+        granularity = max(1, math.ceil(token_budget / max_cells))
+        scaled = -(-weights // granularity)  # Aufrunden
+        capacity = token_budget // granularity
+        
+        best = np.zeros(capacity + 1)
+        taken = np.zeros((len(values), capacity + 1), dtype=bool)
+        for index in range(len(values)):
+            weight = scaled[index]
+            if weight > capacity or values[index] <= 0:
+                continue
+            candidate = best[:capacity + 1 - weight] + values[index]
+            better = candidate > best[weight:]
+            taken[index, weight:] = better
+            best[weight:] = np.where(better, candidate, best[weight:])
+        
+        selected = []
+        remaining = capacity
+        for index in range(len(values) - 1, -1, -1):
+            if taken[index, remaining]:
+                selected.append(index)
+                remaining -= scaled[index]
+        
+        # Rundungsverlust der Token-Gruppen: Restbudget nach Score-Dichte auffüllen
+        if granularity > 1:
+            remaining_tokens = token_budget - int(weights[selected].sum())
+            chosen = np.zeros(len(values), dtype=bool)
+            chosen[selected] = True
+            density = values / np.maximum(weights, 1)
+            for index in np.argsort(-density, kind='stable'):
+                if not chosen[index] and values[index] > 0 and weights[index] <= remaining_tokens:
+                    selected.append(int(index))
+                    remaining_tokens -= weights[index]
+        
+        selected = np.asarray(selected, dtype=np.int64)
+        return selected[np.argsort(-values[selected], kind='stable')]
+    
     @staticmethod
     def rerank_and_filter(
         chunks: List[Dict[str, Any]],
         query: str,
-        max_chunks: int
+        max_chunks: int,
+        token_counts: Optional[List[int]] = None
     ) -> Tuple[List[Dict[str, Any]], int]:
         """
         Rerankt Chunks und behält nur Top-N
@@ -97,31 +320,26 @@ class ChunkReranker:
             chunks: Liste von RAG-Chunks
             query: Original-Query
             max_chunks: Maximale Anzahl Chunks
+            token_counts: Token-Counts je Chunk (None = über TokenCounter zählen)
             
         Returns:
-            Tuple[filtered_chunks, tokens_saved]
+            Tuple[filtered_chunks, tokens_saved] - die Original-Chunk-Dicts
+            (unverändert) nach Relevanz sortiert
         """
         if not chunks:
             return [], 0
         
-        # Relevanz-Scores berechnen
-        scored_chunks = [
-            {**chunk, 'relevance_score': ChunkReranker.calculate_relevance_score(chunk, query)}
-            for chunk in chunks
-        ]
+        if token_counts is None:
+            token_counts = get_token_counter().count_chunks(chunks)
         
-        # Nach Score sortieren
-        scored_chunks.sort(key=lambda x: x['relevance_score'], reverse=True)
+        scores = ChunkReranker.score_chunks(chunks, query)
+        kept = ChunkReranker.top_n_indices(scores, max_chunks)
         
-        # Top-N behalten
-        original_count = len(chunks)
-        filtered_chunks = scored_chunks[:max_chunks]
-        removed_count = original_count - len(filtered_chunks)
+        # Ersparnis = Tokens der entfernten Chunks
+        counts = np.asarray(token_counts, dtype=np.int64)
+        tokens_saved = int(counts.sum() - counts[kept].sum())
         
-        # Geschätzte Token-Ersparnis (durchschnittlich ~200 tokens pro Chunk)
-        tokens_saved = removed_count * 200
-        
-        return filtered_chunks, tokens_saved
+        return [chunks[index] for index in kept], tokens_saved
 
 
 class ContextSummarizer:
@@ -174,15 +392,13 @@ class ContextSummarizer:
         if len(sentences) <= max_sentences:
             return text
         
-        # Scoring: Längere Sätze mit mehr Keywords bevorzugen
-        def score_sentence(sent: str) -> float:
-            return len(sent) * (1 + sent.count(',') * 0.1)
-        
-        scored = [(score_sentence(s), s) for s in sentences]
-        scored.sort(reverse=True)
+        # Scoring: Längere Sätze mit mehr Keywords bevorzugen (vektorisiert)
+        sentence_array = np.array(sentences)
+        scores = np.char.str_len(sentence_array) * (1 + np.char.count(sentence_array, ',') * 0.1)
         
         # Top-N behalten und in ursprünglicher Reihenfolge zurückgeben
-        top_sentences = [s for _, s in scored[:max_sentences]]
+        top_indices = np.sort(ChunkReranker.top_n_indices(scores, max_sentences))
+        top_sentences = [sentences[index] for index in top_indices]
         result = '. '.join(top_sentences) + '.'
         
         return result
@@ -284,8 +500,14 @@ class TokenOverflowHandler:
     Hauptklasse für Token-Overflow-Management
     """
     
-    def __init__(self):
-        """Initialisiert Handler"""
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        """
+        Initialisiert Handler
+        
+        Args:
+            token_counter: Token-Counter (default: prozessweite Instanz)
+        """
+        self.token_counter = token_counter or get_token_counter()
         self.reranker = ChunkReranker()
         self.summarizer = ContextSummarizer()
         self.chunked_handler = ChunkedResponseHandler()
@@ -297,7 +519,8 @@ class TokenOverflowHandler:
         rag_chunks: List[Dict[str, Any]] = None,
         rag_context: Dict[str, Any] = None,
         query: str = "",
-        agent_count: int = 0
+        agent_count: int = 0,
+        tokenizer: Optional[str] = None
     ) -> OverflowResult:
         """
         Behandelt Token-Overflow mit geeigneter Strategie
@@ -309,6 +532,7 @@ class TokenOverflowHandler:
             rag_context: RAG-Context
             query: Original-Query
             agent_count: Anzahl Agenten
+            tokenizer: Tokenizer des Modells (``ModelSpec.tokenizer``)
             
         Returns:
             OverflowResult mit angewandter Strategie
@@ -317,14 +541,20 @@ class TokenOverflowHandler:
         
         # Strategie 1: Chunk Reranking (bevorzugt, minimaler Qualitätsverlust)
         if rag_chunks and len(rag_chunks) >= 5:
-            # Berechne wie viele Chunks wir entfernen können
-            overflow_tokens = overflow
-            chunks_to_remove = min(len(rag_chunks) - 3, max(1, overflow_tokens // 200))
-            max_chunks = len(rag_chunks) - chunks_to_remove
+            # Exakte Token-Counts je Chunk (gecached über den Chunk-Hash)
+            token_counts = np.asarray(self.token_counter.count_chunks(rag_chunks, tokenizer), dtype=np.int64)
+            scores = self.reranker.score_chunks(rag_chunks, query)
+            total_chunk_tokens = int(token_counts.sum())
             
-            filtered_chunks, tokens_saved = self.reranker.rerank_and_filter(
-                rag_chunks, query, max_chunks
+            # Maximale Relevanz innerhalb des Budgets, das nach dem Overflow bleibt
+            selected = self.reranker.select_within_budget(
+                scores, token_counts, total_chunk_tokens - overflow
             )
+            if len(selected) < MIN_KEPT_CHUNKS:
+                selected = self.reranker.top_n_indices(scores, MIN_KEPT_CHUNKS)
+            
+            filtered_chunks = [rag_chunks[index] for index in selected]
+            tokens_saved = total_chunk_tokens - int(token_counts[selected].sum())
             
             # Wenn wir deutliche Token-Ersparnis erzielen, verwende diese Strategie
             if tokens_saved > 0 and tokens_saved >= overflow * 0.2:
@@ -335,7 +565,11 @@ class TokenOverflowHandler:
                     tokens_saved=tokens_saved,
                     quality_impact=0.95,  # Minimal impact
                     user_message=f"ℹ️ {len(rag_chunks) - len(filtered_chunks)} weniger relevante Quellen ausgeblendet",
-                    metadata={'original_chunks': len(rag_chunks), 'filtered_chunks': len(filtered_chunks)}
+                    metadata={
+                        'original_chunks': len(rag_chunks),
+                        'filtered_chunks': len(filtered_chunks),
+                        'selected_indices': selected.tolist()
+                    }
                 )
         
         # Strategie 2: Context Summarization (mittlerer Impact)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+WebSocket Delivery - Sende-Queue und Writer-Task je Verbindung
+==============================================================
+Entkoppelt das Senden an WebSocket-Clients von den Endpoints und vom
+Broadcast: ein langsamer oder hängender Socket bremst nur sich selbst.
+
+Features:
+- Begrenzte Sende-Queue + eigener Writer-Task je Verbindung
+- Broadcasts serialisieren die Nachricht einmal und reihen nur ein
+  (kein ``await`` auf fremde Sockets)
+- High-Water-Marks je Queue:
+    * ``degrade_watermark``: verwerfbare Frames (Broadcast, Logs) werden
+      für diese Verbindung übersprungen
+    * ``queue_size``: Queue voll → Verbindung wird geschlossen (1013),
+      nur bei nicht verwerfbaren Frames ohne Backpressure (``enqueue``)
+- ``send_timeout``: hängender Socket → Verbindung wird geschlossen
+- Antwort-Streams (``send``) warten auf Platz in der Queue und laufen damit
+  so schnell, wie der Client liest
+- ``iter_batches`` für gebündelte Ergebnis-Frames
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# RFC 6455: 1013 "Try Again Later" - Server schließt langsamen Consumer
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ConnectionClosed(Exception):
+    """Verbindung geschlossen (Disconnect, Sende-Fehler oder langsamer Consumer)"""
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """Serialisiert eine Nachricht (gleiches Format wie ``WebSocket.send_json``)"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def iter_batches(items: Sequence[Any], batch_size: int) -> Iterator[Tuple[int, Sequence[Any]]]:
+    """Teilt Ergebnisse in (offset, batch) für gebündelte Frames"""
+    batch_size = max(1, batch_size)
+    for offset in range(0, len(items), batch_size):
+        yield offset, items[offset:offset + batch_size]
+
+
+@dataclass
+class DeliveryConfig:
+    """Konfiguration der Sende-Queues"""
+    queue_size: int = 256          # Max. Frames je Verbindung; voll = Verbindung schließen
+    degrade_watermark: int = 64    # Ab hier werden verwerfbare Frames übersprungen
+    send_timeout: float = 10.0     # Max. Dauer eines einzelnen Sendevorgangs (s)
+    close_timeout: float = 2.0     # Max. Dauer für das Schließen des Sockets (s)
+
+
+class WebSocketConnection:
+    """
+    Eine WebSocket-Verbindung mit Sende-Queue und Writer-Task
+
+    Alle Frames einer Verbindung laufen über den Writer-Task - Endpoint,
+    Broadcasts und Log-Handler senden damit nie gleichzeitig auf denselben
+    Socket, und die Reihenfolge bleibt erhalten.
+    """
+
+    def __init__(
+        self,
+        websocket: Any,
+        client_id: str,
+        config: Optional[DeliveryConfig] = None,
+        on_close: Optional[Callable[["WebSocketConnection"], None]] = None
+    ):
+        """
+        Args:
+            websocket: Starlette/FastAPI WebSocket (``send_text``, ``close``)
+            client_id: Client-ID
+            config: Queue-Konfiguration
+            on_close: Callback nach dem Schließen (Manager-Cleanup)
+        """
+        self.websocket = websocket
+        self.client_id = client_id
+        self.config = config or DeliveryConfig()
+        self._on_close = on_close
+
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()   # Frames in der Queue
+        self._space = asyncio.Event()   # Platz in der Queue
+        self._space.set()
+        self._writer: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.degraded = False
+        self.stats = {"sent": 0, "sent_bytes": 0, "skipped": 0}
+
+    def start(self) -> None:
+        """Startet den Writer-Task (im Event-Loop aufrufen)"""
+        self._loop = asyncio.get_running_loop()
+        self._writer = asyncio.create_task(self._run_writer(), name=f"ws-writer-{self.client_id}")
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    # ------------------------------------------------------------------
+    # Einreihen
+    # ------------------------------------------------------------------
+
+    def enqueue(self, frame: str, droppable: bool = False) -> bool:
+        """
+        Reiht einen serialisierten Frame ein, ohne zu warten (Broadcasts)
+
+        Args:
+            frame: Serialisierte Nachricht (``encode_message``)
+            droppable: Frame darf bei Rückstau übersprungen werden
+
+        Returns:
+            True wenn eingereiht
+        """
+        if self.closed:
+            return False
+
+        depth = len(self._queue)
+        # Zustand jeweils vor dem Logging setzen: Log-Handler (/ws/logs)
+        # reihen über dieselbe Verbindung ein
+
+        # Verwerfbare Frames schließen nie: eine per ``send()`` bis
+        # ``queue_size`` gefüllte Queue ist Backpressure, kein toter Client
+        if droppable and depth >= min(self.config.degrade_watermark, self.config.queue_size):
+            newly_degraded = not self.degraded
+            self.degraded = True
+            self.stats["skipped"] += 1
+            if newly_degraded:
+                logger.info(f"🐢 WebSocket {self.client_id}: Rückstau ({depth}) - verwerfbare Frames werden übersprungen")
+            return False
+
+        if depth >= self.config.queue_size:
+            self.close(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+            logger.warning(f"⚠️ WebSocket {self.client_id}: Sende-Queue voll ({depth}) - schließe langsamen Consumer")
+            return False
+
+        self._push(frame)
+        return True
+
+    def _push(self, frame: str) -> None:
+        self._queue.append(frame)
+        self._ready.set()
+        if len(self._queue) >= self.config.queue_size:
+            self._space.clear()
+
+    async def put(self, frame: str) -> None:
+        """
+        Reiht einen Frame ein und wartet bei voller Queue auf Platz
+
+        Raises:
+            ConnectionClosed: Verbindung ist geschlossen
+        """
+        while True:
+            if self.closed:
+                raise ConnectionClosed(self.close_reason or "closed")
+            if len(self._queue) < self.config.queue_size:
+                self._push(frame)
+                return
+            self._space.clear()
+            await self._space.wait()
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Sendet eine Nachricht dieser Verbindung (mit Backpressure)"""
+        await self.put(encode_message(message))
+
+    def send_threadsafe(self, message: Dict[str, Any], droppable: bool = True) -> None:
+        """Reiht eine Nachricht aus beliebigem Thread ein (z.B. Logging-Handler)"""
+        if self.closed or self._loop is None:
+            return
+        frame = encode_message(message)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self.enqueue(frame, droppable)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self.enqueue, frame, droppable)
+            except RuntimeError:
+                pass  # Loop bereits geschlossen
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+
+    async def _run_writer(self) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self.degraded = False
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                frame = self._queue.popleft()
+                if len(self._queue) < self.config.queue_size:
+                    self._space.set()
+
+                await asyncio.wait_for(self.websocket.send_text(frame), self.config.send_timeout)
+                self.stats["sent"] += 1
+                self.stats["sent_bytes"] += len(frame)
+
+        except asyncio.CancelledError:
+            raise
+
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ WebSocket {self.client_id}: Senden hängt > {self.config.send_timeout}s - schließe Verbindung")
+            self.close(SLOW_CONSUMER_CLOSE_CODE, "send timeout")
+
+        except Exception as e:
+            logger.debug(f"WebSocket {self.client_id}: Senden fehlgeschlagen: {e}")
+            self.close(None, f"send failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Schließen
+    # ------------------------------------------------------------------
+
+    def close(self, code: Optional[int] = None, reason: str = "") -> None:
+        """
+        Schließt die Verbindung (idempotent)
+
+        Args:
+            code: Close-Code für den Socket; None = Socket nicht aktiv schließen
+                  (Client hat sich bereits getrennt)
+            reason: Grund (Logging/Stats)
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason or "closed"
+        self._queue.clear()
+        self._ready.set()
+        self._space.set()  # wartende put() wecken
+
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+        if code is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.create_task(self._close_socket(code, reason))
+
+        if self._on_close is not None:
+            self._on_close(self)
+
+    async def _close_socket(self, code: int, reason: str) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), self.config.close_timeout)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "client_id": self.client_id,
+            "queue_depth": len(self._queue),
+            "degraded": self.degraded,
+            "closed": self.closed,
+            "close_reason": self.close_reason
+        }
+
+
+class ConnectionManager:
+    """
+    Verwaltet aktive WebSocket-Verbindungen
+    Unterstützt Broadcast und gezielte Nachrichten
+
+    Nachrichten werden einmal serialisiert und in die Sende-Queue jeder
+    Verbindung eingereiht; gesendet wird von den Writer-Tasks.
+    """
+
+    def __init__(self, config: Optional[DeliveryConfig] = None):
+        self.config = config or DeliveryConfig()
+        self.active_connections: Dict[str, List[WebSocketConnection]] = {}
+        self.connection_metadata: Dict[Any, Dict] = {}
+        self._connections: Dict[Any, WebSocketConnection] = {}  # WebSocket → Verbindung
+        self.stats = {"broadcasts": 0, "frames_enqueued": 0, "slow_consumers_closed": 0}
+
+    async def connect(
+        self,
+        websocket: Any,
+        client_id: str,
+        metadata: Optional[Dict] = None
+    ) -> WebSocketConnection:
+        """
+        Registriert neue WebSocket-Verbindung
+
+        Returns:
+            Verbindung mit Sende-Queue - Endpoints senden über ``connection.send``
+        """
+        await websocket.accept()
+
+        connection = WebSocketConnection(websocket, client_id, self.config, on_close=self._on_connection_closed)
+        connection.start()
+
+        self.active_connections.setdefault(client_id, []).append(connection)
+        self._connections[websocket] = connection
+        self.connection_metadata[websocket] = {
+            "client_id": client_id,
+            "connected_at": datetime.now().isoformat(),
+            "metadata": metadata or {}
+        }
+
+        logger.info(f"WebSocket connected: client_id={client_id}, total_connections={self.total_connections}")
+        return connection
+
+    def disconnect(self, websocket: Any, client_id: Optional[str] = None) -> None:
+        """
+        Entfernt WebSocket-Verbindung (WebSocket oder WebSocketConnection)
+        """
+        connection = websocket if isinstance(websocket, WebSocketConnection) else self._connections.get(websocket)
+        if connection is None:
+            return
+        connection.close()  # ruft _on_connection_closed
+
+    def _on_connection_closed(self, connection: WebSocketConnection) -> None:
+        client_id = connection.client_id
+        connections = self.active_connections.get(client_id)
+        if connections is not None:
+            try:
+                connections.remove(connection)
+            except ValueError:
+                pass
+            if not connections:
+                del self.active_connections[client_id]
+
+        self._connections.pop(connection.websocket, None)
+        self.connection_metadata.pop(connection.websocket, None)
+
+        if connection.close_reason in ("slow consumer", "send timeout"):
+            self.stats["slow_consumers_closed"] += 1
+
+        logger.info(f"WebSocket disconnected: client_id={client_id}, remaining={self.total_connections}")
+
+    def get_connection(self, websocket: Any) -> Optional[WebSocketConnection]:
+        return self._connections.get(websocket)
+
+    def _enqueue(self, connections: List[WebSocketConnection], frame: str, droppable: bool) -> int:
+        delivered = 0
+        for connection in list(connections):  # close() verändert die Liste
+            if connection.enqueue(frame, droppable):
+                delivered += 1
+        self.stats["frames_enqueued"] += delivered
+        return delivered
+
+    async def send_personal_message(self, message: dict, client_id: str, droppable: bool = False) -> int:
+        """
+        Sendet Nachricht an alle Verbindungen eines Clients
+
+        Returns:
+            Anzahl Verbindungen, in deren Queue die Nachricht liegt
+        """
+        connections = self.active_connections.get(client_id)
+        if not connections:
+            return 0
+        return self._enqueue(connections, encode_message(message), droppable)
+
+    async def broadcast(
+        self,
+        message: dict,
+        exclude_client: Optional[str] = None,
+        droppable: bool = True
+    ) -> int:
+        """
+        Sendet Nachricht an alle verbundenen Clients
+
+        Die Nachricht wird einmal serialisiert; es wird auf keinen Socket
+        gewartet. Verbindungen im Rückstau überspringen verwerfbare Frames,
+        Verbindungen mit voller Queue werden geschlossen.
+
+        Returns:
+            Anzahl Verbindungen, in deren Queue die Nachricht liegt
+        """
+        frame = encode_message(message)
+        self.stats["broadcasts"] += 1
+        delivered = 0
+        for client_id, connections in list(self.active_connections.items()):
+            if exclude_client and client_id == exclude_client:
+                continue
+            delivered += self._enqueue(connections, frame, droppable)
+        return delivered
+
+    @property
+    def total_connections(self) -> int:
+        """Gesamtzahl aktiver Verbindungen"""
+        return sum(len(conns) for conns in self.active_connections.values())
+
+    @property
+    def active_clients(self) -> Set[str]:
+        """Set aller verbundenen Client-IDs"""
+        return set(self.active_connections.keys())
+
+    def get_stats(self) -> Dict[str, Any]:
+        connections = [conn for conns in self.active_connections.values() for conn in conns]
+        return {
+            **self.stats,
+            "total_connections": len(connections),
+            "degraded_connections": sum(1 for conn in connections if conn.degraded),
+            "queued_frames": sum(conn.queue_depth for conn in connections)
+        }
@@ -303,9 +303,9 @@ class SessionManagerWindow:
                 created = datetime.fromisoformat(session['created_at']).strftime('%d.%m.%Y %H:%M')
                 updated = datetime.fromisoformat(session['updated_at']).strftime('%d.%m.%Y %H:%M')
                 
-                # File-Size
-                session_file = os.path.join(self.service.sessions_dir, f"{session['session_id']}.json")
-                if os.path.exists(session_file):
+                # File-Size (Message-Log des Session-Stores bzw. Legacy-JSON)
+                session_file = session.get('file_path')
+                if session_file and os.path.exists(session_file):
                     size_bytes = os.path.getsize(session_file)
                     size_str = self._format_size(size_bytes)
                 else:
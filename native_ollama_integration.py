@@ -9,12 +9,14 @@ mode during local development or CI.
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
 import os
 import random
+import threading
 import time
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 try:
     import requests
@@ -85,6 +87,19 @@ def _ensure_requests() -> None:
         )
 
 
+_SESSIONS = threading.local()
+
+
+def _http_session() -> Any:
+    """Return the keep-alive `requests.Session` of the current thread."""
+    _ensure_requests()
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = requests.Session()
+        _SESSIONS.session = session
+    return session
+
+
 def _stable_hash_int(text: str) -> int:
     return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16)
 
@@ -113,7 +128,13 @@ def _fallback_text(prompt: str, error_message: str) -> str:
 
 
 class DirectOllamaLLM:
-    """Minimal HTTP client for Ollama's `/api/generate` endpoint."""
+    """Minimal HTTP client for Ollama's `/api/generate` endpoint.
+
+    Calls reuse a per-thread keep-alive session. Async code should talk to
+    Ollama through the process-wide pooled transport
+    (`backend.agents.veritas_ollama_transport`) instead of blocking the
+    event loop.
+    """
 
     def __init__(
         self,
@@ -135,24 +156,19 @@ class DirectOllamaLLM:
         self.raise_on_failure = raise_on_failure
 
     # ------------------------------------------------------------------
-    def invoke(
+    def _build_payload(
         self,
         prompt: str,
         *,
-        system: Optional[str] = None,
-        stream: bool = False,
-        context: Optional[List[int]] = None,
-        options: Optional[Dict[str, Any]] = None,
-    ) -> OllamaInvocationResult:
-        """Execute a prompt against Ollama and return a structured result."""
-
-        if stream:
-            LOGGER.info("Streaming wird derzeit nicht unterstützt – es wird ein synchroner Aufruf ausgeführt.")
-
+        system: Optional[str],
+        stream: bool,
+        context: Optional[List[int]],
+        options: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": self.temperature,
             },
@@ -167,12 +183,86 @@ class DirectOllamaLLM:
             payload["context"] = context
         if options:
             payload["options"].update(options)
+        return payload
+
+    # ------------------------------------------------------------------
+    def iter_chunks(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream NDJSON chunks from Ollama as soon as they arrive.
+
+        Closing the generator (``close()``) closes the HTTP response, which
+        makes Ollama stop generating. Connection errors are raised as
+        :class:`OllamaConnectionError`.
+        """
+
+        payload = self._build_payload(
+            prompt, system=system, stream=True, context=context, options=options
+        )
+        try:
+            response = _http_session().post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout,
+                stream=True,
+            )
+            response.raise_for_status()
+        except Exception as exc:
+            raise OllamaConnectionError(str(exc)) from exc
+
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if data.get("error"):
+                    raise OllamaModelError(str(data["error"]))
+                yield data
+                if data.get("done"):
+                    break
+        finally:
+            response.close()
+
+    # ------------------------------------------------------------------
+    def invoke(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        stream: bool = False,
+        context: Optional[List[int]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> OllamaInvocationResult:
+        """Execute a prompt against Ollama and return a structured result.
+
+        With ``stream=True`` the response is read incrementally and every
+        token is passed to ``on_token`` as soon as it arrives; the returned
+        result contains the full text and ``time_to_first_token`` in its
+        metadata.
+        """
+
+        if stream:
+            return self._invoke_streaming(
+                prompt, system=system, context=context, options=options, on_token=on_token
+            )
+
+        payload = self._build_payload(
+            prompt, system=system, stream=False, context=context, options=options
+        )
 
         start = time.perf_counter()
 
         try:
-            _ensure_requests()
-            response = requests.post(
+            response = _http_session().post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=self.timeout,
@@ -180,18 +270,14 @@ class DirectOllamaLLM:
             response.raise_for_status()
             data = response.json()
         except Exception as exc:  # pragma: no cover - network dependent
-            LOGGER.warning("Ollama-Aufruf fehlgeschlagen: %s", exc)
-            if self.raise_on_failure:
-                raise OllamaConnectionError(str(exc)) from exc
-            duration = time.perf_counter() - start
-            return OllamaInvocationResult(
-                content=_fallback_text(prompt, str(exc)),
-                raw_response={},
-                model=self.model,
-                duration=duration,
-                metadata={"fallback": True, "error": str(exc)},
-            )
+            return self._failure_result(prompt, exc, start)
+
+        return self._result_from_data(prompt, data, start)
 
+    # ------------------------------------------------------------------
+    def _result_from_data(
+        self, prompt: str, data: Dict[str, Any], start: float
+    ) -> OllamaInvocationResult:
         duration = time.perf_counter() - start
         text = data.get("response")
         if not isinstance(text, str):
@@ -215,6 +301,60 @@ class DirectOllamaLLM:
             metadata={"fallback": False},
         )
 
+    # ------------------------------------------------------------------
+    def _invoke_streaming(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str],
+        context: Optional[List[int]],
+        options: Optional[Dict[str, Any]],
+        on_token: Optional[Callable[[str], None]],
+    ) -> OllamaInvocationResult:
+        start = time.perf_counter()
+        parts: List[str] = []
+        last_chunk: Dict[str, Any] = {}
+        time_to_first_token: Optional[float] = None
+
+        try:
+            for chunk in self.iter_chunks(prompt, system=system, context=context, options=options):
+                token = chunk.get("response") or ""
+                if token:
+                    if time_to_first_token is None:
+                        time_to_first_token = time.perf_counter() - start
+                    parts.append(token)
+                    if on_token is not None:
+                        on_token(token)
+                last_chunk = chunk
+        except Exception as exc:  # pragma: no cover - network dependent
+            if parts:
+                # Tokens were already delivered - do not replace them with fallback text
+                raise
+            return self._failure_result(prompt, exc, start)
+
+        return OllamaInvocationResult(
+            content="".join(parts),
+            raw_response=last_chunk,
+            model=self.model,
+            duration=time.perf_counter() - start,
+            metadata={"fallback": False, "time_to_first_token": time_to_first_token},
+        )
+
+    # ------------------------------------------------------------------
+    def _failure_result(self, prompt: str, exc: Exception, start: float) -> OllamaInvocationResult:
+        LOGGER.warning("Ollama-Aufruf fehlgeschlagen: %s", exc)
+        if self.raise_on_failure:
+            if isinstance(exc, OllamaError):
+                raise exc
+            raise OllamaConnectionError(str(exc)) from exc
+        return OllamaInvocationResult(
+            content=_fallback_text(prompt, str(exc)),
+            raw_response={},
+            model=self.model,
+            duration=time.perf_counter() - start,
+            metadata={"fallback": True, "error": str(exc)},
+        )
+
     # ------------------------------------------------------------------
     def generate(self, prompt: str, **kwargs: Any) -> OllamaInvocationResult:
         """Compatibility alias used by some legacy code paths."""
@@ -232,7 +372,14 @@ class DirectOllamaLLM:
 
 
 class DirectOllamaEmbeddings:
-    """Simple wrapper for Ollama's `/api/embeddings` endpoint."""
+    """Simple wrapper for Ollama's embedding endpoints.
+
+    Texts are sent in batches to `/api/embed` over a keep-alive session.
+    Servers without the batch endpoint fall back to one `/api/embeddings`
+    request per text. If a batch fails, its texts are retried one by one and
+    only the texts that still fail get placeholder vectors. For async ingestion with an on-disk cache use
+    `backend.agents.veritas_embedding_service.AsyncEmbeddingService`.
+    """
 
     def __init__(
         self,
@@ -242,12 +389,15 @@ class DirectOllamaEmbeddings:
         timeout: float = 60.0,
         dimension: int = DEFAULT_EMBEDDING_DIMENSION,
         raise_on_failure: bool = False,
+        batch_size: int = 64,
     ) -> None:
         self.model = model
         self.base_url = (base_url or DEFAULT_OLLAMA_HOST).rstrip("/")
         self.timeout = timeout
         self.dimension = dimension
         self.raise_on_failure = raise_on_failure
+        self.batch_size = max(1, batch_size)
+        self._batch_endpoint_supported = True
 
     # ------------------------------------------------------------------
     def embed_query(self, text: str) -> List[float]:
@@ -256,31 +406,66 @@ class DirectOllamaEmbeddings:
 
     # ------------------------------------------------------------------
     def embed_documents(self, texts: Iterable[str]) -> List[List[float]]:
+        texts = list(texts)
         vectors: List[List[float]] = []
 
-        for text in texts:
-            payload = {"model": self.model, "prompt": text}
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
             try:
-                _ensure_requests()
-                response = requests.post(
-                    f"{self.base_url}/api/embeddings",
-                    json=payload,
-                    timeout=self.timeout,
-                )
-                response.raise_for_status()
-                data = response.json()
-                vector = data.get("embedding")
-                if not isinstance(vector, list):
-                    raise ValueError("embedding fehlt")
-                vectors.append(vector)
+                vectors.extend(self._embed_batch(batch))
+            except Exception as exc:
+                LOGGER.warning("Embedding-Batch fehlgeschlagen: %s", exc)
+                vectors.extend(self._embed_each(batch))
+
+        return vectors
+
+    # ------------------------------------------------------------------
+    def _embed_each(self, batch: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for text in batch:
+            try:
+                vectors.append(self._embed_single(text))
             except Exception as exc:  # pragma: no cover - network dependent
                 LOGGER.warning("Embedding-Aufruf fehlgeschlagen: %s", exc)
                 if self.raise_on_failure:
                     raise OllamaConnectionError(str(exc)) from exc
                 vectors.append(_fallback_embedding(text, self.dimension))
-
         return vectors
 
+    # ------------------------------------------------------------------
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        session = _http_session()
+        if self._batch_endpoint_supported:
+            response = session.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.model, "input": batch},
+                timeout=self.timeout,
+            )
+            if response.status_code == 404 and "model" not in response.text.lower():
+                # Older Ollama releases only provide /api/embeddings
+                self._batch_endpoint_supported = False
+            else:
+                response.raise_for_status()
+                embeddings = response.json().get("embeddings")
+                if not isinstance(embeddings, list) or len(embeddings) != len(batch):
+                    raise ValueError("embeddings fehlen")
+                return embeddings
+
+        return self._embed_each(batch)
+
+    # ------------------------------------------------------------------
+    def _embed_single(self, text: str) -> List[float]:
+        response = _http_session().post(
+            f"{self.base_url}/api/embeddings",
+            json={"model": self.model, "prompt": text},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        vector = response.json().get("embedding")
+        if not isinstance(vector, list):
+            raise ValueError("embedding fehlt")
+        return vector
+
 
 # ============================================================================
 # Utility classes compatible with legacy imports
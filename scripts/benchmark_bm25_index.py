@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+BM25 INVERTED INDEX BENCHMARK
+=============================
+
+Vergleicht den nativen BM25InvertedIndex (Postings + MaxScore Top-K)
+mit dem rank_bm25 Linear-Scan (BM25Okapi.get_scores + argsort).
+
+Synthetischer Corpus mit Zipf-verteiltem Vokabular, Queries mit
+1-6 Termen (ebenfalls Zipf-verteilt, d.h. realistische Mischung aus
+häufigen und seltenen Termen).
+
+Usage:
+    python scripts/benchmark_bm25_index.py
+    python scripts/benchmark_bm25_index.py --sizes 10000,100000 --queries 200
+    python scripts/benchmark_bm25_index.py --legacy-max-docs 100000
+    python scripts/benchmark_bm25_index.py --variants 3  # Multi-Query (Query Expansion)
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.veritas_bm25_index import BM25InvertedIndex
+
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    BM25Okapi = None
+
+
+def generate_corpus(
+    num_docs: int,
+    vocab_size: int,
+    avg_doc_length: int,
+    seed: int = 42
+) -> List[List[str]]:
+    """Erzeugt einen tokenisierten Zipf-Corpus."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"t{i}" for i in range(vocab_size)], dtype=object)
+    probs = 1.0 / np.arange(1, vocab_size + 1)
+    probs /= probs.sum()
+
+    lengths = rng.poisson(avg_doc_length, size=num_docs).clip(min=1)
+    flat = vocab[rng.choice(vocab_size, size=int(lengths.sum()), p=probs)]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return [flat[offsets[i]:offsets[i + 1]].tolist() for i in range(num_docs)]
+
+
+def generate_queries(num_queries: int, vocab_size: int, seed: int = 7) -> List[List[str]]:
+    """Erzeugt Queries mit 1-6 Termen."""
+    rng = np.random.default_rng(seed)
+    probs = 1.0 / np.arange(1, vocab_size + 1)
+    probs /= probs.sum()
+    return [
+        [f"t{t}" for t in rng.choice(vocab_size, size=int(rng.integers(1, 7)), p=probs)]
+        for _ in range(num_queries)
+    ]
+
+
+def percentile_ms(samples: List[float], pct: float) -> float:
+    return float(np.percentile(samples, pct) * 1000)
+
+
+def run_benchmark(
+    num_docs: int,
+    queries: List[List[str]],
+    top_k: int,
+    vocab_size: int,
+    avg_doc_length: int,
+    run_legacy: bool,
+    variants: int = 3
+) -> Dict[str, float]:
+    """Benchmark für eine Corpus-Größe."""
+    print(f"\n📚 Corpus: {num_docs:,} Dokumente")
+    corpus = generate_corpus(num_docs, vocab_size, avg_doc_length)
+
+    start = time.perf_counter()
+    index = BM25InvertedIndex().build(corpus)
+    native_build = time.perf_counter() - start
+    print(f"   Inverted Index Build: {native_build:.2f}s "
+          f"({index.num_postings:,} Postings, {index.memory_bytes() / 1e6:.1f} MB)")
+
+    native_times = []
+    for query in queries:
+        start = time.perf_counter()
+        index.top_k(query, top_k)
+        native_times.append(time.perf_counter() - start)
+
+    result = {
+        "num_docs": num_docs,
+        "native_build_s": native_build,
+        "native_p50_ms": percentile_ms(native_times, 50),
+        "native_p95_ms": percentile_ms(native_times, 95),
+    }
+
+    # Multi-Query: Sparse Q @ W vs. gestapelte dichte Score-Vektoren
+    if variants > 1:
+        groups = [queries[i:i + variants] for i in range(0, len(queries) - variants + 1, variants)]
+        multi_times, stacked_times = [], []
+        for group in groups:
+            start = time.perf_counter()
+            index.top_k_multi(group, top_k, aggregation="max")
+            multi_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            stacked = np.max(np.array([index.get_scores(q) for q in group]), axis=0)
+            np.argsort(stacked)[-top_k:][::-1]
+            stacked_times.append(time.perf_counter() - start)
+
+        result.update({
+            "multi_p50_ms": percentile_ms(multi_times, 50),
+            "stacked_p50_ms": percentile_ms(stacked_times, 50),
+        })
+        print(f"   Multi-Query ({variants} Varianten, max): "
+              f"Sparse {result['multi_p50_ms']:.2f}ms vs. dicht gestapelt "
+              f"{result['stacked_p50_ms']:.2f}ms (p50, "
+              f"{variants * num_docs * 8 / 1e6:.1f} MB Score-Matrix vermieden)")
+
+    if run_legacy:
+        start = time.perf_counter()
+        bm25 = BM25Okapi(corpus)
+        legacy_build = time.perf_counter() - start
+        print(f"   rank_bm25 Build: {legacy_build:.2f}s")
+
+        legacy_times = []
+        for query in queries:
+            start = time.perf_counter()
+            scores = bm25.get_scores(query)
+            np.argsort(scores)[-top_k:][::-1]
+            legacy_times.append(time.perf_counter() - start)
+
+        result.update({
+            "legacy_build_s": legacy_build,
+            "legacy_p50_ms": percentile_ms(legacy_times, 50),
+            "legacy_p95_ms": percentile_ms(legacy_times, 95),
+        })
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BM25 Inverted Index vs. rank_bm25")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Corpus-Größen (kommagetrennt)")
+    parser.add_argument("--queries", type=int, default=100, help="Anzahl Queries")
+    parser.add_argument("--top-k", type=int, default=50, help="Top-K")
+    parser.add_argument("--vocab-size", type=int, default=50000, help="Vokabulargröße")
+    parser.add_argument("--doc-length", type=int, default=60, help="Durchschnittliche Dokumentlänge")
+    parser.add_argument("--legacy-max-docs", type=int, default=1000000,
+                        help="rank_bm25 nur bis zu dieser Corpus-Größe messen")
+    parser.add_argument("--variants", type=int, default=3,
+                        help="Query-Varianten je Multi-Query (<= 1: deaktiviert)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    queries = generate_queries(args.queries, args.vocab_size)
+
+    print("=" * 70)
+    print("BM25 BENCHMARK: Inverted Index (MaxScore) vs. rank_bm25 (Linear-Scan)")
+    print("=" * 70)
+    if BM25Okapi is None:
+        print("⚠️ rank_bm25 nicht installiert - nur Inverted Index wird gemessen")
+
+    results = [
+        run_benchmark(
+            num_docs,
+            queries,
+            args.top_k,
+            args.vocab_size,
+            args.doc_length,
+            run_legacy=BM25Okapi is not None and num_docs <= args.legacy_max_docs,
+            variants=args.variants
+        )
+        for num_docs in sizes
+    ]
+
+    print("\n" + "=" * 70)
+    print(f"{'Docs':>10} | {'Native p50':>11} | {'Native p95':>11} | "
+          f"{'Legacy p50':>11} | {'Legacy p95':>11} | {'Speedup':>8}")
+    print("-" * 70)
+    for r in results:
+        legacy_p50 = r.get("legacy_p50_ms")
+        speedup = f"{legacy_p50 / r['native_p50_ms']:.1f}x" if legacy_p50 else "-"
+        legacy_p50_str = f"{legacy_p50:.2f}ms" if legacy_p50 else "-"
+        legacy_p95_str = f"{r['legacy_p95_ms']:.2f}ms" if legacy_p50 else "-"
+        print(f"{r['num_docs']:>10,} | {r['native_p50_ms']:>9.2f}ms | {r['native_p95_ms']:>9.2f}ms | "
+              f"{legacy_p50_str:>11} | {legacy_p95_str:>11} | {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+CHAT SESSION STORE BENCHMARK
+============================
+
+Vergleicht die bisherige JSON-Persistierung (eine pretty-printed Datei je
+Session) mit dem Session-Store (Message-Log + SQLite-Index):
+
+1. ``--sessions`` Sessions im JSON-Format anlegen (Ø ``--messages`` Nachrichten)
+2. ``list_chat_sessions`` (erste Seite, Seite in der Mitte) - JSON vs. Index
+3. Migration der JSON-Dateien in den Store
+4. Auto-Save einer langen Konversation (Save nach jeder Nachricht,
+   ``--conversation`` Nachrichten) - JSON vs. Store
+
+Usage:
+    python scripts/benchmark_chat_session_store.py
+    python scripts/benchmark_chat_session_store.py --sessions 10000 --messages 20 --conversation 1000
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.chat_persistence_service import ChatPersistenceService
+from shared.chat_schema import ChatSession
+
+SAMPLE_TEXT = (
+    "Nach § 4 BImSchG bedürfen die Errichtung und der Betrieb von Anlagen, die "
+    "auf Grund ihrer Beschaffenheit oder ihres Betriebs in besonderem Maße "
+    "geeignet sind, schädliche Umwelteinwirkungen hervorzurufen, einer Genehmigung. "
+)
+
+
+def make_session(index: int, messages: int, rng: random.Random) -> ChatSession:
+    created = datetime(2025, 1, 1) + timedelta(minutes=index * 7)
+    session = ChatSession(created_at=created, updated_at=created + timedelta(minutes=rng.randint(1, 600)))
+    for number in range(messages):
+        role = "user" if number % 2 == 0 else "assistant"
+        session.add_message(role, SAMPLE_TEXT * (1 if role == "user" else rng.randint(2, 6)),
+                            metadata={"confidence": 0.8} if role == "assistant" else None)
+    return session
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JSON-Dateien vs. Session-Store (Log + Index)")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=20, help="Durchschnittliche Nachrichten je Session")
+    parser.add_argument("--conversation", type=int, default=500, help="Nachrichten der Auto-Save-Konversation")
+    parser.add_argument("--workdir", default=None, help="Arbeitsverzeichnis (Default: temporär)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(42)
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="chat_store_bench_"))
+    sessions_dir = workdir / "sessions"
+    backups_dir = workdir / "backups"
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"📁 {workdir}")
+    print(f"🛠️  Erzeuge {args.sessions} JSON-Sessions...")
+    started = time.perf_counter()
+    for index in range(args.sessions):
+        session = make_session(index, rng.randint(1, 2 * args.messages - 1), rng)
+        with open(sessions_dir / f"{session.session_id}.json", "w", encoding="utf-8") as f:
+            json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
+    print(f"   {time.perf_counter() - started:.1f}s")
+
+    legacy = ChatPersistenceService(str(sessions_dir), str(backups_dir), use_session_store=False)
+    middle = args.sessions // 2
+
+    print("\n📋 list_chat_sessions")
+    _, legacy_first = timed(legacy.list_chat_sessions, limit=50)
+    _, legacy_middle = timed(legacy.list_chat_sessions, limit=50, offset=middle, sort_by="title", reverse=False)
+
+    service, migration = timed(ChatPersistenceService, str(sessions_dir), str(backups_dir))
+    store_first_page, store_first = timed(service.list_chat_sessions, limit=50)
+    _, store_middle = timed(service.list_chat_sessions, limit=50, offset=middle, sort_by="title", reverse=False)
+    _, store_stats = timed(service.get_session_statistics)
+
+    print(f"{'':<28} {'json':>10} {'store':>10}")
+    print(f"{'erste Seite (updated_at)':<28} {legacy_first * 1000:>8.1f}ms {store_first * 1000:>8.1f}ms")
+    print(f"{'Seite ' + str(middle) + ' (title)':<28} {legacy_middle * 1000:>8.1f}ms {store_middle * 1000:>8.1f}ms")
+    print(f"{'Statistiken':<28} {'':>10} {store_stats * 1000:>8.1f}ms")
+    print(f"\n📦 Migration: {service.session_store.count_sessions()} Sessions in {migration:.1f}s")
+
+    print(f"\n💾 Auto-Save, {args.conversation} Nachrichten (Save nach jeder Nachricht)")
+    results = {}
+    for name, target in (("json", legacy), ("store", service)):
+        session = ChatSession()
+        total = 0.0
+        for number in range(args.conversation):
+            session.add_message("user" if number % 2 == 0 else "assistant", SAMPLE_TEXT * 3)
+            _, elapsed = timed(target.save_chat_session, session)
+            total += elapsed
+        results[name] = total
+        print(f"   {name:<6} {total:>8.2f}s gesamt, letzter Save {elapsed * 1000:.2f}ms")
+
+    if results["store"] > 0:
+        print(f"   Speedup: {results['json'] / results['store']:.1f}x")
+
+    loaded = service.load_chat_session(store_first_page[0]["session_id"])
+    print(f"\n✅ Stichprobe geladen: {loaded.title[:40]}... ({len(loaded.messages)} Nachrichten)")
+    service.session_store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+CHUNK SCORING BENCHMARK
+=======================
+
+Vergleicht das Chunk-Reranking im TokenOverflowHandler:
+
+- legacy:     ``calculate_relevance_score`` je Chunk (lower + Regex + Set),
+              Dict-Kopie je Chunk, Sortierung aller Chunks
+- vectorized: ``score_chunks`` (gecachte Term-IDs, ``np.isin``-Overlap) +
+              ``top_n_indices`` (argpartition), Chunk-Dicts unverändert
+- knapsack:   ``select_within_budget`` im exakten Token-Budget
+
+Gemessen jeweils für einen Overflow; "warm" = Chunks bereits im Term-Cache
+(gleiche Chunks in mehreren Overflows / Research-Schritten).
+
+Usage:
+    python scripts/benchmark_chunk_scoring.py
+    python scripts/benchmark_chunk_scoring.py --chunks 100 500 2000 --repeat 20
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+
+from backend.services.token_overflow_handler import ChunkReranker, ChunkTermCache
+
+VOCABULARY = (
+    "genehmigung anlage immissionsschutz grenzwert lärm behörde verfahren frist antrag "
+    "windkraft abstand naturschutz bebauungsplan verwaltungsakt widerspruch ermessen "
+    "prüfung auflage bescheid zuständigkeit öffentlichkeit beteiligung gutachten"
+).split()
+
+
+def make_chunks(count: int, rng: random.Random):
+    return [
+        {
+            "text": " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(80, 300))),
+            "score": rng.random(),
+            "source_type": rng.choice(["vector", "graph", "relational"]),
+        }
+        for _ in range(count)
+    ]
+
+
+def legacy_rerank(chunks, query, max_chunks):
+    scored = [
+        {**chunk, "relevance_score": ChunkReranker.calculate_relevance_score(chunk, query)}
+        for chunk in chunks
+    ]
+    scored.sort(key=lambda x: x["relevance_score"], reverse=True)
+    return scored[:max_chunks]
+
+
+def vectorized_rerank(chunks, query, max_chunks, cache):
+    scores = ChunkReranker.score_chunks(chunks, query, term_cache=cache)
+    return [chunks[index] for index in ChunkReranker.top_n_indices(scores, max_chunks)]
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Legacy- vs. vektorisiertes Chunk-Reranking")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", type=float, default=0.3, help="Anteil behaltener Chunks")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    query = "Welche Grenzwerte gelten für Lärm bei der Genehmigung einer Windkraft-Anlage?"
+
+    print(f"{'chunks':>7} {'legacy ms':>10} {'vec cold ms':>12} {'vec warm ms':>12} {'speedup':>8} {'knapsack ms':>12}")
+    for count in args.chunks:
+        chunks = make_chunks(count, rng)
+        max_chunks = max(1, int(count * args.keep))
+
+        legacy = best_of(args.repeat, legacy_rerank, chunks, query, max_chunks)
+        cold = min(
+            best_of(1, vectorized_rerank, chunks, query, max_chunks, ChunkTermCache())
+            for _ in range(args.repeat)
+        )
+        warm_cache = ChunkTermCache()
+        vectorized_rerank(chunks, query, max_chunks, warm_cache)
+        warm = best_of(args.repeat, vectorized_rerank, chunks, query, max_chunks, warm_cache)
+
+        scores = ChunkReranker.score_chunks(chunks, query, term_cache=warm_cache)
+        token_counts = np.array([len(chunk["text"].split()) * 2 for chunk in chunks])
+        budget = int(token_counts.sum() * args.keep)
+        knapsack = best_of(args.repeat, ChunkReranker.select_within_budget, scores, token_counts, budget)
+
+        print(f"{count:>7} {legacy:>10.2f} {cold:>12.2f} {warm:>12.2f} {legacy / warm:>7.1f}x {knapsack:>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+DAG EXECUTOR BENCHMARK
+======================
+
+Vergleicht die Ausführung von Research-Plänen im Agent-Framework:
+
+- level:  bisheriges Verfahren - ``get_execution_plan()``-Gruppen nacheinander,
+          je Gruppe ein neuer ThreadPoolExecutor, Barriere nach jeder Gruppe
+- ready:  ``ReadyQueueExecutor`` - Schritt startet, sobald seine
+          Abhängigkeiten fertig sind; ein Pool je Plan
+
+Synthetische Pläne: geschichtete DAGs (jeder Schritt hängt von 1-2
+Schritten der Vorebene ab) mit schiefer Dauerverteilung (überwiegend kurze
+Schritte, wenige sehr lange - wie UDS3-/LLM-Schritte in der Praxis).
+Schritte schlafen nur (``time.sleep``), gemessen wird also reine
+Scheduling-Qualität.
+
+Usage:
+    python scripts/benchmark_dag_executor.py
+    python scripts/benchmark_dag_executor.py --plans 20 --levels 5 --width 6 --workers 4
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.framework.dag_executor import ReadyQueueExecutor
+from backend.agents.framework.dependency_resolver import DependencyResolver
+
+
+def make_plan(rng: random.Random, levels: int, width: int, slow_ratio: float, scale: float) -> Tuple[List[Dict], Dict[str, float]]:
+    """Geschichteter DAG mit schiefer Dauerverteilung (Sekunden)."""
+    steps: List[Dict] = []
+    durations: Dict[str, float] = {}
+    previous: List[str] = []
+    for level in range(levels):
+        current = []
+        for index in range(rng.randint(max(1, width // 2), width)):
+            step_id = f"L{level}S{index}"
+            depends_on = rng.sample(previous, k=min(len(previous), rng.randint(1, 2))) if previous else []
+            steps.append({"step_id": step_id, "depends_on": depends_on})
+            slow = rng.random() < slow_ratio
+            durations[step_id] = scale * (rng.uniform(8, 20) if slow else rng.lognormvariate(0, 0.5))
+            current.append(step_id)
+        previous = current
+    return steps, durations
+
+
+def run_level_barrier(steps: List[Dict], durations: Dict[str, float], workers: int) -> float:
+    """Bisheriges Verfahren (Level für Level, Pool je Gruppe)."""
+    started = time.perf_counter()
+    for group in DependencyResolver(steps).get_execution_plan():
+        with ThreadPoolExecutor(max_workers=min(workers, len(group))) as pool:
+            for future in as_completed([pool.submit(time.sleep, durations[s]) for s in group]):
+                future.result()
+    return time.perf_counter() - started
+
+
+def run_ready_queue(steps: List[Dict], durations: Dict[str, float], workers: int) -> Tuple[float, Dict]:
+    executor = ReadyQueueExecutor(DependencyResolver(steps), max_workers=workers)
+    started = time.perf_counter()
+    report = executor.run(
+        submit=lambda step_id: time.sleep(durations[step_id]),
+        on_complete=lambda step_id, future: future.result()
+    )
+    return time.perf_counter() - started, report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Level-Barriere vs. Ready-Queue für Research-Pläne")
+    parser.add_argument("--plans", type=int, default=10, help="Anzahl synthetischer Pläne")
+    parser.add_argument("--levels", type=int, default=5, help="Ebenen je Plan")
+    parser.add_argument("--width", type=int, default=5, help="Max. Schritte je Ebene")
+    parser.add_argument("--workers", type=int, default=4, help="max_workers")
+    parser.add_argument("--slow-ratio", type=float, default=0.3, help="Anteil sehr langsamer Schritte")
+    parser.add_argument("--scale", type=float, default=0.005, help="Basisdauer eines Schritts (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = []
+    for plan_index in range(args.plans):
+        steps, durations = make_plan(rng, args.levels, args.width, args.slow_ratio, args.scale)
+        level_time = run_level_barrier(steps, durations, args.workers)
+        ready_time, report = run_ready_queue(steps, durations, args.workers)
+        rows.append((plan_index, len(steps), level_time, ready_time, report))
+
+    print(f"{'plan':>4} {'steps':>5} {'level ms':>9} {'ready ms':>9} {'speedup':>7} "
+          f"{'crit.path ms':>12} {'idle ms':>8} {'util':>5}")
+    for plan_index, count, level_time, ready_time, report in rows:
+        print(
+            f"{plan_index:>4} {count:>5} {level_time * 1000:>9.1f} {ready_time * 1000:>9.1f} "
+            f"{level_time / ready_time:>7.2f} {report['critical_path_ms']:>12.1f} "
+            f"{report['idle_worker_ms']:>8.1f} {report['worker_utilization']:>5.2f}"
+        )
+
+    speedups = [level_time / ready_time for _, _, level_time, ready_time, _ in rows]
+    print()
+    print(f"Speedup: median {statistics.median(speedups):.2f}x, "
+          f"min {min(speedups):.2f}x, max {max(speedups):.2f}x")
+    print(f"Makespan / kritischer Pfad (ready): median "
+          f"{statistics.median(r[3] * 1000 / max(r[4]['critical_path_ms'], 1e-9) for r in rows):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+MESSAGE BROKER LOAD BENCHMARK
+=============================
+
+Vergleicht den AgentMessageBroker mit einer globalen Queue (Worker-Pool,
+bisheriges Design) und mit Shard-Queues je Agent.
+
+Szenario: ``--agents`` Agenten, davon ``--slow`` mit langsamem Handler
+(``--slow-ms``), die übrigen schnell. Ein Produzent sendet ``--messages``
+Messages reihum an alle Agenten; zusätzlich alle ``--event-every``
+Messages ein ``publish_event`` an alle Agenten.
+
+Gemessen:
+- Zustell-Latenz (Senden → Handler) der schnellen Agenten, p50/p95/p99
+- Zeit bis alle Messages an schnelle Agenten zugestellt sind
+- Durchsatz gesamt
+
+Usage:
+    python scripts/benchmark_message_broker.py
+    python scripts/benchmark_message_broker.py --agents 10 --slow 2 --messages 5000
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.agent_message_broker import AgentMessageBroker
+from backend.agents.agent_message_broker_enhanced import BrokerConfiguration, latency_percentiles
+from shared.protocols.agent_message import AgentIdentity, AgentMessage, MessageType
+
+
+async def run_scenario(sharding: bool, args) -> Dict:
+    config = BrokerConfiguration(enable_sharding=sharding, batch_timeout_ms=10, max_queue_size=100000)
+    broker = AgentMessageBroker(config=config)
+
+    producer = AgentIdentity(agent_id="producer", agent_type="bench", agent_name="producer")
+    broker.register_agent(producer, lambda message: None)
+
+    agents: List[AgentIdentity] = []
+    fast_latencies: List[float] = []
+    expected_fast = 0
+    counters = {"fast": 0, "slow": 0}
+    fast_done = asyncio.Event()
+
+    def make_handler(slow: bool):
+        async def handler(message: AgentMessage):
+            if slow:
+                await asyncio.sleep(args.slow_ms / 1000.0)
+                counters["slow"] += 1
+                return None
+            # publish_event legt die Event-Daten unter payload["data"] ab
+            payload = message.payload.get("data", message.payload)
+            fast_latencies.append(time.perf_counter() - payload["sent_at"])
+            counters["fast"] += 1
+            if counters["fast"] >= expected_fast:
+                fast_done.set()
+            return None
+        return handler
+
+    for index in range(args.agents):
+        agent = AgentIdentity(agent_id=f"agent-{index}", agent_type="bench", agent_name=f"agent-{index}")
+        slow = index < args.slow
+        broker.register_agent(agent, make_handler(slow))
+        broker.subscribe(agent.agent_id, "bench_events")
+        agents.append(agent)
+
+    fast_agents = args.agents - args.slow
+    events = args.messages // args.event_every if args.event_every else 0
+    expected_fast = sum(1 for i in range(args.messages) if i % args.agents >= args.slow) + events * fast_agents
+
+    await broker.start()
+    started = time.perf_counter()
+    rejected = 0
+    for index in range(args.messages):
+        target = agents[index % args.agents]
+        message = AgentMessage(
+            sender=producer,
+            recipients=[target],
+            message_type=MessageType.EVENT,
+            payload={"sent_at": time.perf_counter()}
+        )
+        if not await broker.send_message(message):
+            rejected += 1
+        if args.event_every and (index + 1) % args.event_every == 0:
+            await broker.publish_event("bench_events", producer, {"sent_at": time.perf_counter()})
+        if index % 50 == 0:
+            await asyncio.sleep(0)
+
+    try:
+        await asyncio.wait_for(fast_done.wait(), timeout=args.timeout)
+        fast_drain = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        fast_drain = float("nan")
+    stats = broker.get_stats()
+    await broker.stop()
+
+    return {
+        "mode": "sharded" if sharding else "single-queue",
+        "fast_delivered": counters["fast"],
+        "fast_expected": expected_fast,
+        "fast_drain_s": fast_drain,
+        "latency_ms": latency_percentiles(fast_latencies),
+        "throughput": stats["messages_delivered"] / fast_drain if fast_drain == fast_drain else 0.0,
+        "rejected": rejected
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Single-Queue vs. Shard-Queues im AgentMessageBroker")
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--slow", type=int, default=1, help="Anzahl langsamer Agenten")
+    parser.add_argument("--slow-ms", type=float, default=20.0, help="Dauer des langsamen Handlers (ms)")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--event-every", type=int, default=50, help="publish_event alle N Messages (0: aus)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("backend").setLevel(logging.WARNING)
+
+    print(f"{'mode':<13} {'fast msgs':>10} {'drain s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'msg/s':>9} {'rejected':>8}")
+    for sharding in (False, True):
+        result = asyncio.run(run_scenario(sharding, args))
+        latency = result["latency_ms"]
+        print(
+            f"{result['mode']:<13} {result['fast_delivered']:>5}/{result['fast_expected']:<4} "
+            f"{result['fast_drain_s']:>8.2f} {latency['p50'] or 0:>9.1f} {latency['p95'] or 0:>9.1f} "
+            f"{latency['p99'] or 0:>9.1f} {result['throughput']:>9.0f} {result['rejected']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
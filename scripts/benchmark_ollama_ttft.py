@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+OLLAMA TIME-TO-FIRST-TOKEN BENCHMARK
+====================================
+
+Misst Time-To-First-Token (TTFT) und Gesamtdauer von
+``VeritasOllamaClient.generate_response`` mit und ohne Streaming.
+
+- gepuffert (stream=False): TTFT == Gesamtdauer
+- gestreamt (stream=True):  TTFT == Dauer bis zur ersten NDJSON-Zeile
+
+Ohne laufenden Ollama-Server kann mit ``--mock`` ein simulierter
+NDJSON-Stream (konfigurierbare Latenz je Token) verwendet werden.
+
+Usage:
+    python scripts/benchmark_ollama_ttft.py --model llama3:latest
+    python scripts/benchmark_ollama_ttft.py --mock --tokens 200 --token-delay-ms 20
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.veritas_ollama_client import OllamaRequest, VeritasOllamaClient
+
+
+def create_mock_transport(num_tokens: int, token_delay: float, prefill_delay: float) -> httpx.MockTransport:
+    """Simuliert Ollama /api/generate (NDJSON-Stream bzw. Einzelantwort)."""
+
+    async def generate_lines():
+        await asyncio.sleep(prefill_delay)
+        for i in range(num_tokens):
+            await asyncio.sleep(token_delay)
+            yield (json.dumps({"model": "mock", "response": f"tok{i} ", "done": False}) + "\n").encode()
+        yield (json.dumps({"model": "mock", "response": "", "done": True, "eval_count": num_tokens}) + "\n").encode()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        if payload.get("stream"):
+            return httpx.Response(200, content=generate_lines())
+        await asyncio.sleep(prefill_delay + num_tokens * token_delay)
+        text = "".join(f"tok{i} " for i in range(num_tokens))
+        return httpx.Response(200, json={"model": "mock", "response": text, "done": True, "eval_count": num_tokens})
+
+    return httpx.MockTransport(handler)
+
+
+async def measure(client: VeritasOllamaClient, request: OllamaRequest, stream: bool) -> Dict[str, float]:
+    """Eine Generierung: TTFT und Gesamtdauer in Sekunden."""
+    start = time.perf_counter()
+    if not stream:
+        await client.generate_response(request, stream=False)
+        total = time.perf_counter() - start
+        return {"ttft": total, "total": total}
+
+    ttft = None
+    async for chunk in await client.generate_response(request, stream=True):
+        if ttft is None and chunk.response:
+            ttft = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return {"ttft": ttft if ttft is not None else total, "total": total}
+
+
+def summarize(label: str, samples: List[Dict[str, float]]) -> None:
+    ttfts = sorted(s["ttft"] * 1000 for s in samples)
+    totals = sorted(s["total"] * 1000 for s in samples)
+    p50 = len(samples) // 2
+    print(f"{label:<12} | TTFT p50 {ttfts[p50]:>9.1f}ms | max {ttfts[-1]:>9.1f}ms | "
+          f"Total p50 {totals[p50]:>9.1f}ms")
+
+
+async def run(args: argparse.Namespace) -> None:
+    client = VeritasOllamaClient(base_url=args.base_url, timeout=args.timeout, max_retries=1)
+    if args.mock:
+        client.client = httpx.AsyncClient(
+            transport=create_mock_transport(args.tokens, args.token_delay_ms / 1000, args.prefill_ms / 1000)
+        )
+
+    request = OllamaRequest(model=args.model, prompt=args.prompt, max_tokens=args.tokens)
+
+    print("=" * 70)
+    print(f"OLLAMA TTFT BENCHMARK ({'mock' if args.mock else args.base_url}, {args.runs} Runs)")
+    print("=" * 70)
+
+    try:
+        for label, stream in (("gepuffert", False), ("gestreamt", True)):
+            samples = [await measure(client, request, stream) for _ in range(args.runs)]
+            summarize(label, samples)
+    finally:
+        await client.close()
+
+    stats = client.get_client_statistics()["usage_stats"]
+    print(f"\nFallback-Requests: {stats['fallback_requests']} "
+          f"(> 0: Ollama nicht erreichbar, Messung nicht aussagekräftig)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time-To-First-Token: gepuffert vs. gestreamt")
+    parser.add_argument("--base-url", default="http://localhost:11434", help="Ollama URL")
+    parser.add_argument("--model", default="llama3:latest", help="Ollama-Modell")
+    parser.add_argument("--prompt", default="Welche Unterlagen brauche ich für einen Bauantrag?")
+    parser.add_argument("--runs", type=int, default=5, help="Generierungen je Modus")
+    parser.add_argument("--tokens", type=int, default=200, help="max_tokens (bzw. Mock-Tokens)")
+    parser.add_argument("--timeout", type=int, default=120, help="Request-Timeout (s)")
+    parser.add_argument("--mock", action="store_true", help="Simulierten NDJSON-Stream verwenden")
+    parser.add_argument("--token-delay-ms", type=float, default=20.0, help="Mock: Latenz je Token")
+    parser.add_argument("--prefill-ms", type=float, default=150.0, help="Mock: Latenz bis zum ersten Token")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
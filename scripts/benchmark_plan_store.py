@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PLAN STORE BENCHMARK
+====================
+
+Misst persistierte Schritt-Ergebnisse pro Sekunde:
+
+- legacy:  bisheriges ``BaseAgent._store_step_result`` - neue Verbindung je
+           Schritt, ein ``INSERT OR REPLACE``, Commit, Close
+- store:   ``PlanStore`` - ein Writer-Thread, WAL, gebündelte Transaktionen;
+           Zeit inklusive abschließendem ``flush()``
+
+Die Produzenten laufen parallel in ``--threads`` Threads (wie die Schritte
+eines parallelen Plans).
+
+Usage:
+    python scripts/benchmark_plan_store.py
+    python scripts/benchmark_plan_store.py --steps 5000 --threads 8
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.framework.plan_store import UPSERT_STEP_SQL, PlanStore
+from backend.agents.framework.setup_database_sqlite import SQLiteDatabaseSetup
+
+
+def make_step(index: int) -> dict:
+    return {
+        "step_id": f"bench_s{index}",
+        "step_index": index,
+        "step_name": f"Schritt {index}",
+        "step_type": "search",
+        "agent_name": "environmental",
+        "agent_type": "DataRetrievalAgent",
+        "depends_on": [f"bench_s{index - 1}"] if index else [],
+    }
+
+
+RESULT = {
+    "status": "success",
+    "quality_score": 0.9,
+    "data": {"documents": [{"id": i, "title": f"Dokument {i}"} for i in range(10)]},
+}
+
+
+def legacy_store(db_path: Path, plan_id: str, step: dict) -> None:
+    """Nachbau des bisherigen _store_step_result."""
+    conn = sqlite3.connect(str(db_path), timeout=30.0)
+    try:
+        conn.execute(UPSERT_STEP_SQL, (
+            plan_id, step["step_id"], step["step_index"], step["step_name"], step["step_type"],
+            step["agent_name"], step["agent_type"], json.dumps(step["depends_on"]), "completed",
+            json.dumps(step), json.dumps(RESULT), 0, 0, datetime.utcnow().isoformat()
+        ))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run(label: str, store_fn, steps: int, threads: int, finish=None) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(store_fn, [make_step(i) for i in range(steps)]))
+    if finish:
+        finish()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<8} {steps:>6} Schritte in {elapsed:7.3f}s  →  {steps / elapsed:10.0f} Schritte/s")
+    return steps / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Persistierte Schritte/s: legacy vs. PlanStore")
+    parser.add_argument("--steps", type=int, default=2000, help="Anzahl Schritt-Ergebnisse")
+    parser.add_argument("--threads", type=int, default=4, help="Parallele Produzenten")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = Path(tmp) / "legacy.db"
+        store_db = Path(tmp) / "store.db"
+        for path in (legacy_db, store_db):
+            SQLiteDatabaseSetup(str(path)).create_tables()
+
+        legacy_rate = run(
+            "legacy", lambda step: legacy_store(legacy_db, "bench", step), args.steps, args.threads
+        )
+
+        store = PlanStore(store_db)
+        store_rate = run(
+            "store", lambda step: store.store_step_result("bench", step, RESULT),
+            args.steps, args.threads, finish=store.flush
+        )
+        stats = store.get_stats()
+        store.close()
+
+        print()
+        print(f"Speedup: {store_rate / legacy_rate:.1f}x")
+        print(f"Store: {stats['transactions']} Transaktionen, "
+              f"Ø {stats['avg_batch']} Writes/Transaktion, max {stats['max_batch']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
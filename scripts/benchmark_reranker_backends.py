@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+RERANKER BACKEND BENCHMARK
+==========================
+
+Vergleicht die Scoring-Backends des ``ReRankingService`` auf CPU:
+
+- torch:     sentence-transformers CrossEncoder (volle Präzision)
+- onnx:      ONNX-Export, fp32
+- onnx-int8: ONNX-Export, dynamisch int8-quantisiert
+
+Gemessen werden Kaltstart (Laden inkl. ggf. Export), Latenz je 100
+(query, passage)-Paare (p50/p95) und die Rang-Korrelation (Spearman)
+der Scores gegenüber torch.
+
+Usage:
+    python scripts/benchmark_reranker_backends.py
+    python scripts/benchmark_reranker_backends.py --model cross-encoder/ms-marco-MiniLM-L-6-v2 --runs 20
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.veritas_rerank_backends import (
+    ONNX_AVAILABLE,
+    CrossEncoderBackend,
+    OnnxCrossEncoderBackend,
+    ScoringBackend,
+)
+
+QUERIES = [
+    "Welche Unterlagen brauche ich für einen Bauantrag?",
+    "Lärmschutz an Bundesstraßen",
+    "Fristen im Immissionsschutzrecht",
+    "Wer ist für die Baugenehmigung zuständig?",
+]
+
+SNIPPETS = [
+    "Der Bauantrag ist schriftlich bei der unteren Bauaufsichtsbehörde einzureichen.",
+    "Dem Antrag sind Lageplan, Bauzeichnungen und Baubeschreibung beizufügen.",
+    "Die Immissionsrichtwerte für Gewerbegebiete betragen tags 65 dB(A).",
+    "Die Genehmigungsfrist beträgt drei Monate nach Eingang der vollständigen Unterlagen.",
+    "Lärmschutzwände sind bei wesentlicher Änderung einer Straße zu prüfen.",
+    "Zuständig ist die Gemeinde, sofern sie untere Bauaufsichtsbehörde ist.",
+    "Das Verfahren richtet sich nach dem Bundes-Immissionsschutzgesetz.",
+    "Abstandsflächen müssen auf dem eigenen Grundstück liegen.",
+]
+
+
+def make_pairs(n: int, seed: int = 42) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    return [
+        (rng.choice(QUERIES), " ".join(rng.sample(SNIPPETS, k=rng.randint(1, 3))))
+        for _ in range(n)
+    ]
+
+
+def load_backend(name: str, args: argparse.Namespace) -> ScoringBackend:
+    if name == "torch":
+        from sentence_transformers import CrossEncoder
+        return CrossEncoderBackend(CrossEncoder(args.model, max_length=args.max_length), args.batch_size)
+    return OnnxCrossEncoderBackend(
+        args.model,
+        max_length=args.max_length,
+        batch_size=args.batch_size,
+        quantize=(name == "onnx-int8"),
+        num_threads=args.threads,
+    )
+
+
+def spearman(a: List[float], b: List[float]) -> float:
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def benchmark(backend: ScoringBackend, pairs: List[Tuple[str, str]], runs: int) -> Dict[str, float]:
+    backend.predict(pairs[:8])  # Warm-up
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(pairs)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latenz je 100 Paare: torch vs. ONNX (int8)")
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--pairs", type=int, default=100, help="Paare je Messung")
+    parser.add_argument("--runs", type=int, default=10, help="Messungen je Backend")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op Threads (0: Default)")
+    args = parser.parse_args()
+
+    if not ONNX_AVAILABLE:
+        print("⚠️ onnxruntime/transformers nicht installiert - nur torch messbar")
+        args.backends = [b for b in args.backends if b == "torch"]
+
+    pairs = make_pairs(args.pairs)
+    reference = None
+
+    print("=" * 78)
+    print(f"RERANKER BACKEND BENCHMARK ({args.model}, {args.pairs} Paare, {args.runs} Runs)")
+    print("=" * 78)
+
+    for name in args.backends:
+        start = time.perf_counter()
+        try:
+            backend = load_backend(name, args)
+        except Exception as e:
+            print(f"{name:<10} | nicht ladbar: {e}")
+            continue
+        load_ms = (time.perf_counter() - start) * 1000
+
+        result = benchmark(backend, pairs, args.runs)
+        scores = backend.predict(pairs)
+        if reference is None and name == "torch":
+            reference = scores
+        parity = f"{spearman(reference, scores):.4f}" if reference is not None else "-"
+
+        per_100 = 100 / args.pairs
+        print(f"{name:<10} | Laden {load_ms:>8.0f}ms | p50 {result['p50'] * per_100:>8.1f}ms/100 | "
+              f"p95 {result['p95'] * per_100:>8.1f}ms/100 | Spearman vs. torch {parity}")
+
+
+if __name__ == "__main__":
+    main()
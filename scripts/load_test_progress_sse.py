@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+PROGRESS SSE LOAD TEST
+======================
+
+Lasttest für die SSE-Progress-Streams über echte TCP-Verbindungen:
+ein minimaler HTTP-Server (asyncio.start_server) liefert
+``create_progress_stream`` aus, N Clients lesen parallel, ein Teil davon
+langsam. Ein Worker-Thread publiziert Progress-Updates wie die Pipeline.
+
+Modi:
+- hub:    ProgressHub (einmal serialisiert, Ring-Buffer mit Coalescing)
+- legacy: bisheriges Verfahren (Callback je Stream, run_coroutine_threadsafe
+          je Update und Subscriber, json.dumps je Subscriber, unbegrenzte Queue)
+
+Gemessen: Publish-Dauer, Zeit bis alle Clients das Ende gesehen haben,
+Event-Loop-Lag (max / p99), empfangene Events je schnellem/langsamem Client.
+
+Usage:
+    python scripts/load_test_progress_sse.py
+    python scripts/load_test_progress_sse.py --clients 500 --events 2000 --mode both
+    python scripts/load_test_progress_sse.py --slow-fraction 0.5 --slow-delay-ms 50
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.pipelines.veritas_streaming_progress import (
+    ProgressStage,
+    ProgressType,
+    build_sse_payload,
+    create_progress_manager,
+    create_progress_streamer,
+)
+
+SESSION_ID = "load-test"
+
+
+class LegacyStreamer:
+    """Nachbau des bisherigen Streamers (Queue + Callback je Stream)"""
+
+    def __init__(self, progress_manager, loop):
+        self.progress_manager = progress_manager
+        self.loop = loop  # bisher asyncio.get_event_loop() - im Worker-Thread ein RuntimeError
+
+    async def create_progress_stream(self, session_id):
+        progress_queue = asyncio.Queue()
+
+        def progress_callback(update):
+            asyncio.run_coroutine_threadsafe(progress_queue.put(update), self.loop)
+
+        self.progress_manager.subscribe_to_progress(session_id, progress_callback)
+        try:
+            while True:
+                update = await progress_queue.get()
+                yield f"data: {json.dumps(build_sse_payload(update))}\n\n".encode("utf-8")
+                if update.stage in (ProgressStage.COMPLETED, ProgressStage.ERROR):
+                    break
+        finally:
+            self.progress_manager.unsubscribe_from_progress(session_id, progress_callback)
+
+
+def raise_fd_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+async def serve(streamer, send_buffer: int):
+    async def handle(reader, writer):
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        session_id = request_line.split()[1].decode().rsplit("/", 1)[-1]
+
+        sock = writer.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        try:
+            async for chunk in streamer.create_progress_stream(session_id):
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096)
+
+
+async def sse_client(port: int, slow_delay: float, started: asyncio.Event):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /progress/{SESSION_ID} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    started.set()
+
+    received, last_progress = 0, None
+    while True:
+        event = await reader.readuntil(b"\n\n")
+        payload = json.loads(event[len(b"data: "):])
+        if payload["type"] == "heartbeat":
+            continue
+        received += 1
+        last_progress = payload["progress"]
+        if payload["stage"] in ("completed", "error"):
+            break
+        if slow_delay:
+            await asyncio.sleep(slow_delay)
+    writer.close()
+    return received, last_progress
+
+
+async def measure_loop_lag(samples, stop: asyncio.Event, interval=0.005):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+def publish(manager, events: int, rate: float, timings: dict):
+    started = time.perf_counter()
+    for index in range(events):
+        manager.update_agent_progress(SESSION_ID, "legal_framework", ProgressType.AGENT_PROGRESS,
+                                      message=f"Schritt {index}")
+        manager._emit_progress(
+            session_id=SESSION_ID, query_id="q", update_type=ProgressType.STAGE_PROGRESS,
+            stage=ProgressStage.AGENT_PROCESSING, message="⚙️ Agenten arbeiten...",
+            progress_percent=round(100.0 * (index + 1) / events, 2)
+        )
+        if rate:
+            time.sleep(1.0 / rate)
+    timings["publish_s"] = time.perf_counter() - started
+    manager.complete_session(SESSION_ID, {"final_answer": "fertig"})
+
+
+async def run(mode: str, args) -> dict:
+    loop = asyncio.get_running_loop()
+    manager = create_progress_manager()
+    streamer = create_progress_streamer(manager) if mode == "hub" else LegacyStreamer(manager, loop)
+    manager.start_session(SESSION_ID, "q", "Lasttest Progress-Streaming")
+
+    server = await serve(streamer, args.send_buffer)
+    port = server.sockets[0].getsockname()[1]
+
+    slow_every = int(1 / args.slow_fraction) if args.slow_fraction else 0
+    started_events, clients = [], []
+    for index in range(args.clients):
+        slow = bool(slow_every) and index % slow_every == 0
+        started = asyncio.Event()
+        started_events.append(started)
+        clients.append(asyncio.create_task(
+            sse_client(port, args.slow_delay_ms / 1000 if slow else 0.0, started)
+        ))
+    await asyncio.gather(*(started.wait() for started in started_events))
+    await asyncio.sleep(0.1)  # Stream-Registrierung im Server abschließen
+
+    lag_samples, stop_lag = [], asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(lag_samples, stop_lag))
+
+    timings = {}
+    started = time.perf_counter()
+    thread = threading.Thread(target=publish, args=(manager, args.events, args.rate, timings))
+    thread.start()
+    results = await asyncio.gather(*clients)
+    total = time.perf_counter() - started
+    thread.join()
+
+    stop_lag.set()
+    await lag_task
+    server.close()
+    await server.wait_closed()
+
+    slow_results = [r for i, r in enumerate(results) if slow_every and i % slow_every == 0]
+    fast_results = [r for i, r in enumerate(results) if not (slow_every and i % slow_every == 0)]
+    lag_sorted = sorted(lag_samples) or [0.0]
+    return {
+        "mode": mode,
+        "publish_s": timings["publish_s"],
+        "total_s": total,
+        "lag_max_ms": lag_sorted[-1] * 1000,
+        "lag_p99_ms": lag_sorted[int(len(lag_sorted) * 0.99)] * 1000,
+        "fast_events": statistics.mean(r[0] for r in fast_results) if fast_results else 0,
+        "slow_events": statistics.mean(r[0] for r in slow_results) if slow_results else 0,
+        "complete": all(r[1] == 100.0 for r in results),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lasttest SSE-Progress-Streams")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--events", type=int, default=1000, help="Progress-Schritte (je 2 Updates)")
+    parser.add_argument("--rate", type=float, default=0, help="Schritte/s (0 = so schnell wie möglich)")
+    parser.add_argument("--slow-fraction", type=float, default=0.2)
+    parser.add_argument("--slow-delay-ms", type=float, default=20.0)
+    parser.add_argument("--send-buffer", type=int, default=16 * 1024, help="SO_SNDBUF je Verbindung")
+    parser.add_argument("--mode", choices=["hub", "legacy", "both"], default="both")
+    args = parser.parse_args()
+
+    raise_fd_limit(2 * args.clients + 256)
+    modes = ["legacy", "hub"] if args.mode == "both" else [args.mode]
+
+    print(f"{args.clients} Clients ({args.slow_fraction:.0%} langsam, {args.slow_delay_ms:.0f} ms/Event), "
+          f"{2 * args.events} Updates - {datetime.now(timezone.utc).isoformat(timespec='seconds')}")
+    print(f"{'mode':>7} {'publish s':>10} {'total s':>8} {'lag max ms':>11} {'lag p99 ms':>11} "
+          f"{'events fast':>12} {'events slow':>12} {'complete':>9}")
+    for mode in modes:
+        result = asyncio.run(run(mode, args))
+        print(f"{result['mode']:>7} {result['publish_s']:>10.2f} {result['total_s']:>8.2f} "
+              f"{result['lag_max_ms']:>11.1f} {result['lag_p99_ms']:>11.1f} "
+              f"{result['fast_events']:>12.0f} {result['slow_events']:>12.0f} {str(result['complete']):>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
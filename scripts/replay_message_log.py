@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+MESSAGE LOG REPLAY BENCHMARK
+============================
+
+Spielt aufgezeichneten Broker-Verkehr (``MessageLog``-Segmente) offline in
+einen frischen AgentMessageBroker ein und misst Durchsatz und
+Zustell-Latenz - für Single-Queue und Shard-Modus.
+
+Ohne vorhandene Aufzeichnung erzeugt ``--capture N`` zunächst einen
+synthetischen Mitschnitt (N Messages an ``--agents`` Agenten).
+
+Usage:
+    python scripts/replay_message_log.py --log-dir data/agent_message_log
+    python scripts/replay_message_log.py --log-dir /tmp/capture --capture 5000
+    python scripts/replay_message_log.py --log-dir /tmp/capture --speed 1.0 --handler-ms 2
+
+Author: VERITAS System
+Date: 2025-10-06
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add project root
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.agents.agent_message_broker import AgentMessageBroker
+from backend.agents.agent_message_broker_enhanced import BrokerConfiguration, latency_percentiles
+from backend.agents.agent_message_log import MessageLog, MessageLogConfig
+from shared.protocols.agent_message import AgentIdentity, AgentMessage, MessageType
+
+
+async def capture(log_dir: str, messages: int, agents: int) -> None:
+    """Erzeugt einen synthetischen Mitschnitt"""
+    config = BrokerConfiguration(message_log_dir=log_dir)
+    broker = AgentMessageBroker(config=config)
+    identities = [
+        AgentIdentity(agent_id=f"agent-{i}", agent_type="capture", agent_name=f"agent-{i}")
+        for i in range(agents)
+    ]
+    for identity in identities:
+        broker.register_agent(identity, lambda message: None)
+    await broker.start()
+    for index in range(messages):
+        sender = identities[index % agents]
+        recipient = identities[(index * 7 + 1) % agents]
+        await broker.send_message(AgentMessage(
+            sender=sender,
+            recipients=[] if index % 100 == 0 else [recipient],
+            message_type=MessageType.EVENT,
+            payload={"index": index, "text": "x" * (index % 200)}
+        ))
+        if index % 100 == 0:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0.2)
+    await broker.stop()
+
+
+def load_capture(log_dir: str) -> List[Tuple[float, List[str], AgentMessage]]:
+    log = MessageLog(MessageLogConfig(directory=log_dir))
+    try:
+        return list(log.captured_traffic())
+    finally:
+        log.close()
+
+
+async def replay(traffic, sharding: bool, speed: float, handler_ms: float) -> Dict:
+    broker = AgentMessageBroker(config=BrokerConfiguration(
+        enable_sharding=sharding, batch_timeout_ms=10, max_queue_size=100000
+    ))
+    latencies: List[float] = []
+    sent_at: Dict[str, float] = {}
+    expected = sum(len(agent_ids) for _, agent_ids, _ in traffic)
+    done = asyncio.Event()
+
+    async def handler(message: AgentMessage):
+        if handler_ms:
+            await asyncio.sleep(handler_ms / 1000.0)
+        latencies.append(time.perf_counter() - sent_at[message.message_id])
+        if len(latencies) >= expected:
+            done.set()
+
+    agent_ids = sorted({agent_id for _, ids, _ in traffic for agent_id in ids})
+    for agent_id in agent_ids:
+        broker.register_agent(AgentIdentity(agent_id=agent_id, agent_type="replay", agent_name=agent_id), handler)
+    await broker.start()
+
+    first_ts = traffic[0][0] if traffic else 0.0
+    started = time.perf_counter()
+    for ts, ids, message in traffic:
+        if speed > 0:
+            delay = (ts - first_ts) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        # Aufgezeichnete Empfänger explizit (Broadcast wurde beim Einreihen aufgelöst),
+        # Zeitstempel erneuern (TTL)
+        message.recipients = [broker.get_agent(agent_id) for agent_id in ids if broker.get_agent(agent_id)]
+        message.metadata.timestamp = datetime.now()
+        sent_at[message.message_id] = time.perf_counter()
+        await broker.send_message(message)
+
+    try:
+        await asyncio.wait_for(done.wait(), timeout=300)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+    await broker.stop()
+
+    return {
+        "mode": "sharded" if sharding else "single-queue",
+        "deliveries": len(latencies),
+        "expected": expected,
+        "elapsed_s": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": latency_percentiles(latencies)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline-Replay eines Broker-Mitschnitts")
+    parser.add_argument("--log-dir", required=True, help="Verzeichnis der MessageLog-Segmente")
+    parser.add_argument("--capture", type=int, default=0, help="Vorher N synthetische Messages aufzeichnen")
+    parser.add_argument("--agents", type=int, default=8, help="Agenten für --capture")
+    parser.add_argument("--speed", type=float, default=0.0, help="Abspielgeschwindigkeit (0: so schnell wie möglich)")
+    parser.add_argument("--handler-ms", type=float, default=0.0, help="Simulierte Handler-Dauer (ms)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.capture:
+        asyncio.run(capture(args.log_dir, args.capture, args.agents))
+
+    traffic = load_capture(args.log_dir)
+    if not traffic:
+        print(f"Keine enqueued-Records in {args.log_dir}")
+        return 1
+    print(f"Mitschnitt: {len(traffic)} Messages, {sum(len(ids) for _, ids, _ in traffic)} Deliveries")
+
+    print(f"{'mode':<13} {'deliveries':>12} {'time s':>8} {'msg/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for sharding in (False, True):
+        result = asyncio.run(replay(load_capture(args.log_dir), sharding, args.speed, args.handler_ms))
+        latency = result["latency_ms"]
+        print(
+            f"{result['mode']:<13} {result['deliveries']:>6}/{result['expected']:<5} {result['elapsed_s']:>8.2f} "
+            f"{result['throughput']:>9.0f} {latency['p50'] or 0:>8.1f} {latency['p95'] or 0:>8.1f} {latency['p99'] or 0:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,10 +9,14 @@ Features:
 - Agent Deep-thinking Zwischenergebnisse  
 - LLM-aufbereitete Fortschritts-Nachrichten
 - Frontend-Integration für veritas_app.py
+- ProgressHub: an den Event-Loop gebunden, jedes Event wird einmal
+  serialisiert und als Bytes an alle Subscriber verteilt; langsame Clients
+  bekommen einen begrenzten Ring-Buffer, in dem überholte Progress-Prozent-
+  Updates zusammengeführt werden
 
 Author: VERITAS System
 Date: 2025-09-21
-Version: 1.0.0
+Version: 1.1.0
 """
 
 import asyncio
@@ -20,6 +24,7 @@ import json
 import logging
 import time
 import uuid
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, AsyncGenerator, Callable, Set
 from dataclasses import dataclass, field
@@ -99,6 +104,281 @@ class ProgressUpdate:
     gathered_info: Optional[List[str]] = None
     next_actions: Optional[List[str]] = None
 
+# ===== PROGRESS HUB =====
+
+# Reine Prozent-Updates: ein neueres Update macht ein ungelesenes älteres
+# gleichen Typs (und Agents, in derselben Stage) überflüssig
+COALESCING_UPDATE_TYPES = {ProgressType.STAGE_PROGRESS, ProgressType.AGENT_PROGRESS}
+TERMINAL_STAGES = {ProgressStage.COMPLETED, ProgressStage.ERROR}
+
+
+def build_sse_payload(update: ProgressUpdate) -> Dict[str, Any]:
+    """Baut das Frontend-JSON (SSE) zu einem Progress-Update"""
+    sse_data = {
+        'type': update.update_type.value,
+        'stage': update.stage.value,
+        'message': update.message,
+        'progress': update.progress_percent,
+        'timestamp': update.timestamp,
+        'details': update.details
+    }
+    
+    # Optional: Agent/LLM spezifische Daten
+    if update.agent_type:
+        sse_data['agent_type'] = update.agent_type
+    if update.intermediate_conclusion:
+        sse_data['intermediate_result'] = update.intermediate_conclusion
+    if update.llm_thinking_step:
+        sse_data['llm_thinking'] = update.llm_thinking_step
+    
+    # Hypothesis-Daten
+    if update.hypothesis_data:
+        sse_data['hypothesis_data'] = update.hypothesis_data
+    if update.confidence:
+        sse_data['confidence'] = update.confidence
+    if update.information_gaps:
+        sse_data['information_gaps'] = update.information_gaps
+    if update.clarification_questions:
+        sse_data['clarification_questions'] = update.clarification_questions
+    
+    # Stage Reflection Daten
+    if update.reflection_data:
+        sse_data['reflection_data'] = update.reflection_data
+    if update.completion_percent is not None:
+        sse_data['completion_percent'] = update.completion_percent
+    if update.identified_gaps:
+        sse_data['identified_gaps'] = update.identified_gaps
+    if update.gathered_info:
+        sse_data['gathered_info'] = update.gathered_info
+    if update.next_actions:
+        sse_data['next_actions'] = update.next_actions
+    
+    return sse_data
+
+
+def encode_sse(data: Dict[str, Any]) -> bytes:
+    """Server-Sent Event Format als Bytes"""
+    return f"data: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Einmal serialisiertes Progress-Update (Bytes von allen Subscribern geteilt)"""
+    data: bytes
+    coalesce_key: Optional[tuple] = None
+    terminal: bool = False
+    
+    @classmethod
+    def from_update(cls, update: ProgressUpdate) -> "ProgressEvent":
+        coalesce_key = None
+        if update.update_type in COALESCING_UPDATE_TYPES:
+            coalesce_key = (update.update_type, update.agent_type, update.stage)
+        return cls(
+            data=encode_sse(build_sse_payload(update)),
+            coalesce_key=coalesce_key,
+            terminal=update.stage in TERMINAL_STAGES
+        )
+
+
+class ProgressSubscriber:
+    """
+    Begrenzter Ring-Buffer eines SSE-Clients
+    
+    Wird nur im Event-Loop des Hubs benutzt (kein Lock). Ein Prozent-Update
+    ersetzt ein noch ungelesenes Update gleichen Schlüssels an dessen
+    Position, solange danach kein anderes Event (Stage-/Agent-Wechsel)
+    eingereiht wurde - ein Update überholt nie ein solches Event. Ist der
+    Buffer voll, fällt das älteste Event heraus.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer: deque = deque()  # Slots: [ProgressEvent]
+        self._pending: Dict[tuple, list] = {}  # coalesce_key → ungelesener Slot
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+    
+    def offer(self, event: ProgressEvent) -> None:
+        """Nimmt ein Event an (im Event-Loop)"""
+        if event.coalesce_key is not None:
+            slot = self._pending.get(event.coalesce_key)
+            if slot is not None:
+                slot[0] = event
+                self.coalesced += 1
+                return
+        
+        else:
+            # Späteres Prozent-Update darf nicht vor dieses Event rücken
+            self._pending.clear()
+        
+        if len(self._buffer) >= self.capacity:
+            evicted = self._buffer.popleft()
+            self._forget(evicted)
+            self.dropped += 1
+        
+        slot = [event]
+        self._buffer.append(slot)
+        if event.coalesce_key is not None:
+            self._pending[event.coalesce_key] = slot
+        self._ready.set()
+    
+    def _forget(self, slot: list) -> None:
+        key = slot[0].coalesce_key
+        if key is not None and self._pending.get(key) is slot:
+            del self._pending[key]
+    
+    def drain(self) -> List[ProgressEvent]:
+        """Entnimmt alle gepufferten Events"""
+        events = [slot[0] for slot in self._buffer]
+        self._buffer.clear()
+        self._pending.clear()
+        self._ready.clear()
+        self.delivered += len(events)
+        return events
+    
+    async def next_batch(self, timeout: Optional[float] = None) -> List[ProgressEvent]:
+        """
+        Wartet auf gepufferte Events und entnimmt sie
+        
+        Raises:
+            asyncio.TimeoutError: Kein Event innerhalb von ``timeout``
+        """
+        if not self._buffer:
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        return self.drain()
+    
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+
+class ProgressHub:
+    """
+    Verteilt Progress-Updates an SSE-Streams, gebunden an einen Event-Loop
+    
+    - ``publish`` ist aus jedem Thread aufrufbar: das Update wird im
+      aufrufenden Thread einmal serialisiert, die Verteilung läuft über
+      ``call_soon_threadsafe`` (ein Loop-Wakeup je Event, nicht je Subscriber)
+    - Subscriber-Sets und History werden nur im Loop angefasst (kein Lock)
+    - History je Session für Clients, die sich erst später verbinden
+    """
+    
+    def __init__(self, buffer_size: int = 256, history_size: int = 256):
+        """
+        Args:
+            buffer_size: Max. gepufferte Events je Subscriber
+            history_size: Max. Events je Session für spät verbundene Clients
+        """
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[ProgressSubscriber]] = {}
+        self._history: Dict[str, deque] = {}
+        self.stats = {'published': 0, 'serialized_bytes': 0, 'delivered': 0}
+    
+    def bind_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.AbstractEventLoop:
+        """
+        Bindet den Hub an einen Event-Loop (Default: laufender Loop)
+        
+        Raises:
+            RuntimeError: Kein Loop angegeben und keiner läuft
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        return self._loop
+    
+    def publish(self, update: ProgressUpdate) -> None:
+        """Veröffentlicht ein Update (thread-safe)"""
+        event = ProgressEvent.from_update(update)
+        loop = self._loop
+        
+        if loop is None or loop.is_closed():
+            # Noch kein Stream verbunden: nur History für spätere Clients
+            self._record(update.session_id, event)
+            return
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is loop:
+            self._dispatch(update.session_id, event)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, update.session_id, event)
+            except RuntimeError:
+                # Loop wurde zwischenzeitlich geschlossen
+                self._record(update.session_id, event)
+    
+    def _record(self, session_id: str, event: ProgressEvent) -> None:
+        history = self._history.get(session_id)
+        if history is None:
+            history = self._history[session_id] = deque(maxlen=self.history_size)
+        history.append(event)
+        self.stats['published'] += 1
+        self.stats['serialized_bytes'] += len(event.data)
+    
+    def _dispatch(self, session_id: str, event: ProgressEvent) -> None:
+        """Verteilt ein Event an alle Subscriber der Session (im Loop)"""
+        self._record(session_id, event)
+        subscribers = self._subscribers.get(session_id)
+        if subscribers:
+            for subscriber in subscribers:
+                subscriber.offer(event)
+            self.stats['delivered'] += len(subscribers)
+    
+    def subscribe(self, session_id: str, replay: bool = True) -> ProgressSubscriber:
+        """
+        Registriert einen Subscriber (im Event-Loop aufrufen)
+        
+        Args:
+            session_id: Session-ID
+            replay: Bisherige Events der Session in den Buffer übernehmen
+        """
+        running = asyncio.get_running_loop()
+        if self._loop is not running:
+            self.bind_loop(running)
+        
+        subscriber = ProgressSubscriber(self.buffer_size)
+        if replay:
+            for event in self._history.get(session_id, ()):
+                subscriber.offer(event)
+        self._subscribers.setdefault(session_id, set()).add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, session_id: str, subscriber: ProgressSubscriber) -> None:
+        """Entfernt einen Subscriber (im Event-Loop aufrufen)"""
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[session_id]
+    
+    def close_session(self, session_id: str) -> None:
+        """Verwirft die History einer Session (thread-safe, nach bereits publizierten Events)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._history.pop(session_id, None)
+            return
+        try:
+            loop.call_soon_threadsafe(self._history.pop, session_id, None)
+        except RuntimeError:
+            self._history.pop(session_id, None)
+    
+    def subscriber_count(self, session_id: Optional[str] = None) -> int:
+        if session_id is not None:
+            return len(self._subscribers.get(session_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'sessions': len(self._history),
+            'subscribers': self.subscriber_count()
+        }
+
 # ===== PROGRESS MANAGER =====
 
 class VeritasProgressManager:
@@ -116,9 +396,13 @@ class VeritasProgressManager:
         """Initialisiert Progress Manager"""
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
         self.progress_subscribers: Dict[str, List[Callable]] = {}
-        self.progress_lock = threading.RLock()
+        # Nur für Session-Registrierung; Session-State hat eigenen Lock je Session
+        self._sessions_lock = threading.Lock()
         self.cancelled_sessions: Set[str] = set()  # Track cancelled sessions
         
+        # Loop-gebundene Verteilung an SSE-Streams
+        self.hub = ProgressHub()
+        
         # LLM Integration für aufbereitete Messages
         self.llm_available = self._check_llm_availability()
         
@@ -149,18 +433,19 @@ class VeritasProgressManager:
     
     def start_session(self, session_id: str, query_id: str, query_text: str) -> None:
         """Startet neue Progress-Session"""
-        with self.progress_lock:
-            self.active_sessions[session_id] = {
-                'query_id': query_id,
-                'query_text': query_text,
-                'start_time': time.time(),
-                'current_stage': ProgressStage.INITIALIZING,
-                'completed_stages': [],
-                'active_agents': [],
-                'progress_history': [],
-                'estimated_total_time': self._estimate_total_time(query_text)
-            }
-            
+        session = {
+            'query_id': query_id,
+            'query_text': query_text,
+            'start_time': time.time(),
+            'current_stage': ProgressStage.INITIALIZING,
+            'completed_stages': [],
+            'active_agents': [],
+            'progress_history': [],
+            'estimated_total_time': self._estimate_total_time(query_text),
+            'lock': threading.Lock()
+        }
+        with self._sessions_lock:
+            self.active_sessions[session_id] = session
             self.progress_subscribers[session_id] = []
         
         # Initial Progress Update
@@ -189,14 +474,14 @@ class VeritasProgressManager:
     
     def subscribe_to_progress(self, session_id: str, callback: Callable[[ProgressUpdate], None]) -> None:
         """Registriert Callback für Progress Updates"""
-        with self.progress_lock:
+        with self._sessions_lock:
             if session_id not in self.progress_subscribers:
                 self.progress_subscribers[session_id] = []
             self.progress_subscribers[session_id].append(callback)
     
     def unsubscribe_from_progress(self, session_id: str, callback: Callable) -> None:
         """Entfernt Callback"""
-        with self.progress_lock:
+        with self._sessions_lock:
             if session_id in self.progress_subscribers:
                 try:
                     self.progress_subscribers[session_id].remove(callback)
@@ -205,11 +490,11 @@ class VeritasProgressManager:
     
     def update_stage(self, session_id: str, stage: ProgressStage, details: Dict[str, Any] = None) -> None:
         """Updated aktuelles Processing-Stadium"""
-        with self.progress_lock:
-            if session_id not in self.active_sessions:
-                return
-            
-            session = self.active_sessions[session_id]
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return
+        
+        with session['lock']:
             previous_stage = session['current_stage']
             session['current_stage'] = stage
             
@@ -275,12 +560,11 @@ class VeritasProgressManager:
                             result: Dict[str, Any] = None) -> None:
         """Updated Agent-spezifischen Progress"""
         
-        with self.progress_lock:
-            if session_id not in self.active_sessions:
-                return
-            
-            session = self.active_sessions[session_id]
-            
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return
+        
+        with session['lock']:
             if progress_type == ProgressType.AGENT_START:
                 if agent_type not in session['active_agents']:
                     session['active_agents'].append(agent_type)
@@ -528,11 +812,7 @@ class VeritasProgressManager:
         )
         
         # Session cleanup
-        with self.progress_lock:
-            if session_id in self.active_sessions:
-                del self.active_sessions[session_id]
-            if session_id in self.progress_subscribers:
-                del self.progress_subscribers[session_id]
+        self._remove_session(session_id)
         
         logger.info(f"📡 Progress Session beendet: {session_id}")
     
@@ -544,24 +824,25 @@ class VeritasProgressManager:
             session_id: Session-ID zum Abbrechen
             reason: Grund für Abbruch
         """
-        with self.progress_lock:
-            # Markiere Session als abgebrochen
-            self.cancelled_sessions.add(session_id)
-            
-            # Prüfe ob Session existiert
-            if session_id not in self.active_sessions:
-                logger.warning(f"⚠️ Session {session_id} nicht gefunden für Abbruch")
-                return
-            
-            # Update Session Status
-            self.active_sessions[session_id]['current_stage'] = ProgressStage.ERROR
-            self.active_sessions[session_id]['cancelled'] = True
-            self.active_sessions[session_id]['cancel_reason'] = reason
+        # Markiere Session als abgebrochen
+        self.cancelled_sessions.add(session_id)
+        
+        # Prüfe ob Session existiert
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            logger.warning(f"⚠️ Session {session_id} nicht gefunden für Abbruch")
+            return
+        
+        # Update Session Status
+        with session['lock']:
+            session['current_stage'] = ProgressStage.ERROR
+            session['cancelled'] = True
+            session['cancel_reason'] = reason
         
         # Sende Cancel-Update
         self._emit_progress(
             session_id=session_id,
-            query_id=self.active_sessions[session_id]['query_id'],
+            query_id=session['query_id'],
             update_type=ProgressType.ERROR,
             stage=ProgressStage.ERROR,
             message=f"🛑 Verarbeitung abgebrochen: {reason}",
@@ -576,11 +857,7 @@ class VeritasProgressManager:
         # Session cleanup nach kurzer Verzögerung
         def delayed_cleanup():
             time.sleep(1.0)  # Kurz warten damit Frontend Cancel-Message erhält
-            with self.progress_lock:
-                if session_id in self.active_sessions:
-                    del self.active_sessions[session_id]
-                if session_id in self.progress_subscribers:
-                    del self.progress_subscribers[session_id]
+            self._remove_session(session_id)
         
         # Cleanup in separatem Thread
         cleanup_thread = threading.Thread(target=delayed_cleanup, daemon=True)
@@ -592,6 +869,13 @@ class VeritasProgressManager:
         """Prüft ob Session abgebrochen wurde"""
         return session_id in self.cancelled_sessions
     
+    def _remove_session(self, session_id: str) -> None:
+        """Entfernt Session-State, Callbacks und Hub-History"""
+        with self._sessions_lock:
+            self.active_sessions.pop(session_id, None)
+            self.progress_subscribers.pop(session_id, None)
+        self.hub.close_session(session_id)
+    
     def _emit_progress(self, **kwargs) -> None:
         """Emittiert Progress Update an alle Subscriber"""
         
@@ -599,28 +883,31 @@ class VeritasProgressManager:
         session_id = kwargs['session_id']
         
         # Update zu History hinzufügen
-        with self.progress_lock:
-            if session_id in self.active_sessions:
-                self.active_sessions[session_id]['progress_history'].append(progress_update)
+        session = self.active_sessions.get(session_id)
+        if session is not None:
+            with session['lock']:
+                session['progress_history'].append(progress_update)
         
-        # An alle Subscriber senden
-        if session_id in self.progress_subscribers:
-            for callback in self.progress_subscribers[session_id]:
-                try:
-                    callback(progress_update)
-                except Exception as e:
-                    logger.error(f"Progress Callback Fehler: {e}")
+        # SSE-Streams: einmal serialisiert, Verteilung im Event-Loop
+        self.hub.publish(progress_update)
+        
+        # Sync-Callbacks (Snapshot, damit (Un-)Subscribe während Emit möglich bleibt)
+        for callback in list(self.progress_subscribers.get(session_id, ())):
+            try:
+                callback(progress_update)
+            except Exception as e:
+                logger.error(f"Progress Callback Fehler: {e}")
         
         logger.debug(f"📡 Progress emitted: {progress_update.update_type.value} - {progress_update.message}")
     
     def get_session_progress(self, session_id: str) -> Dict[str, Any]:
         """Holt aktuellen Session-Progress"""
         
-        with self.progress_lock:
-            if session_id not in self.active_sessions:
-                return {}
-            
-            session = self.active_sessions[session_id]
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return {}
+        
+        with session['lock']:
             elapsed_time = time.time() - session['start_time']
             estimated_remaining = max(0, session['estimated_total_time'] - elapsed_time)
             
@@ -646,106 +933,54 @@ class VeritasProgressStreamer:
     - Server-Sent Events (SSE) für Real-time Updates
     - JSON Progress-Format
     - WebSocket-ähnliche Funktionalität über HTTP
+    
+    Streams lesen aus dem ProgressHub des Managers: vorserialisierte Bytes,
+    je Client ein Ring-Buffer, bereits gepufferte Events gehen als ein Chunk raus.
     """
     
-    def __init__(self, progress_manager: VeritasProgressManager):
+    def __init__(self, progress_manager: VeritasProgressManager, heartbeat_interval: float = 30.0):
         self.progress_manager = progress_manager
-        self.active_streams: Dict[str, asyncio.Queue] = {}
+        self.hub = progress_manager.hub
+        self.heartbeat_interval = heartbeat_interval
+        self.active_streams: Dict[str, Set[ProgressSubscriber]] = {}
+        
+        try:
+            self.hub.bind_loop()
+        except RuntimeError:
+            pass  # Kein laufender Loop - Bindung beim ersten Stream
     
-    async def create_progress_stream(self, session_id: str) -> AsyncGenerator[str, None]:
+    async def create_progress_stream(self, session_id: str) -> AsyncGenerator[bytes, None]:
         """Erstellt Progress-Stream für Session"""
         
-        # Queue für diese Session
-        progress_queue = asyncio.Queue()
-        self.active_streams[session_id] = progress_queue
-        
-        # Progress Callback registrieren
-        def progress_callback(update: ProgressUpdate):
-            try:
-                # Async queue von sync callback - verwende thread-safe put
-                asyncio.run_coroutine_threadsafe(
-                    progress_queue.put(update), 
-                    asyncio.get_event_loop()
-                )
-            except Exception as e:
-                logger.error(f"Stream Callback Fehler: {e}")
-        
-        self.progress_manager.subscribe_to_progress(session_id, progress_callback)
-        
-        # 🔥 WICHTIG: Sende bereits vorhandene Events aus progress_history!
-        # Wenn Client nach Hypothesis-Generation connected, würde er sonst das Event verpassen!
-        try:
-            with self.progress_manager.progress_lock:
-                if session_id in self.progress_manager.active_sessions:
-                    history = self.progress_manager.active_sessions[session_id]['progress_history']
-                    for past_update in history:
-                        await progress_queue.put(past_update)
-                        logger.debug(f"📜 Sending historical event: {past_update.update_type.value}")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not send historical events: {e}")
+        # Bereits vorhandene Events (z.B. Hypothese vor dem Connect) kommen
+        # aus der Hub-History - atomar mit der Registrierung, ohne Duplikate
+        subscriber = self.hub.subscribe(session_id)
+        self.active_streams.setdefault(session_id, set()).add(subscriber)
         
         try:
             while True:
-                # Warte auf nächstes Update
+                # Warte auf nächste Updates
                 try:
-                    update = await asyncio.wait_for(progress_queue.get(), timeout=30.0)
-                    
-                    # SSE-Format für Frontend
-                    sse_data = {
-                        'type': update.update_type.value,
-                        'stage': update.stage.value,
-                        'message': update.message,
-                        'progress': update.progress_percent,
-                        'timestamp': update.timestamp,
-                        'details': update.details
-                    }
-                    
-                    # Optional: Agent/LLM spezifische Daten
-                    if update.agent_type:
-                        sse_data['agent_type'] = update.agent_type
-                    if update.intermediate_conclusion:
-                        sse_data['intermediate_result'] = update.intermediate_conclusion
-                    if update.llm_thinking_step:
-                        sse_data['llm_thinking'] = update.llm_thinking_step
-                    
-                    # ✨ NEU: Hypothesis-Daten
-                    if update.hypothesis_data:
-                        sse_data['hypothesis_data'] = update.hypothesis_data
-                    if update.confidence:
-                        sse_data['confidence'] = update.confidence
-                    if update.information_gaps:
-                        sse_data['information_gaps'] = update.information_gaps
-                    if update.clarification_questions:
-                        sse_data['clarification_questions'] = update.clarification_questions
-                    
-                    # ✨ NEU: Stage Reflection Daten
-                    if update.reflection_data:
-                        sse_data['reflection_data'] = update.reflection_data
-                    if update.completion_percent is not None:
-                        sse_data['completion_percent'] = update.completion_percent
-                    if update.identified_gaps:
-                        sse_data['identified_gaps'] = update.identified_gaps
-                    if update.gathered_info:
-                        sse_data['gathered_info'] = update.gathered_info
-                    if update.next_actions:
-                        sse_data['next_actions'] = update.next_actions
-                    
-                    # Server-Sent Event Format
-                    yield f"data: {json.dumps(sse_data)}\n\n"
-                    
-                    # Beende Stream bei Completion
-                    if update.stage == ProgressStage.COMPLETED or update.stage == ProgressStage.ERROR:
-                        break
-                        
+                    events = await subscriber.next_batch(timeout=self.heartbeat_interval)
                 except asyncio.TimeoutError:
                     # Heartbeat
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now(timezone.utc).isoformat()})}\n\n"
+                    yield encode_sse({'type': 'heartbeat', 'timestamp': datetime.now(timezone.utc).isoformat()})
+                    continue
+                
+                yield b"".join(event.data for event in events)
+                
+                # Beende Stream bei Completion
+                if any(event.terminal for event in events):
+                    break
         
         finally:
             # Cleanup
-            self.progress_manager.unsubscribe_from_progress(session_id, progress_callback)
-            if session_id in self.active_streams:
-                del self.active_streams[session_id]
+            self.hub.unsubscribe(session_id, subscriber)
+            streams = self.active_streams.get(session_id)
+            if streams is not None:
+                streams.discard(subscriber)
+                if not streams:
+                    del self.active_streams[session_id]
 
 # ===== FACTORY FUNCTIONS =====
 
@@ -79,7 +79,11 @@ def test_chat_persistence():
     try:
         success = service.save_chat_session(session)
         if success:
-            session_file = service.sessions_dir / f"{session.session_id}.json"
+            # Session-Store: Message-Log (.jsonl); ohne Store: JSON-Datei
+            if service.session_store is not None:
+                session_file = service.session_store.log_path(session.session_id)
+            else:
+                session_file = service.sessions_dir / f"{session.session_id}.json"
             file_size = session_file.stat().st_size
             print(f"✅ Session gespeichert")
             print(f"   Datei: {session_file.name}")
@@ -267,7 +267,7 @@ class TestQueryServiceHybridMode:
             MockRAGService.return_value = mock_rag_instance
             
             mock_reranker_instance = Mock()
-            mock_reranker_instance.rerank.return_value = sample_reranking_results
+            mock_reranker_instance.arerank = AsyncMock(return_value=sample_reranking_results)
             MockRerankerService.return_value = mock_reranker_instance
             
             # Create service and execute
@@ -277,7 +277,7 @@ class TestQueryServiceHybridMode:
             result = await service._process_hybrid(sample_query_request)
             
             # Verify reranker was called
-            mock_reranker_instance.rerank.assert_called_once()
+            mock_reranker_instance.arerank.assert_awaited_once()
             
             # Verify reranking info is in sources
             for source in result["sources"]:
@@ -312,7 +312,7 @@ class TestQueryServiceHybridMode:
             result = await service._process_hybrid(sample_query_request)
             
             # Verify reranker was NOT called
-            mock_reranker_instance.rerank.assert_not_called()
+            mock_reranker_instance.arerank.assert_not_called()
             
             # Verify no reranking info in sources
             for source in result["sources"]:
@@ -453,7 +453,7 @@ class TestQueryServiceHybridMode:
             
             # Reranker raises exception
             mock_reranker_instance = Mock()
-            mock_reranker_instance.rerank.side_effect = Exception("LLM timeout")
+            mock_reranker_instance.arerank = AsyncMock(side_effect=Exception("LLM timeout"))
             MockRerankerService.return_value = mock_reranker_instance
             
             service = QueryService(uds3=mock_uds3, pipeline=mock_pipeline)
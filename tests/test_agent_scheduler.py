@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+VERITAS AGENT SCHEDULER TESTS
+=============================
+
+Unit-Tests für den prozessweiten Agent-Scheduler:
+- Begrenzte Nebenläufigkeit (global, je Agent-Typ, je Request)
+- Coroutine-Agenten laufen nativ im Event-Loop
+- Faire Round-Robin-Vergabe über Requests
+- Admission Control mit Queue-Position / Retry-After
+- Slots werden erst nach Ende des Worker-Threads frei
+- Async-Variante des UDS3-Coalescers
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.agents.veritas_agent_scheduler import (
+    AgentScheduler,
+    AgentSchedulerConfig,
+    SchedulerSaturatedError,
+)
+from backend.agents.veritas_uds3_coalescer import UDS3SearchCoalescer
+
+
+class ConcurrencyProbe:
+    """Zählt gleichzeitig laufende Aufrufe (gesamt und je Schlüssel)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = {}
+        self.peak = {}
+
+    def enter(self, key):
+        with self.lock:
+            for k in (key, "*"):
+                self.current[k] = self.current.get(k, 0) + 1
+                self.peak[k] = max(self.peak.get(k, 0), self.current[k])
+
+    def leave(self, key):
+        with self.lock:
+            for k in (key, "*"):
+                self.current[k] -= 1
+
+
+@pytest.mark.asyncio
+async def test_limits_bound_threaded_agents():
+    scheduler = AgentScheduler(AgentSchedulerConfig(
+        max_workers=8, max_concurrent_tasks=4, max_tasks_per_request=3,
+        agent_type_limits={"legal": 1}
+    ))
+    probe = ConcurrencyProbe()
+
+    def agent(agent_type):
+        probe.enter(agent_type)
+        time.sleep(0.02)
+        probe.leave(agent_type)
+        return agent_type
+
+    jobs = [
+        scheduler.run(f"req-{i % 3}", agent_type, agent, agent_type)
+        for i in range(12)
+        for agent_type in (("legal", "environmental")[i % 2],)
+    ]
+    results = await asyncio.gather(*jobs)
+
+    assert sorted(results) == sorted(["legal", "environmental"] * 6)
+    assert probe.peak["*"] <= 4
+    assert probe.peak["legal"] == 1
+    stats = scheduler.get_stats()
+    assert stats["tasks_threaded"] == 12
+    assert stats["running_tasks"] == 0 and stats["queued_tasks"] == 0
+    scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coroutine_agents_run_natively():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_concurrent_tasks=2))
+    loop_thread = threading.current_thread()
+    seen_threads = []
+
+    async def agent(value):
+        seen_threads.append(threading.current_thread())
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    results = await asyncio.gather(*(scheduler.run("req", "social", agent, i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert all(thread is loop_thread for thread in seen_threads)
+    assert scheduler.get_stats()["tasks_async"] == 5
+    assert scheduler._executor is None  # Kein Thread-Pool für native Agenten
+
+
+@pytest.mark.asyncio
+async def test_round_robin_across_requests():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_concurrent_tasks=1, max_tasks_per_request=5))
+    order = []
+    gate = asyncio.Event()
+
+    async def agent(label):
+        await gate.wait()
+        order.append(label)
+
+    # Request A reiht 4 Agenten ein, B danach 2 - B darf nicht bis zum Ende warten
+    jobs = [asyncio.create_task(scheduler.run("A", "x", agent, f"A{i}")) for i in range(4)]
+    await asyncio.sleep(0)
+    jobs += [asyncio.create_task(scheduler.run("B", "x", agent, f"B{i}")) for i in range(2)]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(*jobs)
+
+    assert order == ["A0", "B0", "A1", "B1", "A2", "A3"]
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_and_saturation():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_active_requests=1, max_queued_requests=1))
+
+    await scheduler.acquire_request("first")
+    waiting = asyncio.create_task(scheduler.acquire_request("second"))
+    await asyncio.sleep(0)
+    assert scheduler.get_stats()["queued_requests"] == 1
+
+    with pytest.raises(SchedulerSaturatedError) as exc_info:
+        await scheduler.acquire_request("third")
+    error = exc_info.value
+    assert error.queue_position == 2
+    assert error.retry_after >= 1.0
+    assert int(error.retry_after_header) >= 1
+    assert error.to_dict()["error"] == "scheduler_saturated"
+
+    scheduler.release_request("first")
+    await asyncio.wait_for(waiting, timeout=1.0)
+    stats = scheduler.get_stats()
+    assert stats["active_requests"] == 1
+    assert stats["rejected"] == 1
+    scheduler.release_request("second")
+
+
+@pytest.mark.asyncio
+async def test_admission_timeout_reports_position():
+    scheduler = AgentScheduler(AgentSchedulerConfig(
+        max_active_requests=1, max_queued_requests=5, admission_timeout=0.05
+    ))
+
+    async with scheduler.admit("busy"):
+        with pytest.raises(SchedulerSaturatedError) as exc_info:
+            await scheduler.acquire_request("late")
+
+    assert exc_info.value.reason == "admission_timeout"
+    assert exc_info.value.queue_position == 1
+    stats = scheduler.get_stats()
+    assert stats["queued_requests"] == 0 and stats["active_requests"] == 0
+    assert stats["admission_timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_held_until_thread_finishes():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_workers=2, max_concurrent_tasks=1))
+    release = threading.Event()
+
+    def blocking_agent():
+        release.wait(2.0)
+        return "slow"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(scheduler.run("req", "legal", blocking_agent), timeout=0.05)
+
+    # Der Thread läuft noch → Slot belegt, der nächste Agent wartet
+    follow_up = asyncio.create_task(scheduler.run("req", "legal", lambda: "next"))
+    await asyncio.sleep(0.05)
+    assert not follow_up.done()
+    assert scheduler.get_stats()["running_tasks"] == 1
+
+    release.set()
+    assert await asyncio.wait_for(follow_up, timeout=1.0) == "next"
+    scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coalescer_async_strategy_single_flight():
+    class AsyncUDS3:
+        def __init__(self):
+            self.calls = 0
+
+        async def query_across_databases(self, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0.02)
+            return SimpleNamespace(success=True, joined_results=[
+                {"content": "BauGB", "doc_id": "l1", "category": "legal"},
+                {"content": "Lärm", "doc_id": "e1", "category": "environmental"},
+            ])
+
+    strategy = AsyncUDS3()
+    search = UDS3SearchCoalescer(strategy)
+    assert search.is_async
+
+    legal, environmental = await asyncio.gather(
+        search.avector_search("Bauantrag", category="legal", top_k=1),
+        search.avector_search("Bauantrag", category="environmental", top_k=1),
+    )
+
+    assert strategy.calls == 1
+    assert [r["doc_id"] for r in legal] == ["l1"]
+    assert [r["doc_id"] for r in environmental] == ["e1"]
+    assert search.get_stats()["coalesced"] == 1
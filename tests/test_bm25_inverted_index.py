@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+VERITAS BM25 INVERTED INDEX TESTS
+=================================
+
+Unit-Tests für den nativen BM25 Inverted Index:
+- Score-Parität mit rank_bm25.BM25Okapi
+- MaxScore Top-K vs. vollständiger Sortierung
+- Integration in SparseRetriever
+- Persistenz: atomares Veröffentlichen neuer Versionen (CURRENT-Pointer)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import os
+import random
+import shutil
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.agents.veritas_bm25_index import BM25InvertedIndex
+from backend.agents.veritas_sparse_retrieval import (
+    SparseRetriever,
+    SparseRetrievalConfig,
+    BM25_AVAILABLE,
+    BM25Okapi
+)
+
+
+# ============================================================================
+# TEST FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def zipf_corpus():
+    """Synthetischer Corpus mit Zipf-verteiltem Vokabular."""
+    rng = random.Random(42)
+    vocab = [f"term{i}" for i in range(400)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    corpus = [
+        rng.choices(vocab, weights=weights, k=rng.randint(5, 80))
+        for _ in range(2000)
+    ]
+    queries = [
+        rng.choices(vocab, weights=weights, k=rng.randint(1, 6))
+        for _ in range(100)
+    ]
+    return corpus, queries
+
+
+@pytest.fixture
+def legal_corpus():
+    """Kleiner Rechts-Corpus für SparseRetriever-Tests."""
+    return [
+        {"id": "bgb_242", "content": "§ 242 BGB Leistung nach Treu und Glauben"},
+        {"id": "din_18040", "content": "DIN 18040-1 Barrierefreies Bauen öffentliche Gebäude"},
+        {"id": "uvpg_3a", "content": "UVP nach § 3a UVPG Umweltverträglichkeitsprüfung"},
+        {"id": "baugb_35", "content": "§ 35 BauGB Bauen im Außenbereich"},
+    ]
+
+
+# ============================================================================
+# INDEX TESTS
+# ============================================================================
+
+class TestBM25InvertedIndex:
+    """Tests für BM25InvertedIndex."""
+
+    def test_build_layout(self):
+        """Test: CSR-Layout nach dem Build."""
+        index = BM25InvertedIndex().build([["a", "b", "a"], ["b", "c"], ["c"]])
+
+        assert index.num_docs == 3
+        assert index.num_terms == 3
+        assert index.num_postings == 5
+        assert index.num_segments == 1
+
+        segment = index.segments[0]
+        assert segment.indptr[-1] == index.num_postings
+
+        docs, tfs = segment.postings(segment.find_term(index.vocabulary["b"]))
+        assert list(docs) == [0, 1]
+        assert list(segment.doc_term_ids(0)) == sorted([index.vocabulary["a"], index.vocabulary["b"]])
+
+    @pytest.mark.skipif(not BM25_AVAILABLE, reason="rank_bm25 nicht installiert")
+    def test_score_parity_with_rank_bm25(self, zipf_corpus):
+        """Test: Scores identisch zu BM25Okapi.get_scores."""
+        corpus, queries = zipf_corpus
+        reference = BM25Okapi(corpus, k1=1.5, b=0.75)
+        index = BM25InvertedIndex(k1=1.5, b=0.75).build(corpus)
+
+        for query in queries:
+            assert np.allclose(index.get_scores(query), reference.get_scores(query))
+
+    def test_top_k_matches_full_sort(self, zipf_corpus):
+        """Test: MaxScore Top-K liefert dieselben Scores wie argsort."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex().build(corpus)
+
+        for query in queries:
+            scores = index.get_scores(query)
+            expected = np.sort(scores[scores > 0])[::-1][:10]
+
+            doc_indices, top_scores = index.top_k(query, 10)
+
+            assert np.allclose(top_scores, expected)
+            assert np.allclose(scores[doc_indices], top_scores)
+
+    def test_top_k_unknown_terms(self, zipf_corpus):
+        """Test: Query ohne bekannte Terme."""
+        corpus, _ = zipf_corpus
+        index = BM25InvertedIndex().build(corpus)
+
+        doc_indices, scores = index.top_k(["unbekannt"], 10)
+
+        assert doc_indices.size == 0
+        assert scores.size == 0
+
+    def test_top_k_min_score(self, zipf_corpus):
+        """Test: min_score filtert Kandidaten."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex().build(corpus)
+
+        _, scores = index.top_k(queries[0], 50, min_score=1.0)
+
+        assert np.all(scores >= 1.0)
+
+
+    @pytest.mark.parametrize("aggregation", ["max", "sum", "avg"])
+    @pytest.mark.parametrize("use_scipy", [True, False])
+    def test_top_k_multi_matches_dense_aggregation(self, zipf_corpus, monkeypatch, aggregation, use_scipy):
+        """Test: Sparse Multi-Query-Scoring == Aggregation der dichten Score-Vektoren."""
+        import backend.agents.veritas_bm25_index as bm25_index
+        if use_scipy and not bm25_index.SCIPY_AVAILABLE:
+            pytest.skip("scipy nicht installiert")
+        monkeypatch.setattr(bm25_index, "SCIPY_AVAILABLE", use_scipy)
+
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex(background_merge=False).build(corpus)
+        for slot in range(0, 2000, 7):
+            index.remove_document(slot)
+
+        reduce = {"max": np.max, "sum": np.sum, "avg": np.mean}[aggregation]
+        for start in range(0, 60, 4):
+            variants = queries[start:start + 4]
+            dense = reduce(np.array([index.get_scores(q) for q in variants]), axis=0)
+            expected = np.sort(dense[dense > 0])[::-1][:20]
+
+            slots, scores = index.top_k_multi(variants, 20, aggregation=aggregation)
+
+            assert np.allclose(scores, expected)
+            assert np.allclose(dense[slots], scores)
+            assert index.live[slots].all()
+
+    def test_top_k_multi_invalid_aggregation(self, zipf_corpus):
+        """Test: Unbekannte Aggregation."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex().build(corpus)
+
+        with pytest.raises(ValueError):
+            index.top_k_multi(queries[:2], 10, aggregation="median")
+
+
+# ============================================================================
+# INCREMENTAL UPDATES
+# ============================================================================
+
+class TestIncrementalIndex:
+    """Tests für add/remove, Tombstones und Segment-Merging."""
+
+    def _assert_matches_rebuild(self, index, live_docs, queries):
+        rebuilt = BM25InvertedIndex().build([tokens for _, tokens in live_docs])
+        slots = np.array([slot for slot, _ in live_docs])
+
+        for query in queries:
+            scores = index.get_scores(query)
+            assert np.allclose(scores[slots], rebuilt.get_scores(query))
+
+            _, top_scores = index.top_k(query, 10)
+            _, expected = rebuilt.top_k(query, 10)
+            assert np.allclose(top_scores, expected)
+
+    def test_add_documents_matches_rebuild(self, zipf_corpus):
+        """Test: Inkrementelles Hinzufügen == vollständiger Rebuild."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex(background_merge=False).build(corpus[:1000])
+        for start in range(1000, 2000, 100):
+            index.add_documents(corpus[start:start + 100])
+
+        assert index.num_docs == 2000
+        self._assert_matches_rebuild(index, list(enumerate(corpus)), queries)
+
+    def test_remove_documents_matches_rebuild(self, zipf_corpus):
+        """Test: Tombstones aktualisieren df/avgdl exakt."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex(background_merge=False).build(corpus)
+        removed = set(range(0, 2000, 3))
+        for slot in removed:
+            assert index.remove_document(slot) is True
+
+        assert index.remove_document(0) is False
+        assert index.num_docs == 2000 - len(removed)
+
+        live_docs = [(slot, tokens) for slot, tokens in enumerate(corpus) if slot not in removed]
+        self._assert_matches_rebuild(index, live_docs, queries)
+
+        doc_indices, _ = index.top_k(queries[0], 50)
+        assert not removed.intersection(doc_indices.tolist())
+
+    def test_segment_merging(self, zipf_corpus):
+        """Test: Merge Policy begrenzt die Segmentanzahl."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex(max_segments=4, merge_width=3)
+        for start in range(0, 2000, 50):
+            index.add_documents(corpus[start:start + 50])
+        index.remove_document(5)
+        index.wait_for_merges()
+
+        assert index.num_segments <= 4
+        assert index.get_stats()["merges_completed"] > 0
+
+        live_docs = [(slot, tokens) for slot, tokens in enumerate(corpus) if slot != 5]
+        self._assert_matches_rebuild(index, live_docs, queries)
+
+        index.force_merge()
+        assert index.num_segments == 1
+        assert index.num_postings == sum(len(set(tokens)) for _, tokens in live_docs)
+
+
+# ============================================================================
+# SPARSE RETRIEVER INTEGRATION
+# ============================================================================
+
+class TestSparseRetrieverInvertedIndex:
+    """Tests für SparseRetriever mit Inverted Index."""
+
+    @pytest.mark.asyncio
+    async def test_retrieve_uses_inverted_index(self, legal_corpus):
+        """Test: Retrieval über Inverted Index."""
+        retriever = SparseRetriever(SparseRetrievalConfig(enable_cache=False))
+        retriever.index_documents(legal_corpus)
+
+        results = await retriever.retrieve("UVPG UVP", top_k=2)
+
+        assert retriever.get_stats()["backend"] == "inverted_index"
+        assert results[0].doc_id == "uvpg_3a"
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not BM25_AVAILABLE, reason="rank_bm25 nicht installiert")
+    async def test_retrieve_matches_rank_bm25_backend(self, legal_corpus):
+        """Test: Gleiches Ranking wie der rank_bm25 Linear-Scan."""
+        native = SparseRetriever(SparseRetrievalConfig(enable_cache=False))
+        legacy = SparseRetriever(SparseRetrievalConfig(enable_cache=False, use_inverted_index=False))
+        native.index_documents(legal_corpus)
+        legacy.index_documents(legal_corpus)
+
+        native_results = await native.retrieve("UVPG UVP Außenbereich", top_k=2)
+        legacy_results = await legacy.retrieve("UVPG UVP Außenbereich", top_k=2)
+
+        assert [r.doc_id for r in native_results] == [r.doc_id for r in legacy_results]
+        assert [r.score for r in native_results] == pytest.approx([r.score for r in legacy_results])
+
+    @pytest.mark.asyncio
+    async def test_add_update_remove(self, legal_corpus):
+        """Test: Inkrementelle Änderungen sind sofort durchsuchbar."""
+        retriever = SparseRetriever(SparseRetrievalConfig(enable_cache=False))
+        retriever.index_documents(legal_corpus)
+
+        retriever.add_documents([{"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten Anlagen"}])
+        results = await retriever.retrieve("BImSchG Betreiberpflichten", top_k=1)
+        assert results[0].doc_id == "bimschg_5"
+
+        retriever.update_document("bimschg_5", "§ 5 BImSchG Pflichten der Betreiber genehmigungsbedürftiger Anlagen")
+        results = await retriever.retrieve("genehmigungsbedürftiger", top_k=1)
+        assert results[0].doc_id == "bimschg_5"
+        assert retriever.get_stats()["num_documents"] == len(legal_corpus) + 1
+
+        assert retriever.remove_document("bimschg_5") is True
+        assert retriever.remove_document("bimschg_5") is False
+        results = await retriever.retrieve("BImSchG", top_k=5)
+        assert "bimschg_5" not in [r.doc_id for r in results]
+        assert retriever.get_stats()["num_documents"] == len(legal_corpus)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_inverted_index", [
+        True,
+        pytest.param(False, marks=pytest.mark.skipif(not BM25_AVAILABLE, reason="rank_bm25 nicht installiert")),
+    ])
+    async def test_duplicate_ids_in_batch(self, legal_corpus, use_inverted_index):
+        """Test: Doppelte IDs in einem Batch - letztes Vorkommen gewinnt, kein verwaister Slot."""
+        retriever = SparseRetriever(SparseRetrievalConfig(enable_cache=False, use_inverted_index=use_inverted_index))
+        retriever.index_documents(legal_corpus)
+
+        retriever.add_documents([
+            {"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten Lärmschutz"},
+            {"id": "bimschg_6", "content": "§ 6 BImSchG Genehmigungsvoraussetzungen"},
+            {"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten Vorsorge"},
+        ])
+        assert retriever.get_stats()["num_documents"] == len(legal_corpus) + 2
+
+        results = await retriever.retrieve("Lärmschutz", top_k=5, min_score=0.01)
+        assert results == []
+        results = await retriever.retrieve("Betreiberpflichten", top_k=5, min_score=0.01)
+        assert [r.doc_id for r in results] == ["bimschg_5"]
+        assert "Vorsorge" in results[0].content
+
+        assert retriever.remove_document("bimschg_5") is True
+        results = await retriever.retrieve("Betreiberpflichten BImSchG", top_k=5, min_score=0.01)
+        assert [r.doc_id for r in results] == ["bimschg_6"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not BM25_AVAILABLE, reason="rank_bm25 nicht installiert")
+    async def test_incremental_legacy_backend(self, legal_corpus):
+        """Test: rank_bm25-Backend unterstützt Updates via Rebuild."""
+        retriever = SparseRetriever(SparseRetrievalConfig(enable_cache=False, use_inverted_index=False))
+        retriever.index_documents(legal_corpus)
+
+        retriever.add_documents([{"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten"}])
+        retriever.remove_document("bgb_242")
+
+        results = await retriever.retrieve("BImSchG BGB", top_k=1)
+        assert results[0].doc_id == "bimschg_5"
+        assert "bgb_242" not in retriever.doc_ids
+
+
+# ============================================================================
+# PERSISTENZ
+# ============================================================================
+
+class TestPersistentIndex:
+    """Tests für save/load (memory-mapped)."""
+
+    def test_save_load_roundtrip(self, zipf_corpus, tmp_path):
+        """Test: Geladener Index liefert identische Scores."""
+        corpus, queries = zipf_corpus
+        index = BM25InvertedIndex(background_merge=False).build(corpus[:1500])
+        index.add_documents(corpus[1500:])
+        index.remove_document(3)
+
+        path = str(tmp_path / "bm25")
+        index.save(path, stored_fields={"doc_id": [f"d{i}" for i in range(2000)]})
+        loaded = BM25InvertedIndex.load(path)
+
+        assert isinstance(loaded.segments[0].postings_doc, np.memmap)
+        assert loaded.num_docs == index.num_docs
+        assert loaded.num_segments == index.num_segments
+        assert loaded.stored_fields["doc_id"][1999] == "d1999"
+        for query in queries:
+            assert np.allclose(loaded.get_scores(query), index.get_scores(query))
+            assert np.allclose(loaded.top_k(query, 10)[1], index.top_k(query, 10)[1])
+
+    def test_mutation_after_load(self, zipf_corpus, tmp_path):
+        """Test: Änderungen nach dem Laden (Copy-on-Write) ändern die Dateien nicht."""
+        corpus, queries = zipf_corpus
+        path = str(tmp_path / "bm25")
+        BM25InvertedIndex().build(corpus[:1000]).save(path)
+
+        loaded = BM25InvertedIndex.load(path, background_merge=False)
+        loaded.add_documents(corpus[1000:])
+        loaded.remove_document(0)
+
+        rebuilt = BM25InvertedIndex().build(corpus[1:])
+        for query in queries[:20]:
+            assert np.allclose(loaded.get_scores(query)[1:], rebuilt.get_scores(query))
+
+        assert BM25InvertedIndex.load(path).num_docs == 1000
+
+    def test_resave_is_never_missing_for_readers(self, zipf_corpus, tmp_path, monkeypatch):
+        """Test: Jeder Zwischenzustand eines Saves lädt vollständig (alt oder neu)."""
+        corpus, _ = zipf_corpus
+        path = str(tmp_path / "bm25")
+        BM25InvertedIndex().build(corpus[:100]).save(path)
+        mapped = BM25InvertedIndex.load(path)
+
+        seen = []
+        real_replace = os.replace
+
+        def observing_replace(src, dst):
+            real_replace(src, dst)
+            seen.append(BM25InvertedIndex.load(path).num_docs)
+
+        monkeypatch.setattr(os, "replace", observing_replace)
+        for size in (200, 300):
+            BM25InvertedIndex().build(corpus[:size]).save(path)
+        monkeypatch.undo()
+
+        assert seen == [200, 300]
+        assert BM25InvertedIndex.load(path).num_docs == 300
+        # Aktive + vorherige Version, ältere werden gelöscht
+        assert len([name for name in os.listdir(path) if name.startswith("v-")]) == 2
+        assert mapped.num_docs == 100
+
+    def test_legacy_layout_is_loaded_and_replaced(self, zipf_corpus, tmp_path):
+        """Test: Index im alten Layout (Manifest direkt im Verzeichnis) bleibt lesbar."""
+        corpus, _ = zipf_corpus
+        path = tmp_path / "bm25"
+        BM25InvertedIndex().build(corpus[:100]).save(str(path))
+        version = (path / "CURRENT").read_text()
+        for entry in (path / version).iterdir():
+            shutil.move(str(entry), str(path / entry.name))
+        (path / version).rmdir()
+        (path / "CURRENT").unlink()
+
+        assert BM25InvertedIndex.exists(str(path))
+        assert BM25InvertedIndex.load(str(path)).num_docs == 100
+
+        BM25InvertedIndex().build(corpus[:150]).save(str(path))
+        assert sorted(entry.name for entry in path.iterdir() if not entry.name.startswith("v-")) == ["CURRENT"]
+        assert BM25InvertedIndex.load(str(path)).num_docs == 150
+
+    @pytest.mark.asyncio
+    async def test_sparse_retriever_cold_start(self, legal_corpus, tmp_path):
+        """Test: SparseRetriever lädt den Index ohne Re-Indexierung."""
+        config = SparseRetrievalConfig(enable_cache=False, index_path=str(tmp_path / "bm25"))
+        retriever = SparseRetriever(config)
+        retriever.index_documents(legal_corpus)
+        retriever.save_index()
+
+        restarted = SparseRetriever(config)
+        assert restarted.load_index() is True
+        results = await restarted.retrieve("UVPG UVP", top_k=1)
+        assert results[0].doc_id == "uvpg_3a"
+        assert results[0].content == legal_corpus[2]["content"]
+
+        restarted.add_documents([{"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten"}])
+        assert restarted.remove_document("uvpg_3a") is True
+        results = await restarted.retrieve("BImSchG UVPG", top_k=5)
+        assert [r.doc_id for r in results][0] == "bimschg_5"
+        assert "uvpg_3a" not in [r.doc_id for r in results]
+
+    @pytest.mark.asyncio
+    async def test_updates_are_persisted_for_restart(self, legal_corpus, tmp_path):
+        """Test: Änderungen werden gebündelt gespeichert (flush), nicht je Mutation."""
+        config = SparseRetrievalConfig(enable_cache=False, index_path=str(tmp_path / "bm25"), persist_delay=60.0)
+        retriever = SparseRetriever(config)
+        retriever.index_documents(legal_corpus)
+        retriever.add_documents([{"id": "bimschg_5", "content": "§ 5 BImSchG Betreiberpflichten"}])
+        retriever.remove_document("uvpg_3a")
+        assert not BM25InvertedIndex.exists(config.index_path)
+
+        assert retriever.flush() is True
+        assert retriever.flush() is False  # nichts mehr offen
+
+        restarted = SparseRetriever(config)
+        assert restarted.load_index() is True
+        results = await restarted.retrieve("BImSchG UVPG", top_k=5, min_score=0.01)
+        assert [r.doc_id for r in results] == ["bimschg_5"]
+
+        in_memory = SparseRetriever(SparseRetrievalConfig(
+            index_path=str(tmp_path / "other"), persist_on_update=False
+        ))
+        in_memory.index_documents(legal_corpus)
+        assert in_memory.flush() is False
+        assert not BM25InvertedIndex.exists(str(tmp_path / "other"))
+
+    def test_burst_of_updates_is_saved_once(self, legal_corpus, tmp_path, monkeypatch):
+        """Test: Viele Einzeländerungen → ein Snapshot nach persist_delay."""
+        saves = []
+        real_save = BM25InvertedIndex.save
+
+        def counting_save(index, path, stored_fields=None):
+            saves.append(path)
+            real_save(index, path, stored_fields=stored_fields)
+
+        monkeypatch.setattr(BM25InvertedIndex, "save", counting_save)
+        config = SparseRetrievalConfig(enable_cache=False, index_path=str(tmp_path / "bm25"), persist_delay=0.1)
+        retriever = SparseRetriever(config)
+        retriever.index_documents(legal_corpus)
+        for i in range(50):
+            retriever.add_documents([{"id": f"doc_{i}", "content": f"Dokument {i} Inhalt"}])
+        retriever.remove_document("doc_0")
+        assert saves == []
+
+        deadline = time.monotonic() + 5.0
+        while not saves and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.2)
+
+        assert len(saves) == 1
+        restarted = SparseRetriever(config)
+        assert restarted.load_index() is True
+        assert restarted.get_stats()["num_documents"] == len(legal_corpus) + 49
+
+    def test_load_missing_index(self, tmp_path):
+        """Test: Fehlender Index → False statt Exception."""
+        retriever = SparseRetriever(SparseRetrievalConfig(index_path=str(tmp_path / "missing")))
+
+        assert retriever.load_index() is False
+        assert retriever.is_indexed() is False
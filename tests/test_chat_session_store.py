@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+VERITAS CHAT SESSION STORE TESTS
+================================
+
+Unit-Tests für den Chat-Session-Store (Message-Log + SQLite-Index):
+- Save hängt nur neue Nachrichten an (kein Rewrite der Session)
+- Geänderte letzte Nachricht / entfernte Nachrichten / Kompaktierung
+- Geänderte frühere Nachricht → Log wird neu geschrieben
+- Robustheit gegen Absturz zwischen Log-Append und Index-Update
+- Sortierung und Paging über den Index
+- Migration bestehender JSON-Sessions über den ChatPersistenceService
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.chat_persistence_service import ChatPersistenceService
+from backend.services.chat_session_store import ChatSessionStore
+from shared.chat_schema import ChatMessage, ChatSession
+
+
+def rebuilt(session, contents):
+    """Baut messages neu auf wie das Frontend (neue IDs bei jedem Save)"""
+    session.messages = [
+        ChatMessage(role="user" if i % 2 == 0 else "assistant", content=content)
+        for i, content in enumerate(contents)
+    ]
+    return session
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ChatSessionStore(str(tmp_path / "store"))
+    yield store
+    store.close()
+
+
+def test_save_appends_only_new_messages(store):
+    session = ChatSession()
+    session.add_message("user", "Was ist das BImSchG?")
+    assert store.save_session(session) == 1
+
+    contents = ["Was ist das BImSchG?"]
+    for index in range(1, 20):
+        contents.append(f"Nachricht {index}")
+        assert store.save_session(rebuilt(session, contents)) == 1
+
+    log_lines = store.log_path(session.session_id).read_text(encoding="utf-8").splitlines()
+    assert len(log_lines) == 20
+    assert store.stats["rewrites"] == 1  # nur der erste Save
+
+    loaded = store.load_session(session.session_id)
+    assert [m.content for m in loaded.messages] == contents
+    assert loaded.title == "Was ist das BImSchG?"
+
+
+def test_changed_last_message_and_removed_messages(store):
+    session = rebuilt(ChatSession(), ["Frage", "Antwort (streaming..."])
+    store.save_session(session)
+
+    # Letzte Nachricht fertig gestreamt → ein Record mit gleichem Index
+    assert store.save_session(rebuilt(session, ["Frage", "Antwort komplett", "Folgefrage"])) == 2
+    assert [m.content for m in store.load_session(session.session_id).messages] == [
+        "Frage", "Antwort komplett", "Folgefrage"
+    ]
+
+    # Chat geleert → Log wird neu geschrieben
+    assert store.save_session(rebuilt(session, ["Neu"])) == 1
+    assert store.log_path(session.session_id).read_text(encoding="utf-8").count("\n") == 1
+    assert [m.content for m in store.load_session(session.session_id).messages] == ["Neu"]
+
+
+def test_edited_first_message_survives_reload(tmp_path):
+    store = ChatSessionStore(str(tmp_path))
+    session = rebuilt(ChatSession(), ["Frage", "Antwort", "Folgefrage"])
+    store.save_session(session)
+
+    store.save_session(rebuilt(session, ["Frage (bearbeitet)", "Antwort", "Folgefrage", "Neu"]))
+    store.close()
+
+    reopened = ChatSessionStore(str(tmp_path))
+    assert [m.content for m in reopened.load_session(session.session_id).messages] == [
+        "Frage (bearbeitet)", "Antwort", "Folgefrage", "Neu"
+    ]
+    assert reopened.stats["rewrites"] == 0
+    assert store.stats["rewrites"] == 2
+    reopened.close()
+
+
+def test_log_compaction(tmp_path):
+    store = ChatSessionStore(str(tmp_path), compact_ratio=2.0)
+    try:
+        session = rebuilt(ChatSession(), ["Frage", "a"])
+        store.save_session(session)
+        for step in range(40):
+            store.save_session(rebuilt(session, ["Frage", "a" * (step + 2)]))
+        lines = store.log_path(session.session_id).read_text(encoding="utf-8").count("\n")
+        assert lines <= 2 * 2 + 16 + 1
+        assert store.stats["rewrites"] >= 2
+        assert store.load_session(session.session_id).messages[-1].content == "a" * 41
+    finally:
+        store.close()
+
+
+def test_crash_between_log_and_index_is_ignored(store):
+    session = rebuilt(ChatSession(), ["eins", "zwei"])
+    store.save_session(session)
+
+    # Log-Append ohne Index-Update + halbe Zeile
+    with open(store.log_path(session.session_id), "a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"i": 2, "id": "x", "role": "user", "content": "verloren",
+                                 "timestamp": datetime.now().isoformat()}) + "\n")
+        handle.write('{"i": 3, "role": "us')
+
+    assert [m.content for m in store.load_session(session.session_id).messages] == ["eins", "zwei"]
+
+    store.save_session(rebuilt(session, ["eins", "zwei", "drei"]))
+    assert [m.content for m in store.load_session(session.session_id).messages] == ["eins", "zwei", "drei"]
+
+
+def test_list_sessions_sorting_and_paging(store):
+    base = datetime(2025, 10, 1, 12, 0, 0)
+    for index in range(25):
+        session = rebuilt(ChatSession(title=f"Session {index:02d}"), ["x"] * (index % 5 + 1))
+        session.created_at = base + timedelta(minutes=index)
+        session.updated_at = base + timedelta(hours=1, minutes=-index)
+        store.save_session(session)
+
+    newest = store.list_sessions(limit=10, sort_by="created_at", reverse=True)
+    assert [s["title"] for s in newest[:3]] == ["Session 24", "Session 23", "Session 22"]
+
+    page = store.list_sessions(limit=10, offset=20, sort_by="title", reverse=False)
+    assert [s["title"] for s in page] == [f"Session {i}" for i in range(20, 25)]
+
+    by_update = store.list_sessions(limit=1, sort_by="updated_at")
+    assert by_update[0]["title"] == "Session 00"
+    assert by_update[0]["message_count"] == 1
+
+    stats = store.get_statistics()
+    assert stats["total_sessions"] == 25
+    assert stats["total_messages"] == sum(i % 5 + 1 for i in range(25))
+    assert stats["oldest_session"]["title"] == "Session 00"
+
+
+def test_service_migrates_legacy_json(tmp_path):
+    sessions_dir = tmp_path / "sessions"
+    backups_dir = tmp_path / "backups"
+
+    legacy = ChatPersistenceService(str(sessions_dir), str(backups_dir), use_session_store=False)
+    session = ChatSession()
+    session.add_message("user", "Genehmigung nach BImSchG?")
+    session.add_message("assistant", "Antwort", metadata={"confidence": 0.9})
+    legacy.save_chat_session(session)
+    updated_at = session.updated_at
+
+    service = ChatPersistenceService(str(sessions_dir), str(backups_dir))
+    try:
+        assert list(sessions_dir.glob("*.json")) == []
+        assert len(list(backups_dir.glob("*/*.json"))) == 1
+
+        listed = service.list_chat_sessions()
+        assert [s["session_id"] for s in listed] == [session.session_id]
+        assert listed[0]["message_count"] == 2
+        assert listed[0]["updated_at"] == updated_at.isoformat()
+
+        loaded = service.load_chat_session(session.session_id)
+        assert loaded.messages[1].metadata == {"confidence": 0.9}
+
+        loaded.add_message("user", "Und die Fristen?")
+        assert service.save_chat_session(loaded)
+        assert service.get_session_statistics()["total_messages"] == 3
+
+        assert service.delete_chat_session(session.session_id, create_backup=True)
+        assert service.list_chat_sessions() == []
+    finally:
+        service.session_store.close()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+VERITAS CHUNK SCORING TESTS
+===========================
+
+Unit-Tests für das vektorisierte Chunk-Scoring im TokenOverflowHandler:
+- Vektorisierte Scores identisch mit der skalaren Referenz
+- Gecachte Term-ID-Repräsentation der Chunks
+- argpartition-Top-N ohne Kopieren der Chunk-Dicts
+- Knapsack-Auswahl: maximale Relevanz im exakten Token-Budget
+- Satz-Extraktion in ursprünglicher Reihenfolge
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import copy
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from backend.services.token_overflow_handler import (
+    ChunkReranker,
+    ChunkTermCache,
+    ContextSummarizer,
+)
+
+WORDS = ["baugenehmigung", "bimschg", "lärm", "grenzwert", "verfahren", "behörde", "frist", "§", "4", "Anlage"]
+
+
+def random_chunks(count, seed=7):
+    rng = random.Random(seed)
+    chunks = []
+    for index in range(count):
+        chunk = {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 300)))}
+        if index % 3:
+            chunk["score"] = rng.random()
+        if index % 4 == 0:
+            chunk["source_type"] = rng.choice(["vector", "graph", "relational"])
+        chunks.append(chunk)
+    return chunks
+
+
+def test_vectorized_scores_match_scalar_reference():
+    chunks = random_chunks(120)
+    query = "Welche Grenzwerte gelten für Lärm nach BImSchG?"
+
+    scores = ChunkReranker.score_chunks(chunks, query, term_cache=ChunkTermCache())
+    expected = [ChunkReranker.calculate_relevance_score(chunk, query) for chunk in chunks]
+
+    np.testing.assert_allclose(scores, expected, rtol=0, atol=1e-12)
+
+
+def test_term_cache_reuses_chunk_representation():
+    cache = ChunkTermCache(max_entries=10)
+    chunks = random_chunks(5)
+    ChunkReranker.score_chunks(chunks, "frist", term_cache=cache)
+    ChunkReranker.score_chunks(chunks, "behörde", term_cache=cache)
+
+    assert cache.misses == len({chunk["text"] for chunk in chunks})
+    assert cache.hits == 2 * len(chunks) - cache.misses
+
+
+def test_rerank_keeps_chunk_dicts_untouched():
+    chunks = random_chunks(30)
+    snapshot = copy.deepcopy(chunks)
+
+    filtered, saved = ChunkReranker.rerank_and_filter(chunks, "baugenehmigung frist", 5, [10] * 30)
+
+    assert len(filtered) == 5 and saved == 250
+    assert all(any(chunk is original for original in chunks) for chunk in filtered)
+    assert chunks == snapshot
+    scores = ChunkReranker.score_chunks(chunks, "baugenehmigung frist")
+    assert [ChunkReranker.calculate_relevance_score(c, "baugenehmigung frist") for c in filtered] == \
+        sorted(scores, reverse=True)[:5]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_knapsack_is_optimal_within_budget(seed):
+    rng = random.Random(seed)
+    scores = np.array([rng.random() for _ in range(10)])
+    weights = [rng.randint(1, 400) for _ in range(10)]
+    budget = sum(weights) // 3
+
+    selected = ChunkReranker.select_within_budget(scores, weights, budget)
+
+    assert sum(weights[i] for i in selected) <= budget
+    best = max(
+        sum(scores[i] for i in subset)
+        for size in range(len(scores) + 1)
+        for subset in itertools.combinations(range(len(scores)), size)
+        if sum(weights[i] for i in subset) <= budget
+    )
+    assert scores[selected].sum() == pytest.approx(best)
+    assert list(scores[selected]) == sorted(scores[selected], reverse=True)
+
+
+def test_knapsack_large_budget_is_bucketed_but_never_exceeds():
+    rng = random.Random(1)
+    scores = np.array([rng.random() for _ in range(200)])
+    weights = [rng.randint(100, 2000) for _ in range(200)]
+    budget = 60_000
+
+    selected = ChunkReranker.select_within_budget(scores, weights, budget, max_cells=1024)
+
+    assert sum(weights[i] for i in selected) <= budget
+    # Gierige Auswahl nach Score-Dichte als Untergrenze
+    greedy, used = 0.0, 0
+    for i in np.argsort(-(scores / np.array(weights))):
+        if used + weights[i] <= budget:
+            used += weights[i]
+            greedy += scores[i]
+    assert scores[selected].sum() >= greedy * 0.98
+
+
+def test_extract_key_sentences_keeps_original_order():
+    text = "Kurz. Ein deutlich längerer Satz, mit Komma, und mehr Inhalt. Mittel langer Satz hier. " \
+           "Noch ein sehr langer Satz, der wichtig ist. X."
+    result = ContextSummarizer.extract_key_sentences(text, max_sentences=2)
+    assert result == "Ein deutlich längerer Satz, mit Komma, und mehr Inhalt. Noch ein sehr langer Satz, der wichtig ist."
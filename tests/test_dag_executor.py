@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+VERITAS DAG EXECUTOR TESTS
+==========================
+
+Unit-Tests für den Ready-Queue-Executor des Agent-Frameworks:
+- Schritte starten, sobald ihre Abhängigkeiten fertig sind (keine Level-Barriere)
+- Ein Thread-Pool je Plan, Begrenzung durch max_workers
+- Kritischer Pfad und Idle-Worker-Zeit im Report
+- Integration in BaseAgent._execute_parallel
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import threading
+import time
+
+import pytest
+
+from backend.agents.framework.base_agent import BaseAgent
+from backend.agents.framework.dag_executor import ReadyQueueExecutor
+from backend.agents.framework.dependency_resolver import DependencyError, DependencyResolver
+
+# A (langsam) → C ;  B (schnell) → D ;  C, D → E
+STEPS = [
+    {"step_id": "A", "depends_on": []},
+    {"step_id": "B", "depends_on": []},
+    {"step_id": "C", "depends_on": ["A"]},
+    {"step_id": "D", "depends_on": ["B"]},
+    {"step_id": "E", "depends_on": ["C", "D"]},
+]
+DURATIONS = {"A": 0.20, "B": 0.02, "C": 0.02, "D": 0.02, "E": 0.01}
+
+
+def run_plan(steps, durations, max_workers=4):
+    executor = ReadyQueueExecutor(DependencyResolver(steps), max_workers=max_workers)
+    completed = []
+
+    def submit(step_id):
+        time.sleep(durations[step_id])
+        return step_id
+
+    report = executor.run(submit=submit, on_complete=lambda step_id, future: completed.append(future.result()))
+    return report, completed
+
+
+def test_step_starts_when_dependencies_finish():
+    report, completed = run_plan(STEPS, DURATIONS)
+    timings = report["step_timings"]
+
+    # D hängt nur von B ab und startet, während A noch läuft
+    assert timings["D"]["start_ms"] < timings["A"]["end_ms"]
+    assert timings["E"]["start_ms"] >= max(timings["C"]["end_ms"], timings["D"]["end_ms"])
+    assert completed.index("D") < completed.index("A")
+    assert sorted(completed) == ["A", "B", "C", "D", "E"]
+
+
+def test_report_critical_path_and_idle_time():
+    report, _ = run_plan(STEPS, DURATIONS, max_workers=2)
+
+    assert report["critical_path"] == ["A", "C", "E"]
+    assert report["critical_path_ms"] == pytest.approx(230, abs=60)
+    assert report["makespan_ms"] >= report["critical_path_ms"] - 1
+    assert report["workers"] == 2
+    assert report["peak_parallelism"] == 2
+    busy = sum(t["end_ms"] - t["start_ms"] for t in report["step_timings"].values())
+    assert report["idle_worker_ms"] == pytest.approx(2 * report["makespan_ms"] - busy, abs=5)
+    assert 0.0 < report["worker_utilization"] <= 1.0
+
+
+def test_max_workers_bounds_concurrency():
+    steps = [{"step_id": f"s{i}", "depends_on": []} for i in range(8)]
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def submit(step_id):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+
+    executor = ReadyQueueExecutor(DependencyResolver(steps), max_workers=3)
+    report = executor.run(submit=submit, on_complete=lambda step_id, future: None)
+
+    assert state["peak"] == 3
+    assert report["peak_parallelism"] == 3
+
+
+def test_cycle_is_rejected():
+    steps = [
+        {"step_id": "A", "depends_on": ["B"]},
+        {"step_id": "B", "depends_on": ["A"]},
+    ]
+    with pytest.raises(DependencyError):
+        ReadyQueueExecutor(DependencyResolver(steps))
+
+
+class SleepAgent(BaseAgent):
+    def execute_step(self, step, context):
+        return {"status": "success", "quality_score": 1.0}
+
+    def get_agent_type(self):
+        return "sleep"
+
+    def get_capabilities(self):
+        return []
+
+    def _execute_single_step(self, plan_id, step, context):
+        time.sleep(DURATIONS[step["step_id"]])
+        if step["step_id"] == "B":
+            raise RuntimeError("B kaputt")
+        return {
+            "status": "success",
+            "quality_score": 1.0,
+            "seen": sorted(context["previous_results"]),
+        }
+
+
+def test_base_agent_parallel_uses_ready_queue(tmp_path):
+    agent = SleepAgent(db_path=tmp_path / "agents.db", enable_monitoring=False)
+    context = {"plan_id": "p1", "previous_results": {}}
+
+    result = agent._execute_parallel("p1", [dict(step) for step in STEPS], context, max_workers=4)
+
+    assert result["succeeded"] == 4
+    assert result["failed"] == 1
+    assert result["results"]["B"]["status"] == "failed"
+    # Fehlgeschlagene Abhängigkeit gibt Nachfolger frei; E sieht alle erfolgreichen Vorgänger
+    assert result["results"]["E"]["seen"] == ["A", "C", "D"]
+    assert result["schedule"]["critical_path"][0] == "A"
+    assert set(context["previous_results"]) == {"A", "C", "D", "E"}
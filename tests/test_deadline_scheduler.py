@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+VERITAS DEADLINE SCHEDULER TESTS
+================================
+
+Unit-Tests für deadline-basierte Agent-Budgets:
+- Latenz-Perzentile je Agent-Typ
+- Budget aus Perzentilen, gedeckelt durch die Restzeit
+- Reserve für Aggregation vor der Request-Deadline
+- Teilergebnisse statt Gesamt-Timeout
+- Start-Reihenfolge nach priority_score
+- Budget beginnt erst mit der Slot-Vergabe des Agent-Schedulers
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.agents.veritas_agent_scheduler import AgentScheduler, AgentSchedulerConfig
+from backend.agents.veritas_deadline_scheduler import (
+    AgentLatencyTracker,
+    DeadlineConfig,
+    DeadlinePlanner,
+    order_by_priority,
+    run_until_deadline,
+)
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_latency_percentiles():
+    tracker = AgentLatencyTracker(history_size=100)
+    for value in range(1, 11):
+        tracker.observe("legal_framework", float(value))
+
+    assert tracker.sample_count("legal_framework") == 10
+    assert tracker.percentile("legal_framework", 0.5) == pytest.approx(5.5)
+    assert tracker.percentile("legal_framework", 0.9) == pytest.approx(9.1)
+    assert tracker.percentile("unknown", 0.9) is None
+    assert tracker.percentiles("legal_framework")["p95"] == pytest.approx(9.55)
+
+
+def test_budget_from_history_capped_by_deadline():
+    clock = FakeClock()
+    planner = DeadlinePlanner(DeadlineConfig(min_samples=3, priority_boost=0.0), clock=clock)
+    deadline = clock.now + 20.0
+
+    # Ohne Historie: gesamte Restzeit
+    assert planner.budget("legal_framework", deadline) == pytest.approx(20.0)
+
+    for duration in (4.0, 5.0, 6.0):
+        planner.tracker.observe("legal_framework", duration)
+        planner.tracker.observe("geo_context", 0.2)
+
+    # Langsamer Agent: p90 (5.8s) × 1.25, schneller Agent: min_budget
+    assert planner.budget("legal_framework", deadline) == pytest.approx(5.8 * 1.25)
+    assert planner.budget("geo_context", deadline) == pytest.approx(0.5)
+
+    # Kurz vor der Deadline: Restzeit deckelt, darunter min_budget → nicht starten
+    clock.now = deadline - 3.0
+    assert planner.budget("legal_framework", deadline) == pytest.approx(3.0)
+    clock.now = deadline - 0.2
+    assert planner.budget("legal_framework", deadline) == 0.0
+
+
+def test_budget_grows_when_latency_rises_above_budget():
+    clock = FakeClock()
+    planner = DeadlinePlanner(DeadlineConfig(min_samples=5, priority_boost=0.0), clock=clock)
+    deadline = clock.now + 60.0
+    for _ in range(20):
+        planner.tracker.observe("legal_framework", 1.0)
+    assert planner.budget("legal_framework", deadline) == pytest.approx(1.25)
+
+    # Latenz steigt auf 4 s: Läufe über dem Budget enden als Timeout
+    latency, outcomes = 4.0, []
+    for _ in range(30):
+        budget = planner.budget("legal_framework", deadline)
+        if latency > budget:
+            planner.observe_timeout("legal_framework", budget)
+            outcomes.append("timeout")
+        else:
+            planner.tracker.observe("legal_framework", latency)
+            outcomes.append("completed")
+
+    # Zensierte Timeouts heben das Budget über die neue Latenz
+    assert "timeout" in outcomes
+    assert outcomes[-5:] == ["completed"] * 5
+    assert planner.budget("legal_framework", deadline) >= latency
+
+
+def test_priority_increases_budget():
+    clock = FakeClock()
+    planner = DeadlinePlanner(DeadlineConfig(min_samples=1, priority_boost=0.5), clock=clock)
+    planner.tracker.observe("environmental", 2.0)
+    deadline = clock.now + 60.0
+
+    low = planner.budget("environmental", deadline, priority_score=0.0)
+    high = planner.budget("environmental", deadline, priority_score=1.0)
+    assert high == pytest.approx(low * 1.5)
+
+
+def test_agent_deadline_keeps_synthesis_reserve():
+    clock = FakeClock()
+    planner = DeadlinePlanner(DeadlineConfig(synthesis_reserve=0.2, min_synthesis_reserve=2.0), clock=clock)
+
+    request_deadline = planner.request_deadline(60)
+    assert request_deadline == pytest.approx(160.0)
+    assert planner.agent_deadline(request_deadline, 60) == pytest.approx(148.0)
+
+    # Wenig Restzeit: Reserve höchstens die Hälfte davon
+    clock.now = request_deadline - 4.0
+    assert planner.agent_deadline(request_deadline, 60) == pytest.approx(request_deadline - 2.0)
+
+
+def test_order_by_priority():
+    tasks = [
+        SimpleNamespace(agent_type="a", priority_score=0.2, planned_order=0),
+        SimpleNamespace(agent_type="b", priority_score=0.9, planned_order=2),
+        SimpleNamespace(agent_type="c", priority_score=0.9, planned_order=1),
+    ]
+    assert [t.agent_type for t in order_by_priority(tasks)] == ["c", "b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_returns_partial_results_at_deadline():
+    delays = {"fast": 0.01, "medium": 0.05, "hung": 5.0}
+
+    async def run(agent_type):
+        await asyncio.sleep(delays[agent_type])
+        return agent_type.upper()
+
+    deadline = time.monotonic() + 0.3
+    started = time.monotonic()
+    outcomes = await run_until_deadline(
+        ["fast", "medium", "hung"],
+        run,
+        budget_for=lambda task: 10.0,
+        deadline=deadline,
+    )
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0
+    assert [(task, status, result) for task, status, result, _ in outcomes] == [
+        ("fast", "completed", "FAST"),
+        ("medium", "completed", "MEDIUM"),
+        ("hung", "timeout", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_error_cancels_unfinished_tasks():
+    cancelled = []
+
+    async def run(agent_type):
+        if agent_type == "broken":
+            raise ValueError("Agent fehlgeschlagen")
+        try:
+            await asyncio.sleep(5.0)
+        except asyncio.CancelledError:
+            cancelled.append(agent_type)
+            raise
+
+    # Sicherheitsnetz nach 0.5 s, die Budgets der Aufgaben laufen noch
+    readings = itertools.chain([100.0], itertools.repeat(0.0))
+    with pytest.raises(ValueError):
+        await run_until_deadline(
+            ["broken", "stubborn"],
+            run,
+            budget_for=lambda task: 10.0,
+            deadline=100.0,
+            clock=lambda: next(readings),
+        )
+    await asyncio.sleep(0.01)
+
+    assert cancelled == ["stubborn"]
+
+
+@pytest.mark.asyncio
+async def test_sequential_skips_agents_after_deadline():
+    planner = DeadlinePlanner(DeadlineConfig(min_budget=0.05))
+    deadline = time.monotonic() + 0.15
+
+    async def run(agent_type):
+        await asyncio.sleep(0.12)
+        return agent_type
+
+    outcomes = await run_until_deadline(
+        ["legal_framework", "environmental", "traffic"],
+        run,
+        budget_for=lambda task: planner.budget(task, deadline),
+        deadline=deadline,
+        concurrent=False,
+    )
+
+    statuses = [status for _, status, _, _ in outcomes]
+    assert statuses[0] == "completed"
+    assert statuses[-1] == "not_started"
+    assert "completed" not in statuses[1:]
+
+
+@pytest.mark.asyncio
+async def test_budget_starts_when_scheduler_grants_slot():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_concurrent_tasks=1))
+
+    async def agent(agent_type):
+        await asyncio.sleep(0.1)
+        return agent_type
+
+    outcomes = await run_until_deadline(
+        ["legal_framework", "environmental", "traffic"],
+        lambda task, budget: scheduler.run_with_budget("req", task, budget, agent, task),
+        budget_for=lambda task: 0.15,
+        deadline=time.monotonic() + 2.0,
+        budget_on_grant=True,
+    )
+
+    # Je 0.1 s Laufzeit im Budget von 0.15 s - die Wartezeit (bis 0.2 s) zählt nicht
+    assert [(task, status) for task, status, _, _ in outcomes] == [
+        ("legal_framework", "completed"),
+        ("environmental", "completed"),
+        ("traffic", "completed"),
+    ]
+    assert all(elapsed < 0.15 for _, _, _, elapsed in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_capped_by_deadline_only():
+    scheduler = AgentScheduler(AgentSchedulerConfig(max_concurrent_tasks=1))
+    started = []
+
+    async def agent(agent_type, delay):
+        started.append(agent_type)
+        await asyncio.sleep(delay)
+        return agent_type
+
+    delays = {"slow": 5.0, "queued": 0.01}
+    outcomes = await run_until_deadline(
+        ["slow", "queued"],
+        lambda task, budget: scheduler.run_with_budget("req", task, budget, agent, task, delays[task]),
+        budget_for=lambda task: 0.1,
+        deadline=time.monotonic() + 0.3,
+        budget_on_grant=True,
+    )
+
+    # "slow" überschreitet sein Budget; "queued" erhält den Slot noch vor der Deadline
+    assert [(task, status) for task, status, _, _ in outcomes] == [
+        ("slow", "timeout"),
+        ("queued", "completed"),
+    ]
+
+    blocker = asyncio.create_task(scheduler.run("req", "blocker", asyncio.sleep, 0.5))
+    await asyncio.sleep(0)
+    outcomes = await run_until_deadline(
+        ["late"],
+        lambda task, budget: scheduler.run_with_budget("req", task, budget, agent, task, 0.01),
+        budget_for=lambda task: 0.1,
+        deadline=time.monotonic() + 0.2,
+        budget_on_grant=True,
+    )
+    await blocker
+
+    # Slot erst nach der Deadline frei: nicht gestartet statt Timeout
+    assert [status for _, status, _, _ in outcomes] == ["not_started"]
+    assert "late" not in started
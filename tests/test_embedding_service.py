@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+VERITAS EMBEDDING SERVICE TESTS
+===============================
+
+Unit-Tests für den gebatchten Embedding-Client:
+- Batching über /api/embed und begrenzte Parallelität
+- Persistenter Content-Hash-Cache (SQLite, float32)
+- Fallback auf /api/embeddings und Platzhalter-Vektoren (Dimension des Modells)
+- Fehlgeschlagener Batch: nur die fehlerhaften Texte erhalten Platzhalter
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+import native_ollama_integration
+from backend.agents.veritas_embedding_service import (
+    AsyncEmbeddingService,
+    EmbeddingCache,
+    EmbeddingServiceConfig,
+    content_hash,
+)
+
+
+def vector_for(text: str, dim: int = 4):
+    return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0, float(dim)]
+
+
+class MockOllama:
+    """Simuliert /api/embed (optional ohne Batch-Endpoint)."""
+
+    def __init__(self, batch_endpoint: bool = True, delay: float = 0.0, fail: bool = False,
+                 fail_texts=()):
+        self.batch_endpoint = batch_endpoint
+        self.delay = delay
+        self.fail = fail
+        self.fail_texts = set(fail_texts)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.calls.append((request.url.path, payload))
+        if self.fail or self.fail_texts.intersection(payload.get("input") or [payload.get("prompt")]):
+            return httpx.Response(503, json={"error": "busy"})
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if request.url.path == "/api/embed":
+            if not self.batch_endpoint:
+                return httpx.Response(404, text="404 page not found")
+            return httpx.Response(200, json={"embeddings": [vector_for(t) for t in payload["input"]]})
+        return httpx.Response(200, json={"embedding": vector_for(payload["prompt"])})
+
+    def service(self, **config) -> AsyncEmbeddingService:
+        config.setdefault("cache_path", None)
+        config.setdefault("max_retries", 1)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return AsyncEmbeddingService(EmbeddingServiceConfig(**config), client=client)
+
+
+@pytest.mark.asyncio
+async def test_batches_and_returns_float32_matrix():
+    ollama = MockOllama(delay=0.02)
+    service = ollama.service(batch_size=10, max_concurrency=2)
+    texts = [f"Chunk {i}" for i in range(45)]
+
+    matrix = await service.embed_documents(texts)
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (45, 4)
+    np.testing.assert_allclose(matrix[7], vector_for("Chunk 7"))
+    assert len(ollama.calls) == 5
+    assert all(path == "/api/embed" for path, _ in ollama.calls)
+    assert ollama.max_in_flight == 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_embedded_once():
+    ollama = MockOllama()
+    service = ollama.service()
+
+    matrix = await service.embed_documents(["a", "b", "a", "a"])
+
+    assert ollama.calls[0][1]["input"] == ["a", "b"]
+    np.testing.assert_array_equal(matrix[0], matrix[2])
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_persistent_cache_skips_unchanged_chunks(tmp_path):
+    cache_path = str(tmp_path / "embeddings.sqlite")
+    texts = ["Bauantrag", "Lärmschutz", "Frist"]
+
+    ollama = MockOllama()
+    service = ollama.service(cache_path=cache_path)
+    first = await service.embed_documents(texts)
+    await service.close()
+
+    # Neuer Prozess: nur der geänderte Chunk wird angefragt
+    ollama = MockOllama()
+    service = ollama.service(cache_path=cache_path)
+    second = await service.embed_documents(texts[:2] + ["Frist (geändert)"])
+
+    assert len(ollama.calls) == 1
+    assert ollama.calls[0][1]["input"] == ["Frist (geändert)"]
+    np.testing.assert_array_equal(first[:2], second[:2])
+    assert service.get_stats()["cache_hits"] == 2
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_legacy_endpoint_fallback():
+    ollama = MockOllama(batch_endpoint=False)
+    service = ollama.service(batch_size=8)
+
+    matrix = await service.embed_documents(["x", "yy", "zzz"])
+
+    assert [path for path, _ in ollama.calls] == ["/api/embed"] + ["/api/embeddings"] * 3
+    np.testing.assert_allclose(matrix[1], vector_for("yy"))
+    assert service.get_stats()["batch_endpoint"] is False
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_use_uncached_placeholders():
+    ollama = MockOllama(fail=True)
+    service = ollama.service(dimension=16)
+
+    matrix = await service.embed_documents(["offline"])
+
+    assert matrix.shape == (1, 16)
+    assert service.get_stats()["fallback_vectors"] == 1
+    assert len(service.cache) == 0
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_placeholder_uses_dimension_of_returned_vectors():
+    ollama = MockOllama(fail_texts={"kaputt"})
+    service = ollama.service(dimension=768, batch_size=1)  # Modell liefert 4 Dimensionen
+
+    matrix = await service.embed_documents(["Bauantrag", "kaputt", "Frist"])
+
+    assert matrix.shape == (3, 4)
+    np.testing.assert_allclose(matrix[2], vector_for("Frist"))
+    assert service.get_stats()["fallback_vectors"] == 1
+
+    # Auch wenn in einem späteren Aufruf alles fehlschlägt
+    assert (await service.embed_documents(["kaputt"])).shape == (1, 4)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_vectors_of_healthy_texts():
+    ollama = MockOllama(fail_texts={"kaputt"})
+    service = ollama.service(batch_size=8)
+
+    matrix = await service.embed_documents(["Bauantrag", "kaputt", "Frist"])
+
+    np.testing.assert_allclose(matrix[0], vector_for("Bauantrag"))
+    np.testing.assert_allclose(matrix[2], vector_for("Frist"))
+    assert service.get_stats()["fallback_vectors"] == 1
+    assert len(service.cache) == 2
+    await service.close()
+
+
+def test_direct_embeddings_fall_back_only_for_failed_texts(monkeypatch):
+    class FakeResponse:
+        def __init__(self, status, payload):
+            self.status_code = status
+            self.text = json.dumps(payload)
+            self._payload = payload
+
+        def raise_for_status(self):
+            if self.status_code >= 400:
+                raise RuntimeError(self.status_code)
+
+        def json(self):
+            return self._payload
+
+    def fake_post(url, json=None, timeout=None):
+        texts = json.get("input") or [json.get("prompt")]
+        if "kaputt" in texts:
+            return FakeResponse(500, {"error": "context length exceeded"})
+        if url.endswith("/api/embed"):
+            return FakeResponse(200, {"embeddings": [vector_for(t) for t in texts]})
+        return FakeResponse(200, {"embedding": vector_for(texts[0])})
+
+    monkeypatch.setattr(native_ollama_integration, "_http_session", lambda: SimpleNamespace(post=fake_post))
+    embeddings = native_ollama_integration.DirectOllamaEmbeddings(dimension=4)
+
+    vectors = embeddings.embed_documents(["Bauantrag", "kaputt", "Frist"])
+
+    assert vectors[0] == vector_for("Bauantrag")
+    assert vectors[2] == vector_for("Frist")
+    assert vectors[1] == native_ollama_integration._fallback_embedding("kaputt", 4)
+
+
+def test_cache_roundtrip_is_float32(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    digest = content_hash("text")
+    cache.put_many("m", {digest: np.array([0.1, 0.2, 0.3])})
+
+    found = cache.get_many("m", [digest, content_hash("other")])
+
+    assert list(found) == [digest]
+    assert found[digest].dtype == np.float32
+    assert cache.get_many("other-model", [digest]) == {}
+    cache.close()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+VERITAS MESSAGE BROKER SHARDING TESTS
+=====================================
+
+Unit-Tests für Shard-Queues und Backpressure im AgentMessageBroker:
+- Langsamer Handler blockiert nur den eigenen Shard
+- Credit-basiertes Backpressure statt stillem Verwerfen
+- Retry bei vollem Shard ohne Backpressure-Timeout
+- Abgebrochene Sender geben belegte Credits zurück
+- Gebündelter Fan-Out für publish_event
+- Mehrere Consumer je Agent
+- Request/Response und Legacy-Modus (eine globale Queue)
+- Request aus einem Handler heraus (Response nicht im eigenen Shard blockiert)
+- Statistiken je Shard (Tiefe, Latenz-Perzentile, Throughput)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.agents.agent_message_broker import AgentMessageBroker
+from backend.agents.agent_message_broker_enhanced import AgentShard, BrokerConfiguration
+from shared.protocols.agent_message import (
+    AgentIdentity,
+    AgentMessage,
+    MessageMetadata,
+    MessagePriority,
+    MessageType,
+    create_request_message,
+)
+
+
+def identity(agent_id):
+    return AgentIdentity(agent_id=agent_id, agent_type="test", agent_name=agent_id)
+
+
+def direct(sender, recipient, payload=None):
+    return AgentMessage(
+        sender=sender,
+        recipients=[recipient],
+        message_type=MessageType.EVENT,
+        payload=payload or {},
+    )
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Bedingung nicht erfüllt")
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_does_not_delay_other_agents():
+    broker = AgentMessageBroker()
+    sender, slow, fast = identity("sender"), identity("slow"), identity("fast")
+    received = {"slow": 0, "fast": 0}
+
+    async def slow_handler(message):
+        await asyncio.sleep(0.2)
+        received["slow"] += 1
+
+    async def fast_handler(message):
+        received["fast"] += 1
+
+    broker.register_agent(sender, lambda m: None)
+    broker.register_agent(slow, slow_handler)
+    broker.register_agent(fast, fast_handler)
+    await broker.start()
+    try:
+        for _ in range(5):
+            assert await broker.send_message(direct(sender, slow))
+        started = time.monotonic()
+        for _ in range(5):
+            assert await broker.send_message(direct(sender, fast))
+
+        await wait_until(lambda: received["fast"] == 5)
+        assert time.monotonic() - started < 0.15
+        assert received["slow"] <= 1
+
+        stats = broker.get_stats()
+        assert stats["shards"]["slow"]["depth"] + stats["shards"]["slow"]["in_flight"] >= 3
+        assert stats["shards"]["fast"]["delivered"] == 5
+        assert stats["shards"]["fast"]["latency_ms"]["p50"] is not None
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_waits_for_credits_then_rejects():
+    config = BrokerConfiguration(shard_capacity=2, backpressure_timeout_ms=50)
+    broker = AgentMessageBroker(config=config)
+    sender, blocked = identity("sender"), identity("blocked")
+    gate = asyncio.Event()
+
+    async def blocked_handler(message):
+        await gate.wait()
+
+    broker.register_agent(sender, lambda m: None)
+    broker.register_agent(blocked, blocked_handler)
+    await broker.start()
+    try:
+        assert await broker.send_message(direct(sender, blocked))
+        assert await broker.send_message(direct(sender, blocked))
+
+        # Alle Credits belegt → Timeout → Dead-Letter statt stillem Verwerfen
+        assert not await broker.send_message(direct(sender, blocked))
+        assert broker.get_dead_letters()[-1][1] == "backpressure:blocked"
+        assert broker.get_stats()["backpressure_rejections"] == 1
+
+        # Wartender Sender bekommt den Credit, sobald eine Zustellung endet
+        config.backpressure_timeout_ms = 2000
+        pending = asyncio.create_task(broker.send_message(direct(sender, blocked)))
+        await asyncio.sleep(0.02)
+        assert not pending.done()
+        gate.set()
+        assert await pending
+
+        await wait_until(lambda: broker.get_stats()["shards"]["blocked"]["delivered"] == 3)
+        assert broker.get_stats()["shards"]["blocked"]["available_credits"] == 2
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reserve_does_not_leak_credit():
+    shard = AgentShard("agent", broker=None, capacity=1)
+    assert shard.try_reserve()
+
+    blocked = asyncio.create_task(shard.reserve(5.0))
+    await asyncio.sleep(0)
+    blocked.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await blocked
+
+    shard.release()
+    assert shard.available_credits == 1
+    assert shard.try_reserve()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_fanout_releases_granted_credits():
+    config = BrokerConfiguration(shard_capacity=1, backpressure_timeout_ms=2000)
+    broker = AgentMessageBroker(config=config)
+    sender, first, second = identity("sender"), identity("first"), identity("second")
+    gates = {"first": asyncio.Event(), "second": asyncio.Event()}
+
+    def gated(agent_id):
+        async def handler(message):
+            await gates[agent_id].wait()
+        return handler
+
+    broker.register_agent(sender, lambda m: None)
+    broker.register_agent(first, gated("first"))
+    broker.register_agent(second, gated("second"))
+    await broker.start()
+    try:
+        assert await broker.send_message(direct(sender, first))
+        assert await broker.send_message(direct(sender, second))
+
+        fanout = AgentMessage(sender=sender, recipients=[first, second],
+                              message_type=MessageType.EVENT, payload={})
+        pending = asyncio.create_task(broker.send_message(fanout))
+        await asyncio.sleep(0.02)
+        gates["first"].set()  # Credit von "first" geht an den wartenden Fan-Out
+        await asyncio.sleep(0.02)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        gates["second"].set()
+
+        await wait_until(lambda: all(
+            shard["available_credits"] == 1 for shard in broker.get_stats()["shards"].values()
+        ))
+        assert broker.get_stats()["shards"]["first"]["delivered"] == 1
+    finally:
+        await broker.stop()
+
+
+def test_get_stats_has_no_side_effects():
+    broker = AgentMessageBroker()
+    for _ in range(5):
+        broker._count_delivery()
+
+    first = broker.get_stats()["throughput_recent_msgs_per_sec"]
+    assert first > 0
+    assert broker.get_stats()["throughput_recent_msgs_per_sec"] == first
+
+
+@pytest.mark.asyncio
+async def test_retry_on_full_shard_is_not_dead_lettered():
+    config = BrokerConfiguration(shard_capacity=1, backpressure_timeout_ms=50)
+    broker = AgentMessageBroker(config=config)
+    sender, flaky = identity("sender"), identity("flaky")
+    attempts = []
+
+    async def flaky_handler(message):
+        attempts.append(message.metadata.retry_count)
+        if len(attempts) == 1:
+            raise RuntimeError("vorübergehender Fehler")
+
+    broker.register_agent(sender, lambda m: None)
+    broker.register_agent(flaky, flaky_handler)
+    await broker.start()
+    try:
+        message = direct(sender, flaky)
+        message.metadata = MessageMetadata(priority=MessagePriority.HIGH)
+        assert await broker.send_message(message)
+
+        # Einziger Credit ist während des Retrys belegt → trotzdem zugestellt
+        await wait_until(lambda: len(attempts) == 2)
+        await wait_until(lambda: broker.get_stats()["shards"]["flaky"]["available_credits"] == 1)
+        assert attempts == [0, 1]
+        assert broker.get_dead_letters() == []
+        assert broker.get_stats()["messages_retried"] == 1
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_event_fans_out_once_per_subscriber():
+    broker = AgentMessageBroker()
+    publisher = identity("publisher")
+    subscribers = [identity(f"sub-{i}") for i in range(3)]
+    received = []
+
+    broker.register_agent(publisher, lambda m: None)
+    for sub in subscribers:
+        broker.register_agent(sub, lambda m, agent_id=sub.agent_id: received.append((agent_id, m.payload["topic"])))
+        broker.subscribe(sub.agent_id, "rag_context_updates")
+    await broker.start()
+    try:
+        await broker.publish_event("rag_context_updates", publisher, {"context_id": "ctx-1"})
+        await wait_until(lambda: len(received) == 3)
+
+        assert sorted(received) == [(f"sub-{i}", "rag_context_updates") for i in range(3)]
+        stats = broker.get_stats()
+        assert stats["fanout_batches"] == 1
+        assert stats["messages_sent"] == 1
+        assert stats["shards"]["publisher"]["delivered"] == 0
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_multiple_consumers_per_agent():
+    broker = AgentMessageBroker(config=BrokerConfiguration(consumers_per_agent=1))
+    sender, worker = identity("sender"), identity("worker")
+    state = {"running": 0, "peak": 0, "done": 0}
+
+    async def handler(message):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.02)
+        state["running"] -= 1
+        state["done"] += 1
+
+    broker.register_agent(sender, lambda m: None)
+    broker.register_agent(worker, handler, consumers=3)
+    await broker.start()
+    try:
+        for _ in range(9):
+            await broker.send_message(direct(sender, worker))
+        await wait_until(lambda: state["done"] == 9)
+        assert state["peak"] == 3
+        assert broker.get_stats()["shards"]["worker"]["consumers"] == 3
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sharding", [True, False])
+async def test_request_response(sharding):
+    config = BrokerConfiguration(enable_sharding=sharding, batch_timeout_ms=10)
+    broker = AgentMessageBroker(config=config)
+    client, server = identity("client"), identity("server")
+
+    broker.register_agent(client, lambda m: None)
+    broker.register_agent(server, lambda m: {"answer": m.payload["question"] * 2})
+    await broker.start()
+    try:
+        request = create_request_message(sender=client, recipient=server, payload={"question": 21})
+        response = await broker.send_request(request, timeout=2.0)
+
+        assert response is not None
+        assert response.payload == {"answer": 42}
+        # Die Response erreicht den Client-Handler ggf. erst nach send_request
+        await wait_until(lambda: broker.get_stats()["messages_delivered"] == 2)
+        stats = broker.get_stats()
+        assert stats["throughput_msgs_per_sec"] > 0
+        assert bool(stats["shards"]) is sharding
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sharding", [True, False])
+async def test_nested_request_inside_handler(sharding):
+    config = BrokerConfiguration(enable_sharding=sharding, batch_timeout_ms=10)
+    broker = AgentMessageBroker(config=config)
+    client, coordinator, server = identity("client"), identity("coordinator"), identity("server")
+
+    async def coordinate(message):
+        # Wartet im eigenen Shard-Consumer auf die Response von "server"
+        request = create_request_message(sender=coordinator, recipient=server, payload=message.payload)
+        response = await broker.send_request(request, timeout=2.0)
+        return {"answer": response.payload["answer"] if response else None}
+
+    broker.register_agent(client, lambda m: None)
+    broker.register_agent(coordinator, coordinate)
+    broker.register_agent(server, lambda m: {"answer": m.payload["question"] * 2})
+    await broker.start()
+    try:
+        started = time.monotonic()
+        request = create_request_message(sender=client, recipient=coordinator, payload={"question": 21})
+        response = await broker.send_request(request, timeout=3.0)
+
+        assert response is not None
+        assert response.payload == {"answer": 42}
+        assert time.monotonic() - started < 1.0
+        assert broker.get_stats()["requests_timeout"] == 0
+    finally:
+        await broker.stop()
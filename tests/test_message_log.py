@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+VERITAS MESSAGE LOG TESTS
+=========================
+
+Unit-Tests für das persistente Message-Log des AgentMessageBrokers:
+- enqueued/delivered/dead_letter-Records überleben einen Neustart
+- Unvollständige letzte Zeile wird repariert
+- Segment-Rotation und Löschen abgeschlossener Segmente
+- Replay unbestätigter Requests nach Broker-Neustart
+- Dead-Letter-Reprocessing aus dem Log, Verwerfen ohne Blockieren des Event-Loops
+- Broker löscht abgeschlossene Segmente nach einer Rotation
+- Aufgezeichneter Verkehr für Offline-Benchmarks
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.agents.agent_message_broker import AgentMessageBroker
+from backend.agents.agent_message_broker_enhanced import BrokerConfiguration
+from backend.agents.agent_message_log import MessageLog, MessageLogConfig
+from shared.protocols.agent_message import (
+    AgentIdentity,
+    AgentMessage,
+    MessageType,
+    create_request_message,
+)
+
+CLIENT = AgentIdentity(agent_id="client", agent_type="test", agent_name="client")
+SERVER = AgentIdentity(agent_id="server", agent_type="test", agent_name="server")
+OTHER = AgentIdentity(agent_id="other", agent_type="test", agent_name="other")
+
+
+def event(recipients, payload=None):
+    return AgentMessage(
+        sender=CLIENT,
+        recipients=list(recipients),
+        message_type=MessageType.EVENT,
+        payload=payload or {},
+    )
+
+
+async def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Bedingung nicht erfüllt")
+        await asyncio.sleep(0.005)
+
+
+def test_state_survives_reopen(tmp_path):
+    log = MessageLog(MessageLogConfig(directory=str(tmp_path)))
+    request = create_request_message(sender=CLIENT, recipient=SERVER, payload={"q": 1})
+    broadcast = event([SERVER, OTHER])
+    log.append_enqueued(request, ["server"])
+    log.append_enqueued(broadcast, ["server", "other"])
+    log.append_delivered(broadcast.message_id, "server")
+    log.append_dead_letter(broadcast, "handler kaputt", "other")
+    log.close()
+
+    reopened = MessageLog(MessageLogConfig(directory=str(tmp_path)))
+    try:
+        pending = reopened.unacknowledged()
+        assert [(agent_id, m.message_id) for agent_id, m in pending] == [("server", request.message_id)]
+        assert pending[0][1].payload == {"q": 1}
+        assert reopened.unacknowledged(message_types=None) == pending  # Event ist bestätigt/dead
+
+        dead = reopened.dead_letters()
+        assert [(m.message_id, reason, agent_id) for m, reason, agent_id in dead] == [
+            (broadcast.message_id, "handler kaputt", "other")
+        ]
+        assert reopened.get_stats()["next_seq"] == 4
+    finally:
+        reopened.close()
+
+
+def test_torn_tail_is_repaired(tmp_path):
+    log = MessageLog(MessageLogConfig(directory=str(tmp_path)))
+    message = event([SERVER])
+    log.append_enqueued(message, ["server"])
+    log.close()
+
+    segment = sorted(tmp_path.glob("segment-*.log"))[-1]
+    with open(segment, "ab") as handle:
+        handle.write(b'{"kind":"delivered","id":"')  # Absturz mitten im write
+
+    reopened = MessageLog(MessageLogConfig(directory=str(tmp_path)))
+    try:
+        reopened.append_delivered(message.message_id, "server")
+        assert reopened.unacknowledged(message_types=None) == []
+        assert [r["seq"] for r in reopened.records()] == [0, 1]
+    finally:
+        reopened.close()
+
+
+def test_rotation_and_prune(tmp_path):
+    log = MessageLog(MessageLogConfig(directory=str(tmp_path), segment_max_bytes=2000))
+    try:
+        open_message = event([SERVER], {"offen": True})
+        log.append_enqueued(open_message, ["server"])
+        for index in range(40):
+            message = event([SERVER], {"i": index})
+            log.append_enqueued(message, ["server"])
+            log.append_delivered(message.message_id, "server")
+        log.sync()
+        assert log.get_stats()["segments"] > 3
+
+        # Ältestes Segment enthält die offene Message → bleibt erhalten
+        assert log.prune() == 0
+        log.append_delivered(open_message.message_id, "server")
+        assert log.prune() > 0
+        assert log.unacknowledged(message_types=None) == []
+        assert len(list(log.captured_traffic())) < 41
+    finally:
+        log.close()
+
+
+def test_prune_keeps_segments_written_during_scan(tmp_path):
+    log = MessageLog(MessageLogConfig(directory=str(tmp_path), segment_max_bytes=2000))
+    try:
+        for index in range(20):
+            message = event([SERVER], {"i": index})
+            log.append_enqueued(message, ["server"])
+            log.append_delivered(message.message_id, "server")
+        log.sync()
+
+        # Während des Scans: neue offene Records, Segment rotiert
+        late = [event([SERVER], {"spaet": index}) for index in range(20)]
+        real_scan = log._scan
+
+        def scan_with_concurrent_writes():
+            result = real_scan()
+            for message in late:
+                log.append_enqueued(message, ["server"])
+            log.sync()
+            return result
+
+        log._scan = scan_with_concurrent_writes
+        assert log.prune() > 0
+
+        pending = {message.message_id for _, message in log.unacknowledged(message_types=None)}
+        assert pending == {message.message_id for message in late}
+    finally:
+        log.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sharding", [True, False])
+async def test_replay_unacknowledged_request_after_restart(tmp_path, sharding):
+    config = BrokerConfiguration(enable_sharding=sharding, batch_timeout_ms=10, message_log_dir=str(tmp_path))
+
+    # Erster Broker: Server hängt, Broker wird gestoppt
+    gate = asyncio.Event()
+    first = AgentMessageBroker(config=config)
+    first.register_agent(CLIENT, lambda m: None)
+
+    async def hanging(message):
+        await gate.wait()
+
+    first.register_agent(SERVER, hanging)
+    await first.start()
+    request = create_request_message(sender=CLIENT, recipient=SERVER, payload={"q": 21})
+    assert await first.send_message(request)
+    await asyncio.sleep(0.05)
+    await first.stop()
+
+    # Neustart: Request wird erneut zugestellt und beantwortet
+    answers = []
+    second = AgentMessageBroker(config=config)
+    second.register_agent(CLIENT, lambda m: answers.append(m.payload) if m.is_response() else None)
+    second.register_agent(SERVER, lambda m: {"a": m.payload["q"] * 2})
+    await second.start()
+    try:
+        assert await second.replay_unacknowledged() == 1
+        await wait_until(lambda: answers == [{"a": 42}])
+        await asyncio.sleep(0.02)
+        assert second._message_log.unacknowledged(message_types=None) == []
+    finally:
+        await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_reprocess_dead_letters_from_log(tmp_path):
+    config = BrokerConfiguration(message_log_dir=str(tmp_path))
+    state = {"fail": True, "received": 0}
+
+    def flaky(message):
+        if state["fail"]:
+            raise RuntimeError("Downstream nicht erreichbar")
+        state["received"] += 1
+
+    first = AgentMessageBroker(config=config)
+    first.register_agent(CLIENT, lambda m: None)
+    first.register_agent(SERVER, flaky)
+    await first.start()
+    for index in range(3):
+        await first.send_message(event([SERVER], {"i": index}))
+    await wait_until(lambda: len(first.get_dead_letters()) == 3)
+    await first.stop()
+
+    state["fail"] = False
+    second = AgentMessageBroker(config=config)
+    second.register_agent(CLIENT, lambda m: None)
+    second.register_agent(SERVER, flaky)
+    await second.start()
+    try:
+        # Nur In-Memory-Queue des neuen Brokers ist leer - das Log kennt die Dead-Letters
+        assert second.get_dead_letters() == []
+        assert await second.reprocess_dead_letters() == 3
+        await wait_until(lambda: state["received"] == 3)
+        assert second._message_log.dead_letters() == []
+    finally:
+        await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_clear_dead_letters_discards_in_log(tmp_path):
+    broker = AgentMessageBroker(config=BrokerConfiguration(message_log_dir=str(tmp_path)))
+    broker.register_agent(CLIENT, lambda m: None)
+    broker.register_agent(SERVER, lambda m: (_ for _ in ()).throw(RuntimeError("kaputt")))
+    await broker.start()
+    try:
+        await broker.send_message(event([SERVER]))
+        await wait_until(lambda: len(broker.get_dead_letters()) == 1)
+
+        broker.clear_dead_letters()  # synchron (öffentliche API)
+
+        assert broker.get_dead_letters() == []
+        assert broker._message_log.dead_letters() == []
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_aclear_dead_letters_discards_earlier_runs(tmp_path):
+    config = BrokerConfiguration(message_log_dir=str(tmp_path))
+
+    def failing(message):
+        raise RuntimeError("kaputt")
+
+    first = AgentMessageBroker(config=config)
+    first.register_agent(CLIENT, lambda m: None)
+    first.register_agent(SERVER, failing)
+    await first.start()
+    for index in range(2):
+        await first.send_message(event([SERVER], {"i": index}))
+    await wait_until(lambda: len(first.get_dead_letters()) == 2)
+    await first.stop()
+
+    second = AgentMessageBroker(config=config)
+    second.register_agent(CLIENT, lambda m: None)
+    second.register_agent(SERVER, failing)
+    await second.start()
+    try:
+        await second.send_message(event([SERVER], {"i": 2}))
+        await wait_until(lambda: len(second.get_dead_letters()) == 1)
+
+        # Synchron: nur Dead-Letters dieses Laufs
+        second.clear_dead_letters()
+        assert len(second._message_log.dead_letters()) == 2
+
+        await second.aclear_dead_letters()
+        assert second._message_log.dead_letters() == []
+    finally:
+        await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_broker_prunes_log_after_rotation(tmp_path):
+    config = BrokerConfiguration(
+        batch_timeout_ms=10,
+        message_log_dir=str(tmp_path),
+        message_log_prune_interval_sec=0.01
+    )
+    log = MessageLog(MessageLogConfig(directory=str(tmp_path), segment_max_bytes=2000))
+    broker = AgentMessageBroker(config=config, message_log=log)
+    broker.register_agent(CLIENT, lambda m: None)
+    broker.register_agent(SERVER, lambda m: None)
+    await broker.start()
+    try:
+        for index in range(40):
+            await broker.send_message(event([SERVER], {"i": index}))
+        await wait_until(lambda: broker.get_stats()["messages_delivered"] >= 40)
+        log.sync()
+        await wait_until(lambda: log.get_stats()["segments"] <= 2)
+    finally:
+        await broker.stop()
+        log.close()
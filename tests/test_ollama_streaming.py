@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+VERITAS OLLAMA STREAMING TESTS
+==============================
+
+Unit-Tests für echtes Token-Streaming im VeritasOllamaClient:
+- Tokens werden vor Ende der Generierung ausgeliefert (TTFT < Gesamtdauer)
+- Abbruch durch den Konsumenten schließt den Upstream-Stream
+- Retry vor dem ersten Token, Fallback wenn Ollama nicht erreichbar
+- DirectOllamaLLM.invoke(stream=True) mit on_token Callback
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import native_ollama_integration
+from backend.agents.veritas_ollama_client import OllamaRequest, VeritasOllamaClient
+
+
+class StreamState:
+    """Beobachtet den simulierten Ollama-Stream."""
+
+    def __init__(self):
+        self.lines_sent = 0
+        self.closed = False
+        self.requests = 0
+
+
+def make_client(state: StreamState, num_tokens: int = 5, token_delay: float = 0.05, fail_first: int = 0):
+    class LineStream(httpx.AsyncByteStream):
+        """NDJSON-Body; ``aclose`` entspricht dem Schließen der Verbindung."""
+
+        async def __aiter__(self):
+            try:
+                for i in range(num_tokens):
+                    await asyncio.sleep(token_delay)
+                    state.lines_sent += 1
+                    yield (json.dumps({"model": "mock", "response": f"t{i}", "done": False}) + "\n").encode()
+                yield (json.dumps({"model": "mock", "response": "", "done": True, "eval_count": num_tokens}) + "\n").encode()
+            finally:
+                state.closed = True
+
+        async def aclose(self):
+            state.closed = True
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state.requests += 1
+        if state.requests <= fail_first:
+            return httpx.Response(503, json={"error": "busy"})
+        return httpx.Response(200, stream=LineStream())
+
+    client = VeritasOllamaClient(max_retries=3)
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Exponential Backoff im Test überspringen."""
+    original_sleep = asyncio.sleep
+
+    async def fast_sleep(delay, *args, **kwargs):
+        await original_sleep(min(delay, 0.01), *args, **kwargs)
+
+    monkeypatch.setattr("backend.agents.veritas_ollama_client.asyncio.sleep", fast_sleep)
+
+
+@pytest.mark.asyncio
+async def test_tokens_arrive_before_generation_finishes():
+    state = StreamState()
+    client = make_client(state, num_tokens=5, token_delay=0.05)
+
+    start = time.perf_counter()
+    stream = await client.generate_response(OllamaRequest(model="mock", prompt="hi"), stream=True)
+
+    first = await stream.__anext__()
+    ttft = time.perf_counter() - start
+    assert first.response == "t0"
+    assert state.lines_sent == 1
+
+    rest = [chunk async for chunk in stream]
+    total = time.perf_counter() - start
+
+    assert [c.response for c in rest[:-1]] == ["t1", "t2", "t3", "t4"]
+    assert rest[-1].done is True
+    assert ttft < total / 2
+
+    stats = client.get_client_statistics()["usage_stats"]
+    assert stats["streams_started"] == 1
+    assert stats["requests_successful"] == 1
+    assert stats["average_time_to_first_token"] > 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_consumer_close_aborts_upstream():
+    state = StreamState()
+    client = make_client(state, num_tokens=50, token_delay=0.01)
+
+    stream = await client.generate_response(OllamaRequest(model="mock", prompt="hi"), stream=True)
+    await stream.__anext__()
+    await stream.__anext__()
+    await stream.aclose()
+
+    assert state.closed is True
+    assert state.lines_sent < 50
+    assert client.stats["streams_cancelled"] == 1
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_task_cancellation_aborts_upstream():
+    state = StreamState()
+    client = make_client(state, num_tokens=50, token_delay=0.02)
+
+    async def consume():
+        stream = await client.generate_response(OllamaRequest(model="mock", prompt="hi"), stream=True)
+        async for _ in stream:
+            pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert state.closed is True
+    assert state.lines_sent < 50
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_retry_before_first_token(no_backoff):
+    state = StreamState()
+    client = make_client(state, num_tokens=2, token_delay=0.0, fail_first=2)
+
+    stream = await client.generate_response(OllamaRequest(model="mock", prompt="hi"), stream=True)
+    chunks = [chunk async for chunk in stream]
+
+    assert state.requests == 3
+    assert "".join(c.response for c in chunks) == "t0t1"
+    assert client.stats["fallback_requests"] == 0
+    await client.close()
+
+
+def test_direct_llm_streaming_invokes_on_token(monkeypatch):
+    lines = [
+        json.dumps({"response": "Hallo", "done": False}).encode(),
+        b"",
+        json.dumps({"response": " Welt", "done": False}).encode(),
+        json.dumps({"response": "", "done": True, "eval_count": 2}).encode(),
+    ]
+
+    class FakeResponse:
+        closed = False
+
+        def raise_for_status(self):
+            pass
+
+        def iter_lines(self):
+            return iter(lines)
+
+        def close(self):
+            FakeResponse.closed = True
+
+    def fake_post(url, json=None, timeout=None, stream=False):
+        assert stream is True and json["stream"] is True
+        return FakeResponse()
+
+    monkeypatch.setattr(native_ollama_integration, "_http_session", lambda: SimpleNamespace(post=fake_post))
+
+    tokens = []
+    llm = native_ollama_integration.DirectOllamaLLM(model="mock")
+    result = llm.invoke("hi", stream=True, on_token=tokens.append)
+
+    assert tokens == ["Hallo", " Welt"]
+    assert result.content == "Hallo Welt"
+    assert result.raw_response["eval_count"] == 2
+    assert result.metadata["time_to_first_token"] is not None
+    assert FakeResponse.closed is True
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+VERITAS OLLAMA TRANSPORT TESTS
+==============================
+
+Unit-Tests für den prozessweiten Ollama-Transport:
+- Semaphoren je Modell und globale In-Flight-Grenze
+- Request-Metriken je Modell und Endpoint
+- Ein Pool je Event-Loop, Pools beendeter Loops werden verworfen
+- Routing von QueryExpander und RerankerService
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import gc
+import json
+import weakref
+
+import httpx
+import pytest
+
+from backend.agents.veritas_ollama_transport import (
+    OllamaTransport,
+    OllamaTransportConfig,
+    get_ollama_transport,
+)
+from backend.agents.veritas_query_expansion import QueryExpander, QueryExpansionConfig
+from backend.services.reranker_service import RerankerService
+
+
+class MockOllama:
+    """Zählt gleichzeitige Requests je Modell."""
+
+    def __init__(self, delay: float = 0.02, response: str = "Bauantrag einreichen"):
+        self.delay = delay
+        self.response = response
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self.requests = 0
+        self.total_in_flight = 0
+        self.max_total_in_flight = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        self.requests += 1
+        self.in_flight[model] = self.in_flight.get(model, 0) + 1
+        self.max_in_flight[model] = max(self.max_in_flight.get(model, 0), self.in_flight[model])
+        self.total_in_flight += 1
+        self.max_total_in_flight = max(self.max_total_in_flight, self.total_in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[model] -= 1
+            self.total_in_flight -= 1
+        return httpx.Response(200, json={"model": model, "response": self.response, "done": True})
+
+
+def make_transport(ollama: MockOllama, **config) -> OllamaTransport:
+    transport = OllamaTransport(OllamaTransportConfig(base_url="http://ollama.test", **config))
+    transport._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(ollama.handler))
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_per_model_concurrency_limits():
+    ollama = MockOllama()
+    transport = make_transport(ollama, per_model_concurrency=2, model_concurrency={"small": 4})
+
+    await asyncio.gather(
+        *(transport.post_json("/api/generate", {"model": "big"}) for _ in range(6)),
+        *(transport.post_json("/api/generate", {"model": "small"}) for _ in range(8)),
+    )
+
+    assert ollama.max_in_flight["big"] == 2
+    assert ollama.max_in_flight["small"] == 4
+    await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_global_in_flight_limit():
+    ollama = MockOllama()
+    transport = make_transport(ollama, max_in_flight=3, per_model_concurrency=10)
+
+    await asyncio.gather(*(
+        transport.post_json("/api/generate", {"model": f"m{i % 4}"}) for i in range(12)
+    ))
+
+    assert ollama.max_total_in_flight == 3
+    assert transport.get_stats()["in_flight"] == 0
+    await transport.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_per_model_and_endpoint():
+    ollama = MockOllama(delay=0.0)
+    transport = make_transport(ollama)
+
+    await transport.post_json("/api/generate", {"model": "a"})
+    await transport.post_json("/api/generate", {"model": "a"})
+    with pytest.raises(RuntimeError):
+        async with transport.slot("b", "/api/embed"):
+            raise RuntimeError("boom")
+
+    stats = transport.get_stats()
+    assert stats["requests"] == 3
+    assert stats["errors"] == 1
+    assert stats["models"]["a"]["requests"] == 2
+    assert stats["endpoints"]["/api/embed"]["errors"] == 1
+    assert stats["clients_created"] == 1
+    await transport.close()
+
+
+def test_pool_is_rebuilt_for_new_event_loop():
+    ollama = MockOllama(delay=0.0)
+    transport = make_transport(ollama)
+
+    async def call():
+        await transport.post_json("/api/generate", {"model": "a"})
+        return transport.client
+
+    first = asyncio.run(call())
+    first_ref = weakref.ref(first)
+    second = asyncio.run(call())
+
+    assert first is not second
+    assert transport.get_stats()["clients_created"] == 2
+
+    # Pool des beendeten Loops wird nicht weiter gehalten
+    del first
+    gc.collect()
+    assert first_ref() is None
+
+
+def test_alternating_event_loops_keep_their_pools():
+    ollama = MockOllama(delay=0.0)
+    transport = make_transport(ollama)
+    loops = [asyncio.new_event_loop(), asyncio.new_event_loop()]
+
+    async def call():
+        await transport.post_json("/api/generate", {"model": "a"})
+        return transport.client
+
+    try:
+        clients = [loop.run_until_complete(call()) for loop in loops + loops]
+
+        assert clients[0] is clients[2] and clients[1] is clients[3]
+        assert clients[0] is not clients[1]
+        assert transport.get_stats()["clients_created"] == 2
+
+        for loop in loops:
+            loop.run_until_complete(transport.close())
+        assert all(client.is_closed for client in clients)
+    finally:
+        for loop in loops:
+            loop.close()
+
+
+def test_get_ollama_transport_is_shared_per_url():
+    assert get_ollama_transport("http://shared.test") is get_ollama_transport("http://shared.test/")
+    assert get_ollama_transport("http://shared.test") is not get_ollama_transport("http://other.test")
+
+
+@pytest.mark.asyncio
+async def test_query_expander_reuses_shared_transport():
+    ollama = MockOllama(delay=0.0)
+    expander = QueryExpander(QueryExpansionConfig(ollama_base_url="http://expander.test"))
+    expander._transport = make_transport(ollama)
+
+    variant = await expander._call_ollama("Prompt")
+    await expander._call_ollama("Prompt 2")
+
+    assert variant == "Bauantrag einreichen"
+    assert expander._transport.get_stats()["clients_created"] == 1
+    assert expander._transport.get_stats()["models"][expander.config.model]["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reranker_arerank_scores_batches_concurrently():
+    ollama = MockOllama(delay=0.02, response="[0.9, 0.1]")
+    reranker = RerankerService(model_name="scorer")
+    reranker.llm = object()  # LLM verfügbar (Client-Modul fehlt in der Testumgebung)
+    reranker.transport = make_transport(ollama, per_model_concurrency=4)
+    documents = [
+        {"document_id": f"d{i}", "content": f"Dokument {i}", "relevance_score": 0.5}
+        for i in range(8)
+    ]
+
+    results = await reranker.arerank("Bauantrag", documents, batch_size=2)
+
+    assert len(results) == 8
+    assert ollama.requests == 4
+    assert ollama.max_in_flight["scorer"] == 4
+    assert results[0].reranked_score == 0.9
+    assert reranker.stats["llm_successes"] == 4
+
+
+@pytest.mark.asyncio
+async def test_reranker_arerank_without_llm_uses_fallback():
+    ollama = MockOllama(delay=0.0, response="[0.9, 0.1]")
+    reranker = RerankerService(model_name="scorer")
+    reranker.llm = None
+    reranker.transport = make_transport(ollama)
+    documents = [{"document_id": "d0", "content": "Dokument", "relevance_score": 0.5}]
+
+    results = await reranker.arerank("Bauantrag", documents)
+
+    assert ollama.requests == 0
+    assert results[0].reranked_score == 0.5
+    assert reranker.stats["llm_successes"] == 0
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+VERITAS PIPELINED HYBRID RETRIEVAL TESTS
+========================================
+
+Unit-Tests für spekulatives Pipelining von Retrieval und Re-Ranking:
+- IncrementalRRF liefert dasselbe Ranking wie ReciprocalRankFusion.fuse
+- Cross-Encoder startet nach dem ersten Retriever
+- Bereits bewertete Dokumente werden nicht erneut gescored
+- Stufen-Timings in HybridResult.metadata
+- Factory und Phase-5-Initialisierung reichen Reranker und Flag durch
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.agents import veritas_reranking_service
+from backend.agents.veritas_hybrid_retrieval import (
+    HybridRetrievalConfig,
+    HybridRetriever,
+    create_hybrid_retriever,
+)
+from backend.agents.veritas_reciprocal_rank_fusion import ReciprocalRankFusion, RRFConfig
+from backend.agents.veritas_sparse_retrieval import SparseRetriever, SparseRetrievalConfig
+
+CORPUS = [
+    {"id": f"d{i}", "content": f"Bauantrag Frist Unterlagen Dokument {i}" + " Bauantrag" * (i % 3)}
+    for i in range(8)
+]
+
+
+class SlowDenseRetriever:
+    """Dense-Retriever mit künstlicher Latenz."""
+
+    def __init__(self, delay: float, doc_ids):
+        self.delay = delay
+        self.doc_ids = doc_ids
+        self.finished_at = None
+
+    async def semantic_search(self, query, top_k, **kwargs):
+        await asyncio.sleep(self.delay)
+        self.finished_at = time.perf_counter()
+        return [
+            {"id": doc_id, "content": f"Inhalt {doc_id}", "score": 1.0 - i * 0.1}
+            for i, doc_id in enumerate(self.doc_ids)
+        ]
+
+
+class RecordingReranker:
+    """Cross-Encoder-Ersatz: Score aus der Dokument-ID, protokolliert Aufrufe."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    async def score_documents(self, query, documents):
+        self.calls.append((time.perf_counter(), [doc["id"] for doc in documents]))
+        await asyncio.sleep(self.delay)
+        return [int(doc["id"][1:]) / 10 for doc in documents]
+
+
+def make_retriever(dense, reranker, **config) -> HybridRetriever:
+    sparse = SparseRetriever(SparseRetrievalConfig(index_path=None))
+    sparse.index_documents(CORPUS)
+    retriever = HybridRetriever(
+        dense_retriever=dense,
+        sparse_retriever=sparse,
+        config=HybridRetrievalConfig(
+            enable_query_expansion=False, enable_pipelined_rerank=True, **config
+        ),
+        reranker=reranker,
+    )
+    retriever.rrf = ReciprocalRankFusion(RRFConfig(weights={"dense": 0.6, "sparse": 0.4}))
+    return retriever
+
+
+def test_incremental_rrf_matches_batch_fusion():
+    rrf = ReciprocalRankFusion(RRFConfig(weights={"dense": 0.7, "sparse": 0.3}))
+    dense = [{"doc_id": d, "content": d, "score": 1.0} for d in ["a", "b", "c", "d"]]
+    sparse = [{"doc_id": d, "content": d, "score": 2.0} for d in ["c", "e", "a"]]
+
+    fusion = rrf.incremental()
+    assert fusion.add("sparse", sparse) == ["c", "e", "a"]
+    assert fusion.add("dense", dense[:2]) == ["b"]
+    assert fusion.add("dense", dense[2:]) == ["d"]  # Ränge laufen weiter
+
+    incremental = fusion.ranking(10)
+    batch = rrf.fuse({"dense": dense, "sparse": sparse}, top_k=10)
+
+    assert [d.doc_id for d in incremental] == [d.doc_id for d in batch]
+    assert [d.rrf_score for d in incremental] == pytest.approx([d.rrf_score for d in batch])
+    assert incremental[0].source_ranks == batch[0].source_ranks
+    assert sorted(fusion.retrievers) == ["dense", "sparse"]
+
+
+@pytest.mark.asyncio
+async def test_rerank_starts_before_slow_retriever_finishes():
+    dense = SlowDenseRetriever(delay=0.15, doc_ids=["d1", "d2", "x9"])
+    reranker = RecordingReranker()
+    retriever = make_retriever(dense, reranker)
+
+    results = await retriever.retrieve("Bauantrag Frist", top_k=5)
+
+    first_call, first_ids = reranker.calls[0]
+    assert first_call < dense.finished_at
+    assert len(first_ids) == 5
+
+    # Jedes Dokument wird höchstens einmal gescored
+    scored = [doc_id for _, ids in reranker.calls for doc_id in ids]
+    assert len(scored) == len(set(scored))
+
+    assert len(results) == 5
+    rerank_scores = [r.metadata["rerank_score"] for r in results]
+    assert rerank_scores == sorted(rerank_scores, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_in_metadata():
+    dense = SlowDenseRetriever(delay=0.05, doc_ids=["d3", "d4"])
+    reranker = RecordingReranker(delay=0.02)
+    retriever = make_retriever(dense, reranker)
+
+    results = await retriever.retrieve("Bauantrag", top_k=4)
+
+    timings = results[0].metadata["timings"]
+    assert timings is results[-1].metadata["timings"]
+    assert timings["mode"] == "pipelined"
+    assert timings["sparse_ms"] < timings["dense_ms"]
+    assert timings["first_candidates_ms"] <= timings["sparse_ms"] + 1
+    assert timings["first_rerank_ms"] < timings["dense_ms"]
+    assert timings["total_ms"] >= timings["dense_ms"]
+    assert timings["rerank_scored"] == len({d for _, ids in reranker.calls for d in ids})
+    assert timings["rerank_skipped"] > 0
+
+
+@pytest.mark.asyncio
+async def test_falls_back_without_reranker():
+    dense = SlowDenseRetriever(delay=0.0, doc_ids=["d1"])
+    retriever = make_retriever(dense, reranker=None)
+
+    results = await retriever.retrieve("Bauantrag", top_k=3)
+
+    assert results
+    assert "timings" not in results[0].metadata
+
+
+def test_factory_wires_reranker_for_pipelined_mode(monkeypatch):
+    reranker = RecordingReranker()
+    monkeypatch.setattr(veritas_reranking_service, "get_reranking_service", lambda: reranker)
+    dense = SlowDenseRetriever(delay=0.0, doc_ids=[])
+
+    pipelined = create_hybrid_retriever(dense, config=HybridRetrievalConfig(enable_pipelined_rerank=True))
+    explicit = create_hybrid_retriever(dense, reranker="explicit")
+    standard = create_hybrid_retriever(dense, config=HybridRetrievalConfig())
+
+    assert pipelined.reranker is reranker
+    assert explicit.reranker == "explicit"
+    assert standard.reranker is None
+
+
+@pytest.mark.asyncio
+async def test_phase5_initialization_enables_pipelined_rerank(monkeypatch):
+    phase5 = pytest.importorskip("backend.api.veritas_phase5_integration")  # backend.api benötigt uds3
+
+    reranker = RecordingReranker()
+    monkeypatch.setattr(veritas_reranking_service, "get_reranking_service", lambda: reranker)
+    monkeypatch.setenv("VERITAS_ENABLE_PIPELINED_RERANK", "true")
+    monkeypatch.setenv("VERITAS_RERANK_CANDIDATES", "12")
+    monkeypatch.setattr(phase5, "hybrid_retriever", None)
+
+    assert await phase5.initialize_phase5_hybrid_search(demo_corpus=CORPUS)
+
+    assert phase5.hybrid_retriever.reranker is reranker
+    assert phase5.hybrid_retriever.config.enable_pipelined_rerank is True
+    assert phase5.hybrid_retriever.config.rerank_candidates == 12
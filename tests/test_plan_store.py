@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+VERITAS PLAN STORE TESTS
+========================
+
+Unit-Tests für die Write-Behind-Persistenz der Research-Pläne:
+- WAL-Modus, ein Writer-Thread
+- Gebündelte Transaktionen (Group Commit)
+- flush() macht alle vorher eingereihten Writes sichtbar
+- Fehlerhafte Zeile verwirft nicht den Rest des Batches
+- Plan-Record wird synchron bestätigt (doppelte plan_id schlägt fehl)
+- BaseAgent: Schritt-Ergebnisse und Plan-Status über den Store
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from backend.agents.framework.base_agent import BaseAgent
+from backend.agents.framework.plan_store import PlanStore, get_plan_store
+from backend.agents.framework.setup_database_sqlite import SQLiteDatabaseSetup
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "agent_framework.db"
+    assert SQLiteDatabaseSetup(str(path)).create_tables()
+    return path
+
+
+def make_plan(plan_id, steps=0):
+    return {
+        "plan_id": plan_id,
+        "research_question": "Welche Auflagen gelten?",
+        "schema_name": "standard",
+        "steps": [{"step_id": f"{plan_id}_s{i}"} for i in range(steps)],
+    }
+
+
+def make_step(plan_id, index):
+    return {
+        "step_id": f"{plan_id}_s{index}",
+        "step_index": index,
+        "step_name": f"Schritt {index}",
+        "step_type": "search",
+        "agent_name": "environmental",
+        "agent_type": "DataRetrievalAgent",
+        "depends_on": [],
+    }
+
+
+def count_rows(db_path, table, plan_id):
+    with sqlite3.connect(str(db_path)) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE plan_id = ?", (plan_id,)).fetchone()[0]
+
+
+def test_wal_mode_and_flush_visibility(db_path):
+    store = PlanStore(db_path)
+    try:
+        store.create_plan(make_plan("p1", steps=3))
+        for index in range(3):
+            store.store_step_result("p1", make_step("p1", index), {"status": "success", "quality_score": 0.9})
+        store.update_plan_status("p1", "partial", 42)
+
+        assert store.flush()
+        assert count_rows(db_path, "research_plan_steps", "p1") == 3
+        with sqlite3.connect(str(db_path)) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            status, time_ms = conn.execute(
+                "SELECT status, execution_time_ms FROM research_plans WHERE plan_id = 'p1'"
+            ).fetchone()
+        assert (status, time_ms) == ("completed", 42)
+    finally:
+        store.close()
+
+
+def test_concurrent_producers_are_batched(db_path):
+    store = PlanStore(db_path)
+    try:
+        store.create_plan(make_plan("p2"))
+
+        def produce(worker):
+            for index in range(100):
+                step = make_step("p2", worker * 1000 + index)
+                store.store_step_result("p2", step, {"status": "success"})
+
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.flush()
+
+        stats = store.get_stats()
+        assert count_rows(db_path, "research_plan_steps", "p2") == 800
+        assert stats["writes"] == 801
+        assert stats["failed_writes"] == 0
+        # Weit weniger Transaktionen als Writes
+        assert stats["transactions"] < stats["writes"]
+        assert stats["max_batch"] > 1
+    finally:
+        store.close()
+
+
+def test_failed_row_does_not_drop_batch(db_path):
+    store = PlanStore(db_path)
+    try:
+        store.create_plan(make_plan("p3"))
+        store.create_plan(make_plan("p3"))  # Primärschlüssel verletzt
+        store.store_step_result("p3", make_step("p3", 0), {"status": "failed"})
+        assert store.flush()
+
+        stats = store.get_stats()
+        assert stats["failed_writes"] == 1
+        assert "UNIQUE" in stats["last_error"]
+        assert count_rows(db_path, "research_plans", "p3") == 1
+        assert count_rows(db_path, "research_plan_steps", "p3") == 1
+    finally:
+        store.close()
+
+
+def test_create_plan_wait_reports_duplicate(db_path):
+    store = PlanStore(db_path)
+    try:
+        store.create_plan(make_plan("p7"), wait=True)
+        assert count_rows(db_path, "research_plans", "p7") == 1
+
+        with pytest.raises(sqlite3.IntegrityError):
+            store.create_plan(make_plan("p7"), wait=True)
+        store.create_plan(make_plan("p8"), wait=True)  # Writer läuft weiter
+        assert count_rows(db_path, "research_plans", "p8") == 1
+    finally:
+        store.close()
+
+
+def test_close_drains_queue_and_rejects_writes(db_path):
+    store = PlanStore(db_path)
+    store.create_plan(make_plan("p4"))
+    store.close()
+
+    assert count_rows(db_path, "research_plans", "p4") == 1
+    with pytest.raises(RuntimeError):
+        store.create_plan(make_plan("p5"))
+    # Geschlossener Store wird durch get_plan_store ersetzt
+    assert get_plan_store(db_path) is not store
+
+
+class EchoAgent(BaseAgent):
+    def execute_step(self, step, context):
+        return {"status": "success", "quality_score": 0.8}
+
+    def get_agent_type(self):
+        return "echo"
+
+    def get_capabilities(self):
+        return []
+
+
+def test_base_agent_persists_through_store(db_path):
+    agent = EchoAgent(db_path=db_path, enable_monitoring=False)
+    plan = make_plan("p6", steps=2)
+    steps = [make_step("p6", 0), make_step("p6", 1)]
+
+    agent._create_plan_record(plan)
+    for step in steps:
+        agent._store_step_result("p6", step, {"status": "success", "quality_score": 0.8})
+    agent._update_plan_status("p6", "completed", 0.8, 10)
+
+    # Nach dem Plan-Abschluss ohne weiteres flush() sichtbar
+    assert count_rows(db_path, "research_plan_steps", "p6") == 2
+    results = agent.get_plan_results("p6")
+    assert results["status"] == "completed"
+    assert [s["step_id"] for s in results["steps"]] == ["p6_s0", "p6_s1"]
+    assert agent.plan_store is get_plan_store(db_path)
+
+    # Doppelte plan_id schlägt synchron fehl (wie vor dem Write-Behind-Store)
+    with pytest.raises(sqlite3.IntegrityError):
+        agent._create_plan_record(plan)
+    agent.close()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+VERITAS PROGRESS HUB TESTS
+==========================
+
+Unit-Tests für den loop-gebundenen ProgressHub:
+- Ein Event wird einmal serialisiert, alle Subscriber teilen die Bytes
+- Ring-Buffer je Client: überholte Prozent-Updates werden zusammengeführt,
+  ohne Stage-/Agent-Wechsel zu überholen
+- Publish aus Worker-Threads ohne eigenen Event-Loop
+- History-Replay für spät verbundene Clients, Stream-Ende bei Completion
+- 500 gleichzeitige SSE-Streams einer Session
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+import shared.pipelines.veritas_streaming_progress as streaming
+from shared.pipelines.veritas_streaming_progress import (
+    ProgressHub,
+    ProgressStage,
+    ProgressType,
+    ProgressUpdate,
+    create_progress_manager,
+    create_progress_streamer,
+)
+
+
+def make_update(update_type=ProgressType.STAGE_PROGRESS, stage=ProgressStage.AGENT_PROCESSING,
+                progress=0.0, agent_type=None, session_id="s1"):
+    return ProgressUpdate(
+        session_id=session_id,
+        query_id="q1",
+        update_type=update_type,
+        stage=stage,
+        message=f"{update_type.value} {progress}",
+        progress_percent=progress,
+        agent_type=agent_type
+    )
+
+
+def decode(events):
+    return [json.loads(event.data[len(b"data: "):]) for event in events]
+
+
+@pytest.mark.asyncio
+async def test_event_is_serialized_once_for_all_subscribers(monkeypatch):
+    hub = ProgressHub()
+    subscribers = [hub.subscribe("s1") for _ in range(50)]
+
+    calls = []
+    original = streaming.json.dumps
+    monkeypatch.setattr(streaming.json, "dumps", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    hub.publish(make_update(ProgressType.AGENT_START, agent_type="legal_framework"))
+
+    assert len(calls) == 1
+    batches = [subscriber.drain() for subscriber in subscribers]
+    assert all(batch[0].data is batches[0][0].data for batch in batches)
+    assert decode(batches[0])[0]["agent_type"] == "legal_framework"
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_coalesces_progress_percent():
+    hub = ProgressHub(buffer_size=8)
+    subscriber = hub.subscribe("s1")
+
+    hub.publish(make_update(ProgressType.STAGE_START, progress=45.0))
+    for percent in range(1, 101):
+        hub.publish(make_update(ProgressType.STAGE_PROGRESS, progress=float(percent)))
+        hub.publish(make_update(ProgressType.AGENT_PROGRESS, progress=float(percent), agent_type="geo_context"))
+    hub.publish(make_update(ProgressType.AGENT_COMPLETE, agent_type="geo_context"))
+
+    payloads = decode(subscriber.drain())
+
+    assert [(p["type"], p["progress"]) for p in payloads] == [
+        ("stage_start", 45.0),
+        ("stage_progress", 100.0),
+        ("agent_progress", 100.0),
+        ("agent_complete", 0.0),
+    ]
+    assert subscriber.coalesced == 198 and subscriber.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_coalescing_keeps_stage_order():
+    hub = ProgressHub(buffer_size=8)
+    subscriber = hub.subscribe("s1")
+
+    hub.publish(make_update(ProgressType.STAGE_PROGRESS, ProgressStage.ANALYZING_QUERY, progress=10.0))
+    hub.publish(make_update(ProgressType.AGENT_PROGRESS, progress=20.0, agent_type="geo_context"))
+    hub.publish(make_update(ProgressType.STAGE_START, ProgressStage.AGENT_PROCESSING, progress=30.0))
+    hub.publish(make_update(ProgressType.STAGE_PROGRESS, ProgressStage.ANALYZING_QUERY, progress=15.0))
+    hub.publish(make_update(ProgressType.STAGE_PROGRESS, ProgressStage.AGENT_PROCESSING, progress=40.0))
+    hub.publish(make_update(ProgressType.AGENT_PROGRESS, progress=50.0, agent_type="geo_context"))
+    hub.publish(make_update(ProgressType.STAGE_PROGRESS, ProgressStage.AGENT_PROCESSING, progress=60.0))
+
+    payloads = decode(subscriber.drain())
+
+    assert [(p["type"], p["stage"], p["progress"]) for p in payloads] == [
+        ("stage_progress", "analyzing_query", 10.0),
+        ("agent_progress", "agent_processing", 20.0),
+        ("stage_start", "agent_processing", 30.0),
+        ("stage_progress", "analyzing_query", 15.0),
+        ("stage_progress", "agent_processing", 60.0),
+        ("agent_progress", "agent_processing", 50.0),
+    ]
+    assert subscriber.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_ring_buffer_is_bounded():
+    hub = ProgressHub(buffer_size=4)
+    subscriber = hub.subscribe("s1")
+
+    for index in range(10):
+        hub.publish(make_update(ProgressType.LLM_THINKING, progress=float(index)))
+
+    assert [p["progress"] for p in decode(subscriber.drain())] == [6.0, 7.0, 8.0, 9.0]
+    assert subscriber.dropped == 6
+
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread_and_stream_ends_on_completion():
+    manager = create_progress_manager()
+    streamer = create_progress_streamer(manager)
+    manager.start_session("s1", "q1", "Welche Frist gilt für den Widerspruch?")
+
+    stream = streamer.create_progress_stream("s1")
+    first = await stream.__anext__()  # History: Initialisierung
+    assert json.loads(first[len(b"data: "):])["stage"] == "initializing"
+
+    def worker():
+        # Kein Event-Loop in diesem Thread
+        manager.update_stage("s1", ProgressStage.AGENT_PROCESSING)
+        manager.update_agent_progress("s1", "legal_framework", ProgressType.AGENT_START)
+        manager.complete_session("s1", {"final_answer": "Ein Monat"})
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+
+    chunks = [chunk async for chunk in stream]
+    thread.join()
+
+    payloads = [json.loads(line[len("data: "):]) for line in b"".join(chunks).decode().split("\n\n") if line]
+    assert [p["stage"] for p in payloads] == ["agent_processing", "agent_processing", "completed"]
+    assert payloads[-1]["details"] == {"final_answer": "Ein Monat"}
+    assert manager.hub.subscriber_count() == 0 and not streamer.active_streams
+
+    await asyncio.sleep(0)  # close_session läuft im Loop
+    assert manager.hub.get_stats()["sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_gets_history_without_duplicates():
+    manager = create_progress_manager()
+    streamer = create_progress_streamer(manager)
+    manager.start_session("s1", "q1", "Lärmgrenzwerte")
+    manager.update_stage("s1", ProgressStage.ANALYZING_QUERY)
+
+    stream = streamer.create_progress_stream("s1")
+    history = await stream.__anext__()
+    manager.complete_session("s1", {})
+    rest = [chunk async for chunk in stream]
+
+    stages = [json.loads(line[len("data: "):])["stage"]
+              for line in (history + b"".join(rest)).decode().split("\n\n") if line]
+    assert stages == ["initializing", "analyzing_query", "completed"]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_when_idle():
+    manager = create_progress_manager()
+    streamer = create_progress_streamer(manager)
+    streamer.heartbeat_interval = 0.01
+
+    stream = streamer.create_progress_stream("idle")
+    chunk = await stream.__anext__()
+    await stream.aclose()
+
+    assert json.loads(chunk[len(b"data: "):])["type"] == "heartbeat"
+    assert manager.hub.subscriber_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_500_concurrent_streams():
+    manager = create_progress_manager()
+    streamer = create_progress_streamer(manager)
+    manager.start_session("s1", "q1", "Genehmigung Windkraftanlage")
+
+    async def client(slow):
+        received = []
+        async for chunk in streamer.create_progress_stream("s1"):
+            received.append(chunk)
+            if slow:
+                await asyncio.sleep(0.005)
+        return b"".join(received)
+
+    clients = [asyncio.create_task(client(slow=index % 5 == 0)) for index in range(500)]
+    await asyncio.sleep(0)
+
+    def publisher():
+        for percent in range(200):
+            manager._emit_progress(
+                session_id="s1", query_id="q1", update_type=ProgressType.STAGE_PROGRESS,
+                stage=ProgressStage.AGENT_PROCESSING, progress_percent=percent / 2
+            )
+        manager.complete_session("s1", {})
+
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    results = await asyncio.wait_for(asyncio.gather(*clients), timeout=30)
+    thread.join()
+
+    for body in results:
+        payloads = [json.loads(line[len("data: "):]) for line in body.decode().split("\n\n") if line]
+        assert payloads[-1]["stage"] == "completed"
+        progress = [p["progress"] for p in payloads if p["type"] == "stage_progress"]
+        assert progress == sorted(progress) and progress[-1] == 99.5
+    assert manager.hub.stats["published"] == 202
+    assert manager.hub.subscriber_count() == 0
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+VERITAS QUERY RESULT CACHE TESTS
+================================
+
+Unit-Tests für den gemeinsamen LRU/TTL-Cache:
+- LRU-Verdrängung nach Einträgen und Bytes
+- TTL-Verfall
+- Hit/Miss/Eviction-Zähler
+- Invalidierungs-Hooks bei Re-Index, nur für Einträge der geänderten Quelle
+- Integration in SparseRetriever, QueryExpander, ReRankingService
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import pytest
+
+from backend.agents.veritas_query_cache import (
+    QueryResultCache,
+    estimate_size,
+    notify_reindex
+)
+from backend.agents.veritas_query_expansion import QueryExpander, QueryExpansionConfig
+from backend.agents.veritas_reranking_service import ReRankingService, ReRankingConfig
+from backend.agents.veritas_sparse_retrieval import SparseRetriever, SparseRetrievalConfig
+
+
+class FakeClock:
+    """Manuell steuerbare Zeitquelle."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ============================================================================
+# QueryResultCache
+# ============================================================================
+
+class TestQueryResultCache:
+
+    def test_lru_eviction_by_entries(self):
+        cache = QueryResultCache(name="t", max_entries=2, ttl=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "a" wird zuletzt benutzt
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = QueryResultCache(name="t", max_entries=100, max_bytes=250, ttl=None, sizer=lambda v: 100)
+        for key in "abc":
+            cache.set(key, key)
+
+        assert len(cache) == 2
+        assert cache.size_bytes == 200
+        assert "a" not in cache
+
+    def test_oversized_entry_is_not_cached(self):
+        cache = QueryResultCache(name="t", max_bytes=10, ttl=None)
+        assert cache.set("big", "x" * 1000) is False
+        assert len(cache) == 0
+
+    def test_ttl_expiration(self):
+        clock = FakeClock()
+        cache = QueryResultCache(name="t", ttl=10, clock=clock)
+        cache.set("a", [1, 2, 3])
+
+        clock.now = 9.9
+        assert cache.get("a") == [1, 2, 3]
+        clock.now = 10.0
+        assert cache.get("a") is None
+
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == 0
+
+    def test_expired_entries_evicted_before_lru(self):
+        clock = FakeClock()
+        cache = QueryResultCache(name="t", max_entries=2, ttl=10, clock=clock)
+        cache.set("old", 1)
+        clock.now = 5
+        cache.set("fresh", 2)
+        cache.get("old")  # "old" ist jetzt MRU
+        clock.now = 11
+        cache.set("new", 3)
+
+        stats = cache.get_stats()
+        assert stats["expirations"] == 1
+        assert stats["evictions"] == 0
+        assert "fresh" in cache and "new" in cache
+
+    def test_invalidation_hooks(self):
+        cache = QueryResultCache(name="t", ttl=None)
+        reasons = []
+        cache.add_invalidation_hook(reasons.append)
+        cache.set("a", 1)
+
+        assert cache.invalidate("test") == 1
+        assert reasons == ["test"]
+        assert len(cache) == 0 and cache.size_bytes == 0
+
+    def test_notify_reindex_respects_flag(self):
+        dependent = QueryResultCache(name="dep", ttl=None)
+        independent = QueryResultCache(name="indep", ttl=None, invalidate_on_reindex=False)
+        dependent.set("a", 1)
+        independent.set("a", 1)
+
+        notify_reindex("test")
+
+        assert "a" not in dependent
+        assert "a" in independent
+
+    def test_notify_reindex_only_drops_entries_of_that_source(self):
+        cache = QueryResultCache(name="multi", ttl=None, source="bm25:a")
+        reasons = []
+        cache.add_invalidation_hook(reasons.append)
+        cache.set("a", 1)
+        cache.set("b", 2, sources=["bm25:b"])
+        cache.set("ab", 3, sources=["bm25:a", "bm25:b"])
+
+        notify_reindex("bm25:b")
+
+        assert "a" in cache
+        assert "b" not in cache and "ab" not in cache
+        assert reasons == ["reindex:bm25:b"]
+
+        notify_reindex("bm25:c")
+        assert "a" in cache and reasons == ["reindex:bm25:b"]
+
+    def test_estimate_size_counts_nested_content(self):
+        small = estimate_size([{"content": "x"}])
+        large = estimate_size([{"content": "x" * 10000}])
+        assert large - small >= 9999
+
+
+# ============================================================================
+# Integration
+# ============================================================================
+
+@pytest.fixture
+def documents():
+    return [
+        {"id": "d1", "content": "Baugenehmigung Verfahren Bauantrag"},
+        {"id": "d2", "content": "Immissionsschutz Lärm Grenzwerte"},
+        {"id": "d3", "content": "Bauantrag Unterlagen Baugenehmigung Frist"},
+    ]
+
+
+class TestRetrievalStackCaches:
+
+    @pytest.mark.asyncio
+    async def test_sparse_cache_is_bounded(self, documents):
+        retriever = SparseRetriever(SparseRetrievalConfig(index_path=None, cache_max_entries=2))
+        retriever.index_documents(documents)
+
+        for query in ["Bauantrag", "Lärm", "Frist", "Verfahren"]:
+            await retriever.retrieve(query)
+        await retriever.retrieve("Verfahren")
+
+        stats = retriever.get_stats()["cache"]
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 2
+        assert stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sparse_reindex_invalidates_dependent_caches(self, documents):
+        retriever = SparseRetriever(SparseRetrievalConfig(index_path=None))
+        retriever.index_documents(documents)
+        reranker = ReRankingService(ReRankingConfig(enable_cache=True))
+        expander = QueryExpander(QueryExpansionConfig())
+
+        reranker._cache.set("key", 1.0)
+        expander._cache.set("key", [])
+        before = await retriever.retrieve("Abstandsflächen")
+
+        retriever.update_document("d2", "Abstandsflächen Grenzwerte")
+        after = await retriever.retrieve("Abstandsflächen")
+
+        score_of = lambda results: {d.doc_id: d.score for d in results}
+        assert score_of(before)["d2"] == 0.0
+        assert score_of(after)["d2"] > 0.0
+        # Re-Ranking-Scores sind content-adressiert (Chunk-Hash) und bleiben gültig
+        assert "key" in reranker._cache
+        assert "key" in expander._cache
+        assert retriever.get_stats()["cache"]["invalidations"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_reindex_keeps_cache_of_unrelated_retriever(self, documents):
+        first = SparseRetriever(SparseRetrievalConfig(index_path=None))
+        second = SparseRetriever(SparseRetrievalConfig(index_path=None))
+        first.index_documents(documents)
+        second.index_documents(documents)
+        await first.retrieve("Bauantrag")
+        await second.retrieve("Bauantrag")
+
+        first.update_document("d2", "Abstandsflächen Grenzwerte")
+
+        assert first.get_stats()["cache"]["entries"] == 0
+        assert second.get_stats()["cache"]["entries"] == 1
+
+    def test_stats_exposed(self):
+        expander_stats = QueryExpander(QueryExpansionConfig()).get_stats()
+        reranker_stats = ReRankingService(ReRankingConfig()).get_stats()
+
+        for stats in (expander_stats, reranker_stats):
+            assert stats["cache_size"] == 0
+            assert {"hits", "misses", "evictions", "bytes"} <= set(stats["cache"])
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+VERITAS QUERY EXPANSION DEADLINE TESTS
+======================================
+
+Unit-Tests für parallele Query-Expansion mit Latenz-Budget:
+- Strategien laufen gleichzeitig statt nacheinander
+- Varianten nach der Deadline werden verworfen (Calls abgebrochen)
+- expand_iter liefert das Original sofort
+- HybridRetriever startet Retrieval mit der Original-Query, bevor
+  die Expansion fertig ist, und zieht Varianten nach
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.agents.veritas_hybrid_retrieval import HybridRetrievalConfig, HybridRetriever
+from backend.agents.veritas_query_expansion import (
+    ExpansionStrategy,
+    QueryExpander,
+    QueryExpansionConfig,
+)
+from backend.agents.veritas_sparse_retrieval import SparseRetriever, SparseRetrievalConfig
+
+STRATEGIES = [ExpansionStrategy.SYNONYM, ExpansionStrategy.CONTEXT, ExpansionStrategy.TECHNICAL]
+
+
+def make_expander(delays, **config) -> QueryExpander:
+    """QueryExpander mit simuliertem LLM (Latenz je Strategie)."""
+    expander = QueryExpander(QueryExpansionConfig(
+        num_expansions=len(STRATEGIES), strategies=STRATEGIES, **config
+    ))
+    expander._ollama_available = True
+    expander.cancelled = []
+
+    markers = {"SYNONYM": "synonym", "KONTEXTUELL": "context", "TECHNISCH": "technical"}
+
+    async def fake_call(prompt):
+        name = next(value for key, value in markers.items() if key in prompt)
+        try:
+            await asyncio.sleep(delays[name])
+        except asyncio.CancelledError:
+            expander.cancelled.append(name)
+            raise
+        return f"Variante {name}"
+
+    expander._call_ollama = fake_call
+    return expander
+
+
+@pytest.mark.asyncio
+async def test_strategies_run_concurrently():
+    expander = make_expander({"synonym": 0.1, "context": 0.1, "technical": 0.1}, latency_budget_ms=None)
+
+    start = time.perf_counter()
+    results = await expander.expand("Bauantrag Frist")
+    duration = time.perf_counter() - start
+
+    assert len(results) == 4
+    assert duration < 0.25
+
+
+@pytest.mark.asyncio
+async def test_late_variants_are_dropped():
+    expander = make_expander({"synonym": 0.01, "context": 0.02, "technical": 1.0}, latency_budget_ms=150)
+
+    start = time.perf_counter()
+    results = await expander.expand("Bauantrag Frist")
+    duration = time.perf_counter() - start
+
+    assert [r.text for r in results] == ["Bauantrag Frist", "Variante synonym", "Variante context"]
+    assert duration < 0.5
+    await asyncio.sleep(0)
+    assert expander.cancelled == ["technical"]
+    # Unvollständige Ergebnisse werden nicht gecacht
+    assert len(expander._cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_budget_override_per_call():
+    expander = make_expander({"synonym": 0.05, "context": 0.05, "technical": 0.05}, latency_budget_ms=1)
+
+    results = await expander.expand("Bauantrag", latency_budget_ms=float("inf"))
+
+    assert len(results) == 4
+    assert len(expander._cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_expand_iter_yields_original_first():
+    expander = make_expander({"synonym": 0.2, "context": 0.2, "technical": 0.2})
+    iterator = expander.expand_iter("Lärmschutz")
+
+    start = time.perf_counter()
+    first = await iterator.__anext__()
+
+    assert first.text == "Lärmschutz"
+    assert first.metadata["source"] == "original"
+    assert time.perf_counter() - start < 0.05
+    await iterator.aclose()
+
+
+class RecordingDenseRetriever:
+    """Dense-Retriever, der Aufrufzeitpunkte je Query protokolliert."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.calls = {}
+
+    async def vector_search(self, query, top_k, **kwargs):
+        self.calls[query] = time.perf_counter() - self.start
+        return [{"doc_id": f"dense-{len(self.calls)}", "content": query, "score": 0.9}]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_retrieval_starts_before_expansion_finishes():
+    dense = RecordingDenseRetriever()
+    sparse = SparseRetriever(SparseRetrievalConfig(index_path=None))
+    sparse.index_documents([{"id": "d1", "content": "Bauantrag Frist Unterlagen"}])
+    retriever = HybridRetriever(
+        dense_retriever=dense,
+        sparse_retriever=sparse,
+        config=HybridRetrievalConfig(enable_query_expansion=False, num_query_expansions=3)
+    )
+    retriever.query_expander = make_expander(
+        {"synonym": 0.05, "context": 0.1, "technical": 1.0}, latency_budget_ms=200
+    )
+    retriever._query_expansion_available = True
+
+    dense.start = time.perf_counter()
+    results = await retriever.retrieve("Bauantrag Frist", enable_query_expansion=True)
+
+    assert results
+    assert dense.calls["Bauantrag Frist"] < 0.04
+    assert dense.calls["Variante synonym"] >= 0.05
+    assert "Variante context" in dense.calls
+    assert "Variante technical" not in dense.calls
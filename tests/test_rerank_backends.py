@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+VERITAS RERANK BACKENDS TESTS
+=============================
+
+Unit-Tests für austauschbare Cross-Encoder-Backends:
+- Auswahl ONNX/torch (Default torch) und Fallback auf torch
+- Parität: Rang-Korrelation int8-ONNX vs. PyTorch (nur mit
+  onnxruntime, sentence-transformers und Modell-Download)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import numpy as np
+import pytest
+
+from backend.agents import veritas_reranking_service
+from backend.agents.veritas_rerank_backends import CrossEncoderBackend, onnx_model_dir
+
+PARITY_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class FakeCrossEncoder:
+    def __init__(self, model_name, max_length=512):
+        self.model_name = model_name
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        return np.array([float(len(doc)) for _, doc in pairs])
+
+
+class BrokenOnnxBackend:
+    def __init__(self, *args, **kwargs):
+        raise RuntimeError("Export fehlgeschlagen")
+
+
+@pytest.fixture
+def torch_only(monkeypatch):
+    monkeypatch.setattr(veritas_reranking_service, "CROSS_ENCODER_AVAILABLE", True)
+    monkeypatch.setattr(veritas_reranking_service, "CrossEncoder", FakeCrossEncoder)
+
+
+def make_service(**config):
+    return veritas_reranking_service.ReRankingService(
+        veritas_reranking_service.ReRankingConfig(enable_micro_batching=False, **config)
+    )
+
+
+def test_default_backend_is_torch_even_with_onnxruntime(torch_only, monkeypatch):
+    created = []
+    monkeypatch.setattr(veritas_reranking_service, "ONNX_AVAILABLE", True)
+    monkeypatch.setattr(veritas_reranking_service, "OnnxCrossEncoderBackend",
+                        lambda *args, **kwargs: created.append(args))
+
+    service = make_service()
+
+    assert created == []
+    assert isinstance(service.backend, CrossEncoderBackend)
+    assert service.get_stats()["backend"] == "torch"
+
+
+def test_onnx_requested_without_onnxruntime_falls_back(torch_only, monkeypatch):
+    monkeypatch.setattr(veritas_reranking_service, "ONNX_AVAILABLE", False)
+
+    service = make_service(backend="onnx")
+
+    assert service.is_available()
+    assert service.get_stats()["backend"] == "torch"
+
+
+def test_onnx_load_failure_falls_back(torch_only, monkeypatch):
+    monkeypatch.setattr(veritas_reranking_service, "ONNX_AVAILABLE", True)
+    monkeypatch.setattr(veritas_reranking_service, "OnnxCrossEncoderBackend", BrokenOnnxBackend)
+
+    service = make_service(backend="auto")
+
+    assert isinstance(service.backend, CrossEncoderBackend)
+    assert service._compute_relevance_scores("q", [{"id": "a", "content": "abc"}]) == [3.0]
+
+
+def test_no_backend_disables_reranking(monkeypatch):
+    monkeypatch.setattr(veritas_reranking_service, "CROSS_ENCODER_AVAILABLE", False)
+    monkeypatch.setattr(veritas_reranking_service, "ONNX_AVAILABLE", False)
+
+    assert not make_service().is_available()
+
+
+def test_onnx_model_dir_is_filesystem_safe(tmp_path):
+    path = onnx_model_dir("cross-encoder/ms-marco-MiniLM-L-6-v2", str(tmp_path))
+
+    assert path.parent == tmp_path
+    assert "/" not in path.name
+
+
+def test_int8_onnx_rank_parity_with_pytorch(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from backend.agents.veritas_rerank_backends import OnnxCrossEncoderBackend
+
+    try:
+        torch_backend = CrossEncoderBackend(sentence_transformers.CrossEncoder(PARITY_MODEL))
+        onnx_backend = OnnxCrossEncoderBackend(PARITY_MODEL, cache_dir=str(tmp_path), quantize=True)
+    except Exception as e:  # Kein Netz / Modell nicht verfügbar
+        pytest.skip(f"Modell nicht ladbar: {e}")
+
+    query = "Welche Unterlagen brauche ich für einen Bauantrag?"
+    passages = [
+        "Dem Bauantrag sind Lageplan, Bauzeichnungen und Baubeschreibung beizufügen.",
+        "Der Bauantrag ist bei der unteren Bauaufsichtsbehörde einzureichen.",
+        "Die Immissionsrichtwerte für Gewerbegebiete betragen tags 65 dB(A).",
+        "Abstandsflächen müssen auf dem eigenen Grundstück liegen.",
+        "Das Wetter ist heute sonnig.",
+        "Fußball-Ergebnisse vom Wochenende.",
+        "Die Genehmigungsfrist beträgt drei Monate nach Eingang der Unterlagen.",
+        "Rezept für Apfelkuchen mit Streuseln.",
+    ]
+    pairs = [(query, passage) for passage in passages]
+
+    reference = torch_backend.predict(pairs)
+    quantized = onnx_backend.predict(pairs)
+
+    ranks_reference = np.argsort(np.argsort(reference))
+    ranks_quantized = np.argsort(np.argsort(quantized))
+    rho = np.corrcoef(ranks_reference, ranks_quantized)[0, 1]
+
+    assert rho >= 0.9
+    assert int(np.argmax(reference)) == int(np.argmax(quantized))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+VERITAS RERANK SCORE CACHE TESTS
+================================
+
+Unit-Tests für den Score-Cache je (Query, Chunk)-Paar:
+- Geänderte Kandidatenmenge → nur neue Paare werden bewertet
+- Normalisierte Query, content-adressierte Chunks
+- Persistenz über Neustarts (SQLite-Store)
+- Store begrenzt: max_rows (älteste zuerst) und Löschen abgelaufener Scores
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import numpy as np
+import pytest
+
+from backend.agents import veritas_blob_store, veritas_reranking_service
+from backend.agents.veritas_rerank_score_cache import RerankScoreStore, normalize_query, pair_key
+
+
+class CountingCrossEncoder:
+    """Fake-Cross-Encoder: Score = Textlänge, zählt bewertete Paare."""
+
+    scored = []
+
+    def __init__(self, model_name, max_length=512):
+        pass
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        CountingCrossEncoder.scored.extend(doc for _, doc in pairs)
+        return np.array([float(len(doc)) for _, doc in pairs])
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(veritas_reranking_service, "CROSS_ENCODER_AVAILABLE", True)
+    monkeypatch.setattr(veritas_reranking_service, "CrossEncoder", CountingCrossEncoder)
+    CountingCrossEncoder.scored = []
+    services = []
+
+    def factory(**config):
+        config.setdefault("cache_path", None)
+        service = veritas_reranking_service.ReRankingService(
+            veritas_reranking_service.ReRankingConfig(backend="torch", micro_batch_max_wait_ms=0, **config)
+        )
+        services.append(service)
+        return service
+
+    yield factory
+    for service in services:
+        service.close()
+
+
+def docs(*ids):
+    return [{"id": doc_id, "content": f"Inhalt von {doc_id}"} for doc_id in ids]
+
+
+@pytest.mark.asyncio
+async def test_extra_candidate_scores_only_new_pair(make_service):
+    service = make_service()
+
+    await service.rerank_documents("Bauantrag Frist", docs("a", "b", "c"), top_k=3)
+    CountingCrossEncoder.scored = []
+    result = await service.rerank_documents("Bauantrag Frist", docs("c", "a", "b", "neu"), top_k=4)
+
+    assert CountingCrossEncoder.scored == ["Inhalt von neu"]
+    assert len(result) == 4
+    assert service.get_stats()["pairs_scored"] == 4
+
+
+@pytest.mark.asyncio
+async def test_query_is_normalized_and_chunks_are_content_addressed(make_service):
+    service = make_service()
+
+    await service.rerank_documents("Bauantrag  Frist", docs("a"), top_k=1)
+    await service.rerank_documents("bauantrag frist ", docs("a"), top_k=1)
+    assert len(CountingCrossEncoder.scored) == 1
+
+    # Gleiche ID, geänderter Inhalt → neu bewerten
+    changed = [{"id": "a", "content": "Neuer Inhalt"}]
+    await service.rerank_documents("Bauantrag Frist", changed, top_k=1)
+    assert CountingCrossEncoder.scored[-1] == "Neuer Inhalt"
+
+
+@pytest.mark.asyncio
+async def test_scores_survive_restart(make_service, tmp_path):
+    path = str(tmp_path / "rerank.sqlite")
+
+    first = make_service(cache_path=path)
+    before = await first.score_documents("Lärmschutz", docs("x", "y"))
+    first.close()
+
+    CountingCrossEncoder.scored = []
+    second = make_service(cache_path=path)
+    after = await second.score_documents("Lärmschutz", docs("y", "x"))
+
+    assert CountingCrossEncoder.scored == []
+    assert after == before[::-1]
+    assert second.get_stats()["score_store"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_scores_every_pair(make_service):
+    service = make_service(enable_cache=False)
+
+    await service.score_documents("q", docs("a"))
+    await service.score_documents("q", docs("a"))
+
+    assert len(CountingCrossEncoder.scored) == 2
+
+
+def test_store_separates_namespaces_and_honours_ttl(tmp_path):
+    store = RerankScoreStore(str(tmp_path / "scores.sqlite"))
+    key = pair_key("Frist", "Inhalt")
+    store.put_many("model-a", {key: 0.7})
+
+    assert store.get_many("model-a", [key]) == {key: 0.7}
+    assert store.get_many("model-b", [key]) == {}
+    store.close()
+
+    expired = RerankScoreStore(str(tmp_path / "scores.sqlite"), ttl=-1)
+    assert expired.get_many("model-a", [key]) == {}
+    expired.close()
+
+
+def test_store_evicts_oldest_rows_over_max_rows():
+    store = RerankScoreStore(max_rows=3, prune_every=1)
+    keys = [pair_key("Frist", f"Chunk {i}") for i in range(5)]
+    for index, key in enumerate(keys):
+        store.put_many("model", {key: float(index)})
+
+    assert len(store) == 3
+    assert store.get_many("model", keys) == {key: float(i) for i, key in enumerate(keys) if i >= 2}
+    assert store.get_stats()["evicted"] == 2
+    store.close()
+
+
+def test_store_deletes_expired_rows_on_write(monkeypatch):
+    store = RerankScoreStore(ttl=10, max_rows=None, prune_every=2)
+    now = [1000.0]
+    monkeypatch.setattr(veritas_blob_store.time, "time", lambda: now[0])
+
+    store.put_many("model", {pair_key("q", "alt"): 0.1})
+    now[0] += 20
+    store.put_many("model", {pair_key("q", "neu"): 0.9})  # 2. Schreibvorgang → Aufräumen
+
+    assert len(store) == 1
+    assert store.get_many("model", [pair_key("q", "neu")]) == {pair_key("q", "neu"): 0.9}
+    store.close()
+
+
+def test_normalize_query():
+    assert normalize_query("  Bauantrag\tFRIST ") == "bauantrag frist"
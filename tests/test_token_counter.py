@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+VERITAS TOKEN COUNTER TESTS
+===========================
+
+Unit-Tests für Tokenizer-basiertes Token-Counting:
+- Batch-Counting mit Cache je Text-Hash (jeder Chunk einmal tokenisiert)
+- Tokenizer-Auflösung je Modell mit Heuristik-Fallback
+- ContextWindowManager zählt mit dem Tokenizer des Modells
+- TokenOverflowHandler entfernt Chunks nach exakten Token-Counts
+- TokenBudgetCalculator: Chunk-Bonus aus gezählten Context-Tokens
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.agents.rag_context_service import RAGContextService, RAGQueryOptions
+from backend.services.context_window_manager import ContextWindowManager
+from backend.services.token_budget_calculator import TokenBudgetCalculator, UserIntent
+from backend.services.token_counter import TokenCounter, TokenCounterConfig
+from backend.services.token_overflow_handler import OverflowStrategy, TokenOverflowHandler
+
+
+class WordTokenizer:
+    """Test-Backend: ein Token je Wort, zählt Aufrufe"""
+
+    name = "words"
+    exact = True
+
+    def __init__(self):
+        self.calls = []
+
+    def count_batch(self, texts):
+        self.calls.append(list(texts))
+        return [len(text.split()) for text in texts]
+
+
+@pytest.fixture
+def counter(tmp_path):
+    counter = TokenCounter(TokenCounterConfig(tokenizer_dir=str(tmp_path), cache_size=100))
+    counter.register_tokenizer("llama3", WordTokenizer())
+    return counter
+
+
+def test_batch_counting_is_cached_per_text(counter):
+    tokenizer = counter.get_tokenizer("llama3")
+    chunk_a, chunk_b = "eins zwei drei", "vier fünf"
+
+    assert counter.count_batch([chunk_a, chunk_b, chunk_a, ""], "llama3") == [3, 2, 3, 0]
+    assert tokenizer.calls == [[chunk_a, chunk_b]]  # dedupliziert, ein Aufruf
+
+    assert counter.count_chunks(
+        [{"text": chunk_b}, {"content": chunk_a}, {"snippet": chunk_b}, {"title": "leer"}], "llama3"
+    ) == [2, 3, 2, 0]
+    assert len(tokenizer.calls) == 1  # nur Cache-Hits
+    assert counter.get_stats()["hits"] == 3
+
+
+def test_cache_is_bounded(counter):
+    counter.count_batch([f"text {i}" for i in range(150)], "llama3")
+    assert counter.get_stats()["cached"] == 100
+
+
+def test_missing_tokenizer_falls_back_to_heuristic(counter):
+    assert not counter.is_exact("mistral")  # keine Datei im tokenizer_dir
+    assert not counter.is_exact("hf:/nicht/vorhanden/tokenizer.json")
+    assert counter.is_exact("llama3")
+
+    text = "Die Genehmigung nach § 4 BImSchG für 2025 Windkraftanlagen."
+    count = counter.count(text, "mistral")
+    assert len(text.split()) < count < len(text)
+    assert counter.count("Immissionsschutzgesetz", "mistral") > 1
+
+
+def test_context_window_manager_uses_model_tokenizer(counter):
+    manager = ContextWindowManager(token_counter=counter)
+    assert manager.get_model_spec("llama3.1:8b").tokenizer == "llama3"
+
+    context = manager.calculate_available_output_tokens(
+        model_name="llama3.1:8b",
+        system_prompt="Du bist ein Rechtsexperte",
+        user_prompt="Was regelt das BImSchG",
+        rag_context="wort " * 1000,
+        requested_output_tokens=1000
+    )
+    assert (context.system_prompt_tokens, context.user_prompt_tokens, context.rag_context_tokens) == (4, 4, 1000)
+    assert manager.estimate_token_count("zwei Wörter", "llama3.1:8b") == 2
+
+
+def test_overflow_handler_removes_chunks_by_exact_tokens(counter):
+    handler = TokenOverflowHandler(token_counter=counter)
+    chunks = [
+        {"text": "baugenehmigung " * 40, "score": 0.9},
+        {"text": "baugenehmigung " * 40, "score": 0.8},
+        {"text": "baugenehmigung " * 40, "score": 0.7},
+        {"text": "sonstiges " * 500, "score": 0.2},
+        {"text": "anderes " * 30, "score": 0.1},
+    ]
+
+    result = handler.handle_overflow(
+        available_tokens=1000,
+        required_tokens=1450,
+        rag_chunks=chunks,
+        query="Baugenehmigung",
+        tokenizer="llama3"
+    )
+
+    assert result.strategy_used == OverflowStrategy.RERANK_CHUNKS
+    # Der 500-Token-Chunk allein deckt den Overflow von 450 (Auswahl im exakten Budget)
+    assert result.tokens_saved == 500
+    assert result.metadata["filtered_chunks"] == 4
+    assert 3 not in result.metadata["selected_indices"]
+
+
+def test_budget_calculator_uses_counted_context_tokens(counter):
+    calculator = TokenBudgetCalculator(token_counter=counter)
+    chunks = [{"text": "wort " * 400}, {"text": "wort " * 400}]
+
+    _, flat = calculator.calculate_budget(
+        query="Was ist eine Baugenehmigung?", chunk_count=2, source_types=["vector"],
+        agent_count=0, intent=UserIntent.EXPLANATION
+    )
+    _, counted = calculator.calculate_budget(
+        query="Was ist eine Baugenehmigung?", chunk_count=2, source_types=["vector"],
+        agent_count=0, intent=UserIntent.EXPLANATION, rag_chunks=chunks, tokenizer="llama3"
+    )
+
+    assert flat["chunk_bonus"] == 100
+    assert counted["context_tokens"] == 800
+    assert counted["chunk_bonus"] == 200
+    assert counted["final_budget"] > flat["final_budget"]
+
+
+def test_budget_calculator_counts_normalized_rag_documents(counter):
+    service = RAGContextService(
+        uds3_strategy=SimpleNamespace(), enable_reranking=False, enable_hybrid_search=False
+    )
+    raw_result = SimpleNamespace(documents=[
+        {"id": f"doc_{i}", "title": f"Dokument {i}", "snippet": "wort " * 400, "score": 0.8}
+        for i in range(4)
+    ] + [{"id": "doc_4", "title": "Ohne Text", "score": 0.5}])
+    documents = service._normalize_result(raw_result, RAGQueryOptions())["documents"]
+    calculator = TokenBudgetCalculator(token_counter=counter)
+
+    _, flat = calculator.calculate_budget(
+        query="Was ist eine Baugenehmigung?", chunk_count=5, source_types=["vector"],
+        agent_count=0, intent=UserIntent.EXPLANATION
+    )
+    _, counted = calculator.calculate_budget(
+        query="Was ist eine Baugenehmigung?", chunk_count=5, source_types=["vector"],
+        agent_count=0, intent=UserIntent.EXPLANATION, rag_chunks=documents, tokenizer="llama3"
+    )
+
+    assert flat["chunk_bonus"] == 250
+    assert counted["context_tokens"] == 1600
+    # 1600 * 0.25 + pauschal 50 für den Chunk ohne Snippet
+    assert counted["chunk_bonus"] == 450
+    assert counted["final_budget"] > flat["final_budget"]
+
+
+def test_budget_calculator_falls_back_to_flat_bonus_without_chunk_text(counter):
+    calculator = TokenBudgetCalculator(token_counter=counter)
+
+    _, breakdown = calculator.calculate_budget(
+        query="Was ist eine Baugenehmigung?", chunk_count=2, source_types=["vector"],
+        agent_count=0, intent=UserIntent.EXPLANATION,
+        rag_chunks=[{"title": "a"}, {"title": "b"}], tokenizer="llama3"
+    )
+
+    assert breakdown["context_tokens"] is None
+    assert breakdown["chunk_bonus"] == 100
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+VERITAS UDS3 SEARCH COALESCER TESTS
+===================================
+
+Unit-Tests für request-scoped Single-Flight der UDS3-Suchen:
+- Gleichzeitige identische Aufrufe teilen eine Ausführung
+- Memoization für die Lebensdauer des Coalescers
+- Lokaler Kategorie-Filter auf einer breiteren Suche
+- Dedup-Ratio in den Statistiken
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from backend.agents.veritas_uds3_coalescer import SingleFlight, UDS3SearchCoalescer
+
+RESULTS = [
+    {"content": "BauGB § 35", "score": 0.9, "doc_id": "l1", "metadata": {"category": "legal"}},
+    {"content": "Lärmkarte", "score": 0.85, "doc_id": "e1", "category": "environmental"},
+    {"content": "Formular", "score": 0.8, "doc_id": "d1", "metadata": {"category": "documents"}},
+    {"content": "VwVfG § 1", "score": 0.7, "doc_id": "l2", "metadata": {"category": "Legal"}},
+    {"content": "Ohne Kategorie", "score": 0.6, "doc_id": "x1"},
+]
+
+
+class SlowUDS3:
+    def __init__(self, delay=0.05, fail_first=False):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def query_across_databases(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+            fail = self.fail_first and len(self.calls) == 1
+        time.sleep(self.delay)
+        if fail:
+            raise ConnectionError("UDS3 nicht erreichbar")
+        return SimpleNamespace(success=True, joined_results=list(RESULTS))
+
+
+def test_parallel_agents_share_one_search():
+    uds3 = SlowUDS3()
+    search = UDS3SearchCoalescer(uds3)
+    categories = ["legal", "environmental", "documents", "geographic", "traffic", "financial"]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda c: search.vector_search("Bauantrag", category=c, top_k=2), categories))
+
+    assert len(uds3.calls) == 1
+    assert uds3.calls[0]["vector_params"]["top_k"] == 25
+    stats = search.get_stats()
+    assert stats["calls"] == 6
+    assert stats["executed"] == 1
+    assert stats["dedup_ratio"] == pytest.approx(5 / 6)
+    assert [r["doc_id"] for r in results[0]] == ["l1", "l2"]
+
+
+def test_results_are_memoized_for_the_run():
+    uds3 = SlowUDS3(delay=0.0)
+    search = UDS3SearchCoalescer(uds3)
+
+    search.vector_search("Bauantrag", category="legal")
+    search.vector_search("Bauantrag", category="documents")
+    search.vector_search("Andere Frage", category="legal")
+
+    assert len(uds3.calls) == 2
+    assert search.get_stats()["memo_hits"] == 1
+    # Neuer Lauf → neuer Coalescer → neue Suche
+    UDS3SearchCoalescer(uds3).vector_search("Bauantrag")
+    assert len(uds3.calls) == 3
+
+
+def test_category_filter_falls_back_to_best_remaining():
+    search = UDS3SearchCoalescer(SlowUDS3(delay=0.0))
+
+    environmental = search.vector_search("q", category="environmental", top_k=3)
+    general = search.vector_search("q", category="general", top_k=3)
+
+    assert [r["doc_id"] for r in environmental] == ["e1", "l1", "d1"]
+    assert [r["doc_id"] for r in general] == ["l1", "e1", "d1"]
+    assert search.get_stats()["category_fallbacks"] == 1
+
+
+def test_errors_propagate_and_are_not_memoized():
+    flight = SingleFlight()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("k", failing)
+    assert flight.do("k", lambda: 42) == 42
+    assert flight.get_stats()["errors"] == 1
+    assert len(attempts) == 1
+
+
+def test_failed_search_yields_empty_results():
+    search = UDS3SearchCoalescer(SimpleNamespace(
+        query_across_databases=lambda **kwargs: SimpleNamespace(success=False, joined_results=[])
+    ))
+
+    assert search.vector_search("q", category="legal") == []
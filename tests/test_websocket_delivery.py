@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+VERITAS WEBSOCKET DELIVERY TESTS
+================================
+
+Unit-Tests für die WebSocket-Auslieferung mit Sende-Queue je Verbindung:
+- Broadcast serialisiert einmal, wartet auf keinen Socket
+- Hängender Client bremst andere Clients nicht
+- High-Water-Marks: verwerfbare Frames überspringen, volle Queue schließen
+- Send-Timeout schließt hängende Verbindungen
+- Antwort-Streams mit Backpressure in Reihenfolge, gebündelte Frames
+- Einreihen aus fremden Threads (Log-Handler)
+
+Author: VERITAS System
+Date: 2025-10-06
+Version: 1.0
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+
+import backend.services.websocket_delivery as delivery
+from backend.services.websocket_delivery import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    ConnectionClosed,
+    ConnectionManager,
+    DeliveryConfig,
+    encode_message,
+    iter_batches,
+)
+
+
+class FakeWebSocket:
+    """Test-WebSocket: zeichnet Frames auf, optional langsam oder hängend"""
+
+    def __init__(self, delay: float = 0.0, stalled: bool = False):
+        self.delay = delay
+        self.stalled = stalled
+        self.frames = []
+        self.closed_with = None
+        self._release = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await self._release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = (code, reason)
+
+    def messages(self):
+        return [json.loads(frame) for frame in self.frames]
+
+
+async def settle(rounds: int = 20):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+async def wait_for_frames(websocket: FakeWebSocket, count: int, timeout: float = 2.0):
+    async def wait():
+        while len(websocket.frames) < count:
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_and_shares_frame(monkeypatch):
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(20)]
+    for index, websocket in enumerate(sockets):
+        await manager.connect(websocket, f"client{index % 5}")
+
+    calls = []
+    original = delivery.json.dumps
+    monkeypatch.setattr(delivery.json, "dumps", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    delivered = await manager.broadcast({"type": "status_update", "läuft": True}, exclude_client="client0")
+    await settle()
+
+    assert len(calls) == 1
+    assert delivered == 16
+    for index, websocket in enumerate(sockets):
+        expected = [] if index % 5 == 0 else [{"type": "status_update", "läuft": True}]
+        assert websocket.messages() == expected
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_does_not_delay_others():
+    manager = ConnectionManager(DeliveryConfig(queue_size=16, degrade_watermark=8, send_timeout=60))
+    stalled = FakeWebSocket(stalled=True)
+    fast = [FakeWebSocket() for _ in range(10)]
+    await manager.connect(stalled, "stalled")
+    for index, websocket in enumerate(fast):
+        await manager.connect(websocket, f"fast{index}")
+
+    for sequence in range(12):
+        await asyncio.wait_for(manager.broadcast({"seq": sequence}), timeout=0.1)
+    await settle()
+
+    assert all([m["seq"] for m in ws.messages()] == list(range(12)) for ws in fast)
+    slow = manager.active_connections["stalled"][0]
+    # 1 Frame im Writer + 8 in der Queue, Rest übersprungen
+    assert slow.degraded and slow.stats["skipped"] == 3
+    assert manager.get_stats()["degraded_connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_closes_slow_consumer():
+    manager = ConnectionManager(DeliveryConfig(queue_size=4, degrade_watermark=2, send_timeout=60))
+    stalled = FakeWebSocket(stalled=True)
+    await manager.connect(stalled, "stalled")
+    await settle()
+
+    for sequence in range(6):
+        await manager.send_personal_message({"seq": sequence}, "stalled")  # nicht verwerfbar
+    await settle()
+
+    assert manager.total_connections == 0
+    assert stalled.closed_with == (SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+    assert manager.stats["slow_consumers_closed"] == 1
+    assert await manager.send_personal_message({"seq": 99}, "stalled") == 0
+
+
+@pytest.mark.asyncio
+async def test_send_timeout_closes_stalled_socket():
+    manager = ConnectionManager(DeliveryConfig(send_timeout=0.02))
+    stalled = FakeWebSocket(stalled=True)
+    connection = await manager.connect(stalled, "stalled")
+
+    await connection.send({"type": "connected"})
+    await asyncio.sleep(0.1)
+
+    assert connection.closed and connection.close_reason == "send timeout"
+    assert manager.total_connections == 0
+    with pytest.raises(ConnectionClosed):
+        await connection.send({"type": "pong"})
+
+
+@pytest.mark.asyncio
+async def test_response_stream_waits_for_slow_client():
+    manager = ConnectionManager(DeliveryConfig(queue_size=4, degrade_watermark=2))
+    slow = FakeWebSocket(delay=0.001)
+    connection = await manager.connect(slow, "slow")
+
+    max_depth = 0
+    for index in range(50):
+        await connection.send({"type": "result", "index": index})
+        max_depth = max(max_depth, connection.queue_depth)
+    await wait_for_frames(slow, 50)
+
+    assert max_depth <= 4
+    assert [m["index"] for m in slow.messages()] == list(range(50))
+    assert not connection.closed
+
+
+@pytest.mark.asyncio
+async def test_send_threadsafe_from_worker_thread():
+    manager = ConnectionManager()
+    websocket = FakeWebSocket()
+    connection = await manager.connect(websocket, "logs")
+
+    thread = threading.Thread(
+        target=lambda: [connection.send_threadsafe({"type": "log", "n": n}) for n in range(5)]
+    )
+    thread.start()
+    thread.join()
+    await settle()
+
+    assert [m["n"] for m in websocket.messages()] == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_disconnect_by_websocket_cleans_up():
+    manager = ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, "same")
+    await manager.connect(second, "same")
+
+    manager.disconnect(first, "same")
+    manager.disconnect(first, "same")  # idempotent
+
+    assert manager.total_connections == 1
+    assert manager.active_clients == {"same"}
+    assert first not in manager.connection_metadata
+    assert first.closed_with is None  # Client hat selbst getrennt
+
+
+def test_iter_batches():
+    items = list(range(7))
+    assert list(iter_batches(items, 3)) == [(0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6])]
+    assert list(iter_batches(items, 0))[1] == (1, [1])
+    assert list(iter_batches([], 5)) == []
+
+
+@pytest.mark.asyncio
+async def test_log_handler_on_same_connection_does_not_recurse():
+    manager = ConnectionManager(DeliveryConfig(queue_size=4, degrade_watermark=2, send_timeout=60))
+    connection = await manager.connect(FakeWebSocket(stalled=True), "logs")
+
+    class ForwardingHandler(logging.Handler):
+        """Wie /ws/logs: jeder Log-Record wird über die Verbindung eingereiht"""
+
+        def emit(self, record):
+            connection.send_threadsafe({"type": "log", "message": record.getMessage()})
+
+    handler = ForwardingHandler()
+    delivery.logger.addHandler(handler)
+    previous_level = delivery.logger.level
+    delivery.logger.setLevel(logging.DEBUG)
+    try:
+        await settle()
+        for sequence in range(4):
+            connection.enqueue(encode_message({"seq": sequence}), droppable=True)
+        for sequence in range(3):
+            connection.enqueue(encode_message({"seq": sequence}))  # voll → schließen
+    finally:
+        delivery.logger.removeHandler(handler)
+        delivery.logger.setLevel(previous_level)
+
+    # 2 Frames in der Queue; übersprungen: 2 verwerfbare Frames + 1 Degrade-Log (keine Rekursion)
+    assert connection.stats["skipped"] == 3
+    assert connection.closed and connection.close_reason == "slow consumer"
+
+
+@pytest.mark.asyncio
+async def test_broadcast_during_backpressured_stream_keeps_connection():
+    manager = ConnectionManager(DeliveryConfig(queue_size=8, degrade_watermark=4))
+    slow = FakeWebSocket(delay=0.001)
+    connection = await manager.connect(slow, "reader")
+
+    async def broadcaster():
+        for sequence in range(20):
+            await manager.broadcast({"type": "status_update", "seq": sequence})
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(broadcaster())
+    for index in range(30):
+        await connection.send({"type": "result", "index": index})
+    await task
+    await wait_for_frames(slow, 30 + 20 - connection.stats["skipped"])
+
+    assert not connection.closed and manager.total_connections == 1
+    results = [m["index"] for m in slow.messages() if m["type"] == "result"]
+    assert results == list(range(30))
+    assert connection.stats["skipped"] > 0